@@ -0,0 +1,80 @@
+"""
+Backfill histórico de candles no Postgres (tabela klines).
+
+Exemplos:
+    python backfill.py --inicio 2024-01-01 --timeframes 15m
+    python backfill.py --symbols BTCUSDT ETHUSDT --inicio 2023-01-01 --fim 2024-01-01
+
+Reexecutar o mesmo comando busca só os trechos do período ainda não gravados.
+"""
+
+import argparse
+import sys
+
+from utils.logging_config import get_logger
+from utils.config import carregar_config
+from utils.schema_generator import generate_schema
+from plugins.gerenciadores.gerenciador_plugins import GerenciadorPlugins
+
+logger = get_logger(__name__)
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Preenche a tabela klines com o histórico da Bybit."
+    )
+    parser.add_argument(
+        "--symbols", nargs="+", help="Pares (padrão: pares da configuração)"
+    )
+    parser.add_argument(
+        "--timeframes",
+        nargs="+",
+        help="Timeframes (padrão: timeframes da configuração)",
+    )
+    parser.add_argument("--inicio", help="Início em UTC (ISO, ex: 2024-01-01)")
+    parser.add_argument("--fim", help="Fim exclusivo em UTC (padrão: agora)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = criar_parser().parse_args(argv)
+    gerente = None
+    try:
+        generate_schema()
+        config = carregar_config()
+        if not config:
+            logger.critical("Falha ao carregar configurações")
+            return 1
+
+        gerente = GerenciadorPlugins()
+        if not gerente.inicializar(config):
+            logger.critical("Falha ao inicializar GerenciadorPlugins")
+            return 1
+
+        backfill = gerente.obter_plugin("backfill_candles")
+        if not backfill:
+            logger.critical("Plugin backfill_candles não disponível")
+            return 1
+
+        resumo = backfill.executar(
+            symbols=args.symbols,
+            timeframes=args.timeframes,
+            inicio=args.inicio,
+            fim=args.fim,
+        )
+        for chave, total in sorted(resumo.items()):
+            logger.info(f"[backfill] {chave}: {total} candles gravados")
+        return 0 if resumo else 1
+    except KeyboardInterrupt:
+        logger.info("Backfill interrompido; a próxima execução retoma de onde parou")
+        return 130
+    except Exception as e:
+        logger.critical(f"Erro fatal no backfill: {e}", exc_info=True)
+        return 1
+    finally:
+        if gerente:
+            gerente.finalizar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,7 @@ from utils.handlers import registrar_sinais
 from plugins.gerenciadores.gerenciador import BaseGerenciador
 from plugins.gerenciadores.gerenciador_plugins import GerenciadorPlugins
 from utils.schema_generator import generate_schema
+from utils.agendador_ciclos import AgendadorCiclos
 
 logger = get_logger(__name__)
 
@@ -73,7 +74,9 @@ def iniciar_bot(config: dict) -> tuple:
         raise
 
 
-def loop_principal(gerenciador_bot, gerente, cycle_interval: float):
+def loop_principal(
+    gerenciador_bot, gerente, cycle_interval: float, agendador: AgendadorCiclos = None
+):
     """
     Executa o loop principal do bot.
 
@@ -81,7 +84,10 @@ def loop_principal(gerenciador_bot, gerente, cycle_interval: float):
         gerenciador_bot: Instância de GerenciadorBot.
         gerente: Instância de GerenciadorPlugins.
         cycle_interval: Intervalo entre ciclos (segundos).
+        agendador: Agendador dos ciclos (grade fixa + fechamento de candles).
+            Padrão: grade fixa de cycle_interval.
     """
+    agendador = agendador or AgendadorCiclos(cycle_interval)
     while True:
         try:
             logger.info("Iniciando ciclo de execução")
@@ -89,7 +95,7 @@ def loop_principal(gerenciador_bot, gerente, cycle_interval: float):
                 logger.warning("Ciclo com falha parcial. Continuando...")
             else:
                 logger.info("Ciclo concluído com sucesso")
-            time.sleep(cycle_interval)
+            agendador.aguardar()
         except KeyboardInterrupt:
             logger.info("Encerramento solicitado pelo usuário (Ctrl+C)")
             gerenciador_bot.finalizar()
@@ -128,7 +134,17 @@ def main():
 
         gerenciador_bot, gerente = iniciar_bot(config)
 
-        loop_principal(gerenciador_bot, gerente, cycle_interval)
+        # Acorda logo após o fechamento de candle de cada timeframe
+        cfg_agendador = config.get("bot", {}).get("agendador", {})
+        agendador = AgendadorCiclos(
+            cycle_interval,
+            timeframes=(
+                config.get("timeframes", []) if cfg_agendador.get("ativo") else []
+            ),
+            atraso_fechamento=cfg_agendador.get("atraso_fechamento", 2.0),
+        )
+
+        loop_principal(gerenciador_bot, gerente, cycle_interval, agendador)
 
     except Exception as e:
         logger.critical(f"Erro fatal ao executar o bot: {e}", exc_info=True)
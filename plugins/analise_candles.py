@@ -8,14 +8,15 @@ Toda a lógica de ciclo de vida é centralizada no GerenciadorPlugins.
 import os
 import json
 import numpy as np
-import talib
 from typing import Dict, Any, List
 import datetime
 
 from utils.logging_config import get_logger
 from plugins.plugin import Plugin
 from utils.config import carregar_config
-from utils.plugin_utils import validar_klines
+from utils.plugin_utils import validar_klines, validacao_klines
+from utils.candles_colunares import CandlesOHLCV
+from utils.scanner_padroes import ScannerPadroes
 
 logger = get_logger(__name__)
 
@@ -32,6 +33,8 @@ class AnaliseCandles(Plugin):
     PLUGIN_CATEGORIA = "plugin"
     PLUGIN_TAGS = ["analise", "candles", "padroes"]
     PLUGIN_PRIORIDADE = 100
+    PLUGIN_CONSOME = ["crus"]
+    PLUGIN_PRODUZ = ["padroes_candles"]
 
     @property
     def plugin_schema_versao(self) -> str:
@@ -87,18 +90,11 @@ class AnaliseCandles(Plugin):
         self._gerente = kwargs.get("gerente")
         self._gerenciador_banco = kwargs.get("gerenciador_banco")
         self._padroes_talib = self._carregar_padroes()
-        self._funcoes_talib = self._mapear_funcoes_talib()
-
-    def _mapear_funcoes_talib(self) -> Dict[str, callable]:
-        """
-        Mapeia os nomes dos padrões para as funções do TA-Lib.
-        """
-        funcoes = {}
-        for padrao in self._padroes_talib:
-            nome_funcao = f"CDL{padrao.upper()}"
-            if hasattr(talib, nome_funcao):
-                funcoes[padrao] = getattr(talib, nome_funcao)
-        return funcoes
+        # Avalia cada padrão só na janela final que ele exige, com cache por candle
+        self._scanner = ScannerPadroes(
+            self._padroes_talib,
+            capacidade=config.get("cache_padroes_candles", {}).get("capacidade", 4096),
+        )
 
     def _carregar_padroes(self) -> set:
         """
@@ -127,6 +123,15 @@ class AnaliseCandles(Plugin):
 
     def _extrair_ohlcv(self, candles: list) -> dict:
         """Extrai arrays OHLCV dos candles."""
+        if isinstance(candles, CandlesOHLCV) and candles.completo(range(6)):
+            return {
+                "timestamp": candles.timestamp,
+                "open": candles.open,
+                "high": candles.high,
+                "low": candles.low,
+                "close": candles.close,
+                "volume": candles.volume,
+            }
         try:
             dados = list(zip(*candles))
             return {
@@ -148,94 +153,90 @@ class AnaliseCandles(Plugin):
                 "volume": np.array([]),
             }
 
-    def _identificar_padroes(self, ohlcv: dict) -> List[Dict]:
+    def _identificar_padroes(
+        self, ohlcv: dict, symbol: str = None, timeframe: str = None
+    ) -> List[Dict]:
         """
-        Identifica padrões de candlestick usando TA-Lib.
+        Identifica padrões de candlestick no último candle usando TA-Lib.
         """
         padroes_encontrados = []
 
-        for nome_padrao, funcao in self._funcoes_talib.items():
-            try:
-                resultado = funcao(
-                    ohlcv["open"], ohlcv["high"], ohlcv["low"], ohlcv["close"]
+        try:
+            ocorrencias = self._scanner.escanear_colunas(
+                ohlcv["timestamp"],
+                ohlcv["open"],
+                ohlcv["high"],
+                ohlcv["low"],
+                ohlcv["close"],
+                symbol=symbol,
+                timeframe=timeframe,
+            )
+        except Exception as e:
+            logger.error(f"[{self.nome}] Erro ao escanear padrões: {e}")
+            return padroes_encontrados
+
+        for ocorrencia in ocorrencias:
+            valor = int(ocorrencia["valor"])
+            direcao = "LONG" if valor > 0 else "SHORT"
+            forca = abs(valor) / 100.0
+
+            # Calcula stop loss e take profit
+            if direcao == "LONG":
+                stop_loss = float(min(ohlcv["low"][-3:]))
+                take_profit = float(
+                    ohlcv["close"][-1] + (ohlcv["close"][-1] - stop_loss) * 1.5
                 )
-
-                # Verifica o último candle
-                if resultado[-1] != 0:
-                    direcao = "LONG" if resultado[-1] > 0 else "SHORT"
-                    forca = abs(resultado[-1]) / 100.0
-
-                    # Calcula stop loss e take profit
-                    if direcao == "LONG":
-                        stop_loss = float(min(ohlcv["low"][-3:]))
-                        take_profit = float(
-                            ohlcv["close"][-1] + (ohlcv["close"][-1] - stop_loss) * 1.5
-                        )
-                    else:
-                        stop_loss = float(max(ohlcv["high"][-3:]))
-                        take_profit = float(
-                            ohlcv["close"][-1] - (stop_loss - ohlcv["close"][-1]) * 1.5
-                        )
-
-                    padrao = {
-                        "timestamp": datetime.datetime.fromtimestamp(
-                            int(ohlcv["timestamp"][-1] / 1000)
-                        ),
-                        "padrao": nome_padrao,
-                        "direcao": direcao,
-                        "forca": round(forca, 2),
-                        "confianca": round(min(forca * 1.5, 1.0), 2),
-                        "preco_entrada": float(ohlcv["close"][-1]),
-                        "stop_loss": stop_loss,
-                        "take_profit": take_profit,
-                        "volume": float(ohlcv["volume"][-1]),
-                    }
-                    padroes_encontrados.append(padrao)
-
-            except Exception as e:
-                logger.error(
-                    f"[{self.nome}] Erro ao processar padrão {nome_padrao}: {e}"
+            else:
+                stop_loss = float(max(ohlcv["high"][-3:]))
+                take_profit = float(
+                    ohlcv["close"][-1] - (stop_loss - ohlcv["close"][-1]) * 1.5
                 )
-                continue
+
+            padrao = {
+                "timestamp": datetime.datetime.fromtimestamp(
+                    int(ohlcv["timestamp"][-1] / 1000)
+                ),
+                "padrao": str(ocorrencia["padrao"]),
+                "direcao": direcao,
+                "forca": round(forca, 2),
+                "confianca": round(min(forca * 1.5, 1.0), 2),
+                "preco_entrada": float(ohlcv["close"][-1]),
+                "stop_loss": stop_loss,
+                "take_profit": take_profit,
+                "volume": float(ohlcv["volume"][-1]),
+            }
+            padroes_encontrados.append(padrao)
 
         return padroes_encontrados
 
-    def _detectar_padroes(self, candles: list) -> list:
+    def _detectar_padroes(
+        self, candles: list, symbol: str = None, timeframe: str = None
+    ) -> list:
         """
         Detecta padrões de candles usando os dados fornecidos e TA-Lib.
 
         Args:
             candles (list): Lista de candles no formato OHLCV.
+            symbol (str, optional): Par (habilita o cache por candle).
+            timeframe (str, optional): Timeframe.
 
         Returns:
             list: Lista de padrões detectados com informações detalhadas.
         """
-        from talib import abstract
-
         padroes_detectados = []
 
         try:
-            # Extrair OHLCV
-            ohlcv = self._extrair_ohlcv(candles)
-
-            # Iterar sobre os padrões disponíveis no padroes_talib.json
-            for padrao in self._padroes_talib:
-                nome_funcao = f"CDL{padrao.upper()}"
-                if hasattr(abstract, nome_funcao):
-                    funcao = getattr(abstract, nome_funcao)
-                    resultado = funcao(ohlcv)
-
-                    # Verificar o último candle para o padrão detectado
-                    if resultado[-1] != 0:
-                        direcao = "Alta" if resultado[-1] > 0 else "Baixa"
-                        padroes_detectados.append(
-                            {
-                                "padrao": padrao,
-                                "direcao": direcao,
-                                "candle": candles[-1],
-                                "forca": abs(resultado[-1]),
-                            }
-                        )
+            ocorrencias = self._scanner.escanear(candles, symbol, timeframe)
+            for ocorrencia in ocorrencias:
+                valor = int(ocorrencia["valor"])
+                padroes_detectados.append(
+                    {
+                        "padrao": str(ocorrencia["padrao"]),
+                        "direcao": "Alta" if valor > 0 else "Baixa",
+                        "candle": candles[-1],
+                        "forca": abs(valor),
+                    }
+                )
 
         except Exception as e:
             logger.error(f"[{self.nome}] Erro ao detectar padrões: {e}", exc_info=True)
@@ -277,7 +278,7 @@ class AnaliseCandles(Plugin):
                 return {}
 
             # Identificar padrões
-            padroes = self._identificar_padroes(ohlcv)
+            padroes = self._identificar_padroes(ohlcv, symbol, timeframe)
             if not padroes:
                 return {}
 
@@ -309,7 +310,7 @@ class AnaliseCandles(Plugin):
             candles = dados_completos.get("crus", [])
             if not self._validar_candles(candles, symbol, timeframe):
                 return resultado_padrao
-            padroes = self._detectar_padroes(candles)
+            padroes = self._detectar_padroes(candles, symbol, timeframe)
             logger.debug(
                 f"[{self.nome}] Padrões detectados para {symbol}-{timeframe}: {padroes}"
             )
@@ -338,18 +339,10 @@ class AnaliseCandles(Plugin):
                 f"[{self.nome}] Candles insuficientes para {symbol} - {timeframe}"
             )
             return False
-        for item in candles:
-            if not isinstance(item, (list, tuple)) or len(item) < 5:
-                logger.error(
-                    f"[{self.nome}] Item inválido em candles para {symbol} - {timeframe}: {item}"
-                )
-                return False
-            for idx in [2, 3, 4]:  # high, low, close
-                try:
-                    float(item[idx])
-                except (TypeError, ValueError):
-                    logger.error(
-                        f"[{self.nome}] Valor não numérico em candles[{idx}]: {item[idx]}"
-                    )
-                    return False
+        relatorio = validacao_klines(candles)
+        if not relatorio.valido((2, 3, 4)):
+            logger.error(
+                f"[{self.nome}] Candles inválidos para {symbol} - {timeframe}: {relatorio.problemas()}"
+            )
+            return False
         return True
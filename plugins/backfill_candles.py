@@ -0,0 +1,397 @@
+"""
+Plugin de backfill de candles.
+Responsabilidade única: preencher o histórico de candles (tabela klines) no Postgres.
+Não deve registrar, inicializar ou finalizar automaticamente.
+Toda a lógica de ciclo de vida é centralizada no GerenciadorPlugins.
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from plugins.plugin import Plugin
+from utils.armazem_candles import timeframe_para_ms
+from utils.config import carregar_config
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Trechos contíguos já gravados no intervalo (ilhas de candles consecutivos)
+SQL_INTERVALOS_GRAVADOS = (
+    "SELECT MIN(ms), MAX(ms) FROM ("
+    " SELECT ms, ms - ROW_NUMBER() OVER (ORDER BY ms) * %s AS ilha FROM ("
+    "  SELECT DISTINCT (EXTRACT(EPOCH FROM timestamp) * 1000)::bigint AS ms"
+    "  FROM klines WHERE symbol = %s AND timeframe = %s"
+    "  AND timestamp >= to_timestamp(%s) AT TIME ZONE 'UTC'"
+    "  AND timestamp < to_timestamp(%s) AT TIME ZONE 'UTC'"
+    " ) candles"
+    ") ilhas GROUP BY ilha ORDER BY 1"
+)
+
+
+def converter_para_ms(valor) -> Optional[int]:
+    """
+    Converte datetime, string ISO (UTC) ou número (ms) em timestamp em milissegundos.
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, (int, float)):
+        return int(valor)
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor)
+    if valor.tzinfo is None:
+        valor = valor.replace(tzinfo=timezone.utc)
+    return int(valor.timestamp() * 1000)
+
+
+def paginar_intervalo(
+    inicio_ms: int, fim_ms: int, timeframe: str, tamanho_pagina: int
+) -> List[Tuple[int, int]]:
+    """
+    Divide [inicio_ms, fim_ms) em páginas de até tamanho_pagina candles.
+
+    Returns:
+        list: Pares (since, ate) alinhados ao timeframe, com ate exclusivo.
+    """
+    passo = timeframe_para_ms(timeframe)
+    inicio_ms = (inicio_ms + passo - 1) // passo * passo  # alinha ao próximo candle
+    largura = passo * tamanho_pagina
+    paginas = []
+    since = inicio_ms
+    while since < fim_ms:
+        ate = min(since + largura, fim_ms)
+        paginas.append((since, ate))
+        since = ate
+    return paginas
+
+
+def lacunas(
+    inicio_ms: int, fim_ms: int, passo: int, gravados: List[Tuple[int, int]]
+) -> List[Tuple[int, int]]:
+    """
+    Trechos de [inicio_ms, fim_ms) sem candles gravados.
+
+    Args:
+        gravados (list): Trechos contíguos já gravados (primeiro, último), em ms
+            e em ordem.
+
+    Returns:
+        list: Pares (inicio, fim) com fim exclusivo.
+    """
+    faltantes = []
+    cursor = (inicio_ms + passo - 1) // passo * passo
+    for primeiro, ultimo in gravados:
+        if primeiro > cursor:
+            faltantes.append((cursor, min(primeiro, fim_ms)))
+        cursor = max(cursor, ultimo + passo)
+    if cursor < fim_ms:
+        faltantes.append((cursor, fim_ms))
+    return [(a, b) for a, b in faltantes if a < b]
+
+
+class BackfillCandles(Plugin):
+    """
+    Plugin de carga histórica de candles para ML e backtests.
+    - Divide o período em páginas por (symbol, timeframe) e as busca
+      concorrentemente pelo cliente assíncrono (dentro do limitador de taxa).
+    - Grava por COPY em lotes (GerenciadorBanco.inserir_klines_em_lote) e, na retomada, busca só as lacunas do período
+      (candles já gravados pelo bot ou por um backfill anterior são pulados).
+    """
+
+    PLUGIN_NAME = "backfill_candles"
+    PLUGIN_CATEGORIA = "plugin"
+    PLUGIN_TAGS = ["dados", "historico", "banco"]
+    PLUGIN_PRIORIDADE = 110
+
+    @classmethod
+    def dependencias(cls):
+        """Declara dependências deste plugin."""
+        return ["conexao", "gerenciador_banco"]
+
+    def __init__(self, conexao=None, gerenciador_banco=None, **kwargs):
+        """
+        Inicializa o plugin com as dependências de conexão e banco.
+        """
+        super().__init__(**kwargs)
+        self._conexao = conexao
+        self._gerenciador_banco = gerenciador_banco
+        # Carrega config institucional centralizada
+        config = carregar_config()
+        self._config = (
+            config.get("plugins", {}).get("backfill_candles", {}).copy()
+            if "plugins" in config and "backfill_candles" in config["plugins"]
+            else {}
+        )
+        # Bybit retorna no máximo 1000 candles por requisição
+        self.tamanho_pagina = self._config.get("tamanho_pagina", 1000)
+        self.concorrencia = self._config.get("concorrencia", 8)
+        self.paginas_por_lote = self._config.get("paginas_por_lote", 10)
+        self.dias_padrao = self._config.get("dias_padrao", 365)
+
+    def executar(
+        self,
+        symbols: List[str] = None,
+        timeframes: List[str] = None,
+        inicio=None,
+        fim=None,
+        **kwargs,
+    ) -> Dict[str, int]:
+        """
+        Executa o backfill dos pares/timeframes no intervalo pedido.
+
+        Args:
+            symbols (list, optional): IDs dos pares. Padrão: config["pares"].
+            timeframes (list, optional): Timeframes. Padrão: config["timeframes"].
+            inicio: Início (datetime, ISO UTC ou ms). Padrão: fim - dias_padrao.
+            fim: Fim exclusivo (datetime, ISO UTC ou ms). Padrão: agora.
+
+        Returns:
+            dict: "SYMBOL-timeframe" -> quantidade de candles gravados.
+        """
+        try:
+            config = carregar_config()
+            symbols = symbols or config.get("pares", [])
+            timeframes = timeframes or config.get("timeframes", [])
+            fim_ms = converter_para_ms(fim) or int(time.time() * 1000)
+            inicio_ms = converter_para_ms(inicio) or converter_para_ms(
+                datetime.fromtimestamp(fim_ms / 1000, tz=timezone.utc)
+                - timedelta(days=self.dias_padrao)
+            )
+            if not self._gerenciador_banco or not self._gerenciador_banco.conn:
+                logger.error(f"[{self.nome}] Conexão com o banco indisponível.")
+                return {}
+            cliente = self._conexao.obter_cliente_async() if self._conexao else None
+            if not cliente:
+                logger.error(f"[{self.nome}] Cliente assíncrono não disponível.")
+                return {}
+            # Resolvidos antes do event loop: obter_info_par pode precisar
+            # carregar os mercados (fetch_markets síncrono)
+            simbolos = {
+                symbol: (self._conexao.obter_info_par(symbol) or {}).get(
+                    "symbol", symbol
+                )
+                for symbol in symbols
+            }
+            inicio_execucao = time.monotonic()
+            resumo = self._conexao.executar_async(
+                self._backfill_async(
+                    cliente, symbols, timeframes, inicio_ms, fim_ms, simbolos
+                )
+            )
+            duracao = time.monotonic() - inicio_execucao
+            logger.info(
+                f"[{self.nome}] Backfill concluído: {sum(resumo.values())} candles em "
+                f"{duracao:.1f}s ({len(resumo)} pares/timeframes)"
+            )
+            self._registrar_execucao(
+                symbols, timeframes, inicio_ms, fim_ms, resumo, duracao
+            )
+            return resumo
+        except Exception as e:
+            logger.error(f"[{self.nome}] Erro no backfill: {e}", exc_info=True)
+            return {}
+
+    async def _backfill_async(
+        self,
+        cliente,
+        symbols: List[str],
+        timeframes: List[str],
+        inicio_ms: int,
+        fim_ms: int,
+        simbolos: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, int]:
+        """
+        Coordena as buscas concorrentes e a escrita serializada no banco.
+        simbolos: symbol -> symbol CCXT já resolvido fora do event loop.
+        """
+        simbolos = simbolos or {}
+        loop = asyncio.get_running_loop()
+        semaforo = asyncio.Semaphore(max(1, int(self.concorrencia)))
+        # psycopg2 não é thread-safe por conexão: uma única thread grava
+        escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backfill")
+        try:
+            chaves = [(s, tf) for s in symbols for tf in timeframes]
+            totais = await asyncio.gather(
+                *(
+                    self._backfill_par(
+                        cliente,
+                        semaforo,
+                        escritor,
+                        s,
+                        tf,
+                        inicio_ms,
+                        fim_ms,
+                        simbolos.get(s, s),
+                    )
+                    for s, tf in chaves
+                ),
+                return_exceptions=True,
+            )
+            resumo = {}
+            for (s, tf), total in zip(chaves, totais):
+                if isinstance(total, Exception):
+                    logger.error(f"[{self.nome}] Backfill de {s}-{tf} falhou: {total}")
+                    total = 0
+                resumo[f"{s}-{tf}"] = total
+            return resumo
+        finally:
+            escritor.shutdown(wait=True)
+
+    async def _backfill_par(
+        self,
+        cliente,
+        semaforo: asyncio.Semaphore,
+        escritor: ThreadPoolExecutor,
+        symbol: str,
+        timeframe: str,
+        inicio_ms: int,
+        fim_ms: int,
+        exchange_symbol: str,
+    ) -> int:
+        """Backfill de um (symbol, timeframe), em lotes de páginas concorrentes."""
+        loop = asyncio.get_running_loop()
+        passo = timeframe_para_ms(timeframe)
+        # Só candles fechados: o candle aberto seria gravado com valores parciais
+        fim_ms = min(fim_ms, int(time.time() * 1000) // passo * passo)
+        gravados = await loop.run_in_executor(
+            escritor, self._intervalos_gravados, symbol, timeframe, inicio_ms, fim_ms
+        )
+        paginas = [
+            pagina
+            for inicio, fim in lacunas(inicio_ms, fim_ms, passo, gravados)
+            for pagina in paginar_intervalo(inicio, fim, timeframe, self.tamanho_pagina)
+        ]
+        if not paginas:
+            return 0
+
+        async def buscar_pagina(since: int, ate: int) -> Optional[list]:
+            async with semaforo:
+                try:
+                    candles = await cliente.fetch_ohlcv(
+                        exchange_symbol,
+                        timeframe,
+                        since=since,
+                        limit=self.tamanho_pagina,
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"[{self.nome}] Falha na página {since} de {symbol}-{timeframe}: {e}"
+                    )
+                    return None
+            return [c for c in candles or [] if since <= c[0] < ate]
+
+        total = 0
+        for i in range(0, len(paginas), self.paginas_por_lote):
+            lote = paginas[i : i + self.paginas_por_lote]
+            resultados = await asyncio.gather(*(buscar_pagina(*p) for p in lote))
+            linhas = []
+            falhou = False
+            for resultado in resultados:
+                # Grava apenas o prefixo de páginas bem-sucedidas; o restante
+                # volta como lacuna na retomada
+                if resultado is None:
+                    falhou = True
+                    break
+                linhas.extend(resultado)
+            if linhas:
+                gravou = await loop.run_in_executor(
+                    escritor,
+                    self._gerenciador_banco.inserir_klines_em_lote,
+                    self.PLUGIN_NAME,
+                    symbol,
+                    timeframe,
+                    linhas,
+                )
+                if gravou:
+                    total += len(linhas)
+                else:
+                    falhou = True
+            if falhou:
+                logger.warning(
+                    f"[{self.nome}] Backfill de {symbol}-{timeframe} interrompido; "
+                    "as lacunas serão buscadas na retomada."
+                )
+                break
+        return total
+
+    def _registrar_execucao(
+        self,
+        symbols: List[str],
+        timeframes: List[str],
+        inicio_ms: int,
+        fim_ms: int,
+        resumo: Dict[str, int],
+        duracao: float,
+    ) -> None:
+        """Persiste o resumo da execução em backfill_execucoes."""
+        try:
+            self._gerenciador_banco.persistir_dados(
+                self.PLUGIN_NAME,
+                "backfill_execucoes",
+                {
+                    "timestamp": datetime.now(timezone.utc).replace(tzinfo=None),
+                    "inicio": datetime.fromtimestamp(
+                        inicio_ms / 1000, tz=timezone.utc
+                    ).replace(tzinfo=None),
+                    "fim": datetime.fromtimestamp(
+                        fim_ms / 1000, tz=timezone.utc
+                    ).replace(tzinfo=None),
+                    "symbols": json.dumps(symbols),
+                    "timeframes": json.dumps(timeframes),
+                    "candles_gravados": sum(resumo.values()),
+                    "duracao_segundos": round(duracao, 2),
+                    "detalhes": json.dumps(resumo),
+                },
+            )
+        except Exception as e:
+            logger.warning(f"[{self.nome}] Falha ao registrar execução: {e}")
+
+    def _intervalos_gravados(
+        self, symbol: str, timeframe: str, inicio_ms: int, fim_ms: int
+    ) -> List[Tuple[int, int]]:
+        """Trechos contíguos (primeiro, último) em ms já gravados no período."""
+        linhas = self._gerenciador_banco.executar_sql(
+            SQL_INTERVALOS_GRAVADOS,
+            (
+                timeframe_para_ms(timeframe),
+                symbol,
+                timeframe,
+                inicio_ms / 1000,
+                fim_ms / 1000,
+            ),
+            fetchall=True,
+        )
+        return [(int(primeiro), int(ultimo)) for primeiro, ultimo in linhas or []]
+
+    @property
+    def plugin_tabelas(self) -> dict:
+        """
+        Tabela de execuções do backfill (os candles vão para a tabela klines do BancoDados).
+        """
+        return {
+            "backfill_execucoes": {
+                "descricao": "Registra cada execução do backfill de candles (período, pares, timeframes, total gravado e duração) para rastreabilidade.",
+                "modo_acesso": "own",
+                "plugin": self.PLUGIN_NAME,
+                "schema": {
+                    "id": "SERIAL PRIMARY KEY",
+                    "timestamp": "TIMESTAMP NOT NULL",
+                    "inicio": "TIMESTAMP",
+                    "fim": "TIMESTAMP",
+                    "symbols": "JSONB",
+                    "timeframes": "JSONB",
+                    "candles_gravados": "INTEGER",
+                    "duracao_segundos": "DECIMAL(10,2)",
+                    "observacoes": "TEXT",
+                    "detalhes": "JSONB",
+                    "created_at": "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+                },
+            }
+        }
+
+    @property
+    def plugin_schema_versao(self) -> str:
+        return "1.0"
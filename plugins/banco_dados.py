@@ -11,6 +11,7 @@ from typing import List, Dict, Any, Optional
 import psycopg2
 from psycopg2.extras import DictCursor
 import datetime
+import io
 import logging
 from utils.config import carregar_config
 from utils.plugin_utils import validar_klines
@@ -96,6 +97,13 @@ class BancoDados(Plugin):
                     "observacoes": "TEXT",
                     "created_at": "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
                 },
+                "indices": {
+                    "idx_klines_symbol_timeframe_timestamp": [
+                        "symbol",
+                        "timeframe",
+                        "timestamp",
+                    ],
+                },
             },
         }
 
@@ -511,3 +519,58 @@ class BancoDados(Plugin):
                 )
                 return False
         return True
+
+    def inserir_klines_em_lote(
+        self, klines: List[List], symbol: str, timeframe: str
+    ) -> bool:
+        """
+        Grava candles OHLCV na tabela 'klines' via COPY em uma única transação.
+        Usado pela carga histórica, onde um INSERT por candle seria lento demais.
+        """
+        if not self._conn:
+            log_banco(
+                plugin=self.PLUGIN_NAME,
+                tabela="klines",
+                operacao="COPY",
+                dados="Conexão não inicializada",
+                nivel=logging.ERROR,
+            )
+            return False
+        if not klines:
+            return True
+        buffer = io.StringIO()
+        for kline in klines:
+            ts = datetime.datetime.fromtimestamp(
+                kline[0] / 1000, tz=datetime.timezone.utc
+            )
+            buffer.write(
+                f"{symbol},{timeframe},{ts:%Y-%m-%d %H:%M:%S},"
+                f"{kline[1]},{kline[2]},{kline[3]},{kline[4]},{kline[5]}\n"
+            )
+        buffer.seek(0)
+        try:
+            with self._conn.cursor() as cur:
+                cur.copy_expert(
+                    "COPY klines (symbol, timeframe, timestamp, open, high, low, "
+                    "close, volume) FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+            self._conn.commit()
+        except Exception as e:
+            self._conn.rollback()
+            log_banco(
+                plugin=self.PLUGIN_NAME,
+                tabela="klines",
+                operacao="COPY",
+                dados=f"Erro ao gravar {len(klines)} candles de {symbol}-{timeframe}: {e}",
+                nivel=logging.ERROR,
+            )
+            return False
+        log_banco(
+            plugin=self.PLUGIN_NAME,
+            tabela="klines",
+            operacao="COPY",
+            dados=f"{len(klines)} candles gravados para {symbol}-{timeframe}",
+            nivel=logging.INFO,
+        )
+        return True
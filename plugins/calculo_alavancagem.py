@@ -6,12 +6,11 @@ Toda a lógica de ciclo de vida é centralizada no GerenciadorPlugins.
 """
 
 import numpy as np
-import talib
 
 from plugins.plugin import Plugin
 from utils.logging_config import get_logger
 from utils.config import carregar_config
-from utils.plugin_utils import validar_klines
+from utils.plugin_utils import validar_klines, validacao_klines
 
 logger = get_logger(__name__)
 
@@ -40,6 +39,8 @@ class CalculoAlavancagem(Plugin):
     PLUGIN_CATEGORIA = "plugin"
     PLUGIN_TAGS = ["analise", "volatilidade", "alavancagem"]
     PLUGIN_PRIORIDADE = 85
+    PLUGIN_CONSOME = ["crus"]
+    PLUGIN_PRODUZ = ["alavancagem"]
 
     def __init__(self, **kwargs):
         """
@@ -88,6 +89,10 @@ class CalculoAlavancagem(Plugin):
             logger.error(f"[{self.nome}] Erro ao inicializar: {e}", exc_info=True)
             return False
 
+    def indicadores_requeridos(self) -> list:
+        """ATR usado no cálculo da alavancagem."""
+        return [("ATR", {"timeperiod": 14})]
+
     def _validar_klines(self, klines: list, symbol: str, timeframe: str) -> bool:
         """
         Valida o formato da lista de klines.
@@ -110,22 +115,12 @@ class CalculoAlavancagem(Plugin):
             )
             return False
 
-        for kline in klines:
-            if not isinstance(kline, (list, tuple)) or len(kline) < 6:
-                logger.error(
-                    f"[{self.nome}] K-line malformada para {symbol} - {timeframe}: {kline}"
-                )
-                return False
-            try:
-                # Verificar se high, low, close são numéricos
-                for i in [2, 3, 4]:  # Índices 2, 3, 4
-                    float(kline[i])
-            except (TypeError, ValueError):
-                logger.error(
-                    f"[{self.nome}] Valor não numérico em k-line para {symbol} - {timeframe}: {kline}"
-                )
-                return False
-
+        relatorio = validacao_klines(klines)
+        if not relatorio.valido((2, 3, 4)):
+            logger.error(
+                f"[{self.nome}] K-lines inválidas para {symbol} - {timeframe}: {relatorio.problemas()}"
+            )
+            return False
         return True
 
     def executar(self, *args, **kwargs):
@@ -148,7 +143,11 @@ class CalculoAlavancagem(Plugin):
             direcao = kwargs.get("direcao", None)
             confianca = kwargs.get("confianca", 0.0)
             alavancagem = self.calcular_alavancagem(
-                crus, direcao=direcao, confianca=confianca
+                crus,
+                direcao=direcao,
+                confianca=confianca,
+                symbol=symbol,
+                timeframe=timeframe,
             )
             logger.debug(
                 f"[{self.nome}] Alavancagem atribuída para {symbol}-{timeframe}: {alavancagem}x"
@@ -159,7 +158,12 @@ class CalculoAlavancagem(Plugin):
             return resultado_padrao
 
     def calcular_alavancagem(
-        self, crus: list, direcao: str = None, confianca: float = 0.0
+        self,
+        crus: list,
+        direcao: str = None,
+        confianca: float = 0.0,
+        symbol: str = None,
+        timeframe: str = None,
     ) -> float:
         """
         Calcula a alavancagem com base no ATR (volatilidade) e na confiança do sinal.
@@ -169,22 +173,23 @@ class CalculoAlavancagem(Plugin):
             crus: Lista de k-lines.
             direcao: Direção do sinal (ex.: ALTA, BAIXA, NEUTRO).
             confianca: Confiança do sinal (0.0 a 1.0).
+            symbol: Par (chave do cache de indicadores).
+            timeframe: Timeframe (chave do cache de indicadores).
 
         Returns:
             float: Alavancagem calculada.
         """
         try:
-            highs = np.array([float(c[2]) for c in crus], dtype=np.float64)
-            lows = np.array([float(c[3]) for c in crus], dtype=np.float64)
-            closes = np.array([float(c[4]) for c in crus], dtype=np.float64)
+            preco_atual = float(crus[-1][4])
 
-            atr = talib.ATR(highs, lows, closes, timeperiod=14)
-            if atr is None or atr.size == 0 or closes[-1] == 0:
+            atr = self.indicadores.calcular(
+                "ATR", crus, symbol, timeframe, timeperiod=14
+            )
+            if atr is None or atr.size == 0 or preco_atual == 0:
                 logger.warning(f"[{self.nome}] ATR inválido ou preço atual zerado")
                 return self._alav_min
 
             atr_atual = atr[-1]
-            preco_atual = closes[-1]
             volatilidade = atr_atual / preco_atual
 
             if direcao and direcao.upper() == "NEUTRO":
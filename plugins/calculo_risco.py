@@ -7,10 +7,9 @@ Toda a lógica de ciclo de vida é centralizada no GerenciadorPlugins.
 
 from utils.logging_config import get_logger
 import numpy as np
-import talib
 from plugins.plugin import Plugin
 from utils.config import carregar_config
-from utils.plugin_utils import validar_klines
+from utils.plugin_utils import validar_klines, validacao_klines
 
 logger = get_logger(__name__)
 
@@ -137,22 +136,12 @@ class CalculoRisco(Plugin):
             )
             return False
 
-        for kline in klines:
-            if not isinstance(kline, (list, tuple)) or len(kline) < 6:
-                logger.error(
-                    f"[{self.nome}] K-line malformada para {symbol} - {timeframe}: {kline}"
-                )
-                return False
-            try:
-                # Verificar se high, low, close, volume são numéricos
-                for i in [2, 3, 4, 5]:
-                    float(kline[i])
-            except (TypeError, ValueError):
-                logger.error(
-                    f"[{self.nome}] Valor não numérico em k-line para {symbol} - {timeframe}: {kline}"
-                )
-                return False
-
+        relatorio = validacao_klines(klines)
+        if not relatorio.valido((2, 3, 4, 5)):
+            logger.error(
+                f"[{self.nome}] K-lines inválidas para {symbol} - {timeframe}: {relatorio.problemas()}"
+            )
+            return False
         return True
 
     def executar(self, *args, **kwargs):
@@ -179,7 +168,7 @@ class CalculoRisco(Plugin):
         if not self._validar_klines(klines, symbol, timeframe):
             return resultado_padrao
         try:
-            sinal = self.gerar_sinal(klines)
+            sinal = self.gerar_sinal(klines, symbol, timeframe)
             return {"calculo_risco": sinal}
         except Exception as e:
             logger.error(f"[{self.nome}] Erro ao executar: {e}", exc_info=True)
@@ -205,20 +194,22 @@ class CalculoRisco(Plugin):
             logger.error(f"[{self.nome}] Erro na extração dos dados: {e}")
             return {i: np.array([]) for i in indices}
 
-    def gerar_sinal(self, klines: list) -> dict:
+    def gerar_sinal(
+        self, klines: list, symbol: str = None, timeframe: str = None
+    ) -> dict:
         """
         Gera sinal de risco baseado em indicadores técnicos.
 
         Args:
             klines: Lista de k-lines.
+            symbol: Par (chave do cache de indicadores).
+            timeframe: Timeframe (chave do cache de indicadores).
 
         Returns:
             dict: Sinal com direção, força, confiança e indicadores.
         """
         try:
-            dados_extraidos = self._extrair_dados(klines, [2, 3, 4, 5])
-            high = dados_extraidos[2]
-            low = dados_extraidos[3]
+            dados_extraidos = self._extrair_dados(klines, [4, 5])
             close = dados_extraidos[4]
             volume = dados_extraidos[5]
 
@@ -234,9 +225,9 @@ class CalculoRisco(Plugin):
                 }
 
             indicadores = {
-                "tendencia": self._confirmar_tendencia(close),
-                "volatilidade": self._verificar_volatilidade(high, low, close),
-                "momentum": self._calcular_momentum(close),
+                "tendencia": self._confirmar_tendencia(klines, symbol, timeframe),
+                "volatilidade": self._verificar_volatilidade(klines, symbol, timeframe),
+                "momentum": self._calcular_momentum(klines, symbol, timeframe),
                 "volume": self._verificar_volume(volume),
             }
 
@@ -278,21 +269,40 @@ class CalculoRisco(Plugin):
                 "indicadores": {},
             }
 
-    def _confirmar_tendencia(self, close: np.ndarray) -> bool:
+    def _confirmar_tendencia(
+        self, klines: list, symbol: str = None, timeframe: str = None
+    ) -> bool:
         """
         Confirma tendência usando médias móveis e MACD.
 
         Args:
-            close: Array de preços de fechamento.
+            klines: Lista de k-lines.
+            symbol: Par (chave do cache de indicadores).
+            timeframe: Timeframe (chave do cache de indicadores).
 
         Returns:
             bool: True se tendência clara, False caso contrário.
         """
         try:
-            ma_curta = talib.SMA(close, timeperiod=self._ma_curta)
-            ma_media = talib.SMA(close, timeperiod=self._ma_media)
-            ma_longa = talib.SMA(close, timeperiod=self._ma_longa)
-            macd, signal, _ = talib.MACD(close)
+            calcular = self.indicadores.calcular
+            ma_curta = calcular(
+                "SMA", klines, symbol, timeframe, timeperiod=self._ma_curta
+            )
+            ma_media = calcular(
+                "SMA", klines, symbol, timeframe, timeperiod=self._ma_media
+            )
+            ma_longa = calcular(
+                "SMA", klines, symbol, timeframe, timeperiod=self._ma_longa
+            )
+            macd, signal, _ = calcular(
+                "MACD",
+                klines,
+                symbol,
+                timeframe,
+                fastperiod=12,
+                slowperiod=26,
+                signalperiod=9,
+            )
             tendencia_mas = (
                 ma_curta[-1] > ma_media[-1] > ma_longa[-1]
                 or ma_curta[-1] < ma_media[-1] < ma_longa[-1]
@@ -304,40 +314,47 @@ class CalculoRisco(Plugin):
             return False
 
     def _verificar_volatilidade(
-        self, high: np.ndarray, low: np.ndarray, close: np.ndarray
+        self, klines: list, symbol: str = None, timeframe: str = None
     ) -> float:
         """
         Calcula volatilidade relativa usando ATR.
 
         Args:
-            high: Array de preços máximos.
-            low: Array de preços mínimos.
-            close: Array de preços de fechamento.
+            klines: Lista de k-lines.
+            symbol: Par (chave do cache de indicadores).
+            timeframe: Timeframe (chave do cache de indicadores).
 
         Returns:
             float: Volatilidade relativa (ATR/close).
         """
         try:
-            atr = talib.ATR(high, low, close, timeperiod=self._atr_period)
-            return (
-                float(atr[-1]) / float(close[-1]) if atr.size and close[-1] > 0 else 1.0
+            atr = self.indicadores.calcular(
+                "ATR", klines, symbol, timeframe, timeperiod=self._atr_period
             )
+            close = float(klines[-1][4])
+            return float(atr[-1]) / close if atr.size and close > 0 else 1.0
         except Exception as e:
             logger.error(f"[{self.nome}] Erro ao verificar volatilidade: {e}")
             return 1.0
 
-    def _calcular_momentum(self, close: np.ndarray) -> float:
+    def _calcular_momentum(
+        self, klines: list, symbol: str = None, timeframe: str = None
+    ) -> float:
         """
         Calcula momentum usando RSI normalizado.
 
         Args:
-            close: Array de preços de fechamento.
+            klines: Lista de k-lines.
+            symbol: Par (chave do cache de indicadores).
+            timeframe: Timeframe (chave do cache de indicadores).
 
         Returns:
             float: Momentum normalizado (-1.0 a 1.0).
         """
         try:
-            rsi = talib.RSI(close, timeperiod=self._rsi_period)
+            rsi = self.indicadores.calcular(
+                "RSI", klines, symbol, timeframe, timeperiod=self._rsi_period
+            )
             return (rsi[-1] - 50) / 50 if rsi.size else 0.0
         except Exception as e:
             logger.error(f"[{self.nome}] Erro ao calcular momentum: {e}")
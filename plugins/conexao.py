@@ -5,11 +5,18 @@ Não deve registrar, inicializar ou finalizar automaticamente.
 Toda a lógica de ciclo de vida é centralizada no GerenciadorPlugins.
 """
 
+import asyncio
 import ccxt
+import ccxt.async_support as ccxt_async
 from plugins.plugin import Plugin
-from utils.config import carregar_config
+from utils.config import carregar_config, PAIRS_JSON_PATH
 from utils.logging_config import get_logger
+from utils.limitador_taxa import LimitadorTaxa
+import hashlib
 import json
+import os
+import threading
+import time
 
 logger = get_logger(__name__)
 
@@ -28,6 +35,27 @@ class Conexao(Plugin):
         self._gerente = gerente
         self._config = None
         self.pares_info = None
+        # Cache de metadados de mercado (id -> mercado e symbol -> mercado)
+        self._mercados_por_symbol = {}
+        self._mercados_timestamp = 0.0
+        self._mercados_hash = None
+        self._mercados_ttl = 3600
+        # Espera até nova consulta após falha de fetch_markets (cache antigo
+        # ou snapshot servido nesse intervalo)
+        self._mercados_retry = 60
+        self._caminho_snapshot = PAIRS_JSON_PATH
+        self._mercados_lock = threading.Lock()
+        self._refresh_parar = threading.Event()
+        self._refresh_thread = None
+        # Cliente assíncrono e event loop dedicado (criados sob demanda)
+        self._parametros_cliente = None
+        self._urls_api = None
+        self._exchange_async = None
+        self._loop_async = None
+        self._loop_thread = None
+        self._async_lock = threading.Lock()
+        # Limitador de taxa compartilhado pelos clientes síncrono e assíncrono
+        self.limitador = LimitadorTaxa()
 
     def inicializar(self, config=None) -> bool:
         """Inicializa a conexão com a Bybit."""
@@ -47,21 +75,32 @@ class Conexao(Plugin):
             # Se quiser forçar swap no bot independentemente da config:
             market = "swap"
 
-            self.exchange = ccxt.bybit(
-                {
-                    "apiKey": api_key,
-                    "secret": api_secret,
-                    "enableRateLimit": True,
-                    "options": {"defaultType": market},
-                }
-            )
+            self._parametros_cliente = {
+                "apiKey": api_key,
+                "secret": api_secret,
+                "enableRateLimit": True,
+                "options": {"defaultType": market},
+            }
+            self.limitador = LimitadorTaxa(bybit_cfg.get("limites_taxa"))
+            self.exchange = ccxt.bybit(dict(self._parametros_cliente))
+            self.limitador.instalar(self.exchange)
 
             # Ajusta URL se estiver em ambiente de teste
             if testnet:
-                self.exchange.urls["api"] = {
+                self._urls_api = {
                     "public": base_url,
                     "private": base_url,
                 }
+                self.exchange.urls["api"] = dict(self._urls_api)
+
+            conexao_cfg = self._config.get("plugins", {}).get("conexao", {})
+            self._mercados_ttl = conexao_cfg.get("mercados_ttl", 3600)
+            self._mercados_retry = conexao_cfg.get("mercados_retry", 60)
+            self._caminho_snapshot = conexao_cfg.get(
+                "caminho_snapshot", PAIRS_JSON_PATH
+            )
+            if conexao_cfg.get("mercados_refresh_background", True):
+                self._iniciar_refresh_mercados()
 
             logger.info("Conexão com Bybit inicializada com sucesso.")
             logger.debug(f"Conectado ao mercado: {market.upper()}")
@@ -77,32 +116,252 @@ class Conexao(Plugin):
         return self.exchange
 
     def listar_pares(self) -> list:
-        """Retorna a lista de IDs dos símbolos disponíveis na Bybit."""
+        """
+        Retorna a lista de IDs dos símbolos disponíveis na Bybit.
+
+        Usa o cache de mercados; a exchange só é consultada quando o cache
+        está vazio ou expirado (TTL em plugins.conexao.mercados_ttl).
+        """
         if not self.exchange:
             logger.error("Cliente Bybit não inicializado, impossível listar pares.")
             return []
-        try:
-            markets = self.exchange.fetch_markets()
-            with open("pares.json", "w") as f:
-                json.dump(markets, f, indent=4)
-
-            # Aqui, corrigido para usar o ID dos mercados (não o symbol formatado)
-            self.pares_info = {m["id"]: m for m in markets}
-            return list(self.pares_info.keys())
-        except Exception as e:
-            logger.error(f"[conexao] Erro ao buscar mercados: {e}", exc_info=True)
+        if not self._garantir_mercados():
             return []
+        return list(self.pares_info.keys())
+
+    def obter_mercados(self) -> dict:
+        """
+        Retorna os mercados do cache no formato de load_markets() (symbol -> mercado).
+
+        Returns:
+            dict: Mercados indexados pelo symbol CCXT (vazio em caso de falha).
+        """
+        if not self._garantir_mercados():
+            return {}
+        return self._mercados_por_symbol
 
     def obter_info_par(self, symbol: str) -> dict:
-        """Retorna informações detalhadas de um par de negociação."""
-        if not self.pares_info:
+        """
+        Retorna informações detalhadas de um par de negociação.
+
+        Aceita tanto o ID da Bybit (ex: "BTCUSDT") quanto o symbol CCXT
+        (ex: "BTC/USDT:USDT"). Busca O(1) no cache de mercados.
+        """
+        if not self._garantir_mercados():
             logger.warning("Informações de pares ainda não carregadas.")
             return {}
-        return self.pares_info.get(symbol, {})
+        return self.pares_info.get(symbol) or self._mercados_por_symbol.get(symbol, {})
+
+    def atualizar_mercados(self, forcar: bool = False) -> bool:
+        """
+        Atualiza o cache de mercados a partir da exchange.
+
+        O snapshot em disco só é reescrito quando o conteúdo muda.
+
+        Args:
+            forcar (bool): Ignora o TTL e consulta a exchange.
+
+        Returns:
+            bool: True se o cache está disponível após a chamada.
+        """
+        with self._mercados_lock:
+            if not forcar and self._cache_mercados_valido():
+                return True
+            if not self.exchange:
+                return bool(self.pares_info)
+            try:
+                markets = self.exchange.fetch_markets()
+            except Exception as e:
+                logger.error(f"[conexao] Erro ao buscar mercados: {e}", exc_info=True)
+                if not self.pares_info:
+                    self._carregar_snapshot()
+                if self.pares_info:
+                    # Serve o cache antigo até a próxima janela de tentativa,
+                    # sem repetir a chamada (e o timeout) a cada consulta
+                    espera = min(self._mercados_retry, self._mercados_ttl)
+                    self._mercados_timestamp = time.time() - self._mercados_ttl + espera
+                return bool(self.pares_info)
+
+            self._indexar_mercados(markets)
+            self._mercados_timestamp = time.time()
+            self._salvar_snapshot(markets)
+            self._aplicar_mercados_clientes(markets)
+            return True
+
+    def _indexar_mercados(self, markets: list) -> None:
+        """
+        Monta os índices do cache. A Bybit reutiliza o mesmo ID entre spot e
+        derivativos (ex: BTCUSDT), então o índice por ID prioriza o defaultType
+        do cliente.
+        """
+        tipo_padrao = (getattr(self.exchange, "options", None) or {}).get("defaultType")
+        # Aqui, corrigido para usar o ID dos mercados (não o symbol formatado)
+        pares_info = {}
+        for m in markets:
+            atual = pares_info.get(m["id"])
+            if atual is None or m.get("type") == tipo_padrao:
+                pares_info[m["id"]] = m
+        self.pares_info = pares_info
+        self._mercados_por_symbol = {m["symbol"]: m for m in markets if m.get("symbol")}
+
+    def _aplicar_mercados_clientes(self, markets: list) -> None:
+        """
+        Injeta os mercados do cache nos clientes CCXT, evitando que cada cliente
+        faça o próprio load_markets() na primeira requisição.
+        """
+        for cliente in (self.exchange, self._exchange_async):
+            if cliente is not None and hasattr(cliente, "set_markets"):
+                try:
+                    cliente.set_markets(markets)
+                except Exception as e:
+                    logger.debug(f"[conexao] Falha ao aplicar mercados no cliente: {e}")
+
+    def _cache_mercados_valido(self) -> bool:
+        """Indica se o cache de mercados está carregado e dentro do TTL."""
+        return bool(self.pares_info) and (
+            time.time() - self._mercados_timestamp < self._mercados_ttl
+        )
+
+    def _garantir_mercados(self) -> bool:
+        """Garante o cache carregado, atualizando apenas se expirado."""
+        if self._cache_mercados_valido():
+            return True
+        return self.atualizar_mercados()
+
+    def _salvar_snapshot(self, markets: list) -> None:
+        """Grava o snapshot de mercados em disco somente se o conteúdo mudou."""
+        try:
+            conteudo = json.dumps(markets, sort_keys=True, default=str)
+            novo_hash = hashlib.sha256(conteudo.encode()).hexdigest()
+            if novo_hash == self._mercados_hash:
+                return
+            diretorio = os.path.dirname(self._caminho_snapshot)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            temporario = f"{self._caminho_snapshot}.tmp"
+            with open(temporario, "w") as f:
+                f.write(conteudo)
+            os.replace(temporario, self._caminho_snapshot)
+            self._mercados_hash = novo_hash
+            logger.debug(
+                f"[conexao] Snapshot de mercados atualizado: {self._caminho_snapshot}"
+            )
+        except Exception as e:
+            logger.error(f"[conexao] Erro ao salvar snapshot de mercados: {e}")
+
+    def _carregar_snapshot(self) -> None:
+        """Carrega o último snapshot em disco como fallback quando a API falha."""
+        try:
+            if not os.path.exists(self._caminho_snapshot):
+                return
+            with open(self._caminho_snapshot) as f:
+                conteudo = f.read()
+            markets = json.loads(conteudo)
+            self._indexar_mercados(markets)
+            self._mercados_hash = hashlib.sha256(conteudo.encode()).hexdigest()
+            logger.warning(
+                f"[conexao] Usando snapshot de mercados em disco ({len(markets)} mercados)."
+            )
+        except Exception as e:
+            logger.error(f"[conexao] Erro ao carregar snapshot de mercados: {e}")
+
+    def _iniciar_refresh_mercados(self) -> None:
+        """Inicia a thread que renova o cache de mercados a cada TTL."""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        self._refresh_parar.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._loop_refresh_mercados,
+            name="conexao-refresh-mercados",
+            daemon=True,
+        )
+        self._refresh_thread.start()
+
+    def _loop_refresh_mercados(self) -> None:
+        """Loop de atualização em background até finalizar()."""
+        while not self._refresh_parar.wait(self._mercados_ttl):
+            if self.exchange:
+                self.atualizar_mercados(forcar=True)
+
+    def obter_cliente_async(self):
+        """
+        Retorna o cliente assíncrono (ccxt.async_support) da Bybit.
+
+        O cliente vive no event loop dedicado da Conexao; use executar_async()
+        para rodar corrotinas que o utilizem.
+        """
+        if not self._parametros_cliente:
+            logger.warning("Cliente Bybit não inicializado. Chame inicializar() antes.")
+            return None
+        with self._async_lock:
+            if self._exchange_async is None:
+                self._exchange_async = ccxt_async.bybit(dict(self._parametros_cliente))
+                self.limitador.instalar(self._exchange_async)
+                if self._urls_api:
+                    self._exchange_async.urls["api"] = dict(self._urls_api)
+                if self._mercados_por_symbol:
+                    self._exchange_async.set_markets(
+                        list(self._mercados_por_symbol.values())
+                    )
+            return self._exchange_async
+
+    def metricas_limitador(self) -> dict:
+        """Retorna profundidade de fila, tokens e espera de cada orçamento de taxa."""
+        return self.limitador.metricas()
+
+    def executar_async(self, corrotina, timeout: float = None):
+        """
+        Executa uma corrotina no event loop dedicado da Conexao e aguarda o resultado.
+
+        Args:
+            corrotina: Corrotina a executar.
+            timeout (float, optional): Tempo máximo de espera em segundos.
+
+        Returns:
+            Resultado da corrotina.
+        """
+        return self.agendar_async(corrotina).result(timeout)
+
+    def agendar_async(self, corrotina):
+        """
+        Agenda uma corrotina no event loop dedicado sem aguardar o resultado.
+
+        Returns:
+            concurrent.futures.Future: Futuro da corrotina (cancelável).
+        """
+        with self._async_lock:
+            if self._loop_async is None or not self._loop_thread.is_alive():
+                self._loop_async = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop_async.run_forever,
+                    name="conexao-async",
+                    daemon=True,
+                )
+                self._loop_thread.start()
+            loop = self._loop_async
+        return asyncio.run_coroutine_threadsafe(corrotina, loop)
+
+    def _encerrar_async(self) -> None:
+        """Fecha o cliente assíncrono e encerra o event loop dedicado."""
+        loop, cliente = self._loop_async, self._exchange_async
+        self._exchange_async = None
+        self._loop_async = None
+        if loop is None:
+            return
+        try:
+            if cliente is not None:
+                asyncio.run_coroutine_threadsafe(cliente.close(), loop).result(10)
+        except Exception as e:
+            logger.debug(f"[conexao] Erro ao fechar cliente assíncrono: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        self._loop_thread.join(timeout=5)
+        loop.close()
 
     def finalizar(self):
         """Finaliza a conexão com a Bybit."""
         try:
+            self._refresh_parar.set()
+            self._encerrar_async()
             self.exchange = None
             super().finalizar()
             logger.info("Conexão com Bybit finalizada.")
@@ -27,6 +27,14 @@ class ConsolidadorSinais(Plugin):
     PLUGIN_CATEGORIA = "plugin"
     PLUGIN_TAGS = ["sinais", "consolidacao", "analise"]
     PLUGIN_PRIORIDADE = 90
+    PLUGIN_CONSOME = [
+        "sinal_consolidado",
+        "analise_mercado",
+        "stop_loss",
+        "take_profit",
+        "alavancagem",
+    ]
+    PLUGIN_PRODUZ = ["sinal_consolidado"]
 
     @property
     def plugin_tabelas(self) -> dict:
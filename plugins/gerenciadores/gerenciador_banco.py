@@ -12,6 +12,7 @@ from utils.logging_config import log_banco
 from plugins.gerenciadores.gerenciador import BaseGerenciador
 from utils.paths import get_schema_path
 from utils.plugin_utils import validar_klines
+from utils.pipeline_estagios import adiar_persistencia
 
 if TYPE_CHECKING:
     from plugins.plugin import Plugin
@@ -271,6 +272,12 @@ class GerenciadorBanco(BaseGerenciador):
                 for tabela, config in schema["tabelas"].items():
                     try:
                         columns = config.get("columns", {})
+                        # Índices declarados junto da tabela em plugin_tabelas
+                        indices = config.get("indices") or (
+                            columns.get("indices", {})
+                            if isinstance(columns, dict)
+                            else {}
+                        )
                         # Corrigir: se columns contiver 'schema', use apenas columns['schema']
                         if (
                             isinstance(columns, dict)
@@ -286,7 +293,7 @@ class GerenciadorBanco(BaseGerenciador):
                         ):
                             columns = columns["columns"]
                         # Remover chaves inválidas
-                        for meta in ["schema", "modo_acesso", "plugin"]:
+                        for meta in ["schema", "modo_acesso", "plugin", "indices"]:
                             if meta in columns:
                                 log_banco(
                                     plugin=self.PLUGIN_NAME,
@@ -338,6 +345,11 @@ class GerenciadorBanco(BaseGerenciador):
                                         nivel=logging.WARNING,
                                     )
                                     continue
+                        for indice, colunas_indice in indices.items():
+                            self.executar_sql(
+                                f"CREATE INDEX IF NOT EXISTS {indice} "
+                                f"ON {tabela} ({', '.join(colunas_indice)});"
+                            )
                         self.executar_sql(
                             """
                             INSERT INTO tabelas_registradas 
@@ -610,6 +622,9 @@ class GerenciadorBanco(BaseGerenciador):
         Returns:
             bool: True se inserção bem-sucedida, False caso contrário
         """
+        # Dentro da análise em pipeline a gravação fica para o estágio de persistência
+        if adiar_persistencia(self, plugin, tabela, dados):
+            return True
         try:
             if not hasattr(self, "_banco_dados") or self._banco_dados is None:
                 # Tenta obter o plugin BancoDados do gerente
@@ -638,6 +653,45 @@ class GerenciadorBanco(BaseGerenciador):
             )
             return False
 
+    def inserir_klines_em_lote(self, plugin, symbol, timeframe, klines):
+        """
+        Método institucional para carga de candles em lote (COPY na tabela klines).
+        Delegação ao plugin BancoDados, dono da tabela, com logging.
+        Args:
+            plugin (str): Nome do plugin de origem
+            symbol (str): Par dos candles
+            timeframe (str): Timeframe dos candles
+            klines (list): Candles [timestamp_ms, open, high, low, close, volume]
+        Returns:
+            bool: True se a gravação foi concluída, False caso contrário
+        """
+        try:
+            if not hasattr(self, "_banco_dados") or self._banco_dados is None:
+                # Tenta obter o plugin BancoDados do gerente
+                if hasattr(self, "_plugins") and "banco_dados" in self._plugins:
+                    self._banco_dados = self._plugins["banco_dados"]
+                else:
+                    from plugins.banco_dados import BancoDados
+
+                    self._banco_dados = BancoDados(gerenciador_banco=self)
+                    self._banco_dados.inicializar(self._config)
+            log_banco(
+                plugin=plugin,
+                tabela="klines",
+                operacao="PERSISTENCIA",
+                dados=f"Carga em lote via GerenciadorBanco: {len(klines)} candles de {symbol}-{timeframe}",
+            )
+            return self._banco_dados.inserir_klines_em_lote(klines, symbol, timeframe)
+        except Exception as e:
+            log_banco(
+                plugin=plugin,
+                tabela="klines",
+                operacao="PERSISTENCIA",
+                dados=f"Erro na carga em lote: {e}",
+                nivel=40,
+            )
+            return False
+
     def buscar_dados(self, tabela, filtros=None, limite=1000):
         """
         Método institucional para busca de dados.
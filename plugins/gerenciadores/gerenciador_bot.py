@@ -2,12 +2,30 @@
 
 from utils.logging_config import get_logger, log_rastreamento, log_dados
 from plugins.gerenciadores.gerenciador import BaseGerenciador
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as TempoEsgotado
 from collections import defaultdict
+import threading
 from time import time
-from typing import List
+from typing import List, Optional
 from utils.config import carregar_config
 from utils.plugin_utils import validar_klines
+from utils.agendador_ciclos import PrioridadeSymbols, SeletorUnidades
+from utils.indicadores_matriciais import (
+    armazenar_lote,
+    calcular_universo,
+    especificacao_universo,
+    lote_universo,
+)
+from utils.servico_indicadores import obter_servico_indicadores
+from utils.execucao_processos import ArenaCandles, ExecutorAnaliseProcessos
+from utils.fragmentacao_symbols import FragmentoSymbols, RepositorioFragmentos
+from utils.pipeline_estagios import (
+    Estagio,
+    PipelineEstagios,
+    adiando_persistencia,
+    persistir_adiadas,
+)
 
 logger = get_logger(__name__)
 
@@ -34,6 +52,53 @@ class GerenciadorBot(BaseGerenciador):
             max_workers=max_workers
         )  # Paralelismo ajustável via config
         self._estado_ativo = defaultdict(dict)  # Guarda o status por par e timeframe
+        # Só reanalisa par/timeframe com candle novo ou variação relevante
+        agendador = config.get("bot", {}).get("agendador", {})
+        self._seletor = (
+            SeletorUnidades(agendador.get("limiar_variacao", 0.002))
+            if agendador.get("ativo", False)
+            else None
+        )
+        # Symbols com posição, sinal recente ou mais voláteis primeiro; os de
+        # baixo interesse a cada N ciclos e prazo por ciclo
+        prioridades = config.get("bot", {}).get("prioridades", {})
+        self._prioridades = (
+            PrioridadeSymbols(
+                intervalo_baixa=prioridades.get("intervalo_baixa", 4),
+                janela_sinal=prioridades.get("janela_sinal", 900.0),
+                quantil_volatilidade=prioridades.get("quantil_volatilidade", 0.8),
+                janela_volatilidade=prioridades.get("janela_volatilidade", 20),
+                prazo_ciclo=prioridades.get("prazo_ciclo"),
+            )
+            if prioridades.get("ativo", False)
+            else None
+        )
+        # Último resultado de cada par/timeframe, reaproveitado na consolidação
+        # dos timeframes que o agendador não reanalisa (só com o seletor ativo)
+        self._ultimos_resultados = defaultdict(dict)
+        # Sem busca prévia (modo REST), o seletor decide após a busca da unidade
+        self._selecao_na_busca = False
+        # Indicadores do modo universo (matriz de todos os pares) por par/timeframe
+        self._indicadores_universo = {}
+        # Pool de processos das análises (criado no primeiro ciclo que o usa)
+        self._processos = None
+        # Plugins independentes de um mesmo par/timeframe em paralelo (pool
+        # próprio: o executor de unidades não pode esperar por ele mesmo)
+        paralelos = config.get("plugins_paralelos", {})
+        self._executor_plugins = (
+            ThreadPoolExecutor(
+                max_workers=paralelos.get("max_workers", 4),
+                thread_name_prefix="plugins",
+            )
+            if paralelos.get("ativo", False)
+            else None
+        )
+        self._symbols_paralelos = set(paralelos.get("symbols") or ())
+        # Parte do universo deste worker no modo fragmentado (criada no
+        # primeiro ciclo, quando o banco já está disponível)
+        self._fragmento = None
+        # Pipeline busca → análise → persistência (criado no primeiro ciclo)
+        self._pipeline = None
 
     def configuracoes_requeridas(self) -> List[str]:
         """
@@ -111,7 +176,7 @@ class GerenciadorBot(BaseGerenciador):
                 conexao_plugin = self._gerente.obter_plugin("conexao")
                 if (
                     not conexao_plugin
-                    or not hasattr(conexao_plugin, "exchange")
+                    or not hasattr(conexao_plugin, "obter_mercados")
                     or not conexao_plugin.exchange
                 ):
                     logger.error(
@@ -119,7 +184,8 @@ class GerenciadorBot(BaseGerenciador):
                     )
                     return False
                 try:
-                    markets = conexao_plugin.exchange.load_markets()
+                    # Lê do cache de mercados da Conexao (symbol -> mercado)
+                    markets = conexao_plugin.obter_mercados()
                     spot = self._config.get("spot", False)
                     futuros = self._config.get("futuros", True)
                     # Novo filtro robusto para pares USDT
@@ -170,11 +236,8 @@ class GerenciadorBot(BaseGerenciador):
                     return False
             else:
                 logger.info(f"Usando pares definidos na configuração: {pares}")
-            plugins_analise = [
-                p
-                for p in self._gerente.filtrar_por_tag("analise")
-                if p.nome != "analisador_mercado"
-            ]
+            # Plano compilado uma vez (cacheado pelo gerente entre ciclos)
+            plano = self._gerente.planejar("analise", excluir=["analisador_mercado"])
             analisador_mercado = self._gerente.obter_plugin("analisador_mercado")
             sinais_plugin = self._gerente.obter_plugin("sinais_plugin")
 
@@ -185,24 +248,100 @@ class GerenciadorBot(BaseGerenciador):
                 logger.error("Plugin analisador_mercado não encontrado")
                 return False
 
-            logger.execution(f"Iniciando ciclo para {len(pares)} pares")
+            # Modo fragmentado: só os symbols deste worker no anel
+            fragmento = self._obter_fragmento()
+            if fragmento:
+                pares = fragmento.symbols_do_ciclo(pares)
+                if not pares:
+                    logger.debug(f"Nenhum symbol arrendado por {fragmento.worker}")
+                    return True
+
+            # Descarta os resultados guardados de symbols que saíram do universo
+            if self._seletor:
+                for symbol in set(self._ultimos_resultados) - set(pares):
+                    del self._ultimos_resultados[symbol]
+                    for tf in timeframes:
+                        self._seletor.esquecer(symbol, tf)
+
+            # Modo WebSocket: após a carga inicial, só analisa pares com candle fechado
+            obter_dados = self._gerente.obter_plugin("obter_dados")
+            streaming = self._config.get("modo_ingestao", "rest") == "websocket"
+            if streaming and obter_dados and hasattr(obter_dados, "iniciar_streaming"):
+                if obter_dados.streaming_ativo:
+                    # Pares que entraram no ciclo são analisados já (via REST)
+                    novos = obter_dados.atualizar_streaming(pares)
+                    fechados = obter_dados.consumir_fechamentos()
+                    pares = [p for p in pares if p in fechados or p in novos]
+                    if not pares:
+                        logger.debug("Nenhum candle fechado desde o último ciclo")
+                        return True
+                else:
+                    obter_dados.iniciar_streaming(pares, timeframes)
+                    streaming = False  # primeira carga ainda via REST
 
-            # Processamento em lote (batch) de symbols
-            from itertools import islice
+            # Ordem por prioridade, amostragem dos symbols de baixo interesse e
+            # limite de tempo do ciclo
+            limite = None
+            if self._prioridades:
+                total = len(pares)
+                pares = self._prioridades.selecionar(pares, self._posicoes_abertas())
+                logger.debug(f"Prioridades: {len(pares)}/{total} symbols no ciclo")
+                if self._prioridades.prazo_ciclo:
+                    limite = time() + self._prioridades.prazo_ciclo
 
-            batch_size = self._config.get("batch_size", 3)
+            logger.execution(f"Iniciando ciclo para {len(pares)} pares")
 
-            def batcher(iterable, n):
-                it = iter(iterable)
-                while True:
-                    batch = list(islice(it, n))
-                    if not batch:
-                        break
-                    yield batch
+            # Busca concorrente de todos os pares x timeframes antes das análises
+            dados_prontos = streaming
+            if (
+                not streaming
+                and self._config.get("fetch_async", False)
+                and obter_dados
+                and hasattr(obter_dados, "buscar_em_lote")
+            ):
+                obter_dados.buscar_em_lote(
+                    pares,
+                    timeframes,
+                    concorrencia=self._config.get("fetch_concorrencia", 20),
+                )
+                dados_prontos = True
+                if self._config.get("indicadores_universo", {}).get("ativo", False):
+                    self._calcular_universo(obter_dados, pares, timeframes, plano)
+
+            # Seleciona só os pares/timeframes com candle novo ou variação
+            # relevante; sem os candles já em memória, a seleção é feita por
+            # unidade logo após a sua busca (_buscar_unidade)
+            unidades = {symbol: list(timeframes) for symbol in pares}
+            self._selecao_na_busca = bool(self._seletor)
+            if (
+                self._seletor
+                and dados_prontos
+                and hasattr(obter_dados, "ultimo_candle")
+            ):
+                self._selecao_na_busca = False
+                total = len(pares) * len(timeframes)
+                selecionadas = self._seletor.selecionar(
+                    [(s, tf) for s in pares for tf in timeframes],
+                    obter_dados.ultimo_candle,
+                )
+                unidades = defaultdict(list)
+                for symbol, tf in selecionadas:
+                    unidades[symbol].append(tf)
+                pares = [p for p in pares if p in unidades]
+                logger.debug(
+                    f"Agendador: {len(selecionadas)}/{total} pares/timeframes selecionados"
+                )
+                if not pares:
+                    logger.debug("Nenhum candle novo ou variação relevante no ciclo")
+                    return True
 
             resultados_gerais = []
-            # Buffer para armazenar sinais por símbolo/timeframe
-            buffer_sinais = {symbol: {} for symbol in pares}
+            # Buffer para armazenar sinais por símbolo/timeframe; timeframes não
+            # reanalisados neste ciclo entram com o último resultado
+            buffer_sinais = {
+                symbol: dict(self._ultimos_resultados.get(symbol, {}))
+                for symbol in pares
+            }
 
             # Obter o consolidador de sinais
             consolidador = self._gerente.obter_plugin("consolidador_sinais")
@@ -210,71 +349,125 @@ class GerenciadorBot(BaseGerenciador):
                 logger.error("Plugin consolidador_sinais não encontrado")
                 return False
 
-            for symbol_batch in batcher(pares, batch_size):
-                tarefas = [
-                    self._executor.submit(
-                        self._processar_par,
-                        symbol,
-                        tf,
-                        plugins_analise,
-                        sinais_plugin,
-                        buffer_sinais,
-                    )
-                    for symbol in symbol_batch
-                    for tf in timeframes
-                ]
-                resultados = [t.result() for t in as_completed(tarefas)]
-                resultados_gerais.extend(resultados)
-                logger.execution(f"Batch finalizado para symbols: {symbol_batch}")
-
-                # Após cada batch, consolidar sinais dos símbolos processados
-                for symbol in symbol_batch:
-                    if all(tf in buffer_sinais[symbol] for tf in timeframes):
-                        for tf in timeframes:
-                            # Loga dados antes do processamento de cada timeframe
-                            log_dados(
-                                componente="gerenciador_bot",
-                                acao=f"antes_analise_{symbol}_{tf}",
-                                dados=buffer_sinais[symbol][tf],
+            # Fila global: todas as unidades são submetidas de uma vez e os
+            # workers não ficam ociosos esperando o par mais lento de um lote.
+            # Cada symbol é consolidado assim que o último timeframe termina.
+            inicio_ciclo = time()
+            pendentes = {symbol: len(unidades[symbol]) for symbol in pares}
+            reanalisados = set()
+            # Modo processos: candles em memória compartilhada e análise fora do GIL
+            arena = None
+            if (
+                dados_prontos
+                and plano is not None
+                and self._config.get("execucao_processos", {}).get("ativo", False)
+                and hasattr(obter_dados, "pre_buscado")
+            ):
+                arena = self._montar_arena(obter_dados, pares, unidades)
+            adiadas = []
+            try:
+                tarefas = {}
+                pipeline = self._obter_pipeline()
+                entregas = []
+                for symbol in pares:
+                    for tf in unidades[symbol]:
+                        if arena is not None and (symbol, tf) in arena:
+                            futuro = self._obter_processos(plano).submeter(
+                                arena,
+                                symbol,
+                                tf,
+                                universo=self._indicadores_universo.pop(
+                                    (symbol, tf), None
+                                ),
                             )
-                            logger.debug(
-                                f"[pipeline] Antes do consolidador: {symbol}-{tf} chaves = {list(buffer_sinais[symbol][tf].keys())}"
+                        elif pipeline is not None:
+                            futuro = Future()
+                            entregas.append(
+                                (
+                                    self._nova_unidade(
+                                        symbol, tf, plano, sinais_plugin, buffer_sinais
+                                    ),
+                                    futuro,
+                                )
                             )
-                        # Monta dicionário de dados completos para todos os timeframes
-                        dados_timeframes = {}
-                        for tf in timeframes:
-                            dados_tf = buffer_sinais[symbol].get(tf, {})
-                            # Garante que todos os campos essenciais estejam presentes
-                            dados_timeframes[tf] = dados_tf.copy()
-
-                        # Adiciona o symbol ao dicionário de timeframes
-                        dados_completos = {
-                            "symbol": symbol,
-                            "timeframes": dados_timeframes,
-                        }
-
-                        logger.debug(
-                            f"[pipeline] Dados enviados ao consolidador para {symbol}: chaves = {list(dados_timeframes.keys())}"
-                        )
-
-                        # Antes do consolidador
-                        log_dados(
-                            componente="gerenciador_bot",
-                            acao=f"antes_consolidador_{symbol}",
-                            dados=dados_completos,
-                        )
-                        sinal_final = consolidador.executar(
-                            dados_completos=dados_completos
+                        else:
+                            futuro = self._executor.submit(
+                                self._processar_par,
+                                symbol,
+                                tf,
+                                plano,
+                                sinais_plugin,
+                                buffer_sinais,
+                            )
+                        tarefas[futuro] = (symbol, tf)
+                if entregas:
+                    # Entrega em outra thread: com as filas cheias ela bloqueia
+                    # (contrapressão) sem atrasar a consolidação dos symbols prontos
+                    threading.Thread(
+                        target=self._alimentar_pipeline,
+                        args=(pipeline, entregas),
+                        name="pipeline-entrega",
+                        daemon=True,
+                    ).start()
+                cancelaveis = (
+                    self._prioridades.adiaveis(pares) if limite is not None else None
+                )
+                for tarefa in self._ate_o_prazo(tarefas, limite, adiadas, cancelaveis):
+                    symbol, tf = tarefas[tarefa]
+                    sucesso = tarefa.result()
+                    if isinstance(sucesso, dict):
+                        sucesso = self._concluir_processo(
+                            sucesso, arena.series[(symbol, tf)], buffer_sinais
                         )
-                        log_dados(
-                            componente="gerenciador_bot",
-                            acao=f"apos_consolidador_{symbol}",
-                            dados=sinal_final,
+                    resultados_gerais.append(sucesso)
+                    # Unidade sem candle novo mantém no buffer o resultado anterior
+                    anterior = self._ultimos_resultados.get(symbol, {}).get(tf)
+                    if buffer_sinais[symbol].get(tf) is not anterior:
+                        reanalisados.add(symbol)
+                    self._registrar_unidade(symbol, tf, sucesso, buffer_sinais)
+                    pendentes[symbol] -= 1
+                    if not pendentes[symbol]:
+                        self._concluir_symbol(
+                            symbol,
+                            timeframes,
+                            buffer_sinais,
+                            consolidador,
+                            inicio_ciclo,
+                            consolidar=symbol in reanalisados,
                         )
-                        # Propaga o resultado para o buffer
-                        buffer_sinais[symbol]["sinal_final"] = sinal_final
+            finally:
+                if arena is not None:
+                    arena.fechar()
+            if adiadas:
+                self._adiar(adiadas)
 
             logger.execution(f"Ciclo finalizado para todos os pares")
+            if self._pipeline is not None:
+                metricas = self._pipeline.metricas()
+                logger.debug(
+                    f"Pipeline: gargalo={metricas.get('gargalo')} | "
+                    + " | ".join(
+                        f"{nome}: fila {m['profundidade_maxima']}/{m['capacidade']}, "
+                        f"espera {m['espera_media']}s, serviço {m['servico_medio']}s"
+                        for nome, m in metricas.items()
+                        if isinstance(m, dict)
+                    )
+                )
+                log_dados(
+                    componente="gerenciador_bot",
+                    acao="metricas_pipeline",
+                    dados=metricas,
+                )
+            if fragmento and fragmento.coordenador:
+                sinais = fragmento.coletar_sinais()
+                logger.execution(
+                    f"Coordenador: sinais de {len(sinais)} symbols de {len(fragmento.workers)} workers"
+                )
+                log_dados(
+                    componente="gerenciador_bot", acao="sinais_fragmentos", dados=sinais
+                )
+            if conexao and hasattr(conexao, "metricas_limitador"):
+                logger.debug(f"Limitador de taxa: {conexao.metricas_limitador()}")
             # Loga dados ao final do ciclo
             log_dados(
                 componente="gerenciador_bot", acao="fim_ciclo", dados=buffer_sinais
@@ -284,91 +477,314 @@ class GerenciadorBot(BaseGerenciador):
             logger.error(f"Erro geral no ciclo do bot: {e}", exc_info=True)
             return False
 
-    def _processar_par(
-        self, symbol, timeframe, plugins_analise, sinais_plugin, buffer_sinais=None
-    ) -> bool:
+    def _calcular_universo(self, obter_dados, pares, timeframes, plano) -> None:
         """
-        Processa um par/timeframe, executando plugins de análise e sinais.
+        Calcula os indicadores do modo universo de cada timeframe sobre a
+        matriz de todos os pares pré-buscados. As séries ficam por
+        par/timeframe e só entram no cache do serviço de indicadores logo
+        antes da análise da unidade (o LRU não comporta o universo inteiro).
         """
-        try:
-            logger.execution(f"Início do processamento: {symbol} - {timeframe}")
-            dados_completos = {}
-            dados_completos["symbol"] = symbol
-            dados_completos["timeframe"] = timeframe
-
-            # Popula k-lines via plugin ObterDados antes das análises
-            obter_dados = self._gerente.obter_plugin("obter_dados")
-            if obter_dados:
-                obter_dados.executar(
-                    dados_completos=dados_completos, symbol=symbol, timeframe=timeframe
+        self._indicadores_universo = {}
+        opcoes = self._config.get("indicadores_universo", {})
+        especificacao = especificacao_universo(
+            opcoes.get("indicadores"), plano.indicadores if plano else ()
+        )
+        for tf in timeframes:
+            candles_por_symbol = {}
+            for symbol in pares:
+                candles = obter_dados.pre_buscado(symbol, tf)
+                if candles:
+                    candles_por_symbol[symbol] = candles
+            try:
+                series = calcular_universo(
+                    candles_por_symbol,
+                    especificacao,
+                    timeframe=tf,
+                    min_pares=opcoes.get("min_pares", 8),
                 )
-                crus = dados_completos.get("crus", [])
-                logger.debug(
-                    f"[pipeline] Crus obtidos para {symbol}-{timeframe}: {len(crus) if crus else 0}"
+            except Exception as e:
+                logger.error(f"Erro no cálculo matricial ({tf}): {e}", exc_info=True)
+                continue
+            for symbol, valores in series.items():
+                self._indicadores_universo[(symbol, tf)] = lote_universo(
+                    valores, especificacao
                 )
-                dados_completos["crus"] = crus
-
-            # Executa plugins de análise
-            for plugin in plugins_analise:
-                if hasattr(plugin, "executar"):
-                    resultado = plugin.executar(
-                        dados_completos=dados_completos,
-                        symbol=symbol,
-                        timeframe=timeframe,
-                    )
-                    if isinstance(resultado, dict):
-                        dados_completos.update(resultado)
-                    logger.debug(
-                        f"[pipeline] Após {plugin.nome}: chaves em dados_completos = {list(dados_completos.keys())}"
-                    )
+            logger.debug(
+                f"Indicadores universo {tf}: {len(series)}/{len(candles_por_symbol)} pares na matriz"
+            )
 
-            # Garante que symbol, timeframe e crus estejam presentes
-            if not all(
-                [
-                    dados_completos.get("symbol"),
-                    dados_completos.get("timeframe"),
-                    dados_completos.get("crus"),
-                ]
-            ):
-                logger.error(
-                    f"[pipeline] Dados incompletos para {symbol}-{timeframe} antes do consolidador: {dados_completos}"
-                )
-                return False
+    @staticmethod
+    def _ate_o_prazo(tarefas, limite, adiadas, cancelaveis=None):
+        """
+        Entrega as tarefas à medida que terminam. Passado o limite, cancela as
+        que ainda não começaram (guardadas em adiadas) e espera as que estão
+        em execução. Com cancelaveis, só as unidades desses symbols são
+        canceladas (as de prioridade ALTA/MEDIA sempre terminam no ciclo).
+        """
+        if limite is None:
+            yield from as_completed(tarefas)
+            return
+        entregues = set()
+        try:
+            for tarefa in as_completed(tarefas, timeout=max(limite - time(), 0)):
+                entregues.add(tarefa)
+                yield tarefa
+        except TempoEsgotado:
+            restantes = []
+            for tarefa in tarefas:
+                if tarefa in entregues:
+                    continue
+                symbol = tarefas[tarefa][0]
+                if (cancelaveis is None or symbol in cancelaveis) and tarefa.cancel():
+                    adiadas.append(tarefas[tarefa])
+                else:
+                    restantes.append(tarefa)
+            yield from as_completed(restantes)
+
+    def _adiar(self, adiadas) -> None:
+        """Symbols com unidades canceladas pelo prazo vão na frente no próximo ciclo."""
+        symbols = sorted({symbol for symbol, _ in adiadas})
+        for symbol in symbols:
+            self._prioridades.adiar(symbol)
+        logger.execution(
+            f"Prazo do ciclo esgotado: {len(adiadas)} pares/timeframes adiados ({len(symbols)} symbols)"
+        )
+        log_dados(
+            componente="gerenciador_bot",
+            acao="unidades_adiadas",
+            dados=[f"{symbol}-{tf}" for symbol, tf in adiadas],
+        )
+
+    def _obter_fragmento(self):
+        """FragmentoSymbols do worker, se o modo fragmentado estiver ativo."""
+        opcoes = self._config.get("fragmentacao", {})
+        if not opcoes.get("ativo", False):
+            return None
+        if self._fragmento is None:
+            banco = self._gerente.obter_plugin("gerenciador_banco")
+            if not banco:
+                raise RuntimeError("Modo fragmentado requer o gerenciador_banco")
+            self._fragmento = FragmentoSymbols(
+                RepositorioFragmentos(banco),
+                worker=opcoes.get("worker"),
+                ttl=opcoes.get("ttl", 60.0),
+                replicas=opcoes.get("replicas", 64),
+            )
+            logger.info(f"Modo fragmentado ativo: worker {self._fragmento.worker}")
+        return self._fragmento
+
+    def _posicoes_abertas(self) -> list:
+        """Symbols com ordem ativa no plugin execucao_ordens."""
+        execucao_ordens = self._gerente.obter_plugin("execucao_ordens")
+        return list(getattr(execucao_ordens, "_ordens_ativas", None) or ())
+
+    def _obter_processos(self, plano) -> ExecutorAnaliseProcessos:
+        """Cria (ou recria, se o plano mudou) o pool de processos das análises."""
+        plugins_plano = [declaracao[0] for declaracao in plano.assinatura]
+        if self._processos is None or not self._processos.compativel(
+            plugins_plano, "sinais_plugin"
+        ):
+            if self._processos is not None:
+                self._processos.encerrar()
+            opcoes = self._config.get("execucao_processos", {})
+            self._processos = ExecutorAnaliseProcessos(
+                plugins_plano,
+                sinais="sinais_plugin",
+                workers=opcoes.get("workers"),
+                contexto=opcoes.get("contexto", "spawn"),
+            )
+            logger.info(
+                f"Pool de processos de análise criado com {self._processos.workers} workers"
+            )
+        return self._processos
 
-            # Executa o plugin de sinais (analise_mercado consolidada)
-            if sinais_plugin and hasattr(sinais_plugin, "executar"):
-                resultado_sinais = sinais_plugin.executar(
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    dados_completos=dados_completos,
+    def _montar_arena(self, obter_dados, pares, unidades):
+        """
+        Copia os candles pré-buscados das unidades do ciclo para um bloco de
+        memória compartilhada. Unidades sem candles ficam fora da arena e
+        seguem pelo executor de threads.
+        """
+        series = {}
+        for symbol in pares:
+            for tf in unidades[symbol]:
+                candles = obter_dados.pre_buscado(symbol, tf)
+                if candles:
+                    series[(symbol, tf)] = candles
+        if not series:
+            return None
+        try:
+            arena = ArenaCandles(series)
+        except Exception as e:
+            logger.error(f"Erro ao montar memória compartilhada: {e}", exc_info=True)
+            return None
+        logger.debug(f"Arena de candles com {len(arena)} pares/timeframes")
+        return arena
+
+    def _concluir_processo(self, registro, candles, buffer_sinais) -> bool:
+        """
+        Converte o registro devolvido por um worker no mesmo resultado de
+        _processar_par (dados completos no buffer e estado ativo).
+        """
+        symbol, timeframe = registro["symbol"], registro["timeframe"]
+        if "erro" in registro:
+            logger.error(
+                f"[pipeline] Erro no processamento de {symbol}-{timeframe} (pid {registro.get('pid')}): {registro['erro']}"
+            )
+            return False
+        dados_completos = registro["dados"]
+        dados_completos["crus"] = candles
+        dados_completos["candles"] = candles
+        persistencias = registro.get("persistencias")
+        if persistencias:
+            banco = self._gerente.obter_plugin("gerenciador_banco")
+            if banco is None:
+                logger.warning(
+                    f"[pipeline] {len(persistencias)} gravações de {symbol}-{timeframe} descartadas: gerenciador_banco indisponível"
                 )
+            else:
+                persistir_adiadas(
+                    [
+                        (banco, plugin, tabela, dados)
+                        for plugin, tabela, dados in persistencias
+                    ]
+                )
+        log_dados(
+            componente="gerenciador_bot",
+            acao=f"apos_sinais_plugin_{symbol}_{timeframe}",
+            dados=dados_completos.get("analise_mercado"),
+        )
+        if buffer_sinais is not None:
+            buffer_sinais[symbol][timeframe] = dados_completos
+        self._estado_ativo[symbol][timeframe] = {"timestamp": time()}
+        logger.execution(
+            f"Fim do processamento: {symbol} - {timeframe} (pid {registro.get('pid')}, {registro.get('segundos')}s)"
+        )
+        return True
+
+    def _concluir_symbol(
+        self,
+        symbol,
+        timeframes,
+        buffer_sinais,
+        consolidador,
+        inicio_ciclo,
+        consolidar=True,
+    ) -> None:
+        """
+        Consolida os sinais de um symbol cujos timeframes terminaram e emite
+        o evento de conclusão (log_dados "symbol_concluido"). Com consolidar
+        False (nenhum timeframe reanalisado no ciclo) só emite o evento.
+        """
+        consolidado = consolidar and all(
+            tf in buffer_sinais[symbol] for tf in timeframes
+        )
+        if consolidado:
+            for tf in timeframes:
+                # Loga dados antes do processamento de cada timeframe
                 log_dados(
                     componente="gerenciador_bot",
-                    acao=f"apos_sinais_plugin_{symbol}_{timeframe}",
-                    dados=resultado_sinais,
+                    acao=f"antes_analise_{symbol}_{tf}",
+                    dados=buffer_sinais[symbol][tf],
                 )
                 logger.debug(
-                    f"[pipeline] Após sinais_plugin: {list(dados_completos.keys())}"
+                    f"[pipeline] Antes do consolidador: {symbol}-{tf} chaves = {list(buffer_sinais[symbol][tf].keys())}"
                 )
-                if isinstance(resultado_sinais, dict):
-                    dados_completos.update(resultado_sinais)
+            # Monta dicionário de dados completos para todos os timeframes
+            dados_timeframes = {
+                tf: buffer_sinais[symbol].get(tf, {}).copy() for tf in timeframes
+            }
+            dados_completos = {"symbol": symbol, "timeframes": dados_timeframes}
+            logger.debug(
+                f"[pipeline] Dados enviados ao consolidador para {symbol}: chaves = {list(dados_timeframes.keys())}"
+            )
+            log_dados(
+                componente="gerenciador_bot",
+                acao=f"antes_consolidador_{symbol}",
+                dados=dados_completos,
+            )
+            sinal_final = consolidador.executar(dados_completos=dados_completos)
+            log_dados(
+                componente="gerenciador_bot",
+                acao=f"apos_consolidador_{symbol}",
+                dados=sinal_final,
+            )
+            # Propaga o resultado para o buffer
+            buffer_sinais[symbol]["sinal_final"] = sinal_final
+            sinal = (
+                sinal_final.get("sinal_consolidado")
+                if isinstance(sinal_final, dict)
+                else None
+            )
+            if self._prioridades and sinal:
+                self._prioridades.registrar_sinal(symbol, sinal.get("direcao"))
+            if self._fragmento and sinal:
+                self._fragmento.publicar_sinal(symbol, sinal)
+        if self._prioridades:
+            self._prioridades.concluir(symbol)
 
-            # Buffer de sinais, se necessário
-            if buffer_sinais is not None:
-                # Armazene o dicionário COMPLETO de dados_completos para cada timeframe
-                from copy import deepcopy
+        duracao = round(time() - inicio_ciclo, 3)
+        log_dados(
+            componente="gerenciador_bot",
+            acao=f"symbol_concluido_{symbol}",
+            dados={"symbol": symbol, "consolidado": consolidado, "segundos": duracao},
+        )
+        logger.execution(f"Symbol {symbol} concluído em {duracao}s do ciclo")
 
-                # Antes de armazenar no buffer
-                log_dados(
-                    componente="gerenciador_bot",
-                    acao=f"antes_buffer_{symbol}_{timeframe}",
-                    dados=dados_completos,
-                )
-                buffer_sinais[symbol][timeframe] = deepcopy(dados_completos)
+    def _registrar_unidade(
+        self, symbol: str, timeframe: str, sucesso: bool, buffer_sinais: dict
+    ) -> None:
+        """Guarda o resultado do par/timeframe para os próximos ciclos."""
+        if not sucesso:
+            # Sem resultado atual o par não é consolidado com dados antigos
+            buffer_sinais[symbol].pop(timeframe, None)
+            self._ultimos_resultados[symbol].pop(timeframe, None)
+            if self._seletor:
+                self._seletor.esquecer(symbol, timeframe)
+            return
+        dados = buffer_sinais[symbol].get(timeframe, {})
+        if self._seletor:
+            self._ultimos_resultados[symbol][timeframe] = dados
+        crus = dados.get("crus") or []
+        if self._seletor and crus:
+            self._seletor.registrar(symbol, timeframe, crus[-1])
+        if self._prioridades and crus:
+            self._prioridades.registrar_candles(symbol, timeframe, crus)
 
-            self._estado_ativo[symbol][timeframe] = {"timestamp": time()}
-            logger.execution(f"Fim do processamento: {symbol} - {timeframe}")
-            return True
+    def _executor_do_symbol(self, symbol: str):
+        """Executor dos plugins do par (None = execução sequencial)."""
+        if self._executor_plugins is None:
+            return None
+        if self._symbols_paralelos and symbol not in self._symbols_paralelos:
+            return None
+        return self._executor_plugins
+
+    def _nova_unidade(
+        self, symbol, timeframe, plano, sinais_plugin, buffer_sinais=None
+    ) -> dict:
+        """Estado de um par/timeframe que passa pelas etapas de processamento."""
+        return {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "plano": plano,
+            "sinais_plugin": sinais_plugin,
+            "buffer_sinais": buffer_sinais,
+            "dados_completos": {"symbol": symbol, "timeframe": timeframe},
+        }
+
+    def _processar_par(
+        self, symbol, timeframe, plano, sinais_plugin, buffer_sinais=None
+    ) -> bool:
+        """
+        Processa um par/timeframe: busca dos candles, plano de análise e
+        sinais, e registro do resultado.
+        """
+        try:
+            unidade = self._nova_unidade(
+                symbol, timeframe, plano, sinais_plugin, buffer_sinais
+            )
+            unidade = self._buscar_unidade(unidade)
+            unidade = self._analisar_unidade(unidade)
+            return unidade is not None and self._persistir_unidade(unidade)
         except Exception as e:
             logger.error(
                 f"[pipeline] Erro no processamento de {symbol}-{timeframe}: {e}",
@@ -376,6 +792,178 @@ class GerenciadorBot(BaseGerenciador):
             )
             return False
 
+    def _buscar_unidade(self, unidade: dict) -> dict:
+        """Popula as k-lines do par/timeframe via plugin ObterDados."""
+        symbol, timeframe = unidade["symbol"], unidade["timeframe"]
+        dados_completos = unidade["dados_completos"]
+        logger.execution(f"Início do processamento: {symbol} - {timeframe}")
+        obter_dados = self._gerente.obter_plugin("obter_dados")
+        if obter_dados:
+            obter_dados.executar(
+                dados_completos=dados_completos, symbol=symbol, timeframe=timeframe
+            )
+            crus = dados_completos.get("crus", [])
+            logger.debug(
+                f"[pipeline] Crus obtidos para {symbol}-{timeframe}: {len(crus) if crus else 0}"
+            )
+            dados_completos["crus"] = crus
+
+        unidade["universo"] = self._indicadores_universo.pop((symbol, timeframe), None)
+        unidade["inalterada"] = self._unidade_inalterada(unidade)
+        return unidade
+
+    def _unidade_inalterada(self, unidade: dict) -> bool:
+        """
+        Seleção do agendador no modo REST: a unidade com resultado anterior
+        e sem candle novo nem variação relevante não é reanalisada.
+        """
+        if not self._selecao_na_busca or unidade["buffer_sinais"] is None:
+            return False
+        symbol, timeframe = unidade["symbol"], unidade["timeframe"]
+        if timeframe not in unidade["buffer_sinais"].get(symbol, {}):
+            return False
+        crus = unidade["dados_completos"].get("crus") or []
+        candle = crus[-1] if len(crus) else None
+        if self._seletor.motivo(symbol, timeframe, candle) is not None:
+            return False
+        logger.debug(
+            f"[agendador] {symbol}-{timeframe} sem candle novo nem variação relevante"
+        )
+        return True
+
+    def _analisar_unidade(self, unidade: dict) -> Optional[dict]:
+        """Executa o plano de análise e o plugin de sinais (None = falha)."""
+        if unidade.get("inalterada"):
+            return unidade
+        symbol, timeframe = unidade["symbol"], unidade["timeframe"]
+        dados_completos = unidade["dados_completos"]
+        if unidade.get("universo") and dados_completos.get("crus"):
+            armazenar_lote(
+                obter_servico_indicadores(),
+                unidade["universo"],
+                dados_completos["crus"],
+                symbol,
+                timeframe,
+            )
+
+        # Executa os plugins de análise na ordem do plano (estágios em
+        # paralelo para os symbols do modo plugins_paralelos)
+        self._gerente.executar_plano(
+            unidade["plano"],
+            dados_completos,
+            symbol,
+            timeframe,
+            executor=self._executor_do_symbol(symbol),
+        )
+
+        # Garante que symbol, timeframe e crus estejam presentes
+        if not all(
+            [
+                dados_completos.get("symbol"),
+                dados_completos.get("timeframe"),
+                dados_completos.get("crus"),
+            ]
+        ):
+            logger.error(
+                f"[pipeline] Dados incompletos para {symbol}-{timeframe} antes do consolidador: {dados_completos}"
+            )
+            return None
+
+        # Executa o plugin de sinais (analise_mercado consolidada)
+        sinais_plugin = unidade["sinais_plugin"]
+        if sinais_plugin and hasattr(sinais_plugin, "executar"):
+            resultado_sinais = sinais_plugin.executar(
+                symbol=symbol,
+                timeframe=timeframe,
+                dados_completos=dados_completos,
+            )
+            log_dados(
+                componente="gerenciador_bot",
+                acao=f"apos_sinais_plugin_{symbol}_{timeframe}",
+                dados=resultado_sinais,
+            )
+            logger.debug(
+                f"[pipeline] Após sinais_plugin: {list(dados_completos.keys())}"
+            )
+            if isinstance(resultado_sinais, dict):
+                dados_completos.update(resultado_sinais)
+        return unidade
+
+    def _analisar_com_persistencia_adiada(self, unidade: dict) -> Optional[dict]:
+        """Análise do pipeline: gravações no banco ficam para o estágio seguinte."""
+        with adiando_persistencia() as pendentes:
+            unidade = self._analisar_unidade(unidade)
+        if unidade is not None:
+            unidade["persistencias"] = pendentes
+        return unidade
+
+    def _persistir_unidade(self, unidade: dict) -> bool:
+        """Grava as persistências adiadas e registra o resultado no buffer."""
+        symbol, timeframe = unidade["symbol"], unidade["timeframe"]
+        if unidade.get("inalterada"):
+            # O buffer já traz o resultado anterior da unidade
+            logger.execution(
+                f"Fim do processamento: {symbol} - {timeframe} (sem mudança)"
+            )
+            return True
+        dados_completos = unidade["dados_completos"]
+        persistir_adiadas(unidade.get("persistencias") or ())
+
+        # Buffer de sinais, se necessário
+        buffer_sinais = unidade["buffer_sinais"]
+        if buffer_sinais is not None:
+            # Armazene o dicionário COMPLETO de dados_completos para cada timeframe
+            from copy import deepcopy
+
+            # Antes de armazenar no buffer
+            log_dados(
+                componente="gerenciador_bot",
+                acao=f"antes_buffer_{symbol}_{timeframe}",
+                dados=dados_completos,
+            )
+            buffer_sinais[symbol][timeframe] = deepcopy(dados_completos)
+
+        self._estado_ativo[symbol][timeframe] = {"timestamp": time()}
+        logger.execution(f"Fim do processamento: {symbol} - {timeframe}")
+        return True
+
+    def _obter_pipeline(self) -> Optional[PipelineEstagios]:
+        """Pipeline busca → análise → persistência, se o modo estiver ativo."""
+        opcoes = self._config.get("pipeline_estagios", {})
+        if not opcoes.get("ativo", False):
+            return None
+        if self._pipeline is None:
+            padroes = {"buscar": (8, 64), "analisar": (4, 32), "persistir": (2, 64)}
+            funcoes = {
+                "buscar": self._buscar_unidade,
+                "analisar": self._analisar_com_persistencia_adiada,
+                "persistir": self._persistir_unidade,
+            }
+            estagios = []
+            for nome, (workers, capacidade) in padroes.items():
+                cfg = opcoes.get(nome, {})
+                estagios.append(
+                    Estagio(
+                        nome,
+                        funcoes[nome],
+                        workers=cfg.get("workers", workers),
+                        capacidade=cfg.get("capacidade", capacidade),
+                    )
+                )
+            self._pipeline = PipelineEstagios(estagios)
+            logger.info(
+                "Pipeline em estágios ativo: "
+                + ", ".join(f"{e.nome}={e.workers}/{e.capacidade}" for e in estagios)
+            )
+        return self._pipeline
+
+    @staticmethod
+    def _alimentar_pipeline(pipeline: PipelineEstagios, entregas: list) -> None:
+        """Entrega as unidades ao pipeline (bloqueia com as filas cheias)."""
+        for unidade, futuro in entregas:
+            if not futuro.cancelled():
+                pipeline.submeter(unidade, futuro)
+
     def iniciar(self) -> bool:
         """
         Inicia a execução do bot.
@@ -416,6 +1004,17 @@ class GerenciadorBot(BaseGerenciador):
         try:
             self.parar()
             self._executor.shutdown(wait=True)
+            if self._processos is not None:
+                self._processos.encerrar()
+                self._processos = None
+            if self._executor_plugins is not None:
+                self._executor_plugins.shutdown(wait=True)
+            if self._fragmento is not None:
+                self._fragmento.encerrar()
+                self._fragmento = None
+            if self._pipeline is not None:
+                self._pipeline.encerrar()
+                self._pipeline = None
             super().finalizar()
             logger.debug("GerenciadorBot finalizado com sucesso")
             return True
@@ -441,7 +1040,37 @@ class GerenciadorBot(BaseGerenciador):
                     "detalhes": "JSONB",
                     "created_at": "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
                 },
-            }
+            },
+            "fragmentos_workers": {
+                "descricao": "Workers do modo fragmentado e o último batimento de cada um (anel de hash consistente).",
+                "modo_acesso": "own",
+                "plugin": self.PLUGIN_NAME,
+                "schema": {
+                    "worker": "VARCHAR(128) PRIMARY KEY",
+                    "visto_em": "TIMESTAMPTZ NOT NULL DEFAULT now()",
+                },
+            },
+            "fragmentos_arrendamentos": {
+                "descricao": "Arrendamento de cada symbol a um worker no modo fragmentado, com expiração.",
+                "modo_acesso": "own",
+                "plugin": self.PLUGIN_NAME,
+                "schema": {
+                    "symbol": "VARCHAR(50) PRIMARY KEY",
+                    "worker": "VARCHAR(128) NOT NULL",
+                    "expira_em": "TIMESTAMPTZ NOT NULL",
+                },
+            },
+            "fragmentos_sinais": {
+                "descricao": "Último sinal consolidado de cada symbol publicado pelos workers para o coordenador.",
+                "modo_acesso": "own",
+                "plugin": self.PLUGIN_NAME,
+                "schema": {
+                    "symbol": "VARCHAR(50) PRIMARY KEY",
+                    "worker": "VARCHAR(128) NOT NULL",
+                    "sinal": "JSONB",
+                    "atualizado_em": "TIMESTAMPTZ NOT NULL DEFAULT now()",
+                },
+            },
         }
 
     @property
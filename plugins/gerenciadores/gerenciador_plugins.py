@@ -2,12 +2,19 @@ import json
 import os
 import inspect
 from collections import defaultdict, deque
-from typing import Optional, List, Dict, Set, Type
+from concurrent.futures import Executor
+from typing import Iterable, Optional, List, Dict, Set, Type
 from plugins.plugin import Plugin, PluginRegistry
 from plugins.gerenciadores.gerenciador import BaseGerenciador
 from utils.logging_config import get_logger
 from utils.config import carregar_config
 from utils.plugin_utils import validar_klines
+from utils.plano_execucao import (
+    PlanoExecucao,
+    compilar_plano,
+    declaracao_plugin,
+    executar_plano,
+)
 
 logger = get_logger(__name__)
 
@@ -40,6 +47,9 @@ class GerenciadorPlugins(BaseGerenciador):
             else {}
         )
         self._dependencias: dict[str, list[str]] = {}
+        # Planos de execução compilados, reaproveitados entre ciclos
+        self._planos: dict[tuple, PlanoExecucao] = {}
+        self.plano_execucao: Optional[PlanoExecucao] = None
 
     def _registrar_gerenciadores(self):
         """Instancia e registra automaticamente os gerenciadores conhecidos."""
@@ -474,6 +484,86 @@ class GerenciadorPlugins(BaseGerenciador):
             logger.error(f"Erro geral na execução dos plugins: {e}", exc_info=True)
             return False
 
+    def planejar(
+        self, tag: str = "analise", excluir: Iterable[str] = ()
+    ) -> PlanoExecucao:
+        """
+        Compila (ou reaproveita) o plano de execução dos plugins com a tag.
+
+        O plano é recompilado só quando o conjunto de plugins ou suas
+        declarações (PLUGIN_CONSOME, PLUGIN_PRODUZ, indicadores_requeridos)
+        mudam; o último plano fica em self.plano_execucao para inspeção.
+
+        Args:
+            tag (str): Tag dos plugins do plano.
+            excluir (Iterable[str]): Nomes de plugins que ficam de fora.
+
+        Returns:
+            PlanoExecucao: Plano compilado.
+        """
+        excluir = set(excluir)
+        plugins = [p for p in self.filtrar_por_tag(tag) if p.nome not in excluir]
+        declaracoes = [declaracao_plugin(p) for p in plugins]
+        chave = (
+            tag,
+            tuple(sorted(excluir)),
+            tuple(id(p) for p in plugins),
+            tuple(
+                (d["nome"], d["consome"], d["produz"], repr(d["indicadores"]))
+                for d in declaracoes
+            ),
+        )
+        plano = self._planos.get(chave)
+        if plano is None:
+            try:
+                plano = compilar_plano(declaracoes)
+            except ValueError as e:
+                # Declarações inconsistentes: mantém a execução sequencial original
+                logger.error(f"Plano de execução '{tag}' inválido: {e}")
+                plano = compilar_plano(
+                    [dict(d, consome=None, produz=()) for d in declaracoes]
+                )
+            self._planos[chave] = plano
+            logger.info(
+                f"Plano de execução '{tag}' compilado: {len(plano.estagios)} estágios, "
+                f"{len(plano.indicadores)} indicadores compartilhados, "
+                f"ordem={plano.plugins}"
+            )
+            if plano.nao_produzidas:
+                logger.debug(
+                    f"Chaves lidas sem produtor no plano '{tag}': {plano.nao_produzidas}"
+                )
+        self.plano_execucao = plano
+        return plano
+
+    def executar_plano(
+        self,
+        plano: PlanoExecucao,
+        dados_completos: dict,
+        symbol: str,
+        timeframe: str,
+        executor: Optional[Executor] = None,
+    ) -> dict:
+        """
+        Executa o plano para um par/timeframe, estágio por estágio.
+
+        Indicadores compartilhados são calculados uma vez (cache do serviço de
+        indicadores) antes dos plugins; o dicionário devolvido por cada plugin
+        é incorporado a dados_completos.
+
+        Args:
+            plano (PlanoExecucao): Plano compilado por planejar().
+            dados_completos (dict): Dados do par/timeframe (com "crus").
+            symbol (str): Símbolo do par.
+            timeframe (str): Timeframe.
+            executor (Executor, optional): Roda em paralelo os plugins de um
+                mesmo estágio (ver utils.plano_execucao.executar_plano).
+
+        Returns:
+            dict: O próprio dados_completos atualizado.
+        """
+        return executar_plano(plano, dados_completos, symbol, timeframe, executor)
+
     def obter_plugin(self, nome: str) -> Optional[Plugin]:
         """Recupera um plugin pelo nome."""
         plugin = self.plugins.get(nome)
@@ -534,6 +624,8 @@ class GerenciadorPlugins(BaseGerenciador):
             except Exception as e:
                 logger.error(f"Erro ao finalizar plugin {nome}: {e}")
         self.plugins.clear()
+        self._planos.clear()
+        self.plano_execucao = None
         self.inicializado = False
 
     def listar_plugins_registrados(self) -> None:
@@ -2,7 +2,6 @@
 
 from plugins.gerenciadores.gerenciador_plugins import GerenciadorPlugins
 from utils.logging_config import get_logger, log_rastreamento
-import talib
 import numpy as np
 from plugins.plugin import Plugin
 import logging
@@ -87,6 +86,8 @@ class IndicadoresOsciladores(Plugin):
     PLUGIN_TYPE = "indicador"
     PLUGIN_CATEGORIA = "plugin"
     PLUGIN_TAGS = ["osciladores", "rsi", "stoch", "mfi"]
+    PLUGIN_CONSOME = ["crus"]
+    PLUGIN_PRODUZ = ["osciladores"]
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -95,15 +96,17 @@ class IndicadoresOsciladores(Plugin):
         self.config = config["indicadores"]["osciladores"].copy()
 
     def calcular_rsi(
-        self, klines, symbol: str, timeframe: str, base_periodo=None
-    ) -> np.ndarray:
+        self, klines, symbol: str, timeframe: str, base_periodo=None, historico=True
+    ):
         """
         Calcula o RSI com ajuste dinâmico baseado na volatilidade e config centralizada.
+        Com historico=False retorna só o último valor (avaliado na cauda estável).
         """
+        vazio = np.array([]) if historico else None
         try:
             close = extrair_ohlcv(klines, [4])[4]
             if close.size < 10:
-                return np.array([])
+                return vazio
             base_periodo = base_periodo or self.config.get("rsi_periodo", 14)
             volatilidade = calcular_volatilidade_generico(close, periodo=base_periodo)
             ajuste = int(volatilidade * 10)
@@ -112,23 +115,29 @@ class IndicadoresOsciladores(Plugin):
             elif timeframe == "1d":
                 base_periodo = min(28, base_periodo * 2)
             periodo_final = max(7, min(28, base_periodo + ajuste))
-            rsi = talib.RSI(close, timeperiod=periodo_final)
-            return rsi
+            calcular = (
+                self.indicadores.calcular if historico else self.indicadores.ultimo
+            )
+            return calcular("RSI", klines, symbol, timeframe, timeperiod=periodo_final)
         except Exception as e:
             logger.error(
                 f"[{self.nome}] Erro ao calcular RSI para {symbol} - {timeframe}: {e}"
             )
-            return np.array([])
+            return vazio
 
-    def calcular_estocastico(self, klines, timeframe: str) -> tuple:
+    def calcular_estocastico(
+        self, klines, timeframe: str, symbol: str = None, historico=True
+    ) -> tuple:
         """
         Calcula o Estocástico com ajuste dinâmico e config centralizada.
+        Com historico=False retorna só os últimos (slowk, slowd).
         """
+        vazio = (np.array([]), np.array([])) if historico else (None, None)
         try:
             extr = extrair_ohlcv(klines, [2, 3, 4])
             high, low, close = extr[2], extr[3], extr[4]
             if len(close) < 10:
-                return np.array([]), np.array([])
+                return vazio
             vol = calcular_volatilidade_generico(close, periodo=14)
             ajuste = int(vol * 3)
             base = {
@@ -143,10 +152,14 @@ class IndicadoresOsciladores(Plugin):
             fastk = max(3, min(10, base["fastk"] + ajuste))
             slowk = max(2, min(6, base["slowk"] + ajuste))
             slowd = max(2, min(6, base["slowd"] + ajuste))
-            slowk_vals, slowd_vals = talib.STOCH(
-                high,
-                low,
-                close,
+            calcular = (
+                self.indicadores.calcular if historico else self.indicadores.ultimo
+            )
+            slowk_vals, slowd_vals = calcular(
+                "STOCH",
+                klines,
+                symbol,
+                timeframe,
                 fastk_period=fastk,
                 slowk_period=slowk,
                 slowk_matype=0,
@@ -156,22 +169,27 @@ class IndicadoresOsciladores(Plugin):
             return slowk_vals, slowd_vals
         except Exception as e:
             logger.error(f"[{self.nome}] Erro ao calcular Estocástico: {e}")
-            return np.array([]), np.array([])
+            return vazio
 
-    def calcular_mfi(self, klines, periodo=None) -> np.ndarray:
+    def calcular_mfi(
+        self, klines, periodo=None, symbol=None, timeframe=None, historico=True
+    ):
         """
         Calcula o MFI (Money Flow Index) usando config centralizada.
+        Com historico=False retorna só o último valor.
         """
+        vazio = np.array([]) if historico else None
         try:
-            extr = extrair_ohlcv(klines, [2, 3, 4, 5])
-            high, low, close, volume = extr[2], extr[3], extr[4], extr[5]
             periodo = periodo or self.config.get("mfi_periodo", 14)
-            if len(close) < periodo:
-                return np.array([])
-            return talib.MFI(high, low, close, volume, timeperiod=periodo)
+            if len(klines) < periodo:
+                return vazio
+            calcular = (
+                self.indicadores.calcular if historico else self.indicadores.ultimo
+            )
+            return calcular("MFI", klines, symbol, timeframe, timeperiod=periodo)
         except Exception as e:
             logger.error(f"[{self.nome}] Erro ao calcular MFI: {e}")
-            return np.array([])
+            return vazio
 
     def executar(self, *args, **kwargs) -> dict:
         """
@@ -200,19 +218,21 @@ class IndicadoresOsciladores(Plugin):
             if not validar_klines(dados_completos.get("crus", []), min_len=20):
                 return resultado_padrao
             crus = dados_completos.get("crus", [])
-            rsi = self.calcular_rsi(crus, symbol, timeframe)
-            slowk, slowd = self.calcular_estocastico(crus, timeframe)
-            mfi = self.calcular_mfi(crus)
+            # Só os últimos valores: nada de séries completas por chamada
+            rsi = self.calcular_rsi(crus, symbol, timeframe, historico=False)
+            slowk, slowd = self.calcular_estocastico(
+                crus, timeframe, symbol, historico=False
+            )
+            mfi = self.calcular_mfi(
+                crus, symbol=symbol, timeframe=timeframe, historico=False
+            )
             close = extrair_ohlcv(crus, [4])[4]
             volatilidade = calcular_volatilidade_generico(close, periodo=14)
             resultado = {
                 "osciladores": {
-                    "rsi": float(rsi[-1]) if rsi.size else None,
-                    "estocastico": {
-                        "slowk": float(slowk[-1]) if slowk.size else None,
-                        "slowd": float(slowd[-1]) if slowd.size else None,
-                    },
-                    "mfi": float(mfi[-1]) if mfi.size else None,
+                    "rsi": rsi,
+                    "estocastico": {"slowk": slowk, "slowd": slowd},
+                    "mfi": mfi,
                     "volatilidade": volatilidade,
                 }
             }
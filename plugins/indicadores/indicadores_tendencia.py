@@ -2,7 +2,6 @@
 
 from typing import Dict
 import numpy as np
-import talib
 from utils.logging_config import get_logger, log_rastreamento
 from plugins.plugin import Plugin
 from plugins.gerenciadores.gerenciador_plugins import GerenciadorPlugins
@@ -41,6 +40,8 @@ class IndicadoresTendencia(Plugin):
     PLUGIN_CATEGORIA = "indicador"
     PLUGIN_TAGS = ["indicador", "tendencia", "analise"]
     PLUGIN_PRIORIDADE = 50
+    PLUGIN_CONSOME = ["crus"]
+    PLUGIN_PRODUZ = ["tendencia", "atr", "preco_atual"]
 
     @property
     def plugin_schema_versao(self) -> str:
@@ -152,60 +153,56 @@ class IndicadoresTendencia(Plugin):
             media = np.mean(close[-14:])
             volatilidade = np.std(close[-14:]) / media if media != 0 else 0.0
             periodos = ajustar_periodos_generico(self.config, timeframe, volatilidade)
-            sma_r = talib.SMA(close, timeperiod=periodos["sma_rapida"])
-            sma_l = talib.SMA(close, timeperiod=periodos["sma_lenta"])
-            ema_r = talib.EMA(close, timeperiod=periodos["ema_rapida"])
-            ema_l = talib.EMA(close, timeperiod=periodos["ema_lenta"])
-            macd, signal, hist = talib.MACD(
-                close,
+
+            # Só o último valor interessa: avaliado na cauda estável dos
+            # candles e compartilhado pelo cache de indicadores
+            def calcular(nome, **params):
+                return self.indicadores.ultimo(
+                    nome, candles, symbol, timeframe, **params
+                )
+
+            sma_r = calcular("SMA", timeperiod=periodos["sma_rapida"])
+            sma_l = calcular("SMA", timeperiod=periodos["sma_lenta"])
+            ema_r = calcular("EMA", timeperiod=periodos["ema_rapida"])
+            ema_l = calcular("EMA", timeperiod=periodos["ema_lenta"])
+            macd, signal, hist = calcular(
+                "MACD",
                 fastperiod=periodos["ema_rapida"],
                 slowperiod=periodos["ema_lenta"],
                 signalperiod=periodos["macd_signal"],
             )
-            adx = talib.ADX(ohlc[2], ohlc[3], close, timeperiod=periodos["adx_periodo"])
-            pdi = talib.PLUS_DI(
-                ohlc[2], ohlc[3], close, timeperiod=periodos["adx_periodo"]
-            )
-            ndi = talib.MINUS_DI(
-                ohlc[2], ohlc[3], close, timeperiod=periodos["adx_periodo"]
-            )
-            atr = talib.ATR(ohlc[2], ohlc[3], close, timeperiod=periodos["atr_periodo"])
+            adx = calcular("ADX", timeperiod=periodos["adx_periodo"])
+            pdi = calcular("PLUS_DI", timeperiod=periodos["adx_periodo"])
+            ndi = calcular("MINUS_DI", timeperiod=periodos["adx_periodo"])
+            atr = calcular("ATR", timeperiod=periodos["atr_periodo"])
             log_rastreamento(
                 componente=f"indicadores_tendencia/{symbol}-{timeframe}",
                 acao="indicadores_calculados",
                 detalhes=(
-                    f"sma_r={sma_r[-1] if sma_r.size else None}, "
-                    f"sma_l={sma_l[-1] if sma_l.size else None}, "
-                    f"ema_r={ema_r[-1] if ema_r.size else None}, "
-                    f"ema_l={ema_l[-1] if ema_l.size else None}, "
-                    f"macd={macd[-1] if macd.size else None}, "
-                    f"signal={signal[-1] if signal.size else None}, "
-                    f"hist={hist[-1] if hist.size else None}, "
-                    f"adx={adx[-1] if adx.size else None}, "
-                    f"pdi={pdi[-1] if pdi.size else None}, "
-                    f"ndi={ndi[-1] if ndi.size else None}, "
-                    f"atr={atr[-1] if atr.size else None}"
+                    f"sma_r={sma_r}, sma_l={sma_l}, ema_r={ema_r}, ema_l={ema_l}, "
+                    f"macd={macd}, signal={signal}, hist={hist}, "
+                    f"adx={adx}, pdi={pdi}, ndi={ndi}, atr={atr}"
                 ),
             )
             tendencia = {
                 "tendencia": {
                     "medias_moveis": {
-                        "sma_rapida": float(sma_r[-1]) if sma_r.size else None,
-                        "sma_lenta": float(sma_l[-1]) if sma_l.size else None,
-                        "ema_rapida": float(ema_r[-1]) if ema_r.size else None,
-                        "ema_lenta": float(ema_l[-1]) if ema_l.size else None,
+                        "sma_rapida": sma_r,
+                        "sma_lenta": sma_l,
+                        "ema_rapida": ema_r,
+                        "ema_lenta": ema_l,
                     },
                     "macd": {
-                        "macd": float(macd[-1]) if macd.size else None,
-                        "signal": float(signal[-1]) if signal.size else None,
-                        "histogram": float(hist[-1]) if hist.size else None,
+                        "macd": macd,
+                        "signal": signal,
+                        "histogram": hist,
                     },
                     "adx": {
-                        "adx": float(adx[-1]) if adx.size else None,
-                        "pdi": float(pdi[-1]) if pdi.size else None,
-                        "ndi": float(ndi[-1]) if ndi.size else None,
+                        "adx": adx,
+                        "pdi": pdi,
+                        "ndi": ndi,
                     },
-                    "atr": float(atr[-1]) if atr.size else 0.0,
+                    "atr": atr if atr is not None else 0.0,
                 }
             }
             if isinstance(dados_completos, dict):
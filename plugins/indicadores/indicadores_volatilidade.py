@@ -3,7 +3,6 @@
 
 from plugins.plugin import Plugin
 from utils.logging_config import get_logger, log_rastreamento
-import talib
 import numpy as np
 from utils.config import carregar_config
 from utils.plugin_utils import (
@@ -44,6 +43,8 @@ class IndicadoresVolatilidade(Plugin):
     PLUGIN_CATEGORIA = "plugin"
     PLUGIN_TAGS = ["indicadores", "volatilidade", "analise"]
     PLUGIN_PRIORIDADE = 100
+    PLUGIN_CONSOME = ["crus"]
+    PLUGIN_PRODUZ = ["volatilidade"]
 
     @classmethod
     def dependencias(cls):
@@ -67,6 +68,21 @@ class IndicadoresVolatilidade(Plugin):
         if "periodos" in self.config:
             self.periodos.update(self.config["periodos"])
 
+    def indicadores_requeridos(self) -> list:
+        """Bollinger Bands e ATR com os períodos configurados."""
+        return [
+            (
+                "BBANDS",
+                {
+                    "timeperiod": self.periodos["bb"],
+                    "nbdevup": self.config["bb_desvio_padrao"],
+                    "nbdevdn": self.config["bb_desvio_padrao"],
+                    "matype": 0,
+                },
+            ),
+            ("ATR", {"timeperiod": self.periodos["atr"]}),
+        ]
+
     def executar(self, *args, **kwargs) -> dict:
         """
         Executa o cálculo dos indicadores de volatilidade.
@@ -114,16 +130,19 @@ class IndicadoresVolatilidade(Plugin):
                 )
                 upper, middle, lower = np.array([]), np.array([]), np.array([])
             else:
-                upper, middle, lower = talib.BBANDS(
-                    close,
+                upper, middle, lower = self.indicadores.calcular(
+                    "BBANDS",
+                    klines,
+                    symbol,
+                    timeframe,
                     timeperiod=self.periodos["bb"],
                     nbdevup=self.config["bb_desvio_padrao"],
                     nbdevdn=self.config["bb_desvio_padrao"],
                     matype=0,
                 )
-            dados_ohlc = extrair_ohlcv(klines, [2, 3, 4])
-            high, low, close_atr = dados_ohlc[2], dados_ohlc[3], dados_ohlc[4]
-            atr = talib.ATR(high, low, close_atr, timeperiod=self.periodos["atr"])
+            atr = self.indicadores.calcular(
+                "ATR", klines, symbol, timeframe, timeperiod=self.periodos["atr"]
+            )
             atr_valor = float(atr[-1]) if atr.size > 0 else None
             resultado = {
                 "volatilidade": {
@@ -7,10 +7,12 @@ import talib
 import numpy as np
 import pandas as pd
 from utils.config import carregar_config
+from utils.candles_colunares import CandlesOHLCV
 from utils.plugin_utils import (
     ajustar_periodos_generico,
     extrair_ohlcv,
     validar_klines,
+    validacao_klines,
     calcular_volatilidade_generico,
 )
 
@@ -38,6 +40,8 @@ class IndicadoresVolume(Plugin):
     PLUGIN_CATEGORIA = "indicador"
     PLUGIN_TAGS = ["indicador", "volume", "analise"]
     PLUGIN_PRIORIDADE = 50
+    PLUGIN_CONSOME = ["crus"]
+    PLUGIN_PRODUZ = ["volume"]
 
     @property
     def plugin_schema_versao(self) -> str:
@@ -118,30 +122,17 @@ class IndicadoresVolume(Plugin):
                 detalhes=f"klines insuficientes: {len(klines)}",
             )
             return False
-        for item in klines:
-            if not isinstance(item, (list, tuple)) or len(item) < 6:
-                logger.error(
-                    f"[{self.nome}] Item inválido em klines para {symbol} - {timeframe}: {item}"
-                )
-                log_rastreamento(
-                    componente=f"indicadores_volume/{symbol}-{timeframe}",
-                    acao="validacao_falha",
-                    detalhes=f"item inválido: {item}",
-                )
-                return False
-            for idx in [2, 3, 4, 5]:  # high, low, close, volume
-                try:
-                    float(item[idx])
-                except (TypeError, ValueError):
-                    logger.error(
-                        f"[{self.nome}] Valor não numérico em klines[{idx}]: {item[idx]}"
-                    )
-                    log_rastreamento(
-                        componente=f"indicadores_volume/{symbol}-{timeframe}",
-                        acao="validacao_falha",
-                        detalhes=f"valor não numérico em klines[{idx}]: {item[idx]}",
-                    )
-                    return False
+        relatorio = validacao_klines(klines)
+        if not relatorio.valido((2, 3, 4, 5)):
+            logger.error(
+                f"[{self.nome}] K-lines inválidas para {symbol} - {timeframe}: {relatorio.problemas()}"
+            )
+            log_rastreamento(
+                componente=f"indicadores_volume/{symbol}-{timeframe}",
+                acao="validacao_falha",
+                detalhes=f"klines inválidos: {relatorio.problemas()}",
+            )
+            return False
         return True
 
     def _extrair_dados(self, dados: list, colunas: list) -> list:
@@ -155,6 +146,8 @@ class IndicadoresVolume(Plugin):
         Returns:
             list: Lista de arrays NumPy para cada coluna.
         """
+        if isinstance(dados, CandlesOHLCV) and dados.completo(colunas):
+            return [dados.coluna(i) for i in colunas]
         try:
             dados_completos = list(zip(*dados))
             return [np.array(dados_completos[i], dtype=np.float64) for i in colunas]
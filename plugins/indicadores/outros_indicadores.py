@@ -8,8 +8,10 @@ from utils.plugin_utils import (
     ajustar_periodos_generico,
     extrair_ohlcv,
     validar_klines,
+    validacao_klines,
     calcular_volatilidade_generico,
 )
+from utils.kernels_outros import aquecer, maximos_minimos_moveis, pivot_points
 
 logger = get_logger(__name__)
 
@@ -48,6 +50,8 @@ class OutrosIndicadores(Plugin):
     PLUGIN_CATEGORIA = "plugin"
     PLUGIN_TAGS = ["indicador", "outros", "ichimoku", "fibonacci", "pivots"]
     PLUGIN_PRIORIDADE = 50
+    PLUGIN_CONSOME = ["crus"]
+    PLUGIN_PRODUZ = ["outros"]
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -60,6 +64,13 @@ class OutrosIndicadores(Plugin):
         )
         logger.debug(f"[{self.nome}] inicializado")
 
+    def inicializar(self, config: dict) -> bool:
+        if not super().inicializar(config):
+            return False
+        # Compila o kernel de máximos/mínimos (numba) fora do primeiro ciclo de análise
+        aquecer()
+        return True
+
     @property
     def plugin_schema_versao(self) -> str:
         return "1.0"
@@ -110,22 +121,12 @@ class OutrosIndicadores(Plugin):
             )
             return False
 
-        for item in klines:
-            if not isinstance(item, (list, tuple)) or len(item) < 6:
-                logger.error(
-                    f"[{self.nome}] Item inválido em klines para {symbol} - {timeframe}: {item}"
-                )
-                return False
-            for idx in [2, 3, 4]:  # high, low, close
-                if not isinstance(item[idx], (int, float)):
-                    try:
-                        float(item[idx])
-                    except (TypeError, ValueError):
-                        logger.error(
-                            f"[{self.nome}] Valor não numérico em klines[{idx}]: {item[idx]}"
-                        )
-                        return False
-
+        relatorio = validacao_klines(klines)
+        if not relatorio.valido((2, 3, 4)):
+            logger.error(
+                f"[{self.nome}] K-lines inválidas para {symbol} - {timeframe}: {relatorio.problemas()}"
+            )
+            return False
         return True
 
     def _calcular_volatilidade(self, close, periodo=14) -> float:
@@ -184,40 +185,46 @@ class OutrosIndicadores(Plugin):
             ),
         }
 
-    def _calcular_ichimoku(self, high, low, close):
+    def _calcular_ichimoku(self, high, low, close, extremos=None):
         """
         Calcula os componentes do Ichimoku Cloud.
 
         Args:
             high, low, close: Arrays de preços high, low e close.
+            extremos: (maximos, minimos) já calculados para as janelas
+                tenkan, kijun e senkou_b, nessa ordem (opcional).
 
         Returns:
             dict: Componentes do Ichimoku (tenkan_sen, kijun_sen, senkou_span_a, senkou_span_b, chikou_span).
         """
         try:
-            periodos = self.config["periodos"]
-            tenkan_sen = (
-                talib.MAX(high, timeperiod=periodos["ichimoku_tenkan"])
-                + talib.MIN(low, timeperiod=periodos["ichimoku_tenkan"])
-            ) / 2
-            kijun_sen = (
-                talib.MAX(high, timeperiod=periodos["ichimoku_kijun"])
-                + talib.MIN(low, timeperiod=periodos["ichimoku_kijun"])
-            ) / 2
-            senkou_span_b = (
-                talib.MAX(high, timeperiod=periodos["ichimoku_senkou_b"])
-                + talib.MIN(low, timeperiod=periodos["ichimoku_senkou_b"])
-            ) / 2
+            if extremos is None:
+                periodos = self.config["periodos"]
+                extremos = maximos_minimos_moveis(
+                    high,
+                    low,
+                    (
+                        periodos["ichimoku_tenkan"],
+                        periodos["ichimoku_kijun"],
+                        periodos["ichimoku_senkou_b"],
+                    ),
+                )
+            maximos, minimos = extremos
+            # Uma passada com filas monotônicas no lugar de 6x talib.MAX/MIN
+            tenkan_sen = (maximos[0] + minimos[0]) / 2
+            kijun_sen = (maximos[1] + minimos[1]) / 2
+            senkou_span_b = (maximos[2] + minimos[2]) / 2
             # Calcular Senkou Span A como (tenkan_sen + kijun_sen) / 2, deslocado à frente
             senkou_span_a = (tenkan_sen + kijun_sen) / 2
+            shift = self.config.get("ichimoku_shift", 26)
             if senkou_span_a.size:
-                senkou_span_a = np.roll(senkou_span_a, self.config["ichimoku_shift"])
-                senkou_span_a[: self.config["ichimoku_shift"]] = np.nan
+                senkou_span_a = np.roll(senkou_span_a, shift)
+                senkou_span_a[:shift] = np.nan
             # Calcular Chikou Span como close deslocado para trás
             chikou_span = close.copy()
             if chikou_span.size:
-                chikou_span = np.roll(chikou_span, -self.config["ichimoku_shift"])
-                chikou_span[-self.config["ichimoku_shift"] :] = np.nan
+                chikou_span = np.roll(chikou_span, -shift)
+                chikou_span[-shift:] = np.nan
 
             return {
                 "tenkan_sen": tenkan_sen,
@@ -239,13 +246,14 @@ class OutrosIndicadores(Plugin):
                 ]
             }
 
-    def _calcular_fibonacci(self, high, low, janela):
+    def _calcular_fibonacci(self, high, low, janela, extremos=None):
         """
         Calcula níveis de Fibonacci com base nos preços máximo e mínimo em uma janela.
 
         Args:
             high, low: Arrays de preços high e low.
             janela: Número de períodos para considerar.
+            extremos: (máximo, mínimo) da janela já calculados (opcional).
 
         Returns:
             dict: Níveis de Fibonacci (23.6%, 38.2%, 50%, 61.8%).
@@ -256,9 +264,10 @@ class OutrosIndicadores(Plugin):
                     f"[{self.nome}] Dados insuficientes para Fibonacci (janela={janela})"
                 )
                 return {k: None for k in ["23.6%", "38.2%", "50%", "61.8%"]}
-            high_janela = high[-janela:]
-            low_janela = low[-janela:]
-            maximo, minimo = np.max(high_janela), np.min(low_janela)
+            if extremos is None:
+                maximo, minimo = np.max(high[-janela:]), np.min(low[-janela:])
+            else:
+                maximo, minimo = extremos
             diferenca = maximo - minimo
             return {
                 "23.6%": maximo - diferenca * 0.236,
@@ -286,8 +295,8 @@ class OutrosIndicadores(Plugin):
                 float(ultimo_candle[3]),
                 float(ultimo_candle[4]),
             )
-            pp = (h + l + c) / 3
-            return {"PP": pp, "R1": 2 * pp - l, "S1": 2 * pp - h}
+            pp, r1, s1 = pivot_points(h, l, c)
+            return {"PP": pp, "R1": r1, "S1": s1}
         except Exception as e:
             logger.error(f"[{self.nome}] Erro ao calcular Pivot Points: {e}")
             return {"PP": None, "R1": None, "S1": None}
@@ -357,9 +366,26 @@ class OutrosIndicadores(Plugin):
                 timeframe,
                 volatilidade,
             )
-            ichimoku = self._calcular_ichimoku(high, low, close)
+            periodos = self.config["periodos"]
+            # Máximos/mínimos das janelas do Ichimoku e do Fibonacci em uma passada
+            maximos, minimos = maximos_minimos_moveis(
+                high,
+                low,
+                (
+                    periodos["ichimoku_tenkan"],
+                    periodos["ichimoku_kijun"],
+                    periodos["ichimoku_senkou_b"],
+                    periodos["fibonacci_janela"],
+                ),
+            )
+            ichimoku = self._calcular_ichimoku(
+                high, low, close, extremos=(maximos[:3], minimos[:3])
+            )
             fibonacci = self._calcular_fibonacci(
-                high, low, self.config["periodos"]["fibonacci_janela"]
+                high,
+                low,
+                periodos["fibonacci_janela"],
+                extremos=(maximos[3, -1], minimos[3, -1]),
             )
             pivot_points = self._calcular_pivot_points(klines[-1])
             resultado = {
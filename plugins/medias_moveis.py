@@ -7,11 +7,10 @@ Toda a lógica de ciclo de vida é centralizada no GerenciadorPlugins.
 
 from utils.logging_config import get_logger, log_banco, log_rastreamento
 import numpy as np
-import talib
 from plugins.plugin import Plugin
 from datetime import datetime
 from utils.config import carregar_config
-from utils.plugin_utils import validar_klines
+from utils.plugin_utils import validar_klines, validacao_klines
 
 logger = get_logger(__name__)
 
@@ -28,6 +27,8 @@ class MediasMoveis(Plugin):
     PLUGIN_CATEGORIA = "plugin"
     PLUGIN_TAGS = ["analise", "medias_moveis", "ma"]
     PLUGIN_PRIORIDADE = 100
+    PLUGIN_CONSOME = ["crus"]
+    PLUGIN_PRODUZ = ["medias_moveis"]
 
     def __init__(self, **kwargs):
         """
@@ -89,6 +90,14 @@ class MediasMoveis(Plugin):
             logger.error(f"[{self.nome}] Erro ao inicializar: {e}", exc_info=True)
             return False
 
+    def indicadores_requeridos(self) -> list:
+        """Médias curta e longa e ATR usados em gerar_sinal."""
+        return [
+            ("SMA", {"timeperiod": self._periodo_curto}),
+            ("SMA", {"timeperiod": self._periodo_longo}),
+            ("ATR", {"timeperiod": 14}),
+        ]
+
     def _validar_klines(self, klines: list, symbol: str, timeframe: str) -> bool:
         """
         Valida o formato da lista de klines.
@@ -112,22 +121,12 @@ class MediasMoveis(Plugin):
             )
             return False
 
-        for kline in klines:
-            if not isinstance(kline, (list, tuple)) or len(kline) < 6:
-                logger.error(
-                    f"[{self.nome}] K-line malformada para {symbol} - {timeframe}: {kline}"
-                )
-                return False
-            try:
-                # Verificar se close e volume são numéricos
-                float(kline[4])  # close
-                float(kline[5])  # volume
-            except (TypeError, ValueError):
-                logger.error(
-                    f"[{self.nome}] Valor não numérico em k-line para {symbol} - {timeframe}: {kline}"
-                )
-                return False
-
+        relatorio = validacao_klines(klines)
+        if not relatorio.valido((4, 5)):
+            logger.error(
+                f"[{self.nome}] K-lines inválidas para {symbol} - {timeframe}: {relatorio.problemas()}"
+            )
+            return False
         return True
 
     def executar(self, *args, **kwargs) -> bool:
@@ -154,7 +153,7 @@ class MediasMoveis(Plugin):
             candles = dados_completos.get("crus", [])
             if not self._validar_klines(candles, symbol, timeframe):
                 return resultado_padrao
-            medias = self.gerar_sinal(candles)
+            medias = self.gerar_sinal(candles, symbol, timeframe)
             logger.debug(
                 f"[{self.nome}] Médias móveis para {symbol}-{timeframe}: {medias}"
             )
@@ -190,7 +189,9 @@ class MediasMoveis(Plugin):
             logger.error(f"[{self.nome}] Erro ao extrair dados: {e}", exc_info=True)
             return {idx: np.array([]) for idx in indices}
 
-    def gerar_sinal(self, crus: list) -> dict:
+    def gerar_sinal(
+        self, crus: list, symbol: str = None, timeframe: str = None
+    ) -> dict:
         """
         Gera sinal baseado em médias móveis, com decisão mais flexível e logs detalhados.
         Se pelo menos 3 dos últimos 5 candles apontarem para ALTA ou BAIXA, já considera a direção.
@@ -204,8 +205,13 @@ class MediasMoveis(Plugin):
                     f"[{self.nome}] Menos de {self._periodo_longo} candles disponíveis"
                 )
                 return self._resultado_padrao()
-            ma_curta = talib.SMA(closes, timeperiod=self._periodo_curto)
-            ma_longa = talib.SMA(closes, timeperiod=self._periodo_longo)
+            calcular = self.indicadores.calcular
+            ma_curta = calcular(
+                "SMA", crus, symbol, timeframe, timeperiod=self._periodo_curto
+            )
+            ma_longa = calcular(
+                "SMA", crus, symbol, timeframe, timeperiod=self._periodo_longo
+            )
             if ma_curta[-1] is None or ma_longa[-1] is None:
                 logger.warning(f"[{self.nome}] Médias móveis inválidas")
                 return self._resultado_padrao()
@@ -235,12 +241,7 @@ class MediasMoveis(Plugin):
                 if np.mean(volumes[-10:]) > 0
                 else 1.0
             )
-            atr = talib.ATR(
-                np.array([float(c[2]) for c in crus], dtype=np.float64),  # high
-                np.array([float(c[3]) for c in crus], dtype=np.float64),  # low
-                closes,
-                timeperiod=14,
-            )
+            atr = calcular("ATR", crus, symbol, timeframe, timeperiod=14)
             volatilidade = (
                 atr[-1] / closes[-1] if atr[-1] is not None and closes[-1] > 0 else 0.0
             )
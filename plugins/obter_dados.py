@@ -5,15 +5,24 @@ Não deve registrar, inicializar ou finalizar automaticamente.
 Toda a lógica de ciclo de vida é centralizada no GerenciadorPlugins.
 """
 
+import asyncio
+import threading
+from typing import Optional
 from plugins.plugin import Plugin
 from utils.logging_config import get_logger, log_rastreamento
-from utils.config import carregar_config
+from utils.config import carregar_config, CANDLES_DIR
 from utils.plugin_utils import validar_klines
+from utils.armazem_candles import ArmazemCandles, timeframe_para_ms
+from utils.armazem_candles_disco import ArmazemCandlesDisco
+from utils.candles_colunares import CandlesOHLCV, como_candles
+from utils.reamostragem_candles import ReamostradorCandles, fecha_bucket
+from utils.stream_klines import StreamKlines
+from utils.dados_externos import ColetorDadosExternos, fontes_da_config
+from utils.indicadores_incrementais import MotorIndicadoresIncrementais
+from utils.servico_indicadores import obter_servico_indicadores
 
 logger = get_logger(__name__)
 
-import requests
-
 
 class ObterDados(Plugin):
     """
@@ -61,6 +70,74 @@ class ObterDados(Plugin):
             if "plugins" in config and "obter_dados" in config["plugins"]
             else {}
         )
+        # Buffers circulares por (symbol, timeframe) para busca incremental
+        self._armazem = self._criar_armazem(config)
+        # Candles prontos vindos de buscar_em_lote(), consumidos por executar()
+        self._pre_buscados = {}
+        # Timeframes maiores derivados localmente do timeframe base
+        self._reamostrador = self._criar_reamostrador(config)
+        # Ingestão opcional por WebSocket (ver iniciar_streaming)
+        self._stream = None
+        self._stream_futuro = None
+        self._fechados_derivados = {}
+        self._lock_fechados = threading.Lock()
+        # Indicadores O(1) atualizados a cada mensagem do stream (opcional)
+        self._motor_incremental = self._criar_motor_incremental(config)
+        # FGI/LSR/BTC.d atualizados em segundo plano (sessão HTTP compartilhada)
+        self._dados_externos = ColetorDadosExternos(
+            fontes_da_config(config), config=config
+        )
+
+    def _criar_armazem(self, config: dict) -> ArmazemCandles:
+        """Cria o armazém em memória ou, com armazem_persistente, em disco."""
+        capacidade = self._config.get("capacidade_buffer", 500)
+        if config.get("armazem_persistente", False):
+            try:
+                armazem = ArmazemCandlesDisco(CANDLES_DIR, capacidade_padrao=capacidade)
+                logger.info(
+                    f"[{self.nome}] Armazém de candles persistente em {CANDLES_DIR}"
+                )
+                return armazem
+            except OSError as e:
+                logger.error(
+                    f"[{self.nome}] Falha ao abrir armazém em disco, usando memória: {e}"
+                )
+        return ArmazemCandles(capacidade_padrao=capacidade)
+
+    def _criar_reamostrador(self, config: dict):
+        """Cria o reamostrador se reamostragem_local estiver ativa na config."""
+        timeframes = config.get("timeframes", [])
+        if not config.get("reamostragem_local", False) or not timeframes:
+            return None
+        try:
+            base = config.get("timeframe_base") or min(
+                timeframes, key=timeframe_para_ms
+            )
+            reamostrador = ReamostradorCandles(self._armazem, base, timeframes)
+        except ValueError as e:
+            logger.warning(f"[{self.nome}] Reamostragem local desativada: {e}")
+            return None
+        if not reamostrador.derivados:
+            return None
+        logger.info(
+            f"[{self.nome}] Timeframes {reamostrador.derivados} derivados localmente de {base}"
+        )
+        return reamostrador
+
+    def _criar_motor_incremental(self, config: dict):
+        """Cria o motor de indicadores incrementais se ativo na config."""
+        opcoes = config.get("indicadores_incrementais", {})
+        if not opcoes.get("ativo", False):
+            return None
+        try:
+            return MotorIndicadoresIncrementais(
+                especificacao=opcoes.get("indicadores"),
+                intervalo_verificacao=opcoes.get("intervalo_verificacao", 100),
+                tolerancia=opcoes.get("tolerancia", 1e-6),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"[{self.nome}] Indicadores incrementais desativados: {e}")
+            return None
 
     def executar(
         self, dados_completos: dict, symbol: str, timeframe: str, limit: int = 200
@@ -81,35 +158,51 @@ class ObterDados(Plugin):
         resultado_padrao = []
 
         try:
-            cliente = self._conexao.obter_cliente()
-            if not cliente:
-                logger.error(f"[{self.nome}] Cliente Bybit não disponível.")
-                dados_completos["crus"] = resultado_padrao
-                dados_completos["candles"] = resultado_padrao  # compatibilidade
-                return True
+            # Resultados já obtidos por buscar_em_lote() dispensam nova requisição
+            candles = self._pre_buscados.pop((symbol, timeframe), None)
+            if (
+                candles is None
+                and self.streaming_ativo
+                and self._eh_derivado(timeframe)
+            ):
+                # Buffer base atualizado pelo stream: deriva sem REST (depois
+                # de completar o base se a conexão caiu)
+                base = self._reamostrador.timeframe_base
+                if self._stream.pendente_recarga(symbol, base):
+                    self._recarregar(symbol, base, limit)
+                if not self._stream.pendente_recarga(symbol, base):
+                    candles = self._derivar(symbol, timeframe, limit)
+            if (
+                candles is None
+                and self.streaming_ativo
+                and not self._stream.pendente_recarga(symbol, timeframe)
+            ):
+                # Com o stream ativo o buffer já está atualizado: sem REST
+                buffer = self._armazem.obter_buffer(symbol, timeframe, capacidade=limit)
+                if len(buffer) >= limit:
+                    candles = CandlesOHLCV.de_array(buffer.como_array(limit))
+            if candles is None:
+                cliente = self._conexao.obter_cliente()
+                if not cliente:
+                    logger.error(f"[{self.nome}] Cliente Bybit não disponível.")
+                    dados_completos["crus"] = resultado_padrao
+                    dados_completos["candles"] = resultado_padrao  # compatibilidade
+                    return True
+                candles = self._buscar_candles(cliente, symbol, timeframe, limit)
 
-            # Ajusta simbolo para formato CCXT usando Conexao
-            if hasattr(self._conexao, "listar_pares"):
-                self._conexao.listar_pares()
-            info = self._conexao.obter_info_par(symbol)
-            exchange_symbol = info.get("symbol", symbol) if info else symbol
-            candles = cliente.fetch_ohlcv(exchange_symbol, timeframe, limit=limit)
-            if not candles or not isinstance(candles, list):
-                logger.warning(
-                    f"[{self.nome}] Nenhum candle recebido para {symbol}-{timeframe}."
-                )
+            if not candles:
                 dados_completos["crus"] = resultado_padrao
                 dados_completos["candles"] = resultado_padrao
                 return True
 
-            # Validação básica do formato dos candles
-            for c in candles:
-                if not isinstance(c, list) or len(c) < 5:
-                    logger.error(f"[{self.nome}] Candle malformado: {c}")
-                    dados_completos["crus"] = resultado_padrao
-                    dados_completos["candles"] = resultado_padrao
-                    return True
-
+            # Colunas montadas uma única vez e compartilhadas por todos os plugins
+            candles = como_candles(candles)
+            # Validação vetorizada única por busca; os plugins consultam o relatório
+            relatorio = candles.validar(timeframe)
+            if not relatorio.consistente or relatorio.lacunas:
+                logger.warning(
+                    f"[{self.nome}] Candles com problemas em {symbol}-{timeframe}: {relatorio.problemas()}"
+                )
             # Preenche tanto 'crus' (preferencial) quanto 'candles' (legado)
             dados_completos["crus"] = candles
             dados_completos["candles"] = candles
@@ -134,189 +227,510 @@ class ObterDados(Plugin):
             dados_completos["candles"] = resultado_padrao
             return True
 
-    def obter_fear_greed_index(self) -> dict:
-        """
-        Obtém o índice Fear & Greed do mercado cripto via API pública.
-        Retorna dict com valor atual, classificação textual e timestamp.
-        Fonte e thresholds são definidos em config/env.
+    def buscar_em_lote(
+        self, pares: list, timeframes: list, limit: int = 200, concorrencia: int = None
+    ) -> int:
         """
-        from utils.config import carregar_config
-        import time
+        Busca os candles de todos os pares x timeframes de forma concorrente
+        (asyncio + ccxt.async_support), limitada por um semáforo.
 
-        config = carregar_config()
-        url = config.get("FGI_URL", "https://api.alternative.me/fng/")
-        cache_key = "_cache_fgi"
-        cache_ttl = int(config.get("FGI_CACHE_TTL", 300))  # segundos
-        now = int(time.time())
-        if hasattr(self, cache_key):
-            cache = getattr(self, cache_key)
-            if now - cache.get("timestamp", 0) < cache_ttl:
-                logger.debug("[obter_dados] FGI cache hit")
-                return cache["data"]
+        Os resultados ficam prontos para as chamadas seguintes de executar(),
+        que não voltam a consultar a exchange para esses pares/timeframes.
+
+        Args:
+            pares (list): IDs dos pares.
+            timeframes (list): Timeframes a buscar.
+            limit (int): Quantidade de candles por par/timeframe.
+            concorrencia (int, optional): Máximo de requisições simultâneas.
+
+        Returns:
+            int: Quantidade de pares/timeframes obtidos com sucesso.
+        """
+        concorrencia = concorrencia or self._config.get("concorrencia_max", 20)
+        self._pre_buscados.clear()
+        chaves = [(symbol, tf) for symbol in pares for tf in timeframes]
+        # Timeframes derivados já inicializados saem do timeframe base: sem REST
+        derivaveis = [
+            (symbol, tf)
+            for symbol, tf in chaves
+            if self._eh_derivado(tf) and self._reamostrador.pronto(symbol, tf, limit)
+        ]
+        a_derivar = set(derivaveis)
+        busca = [chave for chave in chaves if chave not in a_derivar]
+        base = self._reamostrador.timeframe_base if derivaveis else None
+        if derivaveis:
+            ja_buscados = set(busca)
+            busca += [
+                (symbol, base)
+                for symbol in dict.fromkeys(s for s, _ in derivaveis)
+                if (symbol, base) not in ja_buscados
+            ]
         try:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if "data" in data and data["data"]:
-                    info = data["data"][0]
-                    fgi = {
-                        "value": int(info["value"]),
-                        "classification": info["value_classification"],
-                        "timestamp": int(info["timestamp"]),
-                        "fonte": url,
-                    }
-                    setattr(self, cache_key, {"timestamp": now, "data": fgi})
-                    logger.info(f"[obter_dados] Fear & Greed Index: {fgi}")
-                    return fgi
-            logger.warning("[obter_dados] Não foi possível obter o Fear & Greed Index.")
-            return {
-                "value": None,
-                "classification": None,
-                "timestamp": None,
-                "fonte": url,
+            cliente = self._conexao.obter_cliente_async()
+            if not cliente:
+                logger.error(f"[{self.nome}] Cliente assíncrono não disponível.")
+                return 0
+            # Resolvidos antes do event loop: obter_info_par pode precisar
+            # carregar os mercados (fetch_markets síncrono)
+            simbolos = {
+                symbol: self._symbol_exchange(symbol)
+                for symbol in dict.fromkeys(s for s, _ in busca)
             }
+            resultados = self._conexao.executar_async(
+                self._buscar_lote_async(cliente, busca, limit, concorrencia, simbolos)
+            )
+            pendentes = []
+            for symbol, tf in derivaveis:
+                # Sem o base atualizado neste ciclo o derivado ficaria defasado
+                candles = (
+                    self._derivar(symbol, tf, limit)
+                    if resultados.get((symbol, base))
+                    else None
+                )
+                if candles is None:
+                    pendentes.append((symbol, tf))
+                resultados[(symbol, tf)] = candles
+            if pendentes:
+                # Buffer base sem cobertura do candle derivado aberto
+                resultados.update(
+                    self._conexao.executar_async(
+                        self._buscar_lote_async(
+                            cliente, pendentes, limit, concorrencia, simbolos
+                        )
+                    )
+                )
         except Exception as e:
-            logger.error(f"[obter_dados] Erro ao buscar Fear & Greed Index: {e}")
-            return {
-                "value": None,
-                "classification": None,
-                "timestamp": None,
-                "fonte": url,
-            }
+            logger.error(f"[{self.nome}] Erro na busca em lote: {e}", exc_info=True)
+            return 0
+        resultados = {chave: resultados.get(chave) for chave in chaves}
+        for chave, candles in resultados.items():
+            if candles:
+                self._pre_buscados[chave] = candles
+        obtidos = sum(1 for c in resultados.values() if c)
+        logger.info(
+            f"[{self.nome}] Busca em lote concluída: {obtidos}/{len(resultados)} pares/timeframes "
+            f"({len(busca) + len(pendentes)} requisições)"
+        )
+        return obtidos
 
-    def obter_long_short_ratio(self, symbol: str = "BTCUSDT") -> dict:
+    def pre_buscado(self, symbol: str, timeframe: str):
         """
-        Obtém o Long/Short Ratio (LSR) de uma exchange, configurável via config/env.
-        Implementa cache inteligente e logs claros. Nunca hardcoded.
-        Args:
-            symbol (str): Símbolo do ativo (ex: BTCUSDT)
+        Candles obtidos por buscar_em_lote() ainda não consumidos por
+        executar(), já como CandlesOHLCV (a mesma instância que executar()
+        entregará aos plugins), ou None.
+        """
+        candles = self._pre_buscados.get((symbol, timeframe))
+        if not candles:
+            return None
+        candles = como_candles(candles)
+        self._pre_buscados[(symbol, timeframe)] = candles
+        return candles
+
+    async def _buscar_lote_async(
+        self,
+        cliente,
+        chaves: list,
+        limit: int,
+        concorrencia: int,
+        simbolos: Optional[dict] = None,
+    ) -> dict:
+        """
+        Dispara todas as buscas de OHLCV sob um semáforo de concorrência.
+        simbolos: symbol -> symbol CCXT já resolvido fora do event loop.
+        """
+        simbolos = simbolos or {}
+        semaforo = asyncio.Semaphore(max(1, int(concorrencia)))
+
+        async def buscar(symbol, timeframe):
+            async with semaforo:
+                try:
+                    return await self._buscar_candles_async(
+                        cliente, symbol, timeframe, limit, simbolos.get(symbol)
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"[{self.nome}] Erro ao obter candles de {symbol}-{timeframe}: {e}"
+                    )
+                    return []
+
+        resultados = await asyncio.gather(*(buscar(s, tf) for s, tf in chaves))
+        return dict(zip(chaves, resultados))
+
+    def _eh_derivado(self, timeframe: str) -> bool:
+        return self._reamostrador is not None and self._reamostrador.eh_derivado(
+            timeframe
+        )
+
+    def _derivar(self, symbol: str, timeframe: str, limit: int):
+        """
+        Atualiza um timeframe derivado a partir do buffer do timeframe base.
+
         Returns:
-            dict: {'lsr': float, 'long': float, 'short': float, 'direcao': str, 'fonte': str, 'timestamp': int}
+            list | None: Candles derivados, ou None se for preciso buscar na exchange.
         """
-        from utils.config import carregar_config
-        import time
+        try:
+            return self._reamostrador.atualizar(symbol, timeframe, limit)
+        except Exception as e:
+            logger.error(
+                f"[{self.nome}] Erro ao reamostrar {symbol}-{timeframe}: {e}",
+                exc_info=True,
+            )
+            return None
 
-        config = carregar_config()
-        url = config.get("LSR_URL", "").format(symbol=symbol)
-        cache_key = f"_cache_lsr_{symbol}"
-        cache_ttl = int(config.get("LSR_CACHE_TTL", 300))
-        now = int(time.time())
-        if hasattr(self, cache_key):
-            cache = getattr(self, cache_key)
-            if now - cache.get("timestamp", 0) < cache_ttl:
-                logger.debug(f"[obter_dados] LSR cache hit para {symbol}")
-                return cache["data"]
+    def _recarregar(self, symbol: str, timeframe: str, limit: int) -> None:
+        """Completa pelo REST um buffer com lacuna deixada por queda do stream."""
+        cliente = self._conexao.obter_cliente()
+        if not cliente:
+            return
         try:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                # O formato esperado deve ser padronizado via config/env
-                lsr = float(data.get("longShortRatio", 1.0))
-                long_pct = float(data.get("longAccount", 0.0))
-                short_pct = float(data.get("shortAccount", 0.0))
-                direcao = (
-                    "Long Pesado"
-                    if lsr > float(config.get("LSR_LIMITE_LONG", 1.5))
-                    else (
-                        "Short Pesado"
-                        if lsr < float(config.get("LSR_LIMITE_SHORT", 0.7))
-                        else "Equilibrado"
-                    )
-                )
-                resultado = {
-                    "lsr": lsr,
-                    "long": long_pct,
-                    "short": short_pct,
-                    "direcao": direcao,
-                    "fonte": url,
-                    "timestamp": now,
-                }
-                setattr(self, cache_key, {"timestamp": now, "data": resultado})
-                logger.info(f"[obter_dados] LSR: {resultado}")
-                return resultado
-            logger.warning(f"[obter_dados] Não foi possível obter o LSR para {symbol}.")
-            return {
-                "lsr": None,
-                "long": None,
-                "short": None,
-                "direcao": None,
-                "fonte": url,
-                "timestamp": now,
-            }
+            self._buscar_candles(cliente, symbol, timeframe, limit)
         except Exception as e:
-            logger.error(f"[obter_dados] Erro ao buscar LSR: {e}")
-            return {
-                "lsr": None,
-                "long": None,
-                "short": None,
-                "direcao": None,
-                "fonte": url,
-                "timestamp": now,
-            }
+            logger.error(
+                f"[{self.nome}] Erro ao recarregar {symbol}-{timeframe}: {e}",
+                exc_info=True,
+            )
 
-    def obter_btc_dominance(self) -> dict:
+    def _recarregado(self, symbol: str, timeframe: str) -> None:
+        """O buffer acabou de ser completado pelo REST: sem lacuna do stream."""
+        if self._stream:
+            self._stream.marcar_recarregado(symbol, timeframe)
+
+    def _symbol_exchange(self, symbol: str) -> str:
+        """Symbol no formato CCXT pelo cache de mercados da Conexao (síncrono)."""
+        info = self._conexao.obter_info_par(symbol)
+        return info.get("symbol", symbol) if info else symbol
+
+    def _preparar_busca(
+        self,
+        symbol: str,
+        timeframe: str,
+        limit: int,
+        exchange_symbol: Optional[str] = None,
+    ):
         """
-        Obtém o BTC Dominance (BTC.d) de fonte configurável.
-        Implementa cache, categorização e logs claros.
+        Resolve o symbol CCXT (se não informado) e decide entre busca
+        completa ou incremental.
+
         Returns:
-            dict: {'dominance': float, 'direcao': str, 'categoria': str, 'fonte': str, 'timestamp': int}
+            tuple: (buffer, exchange_symbol, since) — since é None na busca completa.
+        """
+        if exchange_symbol is None:
+            exchange_symbol = self._symbol_exchange(symbol)
+        capacidade = limit
+        if self._reamostrador and timeframe == self._reamostrador.timeframe_base:
+            capacidade = self._reamostrador.capacidade_base(limit)
+        buffer = self._armazem.obter_buffer(symbol, timeframe, capacidade=capacidade)
+        ultimo_ts = buffer.ultimo_timestamp
+        # Busca apenas a partir do último candle armazenado (ainda aberto)
+        since = ultimo_ts if ultimo_ts is not None and len(buffer) >= limit else None
+        return buffer, exchange_symbol, since
+
+    def _candles_validos(self, recebidos, symbol: str, timeframe: str) -> bool:
+        """Validação básica do formato dos candles recebidos da exchange."""
+        if not recebidos or not isinstance(recebidos, list):
+            logger.warning(
+                f"[{self.nome}] Nenhum candle recebido para {symbol}-{timeframe}."
+            )
+            return False
+        for c in recebidos:
+            if not isinstance(c, list) or len(c) < 5:
+                logger.error(f"[{self.nome}] Candle malformado: {c}")
+                return False
+        return True
+
+    def _precisa_recarregar(self, recebidos, since, timeframe: str, limit: int) -> bool:
+        """Indica lacuna maior que uma página na busca incremental."""
+        return since is not None and (
+            len(recebidos) >= limit
+            or recebidos[0][0] > since + timeframe_para_ms(timeframe)
+        )
+
+    def _incorporar(self, buffer, recebidos, since, limit: int) -> list:
+        """Grava os candles no buffer e retorna a janela pedida."""
+        if since is not None:
+            buffer.atualizar(recebidos)
+        else:
+            buffer.substituir(recebidos)
+        return buffer.como_lista(limit)
+
+    def _buscar_candles(self, cliente, symbol: str, timeframe: str, limit: int) -> list:
+        """Busca candles (completa ou incremental) com o cliente síncrono."""
+        buffer, exchange_symbol, since = self._preparar_busca(symbol, timeframe, limit)
+        recebidos = cliente.fetch_ohlcv(
+            exchange_symbol, timeframe, since=since, limit=limit
+        )
+        if not self._candles_validos(recebidos, symbol, timeframe):
+            return []
+        if self._precisa_recarregar(recebidos, since, timeframe, limit):
+            # Lacuna maior que uma página: recarrega o histórico completo
+            logger.debug(
+                f"[{self.nome}] Lacuna no buffer de {symbol}-{timeframe}, recarregando."
+            )
+            since = None
+            recebidos = cliente.fetch_ohlcv(exchange_symbol, timeframe, limit=limit)
+            if not self._candles_validos(recebidos, symbol, timeframe):
+                return []
+        candles = self._incorporar(buffer, recebidos, since, limit)
+        self._recarregado(symbol, timeframe)
+        return candles
+
+    async def _buscar_candles_async(
+        self,
+        cliente,
+        symbol: str,
+        timeframe: str,
+        limit: int,
+        exchange_symbol: Optional[str] = None,
+    ) -> list:
+        """
+        Equivalente assíncrono de _buscar_candles(). Sem exchange_symbol, a
+        resolução (que pode consultar a exchange) roda fora do event loop.
         """
-        from utils.config import carregar_config
-        import time
+        if exchange_symbol is None:
+            exchange_symbol = await asyncio.to_thread(self._symbol_exchange, symbol)
+        buffer, exchange_symbol, since = self._preparar_busca(
+            symbol, timeframe, limit, exchange_symbol
+        )
+        recebidos = await cliente.fetch_ohlcv(
+            exchange_symbol, timeframe, since=since, limit=limit
+        )
+        if not self._candles_validos(recebidos, symbol, timeframe):
+            return []
+        if self._precisa_recarregar(recebidos, since, timeframe, limit):
+            since = None
+            recebidos = await cliente.fetch_ohlcv(
+                exchange_symbol, timeframe, limit=limit
+            )
+            if not self._candles_validos(recebidos, symbol, timeframe):
+                return []
+        candles = self._incorporar(buffer, recebidos, since, limit)
+        self._recarregado(symbol, timeframe)
+        return candles
+
+    @property
+    def streaming_ativo(self) -> bool:
+        """Indica se a ingestão por WebSocket está rodando."""
+        return self._stream_futuro is not None and not self._stream_futuro.done()
 
+    def iniciar_streaming(self, pares: list, timeframes: list, url: str = None) -> bool:
+        """
+        Inicia a ingestão de klines por WebSocket no event loop da Conexao.
+
+        As mensagens atualizam os mesmos buffers usados pela busca REST; o
+        histórico inicial continua vindo do REST na primeira execução.
+
+        Args:
+            pares (list): IDs dos pares.
+            timeframes (list): Timeframes a assinar.
+            url (str, optional): URL do WebSocket. Padrão: config bybit.ws_url.
+
+        Returns:
+            bool: True se o stream foi iniciado.
+        """
+        if self.streaming_ativo:
+            return True
         config = carregar_config()
-        url = config.get("BTC_DOMINANCE_URL", "")
-        cache_key = "_cache_btc_dominance"
-        cache_ttl = int(config.get("BTC_DOMINANCE_CACHE_TTL", 300))
-        now = int(time.time())
-        if hasattr(self, cache_key):
-            cache = getattr(self, cache_key)
-            if now - cache.get("timestamp", 0) < cache_ttl:
-                logger.debug("[obter_dados] BTC.d cache hit")
-                return cache["data"]
+        url = url or config.get("bybit", {}).get("ws_url")
+        if not url:
+            logger.error(f"[{self.nome}] URL do WebSocket não configurada.")
+            return False
+        if self._reamostrador:
+            # Só o timeframe base (e os não deriváveis) são assinados
+            timeframes = [tf for tf in timeframes if not self._eh_derivado(tf)]
+            if self._reamostrador.timeframe_base not in timeframes:
+                timeframes.append(self._reamostrador.timeframe_base)
         try:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                dominance = float(data.get("btc_dominance", 0.0))
-                direcao = data.get("direction", "Estável")
-                categoria = (
-                    "Alta"
-                    if dominance >= float(config.get("BTC_DOMINANCE_LIMITE_ALTA", 50))
-                    else (
-                        "Baixa"
-                        if dominance
-                        <= float(config.get("BTC_DOMINANCE_LIMITE_BAIXA", 45))
-                        else "Média"
-                    )
+            self._stream = StreamKlines(
+                url,
+                self._armazem,
+                pares,
+                timeframes,
+                ao_fechar=self._ao_fechar_candle if self._reamostrador else None,
+                ao_atualizar=(
+                    self._ao_atualizar_candle if self._motor_incremental else None
+                ),
+                lote_inscricao=self._config.get("ws_lote_inscricao", 10),
+                intervalo_ping=self._config.get("ws_intervalo_ping", 20),
+            )
+            self._stream_futuro = self._conexao.agendar_async(self._stream.executar())
+            if self._motor_incremental:
+                # ultimo() do serviço passa a ler os valores do motor
+                obter_servico_indicadores().usar_motor_incremental(
+                    self._motor_incremental
                 )
-                resultado = {
-                    "dominance": dominance,
-                    "direcao": direcao,
-                    "categoria": categoria,
-                    "fonte": url,
-                    "timestamp": now,
-                }
-                setattr(self, cache_key, {"timestamp": now, "data": resultado})
-                logger.info(f"[obter_dados] BTC Dominance: {resultado}")
-                return resultado
-            logger.warning("[obter_dados] Não foi possível obter BTC Dominance.")
-            return {
-                "dominance": None,
-                "direcao": None,
-                "categoria": None,
-                "fonte": url,
-                "timestamp": now,
-            }
+            logger.info(
+                f"[{self.nome}] Streaming de klines iniciado para {len(pares)} pares x {len(timeframes)} timeframes"
+            )
+            return True
         except Exception as e:
-            logger.error(f"[obter_dados] Erro ao buscar BTC Dominance: {e}")
-            return {
-                "dominance": None,
-                "direcao": None,
-                "categoria": None,
-                "fonte": url,
-                "timestamp": now,
-            }
+            logger.error(f"[{self.nome}] Erro ao iniciar streaming: {e}", exc_info=True)
+            self._stream = None
+            self._stream_futuro = None
+            return False
+
+    def atualizar_streaming(self, pares: list) -> set:
+        """
+        Reinscreve o stream quando o conjunto de pares muda.
+
+        Returns:
+            set: Pares que entraram (ainda sem candles do stream).
+        """
+        if not self._stream:
+            return set()
+        return self._stream.atualizar_pares(pares)
+
+    def ultimo_candle(self, symbol: str, timeframe: str):
+        """
+        Retorna o candle mais recente já armazenado para o par/timeframe
+        (sem acessar a exchange), ou None.
+        """
+        if not self._armazem.tamanho(symbol, timeframe):
+            return None
+        candles = self._armazem.obter_buffer(symbol, timeframe).como_lista(1)
+        return candles[-1] if candles else None
+
+    def consumir_fechamentos(self) -> dict:
+        """
+        Retorna (e limpa) os pares com candle fechado recebidos pelo stream.
+
+        Returns:
+            dict: symbol -> conjunto de timeframes fechados (vazio sem stream).
+        """
+        if not self._stream:
+            return {}
+        fechados = self._stream.consumir_fechamentos()
+        if self._reamostrador:
+            with self._lock_fechados:
+                derivados, self._fechados_derivados = self._fechados_derivados, {}
+            for symbol, tfs in derivados.items():
+                fechados.setdefault(symbol, set()).update(tfs)
+        return fechados
+
+    def _ao_fechar_candle(self, symbol: str, timeframe: str) -> None:
+        """Marca os timeframes derivados cujo candle fecha junto com o base."""
+        base = self._reamostrador.timeframe_base
+        if timeframe != base:
+            return
+        ts = self._armazem.ultimo_timestamp(symbol, base)
+        if ts is None:
+            return
+        fechados = [
+            tf for tf in self._reamostrador.derivados if fecha_bucket(ts, base, tf)
+        ]
+        if fechados:
+            with self._lock_fechados:
+                self._fechados_derivados.setdefault(symbol, set()).update(fechados)
+
+    def _ao_atualizar_candle(
+        self, symbol: str, timeframe: str, candle: list, fechado: bool
+    ) -> None:
+        """Atualiza os indicadores incrementais com o candle recebido do stream."""
+        motor = self._motor_incremental
+        try:
+            if not motor.conhece(symbol, timeframe):
+                # Primeira mensagem: semeia a série com o histórico do buffer
+                historico = self._armazem.obter_buffer(symbol, timeframe).como_lista()
+                motor.carregar(symbol, timeframe, historico, aberto=not fechado)
+                return
+            motor.processar(symbol, timeframe, candle, fechado)
+            if fechado and motor.precisa_verificar(symbol, timeframe):
+                historico = self._armazem.obter_buffer(symbol, timeframe).como_lista()
+                motor.verificar(symbol, timeframe, historico, aberto=False)
+        except Exception as e:
+            logger.error(
+                f"[{self.nome}] Erro nos indicadores incrementais de {symbol}-{timeframe}: {e}"
+            )
+            motor.remover(symbol, timeframe)
+
+    def parar_streaming(self) -> None:
+        """Encerra a ingestão por WebSocket, se ativa."""
+        if self._stream and self._motor_incremental:
+            obter_servico_indicadores().usar_motor_incremental(None)
+        if self._stream:
+            self._stream.parar()
+        if self._stream_futuro is not None:
+            self._stream_futuro.cancel()
+        self._stream = None
+        self._stream_futuro = None
+
+    def finalizar(self):
+        """Finaliza o plugin, encerrando o streaming e limpando os buffers."""
+        try:
+            self.parar_streaming()
+            self._dados_externos.parar()
+            self._armazem.limpar()
+            self._pre_buscados.clear()
+            return super().finalizar()
+        except Exception as e:
+            logger.error(f"[{self.nome}] Erro ao finalizar: {e}", exc_info=True)
+            return False
+
+    def obter_fear_greed_index(self) -> dict:
+        """
+        Obtém o índice Fear & Greed do mercado cripto (último valor em memória).
+        A atualização é feita em segundo plano pelo ColetorDadosExternos.
+
+        Returns:
+            dict: value, classification, timestamp, fonte e os metadados
+            atualizado_em, idade_segundos, obsoleto e erro.
+        """
+        dados = self._dados_externos.obter("fgi")
+        return {
+            "value": dados.get("value"),
+            "classification": dados.get("classification"),
+            "timestamp": dados.get("timestamp"),
+            **self._metadados_externos(dados),
+        }
+
+    def obter_long_short_ratio(self, symbol: str = "BTCUSDT") -> dict:
+        """
+        Obtém o Long/Short Ratio (LSR) do par (último valor em memória).
+        Args:
+            symbol (str): Símbolo do ativo (ex: BTCUSDT)
+        Returns:
+            dict: {'lsr', 'long', 'short', 'direcao', 'fonte', 'timestamp'} e os
+            metadados atualizado_em, idade_segundos, obsoleto e erro.
+        """
+        dados = self._dados_externos.obter("lsr", symbol)
+        return {
+            "lsr": dados.get("lsr"),
+            "long": dados.get("long"),
+            "short": dados.get("short"),
+            "direcao": dados.get("direcao"),
+            "timestamp": self._timestamp_externo(dados),
+            **self._metadados_externos(dados),
+        }
+
+    def obter_btc_dominance(self) -> dict:
+        """
+        Obtém o BTC Dominance (BTC.d) (último valor em memória).
+        Returns:
+            dict: {'dominance', 'direcao', 'categoria', 'fonte', 'timestamp'} e os
+            metadados atualizado_em, idade_segundos, obsoleto e erro.
+        """
+        dados = self._dados_externos.obter("btc_dominance")
+        return {
+            "dominance": dados.get("dominance"),
+            "direcao": dados.get("direcao"),
+            "categoria": dados.get("categoria"),
+            "timestamp": self._timestamp_externo(dados),
+            **self._metadados_externos(dados),
+        }
+
+    @staticmethod
+    def _timestamp_externo(dados: dict):
+        atualizado_em = dados.get("atualizado_em")
+        return int(atualizado_em) if atualizado_em is not None else None
+
+    @staticmethod
+    def _metadados_externos(dados: dict) -> dict:
+        return {
+            "fonte": dados.get("fonte"),
+            "atualizado_em": dados.get("atualizado_em"),
+            "idade_segundos": dados.get("idade_segundos"),
+            "obsoleto": dados.get("obsoleto", True),
+            "erro": dados.get("erro"),
+        }
 
     @property
     def plugin_tabelas(self) -> dict:
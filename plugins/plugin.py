@@ -3,10 +3,12 @@
 
 from __future__ import annotations
 import inspect
-from typing import TYPE_CHECKING, Dict, Optional, Any, List, Type
+from typing import TYPE_CHECKING, Dict, Optional, Any, List, Tuple, Type
 import numpy as np
 import logging
 from utils.logging_config import get_logger, log_banco, log_banco
+from utils.candles_colunares import CandlesOHLCV
+from utils.servico_indicadores import ServicoIndicadores, obter_servico_indicadores
 
 if TYPE_CHECKING:
     from plugins.gerenciadores.gerenciador import BaseGerenciador
@@ -90,6 +92,11 @@ class Plugin:
     PLUGIN_TAGS: List[str] = []
     PLUGIN_SCHEMA_VERSAO: str = "1.0"
     PLUGIN_TABELAS: Dict[str, Dict] = {}
+    # Chaves de dados_completos lidas e escritas pelo plugin, usadas pelo plano
+    # de execução (GerenciadorPlugins.planejar). None = não declarado: o
+    # plugin roda isolado, na mesma posição da execução sequencial.
+    PLUGIN_CONSOME: Optional[List[str]] = None
+    PLUGIN_PRODUZ: List[str] = []
 
     def __init_subclass__(cls, **kwargs):
         """Registra automaticamente subclasses e valida atributos obrigatórios."""
@@ -237,6 +244,19 @@ class Plugin:
         """
         return []
 
+    def indicadores_requeridos(self) -> List[Tuple[str, dict]]:
+        """
+        Indicadores (nome, parâmetros) que o plugin lê do serviço compartilhado.
+        O plano de execução calcula cada um uma única vez antes dos plugins.
+        Subclasses com indicadores de parâmetros fixos devem sobrescrever.
+        """
+        return []
+
+    @property
+    def indicadores(self) -> ServicoIndicadores:
+        """Serviço de indicadores com cache compartilhado entre os plugins."""
+        return obter_servico_indicadores()
+
     def _extrair_dados(
         self, dados_completos: List[Any], indices: List[int]
     ) -> Dict[int, np.ndarray]:
@@ -250,6 +270,11 @@ class Plugin:
         Returns:
             Dict[int, np.ndarray]: Dicionário com arrays numéricos para cada índice.
         """
+        if isinstance(dados_completos, CandlesOHLCV) and dados_completos.completo(
+            indices
+        ):
+            # Colunas já convertidas pela camada de dados: sem cópia
+            return dados_completos.ohlcv(indices)
         try:
             valores = {idx: [] for idx in indices}
             for candle in dados_completos:
@@ -9,7 +9,7 @@ from utils.logging_config import get_logger, log_rastreamento
 import numpy as np
 from plugins.plugin import Plugin
 from utils.config import carregar_config
-from utils.plugin_utils import validar_klines
+from utils.plugin_utils import validar_klines, validacao_klines
 
 logger = get_logger(__name__)
 
@@ -38,6 +38,8 @@ class PriceAction(Plugin):
     PLUGIN_CATEGORIA = "plugin"
     PLUGIN_TAGS = ["price_action", "candles", "direcional", "analise"]
     PLUGIN_PRIORIDADE = 40
+    PLUGIN_CONSOME = ["crus"]
+    PLUGIN_PRODUZ = ["price_action"]
 
     def __init__(self, **kwargs):
         """
@@ -128,30 +130,17 @@ class PriceAction(Plugin):
                 detalhes=f"klines insuficientes: {len(klines)}",
             )
             return False
-        for kline in klines:
-            if not isinstance(kline, (list, tuple)) or len(kline) < 6:
-                logger.error(
-                    f"[{self.nome}] K-line malformada para {symbol} - {timeframe}: {kline}"
-                )
-                log_rastreamento(
-                    componente=f"price_action/{symbol}-{timeframe}",
-                    acao="validacao_falha",
-                    detalhes=f"kline malformada: {kline}",
-                )
-                return False
-            try:
-                for i in [1, 2, 3, 4, 5]:
-                    float(kline[i])
-            except (TypeError, ValueError):
-                logger.error(
-                    f"[{self.nome}] Valor não numérico em k-line para {symbol} - {timeframe}: {kline}"
-                )
-                log_rastreamento(
-                    componente=f"price_action/{symbol}-{timeframe}",
-                    acao="validacao_falha",
-                    detalhes=f"valor não numérico em kline: {kline}",
-                )
-                return False
+        relatorio = validacao_klines(klines)
+        if not relatorio.valido((1, 2, 3, 4, 5)):
+            logger.error(
+                f"[{self.nome}] K-lines inválidas para {symbol} - {timeframe}: {relatorio.problemas()}"
+            )
+            log_rastreamento(
+                componente=f"price_action/{symbol}-{timeframe}",
+                acao="validacao_falha",
+                detalhes=f"klines inválidos: {relatorio.problemas()}",
+            )
+            return False
         return True
 
     def executar(self, *args, **kwargs) -> dict:
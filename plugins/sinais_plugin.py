@@ -30,6 +30,23 @@ class SinaisPlugin(Plugin):
     PLUGIN_CATEGORIA = "plugin"
     PLUGIN_TAGS = ["sinais", "consolidador", "analise"]
     PLUGIN_PRIORIDADE = 100
+    PLUGIN_CONSOME = [
+        "crus",
+        "analise_mercado",
+        "rsi",
+        "volume",
+        "ma_curta",
+        "ma_media",
+        "ma_longa",
+        "price_action",
+        "medias_moveis",
+        "analise_candles",
+        "atr",
+        "preco_atual",
+        "suporte",
+        "resistencia",
+    ]
+    PLUGIN_PRODUZ = ["analise_mercado"]
 
     _RESULTADO_PADRAO = {
         "analise_mercado": {
@@ -833,7 +850,11 @@ class SinaisPlugin(Plugin):
 
         try:
             return self.calculo_alavancagem.calcular_alavancagem(
-                crus=dados.get("crus", []), direcao=direcao, confianca=confianca
+                crus=dados.get("crus", []),
+                direcao=direcao,
+                confianca=confianca,
+                symbol=dados.get("symbol"),
+                timeframe=dados.get("timeframe"),
             )
         except Exception as e:
             logger.warning(f"[{self.nome}] Erro ao calcular alavancagem: {e}")
@@ -9,7 +9,7 @@ from utils.logging_config import get_logger
 import numpy as np
 from plugins.plugin import Plugin
 from utils.config import carregar_config
-from utils.plugin_utils import validar_klines
+from utils.plugin_utils import validar_klines, validacao_klines
 
 logger = get_logger(__name__)
 
@@ -26,6 +26,8 @@ class ValidadorDados(Plugin):
     PLUGIN_CATEGORIA = "plugin"
     PLUGIN_TAGS = ["validador", "dados", "analise"]
     PLUGIN_PRIORIDADE = 100
+    PLUGIN_CONSOME = ["crus"]
+    PLUGIN_PRODUZ = ["validador_dados"]
 
     @classmethod
     def dependencias(cls):
@@ -177,7 +179,19 @@ class ValidadorDados(Plugin):
                     f"[{self.nome}] Número insuficiente de candles: {len(candles)} < {self.min_candles}"
                 )
                 return False
-            return all(self._validar_candle(c) for c in candles)
+            # Relatório vetorizado: reaproveitado se o ObterDados já validou
+            relatorio = validacao_klines(candles)
+            if relatorio.lacunas:
+                logger.warning(
+                    f"[{self.nome}] {relatorio.lacunas} lacuna(s) em {symbol} - {timeframe} "
+                    f"({relatorio.candles_faltantes} candles faltantes)"
+                )
+            if not relatorio.consistente:
+                logger.debug(
+                    f"[{self.nome}] Candles inválidos para {symbol} - {timeframe}: {relatorio.problemas()}"
+                )
+                return False
+            return True
         except Exception as e:
             logger.error(f"[{self.nome}] Erro ao validar dados: {e}")
             return False
@@ -232,34 +246,6 @@ class ValidadorDados(Plugin):
             logger.error(f"[{self.nome}] Erro ao validar timeframe {tf}: {e}")
             return False
 
-    def _validar_candle(self, candle) -> bool:
-        """
-        Valida uma candle individual.
-
-        Args:
-            candle: Lista ou tupla com [timestamp, open, high, low, close, volume].
-
-        Returns:
-            bool: True se válida, False caso contrário.
-        """
-        try:
-            if not isinstance(candle, (list, tuple)) or len(candle) < 6:
-                logger.debug(f"[{self.nome}] Candle com formato inválido: {candle}")
-                return False
-            ts, o, h, l, c, v = map(float, candle[:6])
-            if not (
-                l <= o <= h
-                and l <= c <= h
-                and v >= 0
-                and all(np.isfinite(x) for x in [o, h, l, c, v])
-            ):
-                logger.debug(f"[{self.nome}] Candle com valores inválidos: {candle}")
-                return False
-            return True
-        except Exception as e:
-            logger.debug(f"[{self.nome}] Erro ao validar candle: {e}")
-            return False
-
     def finalizar(self):
         """
         Finaliza o plugin ValidadorDados, limpando estado e garantindo shutdown seguro.
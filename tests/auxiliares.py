@@ -0,0 +1,74 @@
+"""
+Dados e dublês compartilhados pelos testes (sem rede nem banco).
+"""
+
+import numpy as np
+
+
+def candles_lineares(qtd, inicio=1710000000000, passo=60000):
+    """Candles [ts, o, h, l, c, v] com preços subindo 1.0 por candle."""
+    return [
+        [inicio + i * passo, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 10.0 + i]
+        for i in range(qtd)
+    ]
+
+
+def candles_sinteticos(
+    qtd, semente=0, inicio=1710000000000, passo=60000, repetidos=None
+):
+    """
+    Passeio aleatório OHLCV reprodutível, no formato [ts, o, h, l, c, v].
+
+    Args:
+        qtd (int): Quantidade de candles.
+        semente (int): Semente do gerador.
+        inicio (int): Timestamp (ms) do primeiro candle.
+        passo (int): Intervalo entre candles (ms).
+        repetidos (tuple, optional): Trecho (inicio, fim) de candles iguais ao
+            anterior (closes sem variação e máximos/mínimos repetidos).
+    """
+    rng = np.random.default_rng(semente)
+    c = 100 + np.cumsum(rng.normal(0, 1, qtd))
+    if repetidos:
+        de, ate = repetidos
+        c[de:ate] = c[de - 1]
+    o = np.r_[c[0], c[:-1]]
+    h = np.maximum(o, c) + rng.random(qtd)
+    l = np.minimum(o, c) - rng.random(qtd)
+    if repetidos:
+        h[de:ate], l[de:ate] = h[de - 1], l[de - 1]
+    v = rng.random(qtd) * 100
+    ts = inicio + np.arange(qtd) * passo
+    return [
+        [int(t), float(a), float(b), float(d), float(e), float(f)]
+        for t, a, b, d, e, f in zip(ts, o, h, l, c, v)
+    ]
+
+
+class ClienteFalso:
+    """Cliente mínimo que registra as chamadas a fetch_ohlcv (sem rede)."""
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.chamadas = []
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.chamadas.append({"since": since, "limit": limit})
+        if since is None:
+            selecionados = self.candles[-limit:]
+        else:
+            selecionados = [c for c in self.candles if c[0] >= since][:limit]
+        return [list(c) for c in selecionados]
+
+
+class ConexaoFalsa:
+    """Conexao com o cliente síncrono e os metadados de mercado mínimos."""
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def obter_cliente(self):
+        return self.cliente
+
+    def obter_info_par(self, symbol):
+        return {"id": symbol, "symbol": symbol}
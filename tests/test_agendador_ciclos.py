@@ -0,0 +1,171 @@
+import pytest
+
+from utils.agendador_ciclos import AgendadorCiclos, PrioridadeSymbols, SeletorUnidades
+
+# 2024-01-01 00:00 UTC em segundos
+T0 = 1704067200.0
+
+
+class Relogio:
+    """Relógio simulado: dormir() apenas avança o tempo."""
+
+    def __init__(self, agora):
+        self.agora = agora
+        self.esperas = []
+
+    def __call__(self):
+        return self.agora
+
+    def dormir(self, segundos):
+        self.esperas.append(segundos)
+        self.agora += segundos
+
+
+def _agendador(relogio, intervalo=5.0, timeframes=None, atraso=2.0):
+    return AgendadorCiclos(
+        intervalo,
+        timeframes=timeframes,
+        atraso_fechamento=atraso,
+        relogio=relogio,
+        dormir=relogio.dormir,
+    )
+
+
+def test_cadencia_sem_deriva():
+    relogio = Relogio(T0 + 0.3)
+    agendador = _agendador(relogio)
+    instantes = []
+    for duracao in (1.2, 0.4, 3.9, 2.0):
+        agendador.aguardar()
+        instantes.append(relogio.agora)
+        relogio.agora += duracao  # tempo de execução do ciclo
+    # Os ciclos caem na grade, independente da duração de cada execução
+    assert instantes == [T0 + 5, T0 + 10, T0 + 15, T0 + 20]
+
+
+def test_pula_ciclos_excedidos():
+    relogio = Relogio(T0)
+    agendador = _agendador(relogio)
+    agendador.aguardar()
+    relogio.agora += 12.5  # ciclo demorou mais de dois intervalos
+    assert agendador.aguardar() == 2
+    assert relogio.agora == T0 + 20
+    assert agendador.ciclos_pulados == 2
+
+
+def test_acorda_apos_fechamento_do_candle():
+    relogio = Relogio(T0 + 15 * 60 - 1)  # 00:14:59
+    agendador = _agendador(relogio, intervalo=60.0, timeframes=["15m", "1h"])
+    agendador.aguardar()
+    assert relogio.agora == T0 + 15 * 60  # ponto da grade
+    agendador.aguardar()
+    assert relogio.agora == T0 + 15 * 60 + 2  # fechamento de 15m/1h + atraso
+    agendador.aguardar()
+    assert relogio.agora == T0 + 16 * 60  # próximo ponto da grade
+
+
+def test_intervalo_invalido():
+    with pytest.raises(ValueError):
+        AgendadorCiclos(0)
+
+
+def test_seletor_executa_fechamento_e_variacao():
+    seletor = SeletorUnidades(limiar_variacao=0.01)
+    candle = [1000, 100.0, 101.0, 99.0, 100.0, 5.0]
+    assert seletor.motivo("BTCUSDT", "1d", candle) == "inicial"
+    seletor.registrar("BTCUSDT", "1d", candle)
+    # Candle aberto quase parado: não reanalisa
+    assert seletor.motivo("BTCUSDT", "1d", [1000, 100.0, 101, 99, 100.5, 6]) is None
+    assert seletor.motivo("BTCUSDT", "1d", [1000, 100.0, 102, 99, 101.2, 7]) == (
+        "variacao"
+    )
+    assert seletor.motivo("BTCUSDT", "1d", [2000, 100.0, 100, 100, 100, 1]) == (
+        "fechamento"
+    )
+
+    ultimos = {
+        ("BTCUSDT", "15m"): [2000, 1, 1, 1, 100.0, 1],
+        ("BTCUSDT", "1d"): [1000, 1, 1, 1, 100.2, 1],
+    }
+    seletor.registrar("BTCUSDT", "15m", [1000, 1, 1, 1, 100.0, 1])
+    selecionadas = seletor.selecionar(ultimos, lambda s, tf: ultimos[(s, tf)])
+    assert selecionadas == [("BTCUSDT", "15m")]
+
+
+def _candles(closes):
+    return [[i * 60000, c, c, c, c, 1.0] for i, c in enumerate(closes)]
+
+
+def test_prioridade_posicao_sinal_e_volatilidade():
+    relogio = Relogio(T0)
+    prioridades = PrioridadeSymbols(janela_sinal=60, relogio=relogio)
+    pares = ["AUSDT", "BUSDT", "CUSDT", "DUSDT", "EUSDT"]
+    for symbol in pares:
+        prioridades.registrar_candles(symbol, "1m", _candles([100, 100.1] * 10))
+    prioridades.registrar_candles("EUSDT", "1m", _candles([100, 110] * 10))
+    prioridades.registrar_sinal("CUSDT", "LONG")
+    prioridades.registrar_sinal("DUSDT", "LATERAL")  # sem direção: ignorado
+
+    classes = prioridades.prioridades(pares, posicoes=["BUSDT"])
+    assert classes == {
+        "AUSDT": PrioridadeSymbols.BAIXA,
+        "BUSDT": PrioridadeSymbols.ALTA,
+        "CUSDT": PrioridadeSymbols.MEDIA,
+        "DUSDT": PrioridadeSymbols.BAIXA,
+        "EUSDT": PrioridadeSymbols.MEDIA,
+    }
+    relogio.agora += 61  # sinal deixa de ser recente
+    assert prioridades.prioridades(["CUSDT"])["CUSDT"] == PrioridadeSymbols.BAIXA
+
+
+def test_baixa_prioridade_amostrada_e_adiados_na_frente():
+    prioridades = PrioridadeSymbols(intervalo_baixa=3)
+    pares = ["AUSDT", "BUSDT", "CUSDT", "DUSDT"]
+    # Primeiro ciclo: todos (ainda não analisados), posição primeiro
+    assert prioridades.selecionar(pares, posicoes=["DUSDT"]) == [
+        "DUSDT",
+        "AUSDT",
+        "BUSDT",
+        "CUSDT",
+    ]
+    for symbol in pares:
+        prioridades.concluir(symbol)
+
+    vistos = {symbol: 0 for symbol in pares}
+    for _ in range(6):
+        selecionados = prioridades.selecionar(pares, posicoes=["DUSDT"])
+        assert selecionados[0] == "DUSDT"
+        for symbol in selecionados:
+            vistos[symbol] += 1
+    assert vistos == {"AUSDT": 2, "BUSDT": 2, "CUSDT": 2, "DUSDT": 6}
+
+    prioridades.adiar("CUSDT")
+    assert prioridades.selecionar(pares, posicoes=["DUSDT"])[:2] == [
+        "DUSDT",
+        "CUSDT",
+    ]
+    prioridades.concluir("CUSDT")
+
+
+def test_amostragem_da_baixa_independe_da_ordem_da_lista():
+    pares = [f"PAR{i}USDT" for i in range(30)]
+    normal = PrioridadeSymbols(intervalo_baixa=4)
+    invertida = PrioridadeSymbols(intervalo_baixa=4)
+    for prioridades in (normal, invertida):
+        prioridades.selecionar(pares)
+        for symbol in pares:
+            prioridades.concluir(symbol)
+    # Um symbol que entra no meio da lista não muda o ciclo dos demais
+    for _ in range(4):
+        a = set(normal.selecionar(pares))
+        b = set(invertida.selecionar(["NOVOUSDT"] + pares[::-1]))
+        assert b - {"NOVOUSDT"} == a and 0 < len(a) < len(pares)
+        invertida.concluir("NOVOUSDT")
+    assert normal.adiaveis(pares) == set(pares)
+    normal.selecionar(pares, posicoes=["PAR0USDT"])
+    assert "PAR0USDT" not in normal.adiaveis(pares)
+
+
+def test_intervalo_baixa_invalido():
+    with pytest.raises(ValueError):
+        PrioridadeSymbols(intervalo_baixa=0)
@@ -0,0 +1,61 @@
+import pytest
+from auxiliares import candles_lineares as _candles
+from utils.armazem_candles import ArmazemCandles, BufferCircular, timeframe_para_ms
+
+
+def test_timeframe_para_ms():
+    assert timeframe_para_ms("1m") == 60000
+    assert timeframe_para_ms("4h") == 4 * 3600000
+    assert timeframe_para_ms("1d") == 86400000
+    with pytest.raises(ValueError):
+        timeframe_para_ms("abc")
+
+
+def test_buffer_descarta_antigos_e_mantem_ordem():
+    buffer = BufferCircular(5)
+    candles = _candles(12)
+    assert buffer.atualizar(candles) == 12
+    assert len(buffer) == 5
+    assert buffer.como_lista() == candles[-5:]
+    assert buffer.ultimo_timestamp == candles[-1][0]
+
+
+def test_buffer_sobrescreve_candle_aberto():
+    buffer = BufferCircular(10)
+    candles = _candles(3)
+    buffer.atualizar(candles)
+    aberto = list(candles[-1])
+    aberto[4] = 999.0
+    assert buffer.atualizar([aberto]) == 0
+    assert buffer.como_lista()[-1][4] == 999.0
+    assert len(buffer) == 3
+
+
+def test_visao_array_sem_copia_e_somente_leitura():
+    buffer = BufferCircular(4)
+    buffer.atualizar(_candles(7))
+    visao = buffer.como_array(2, copiar=False)
+    assert visao.shape == (2, 6)
+    assert not visao.flags.writeable
+    assert visao.flags.c_contiguous
+
+
+def test_copia_nao_muda_com_gravacoes_posteriores():
+    buffer = BufferCircular(4)
+    buffer.atualizar(_candles(4))
+    copia = buffer.como_array()
+    antes = copia[:, 0].tolist()
+    # Buffer cheio: o próximo candle sobrescreve a linha do mais antigo
+    buffer.atualizar(_candles(5)[-1:])
+    assert copia[:, 0].tolist() == antes
+    assert antes == sorted(antes)
+
+
+def test_armazem_recria_buffer_com_capacidade_maior():
+    armazem = ArmazemCandles(capacidade_padrao=3)
+    buffer = armazem.obter_buffer("BTCUSDT", "1m")
+    buffer.atualizar(_candles(3))
+    assert armazem.tamanho("BTCUSDT", "1m") == 3
+    maior = armazem.obter_buffer("BTCUSDT", "1m", capacidade=10)
+    assert maior.capacidade == 10
+    assert armazem.ultimo_timestamp("BTCUSDT", "1m") is None
@@ -0,0 +1,114 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from auxiliares import candles_lineares as _candles
+from utils.armazem_candles_disco import ArmazemCandlesDisco, BufferMapeado, nome_arquivo
+
+
+def test_reinicio_reaproveita_candles_do_disco(tmp_path):
+    armazem = ArmazemCandlesDisco(str(tmp_path), capacidade_padrao=10)
+    candles = _candles(15)
+    armazem.obter_buffer("BTCUSDT", "1m").atualizar(candles)
+    # Atualização in-place do candle aberto
+    aberto = list(candles[-1])
+    aberto[4] = 555.0
+    armazem.obter_buffer("BTCUSDT", "1m").atualizar([aberto])
+    armazem.limpar()
+
+    reaberto = ArmazemCandlesDisco(str(tmp_path), capacidade_padrao=10)
+    assert reaberto.tamanho("BTCUSDT", "1m") == 10
+    assert reaberto.ultimo_timestamp("BTCUSDT", "1m") == candles[-1][0]
+    assert reaberto.obter_buffer("BTCUSDT", "1m").como_lista() == candles[-10:-1] + [
+        aberto
+    ]
+
+
+def test_leitura_sem_copia(tmp_path):
+    armazem = ArmazemCandlesDisco(str(tmp_path), capacidade_padrao=10)
+    buffer = armazem.obter_buffer("BTCUSDT", "1m")
+    buffer.atualizar(_candles(5))
+    visao = buffer.como_array(copiar=False)
+    assert not visao.flags.owndata
+    assert not visao.flags.writeable
+    assert np.shares_memory(visao, buffer._dados)
+    # Padrão: cópia feita dentro do seqlock
+    assert not np.shares_memory(buffer.como_array(), buffer._dados)
+
+
+def test_ampliar_capacidade_preserva_historico(tmp_path):
+    armazem = ArmazemCandlesDisco(str(tmp_path), capacidade_padrao=5)
+    armazem.obter_buffer("BTCUSDT", "1m").atualizar(_candles(5))
+    buffer = armazem.obter_buffer("BTCUSDT", "1m", capacidade=20)
+    assert buffer.capacidade == 20
+    assert buffer.como_lista() == _candles(5)
+
+
+def test_ampliar_fecha_o_mapeamento_e_leitor_remapeia(tmp_path, monkeypatch):
+    armazem = ArmazemCandlesDisco(str(tmp_path), capacidade_padrao=5)
+    antigo = armazem.obter_buffer("BTCUSDT", "1m")
+    antigo.atualizar(_candles(5))
+    leitor = ArmazemCandlesDisco(str(tmp_path), somente_leitura=True)
+    buffer_leitor = leitor.obter_buffer("BTCUSDT", "1m")
+    assert buffer_leitor.capacidade == 5 and buffer_leitor.geracao == 0
+
+    from utils import armazem_candles_disco
+
+    substituir = armazem_candles_disco.os.replace
+
+    def replace(origem, destino):
+        if destino == antigo.caminho:
+            assert antigo._dados is None and antigo._cabecalho is None
+            # Entre a marcação e a troca, o leitor continua no arquivo antigo
+            assert len(buffer_leitor.como_array()) == 5
+        substituir(origem, destino)
+
+    monkeypatch.setattr(armazem_candles_disco.os, "replace", replace)
+    novo = armazem.obter_buffer("BTCUSDT", "1m", capacidade=20)
+    novo.atualizar(_candles(8))
+    assert novo.geracao == 1
+
+    assert len(buffer_leitor.como_array()) == 8
+    assert buffer_leitor.capacidade == 20 and buffer_leitor.geracao == 1
+
+
+def test_arquivo_invalido_e_recriado(tmp_path):
+    caminho = tmp_path / nome_arquivo("BTCUSDT", "1m")
+    caminho.write_bytes(b"lixo")
+    buffer = BufferMapeado(str(caminho), 5)
+    assert len(buffer) == 0
+    with pytest.raises(FileNotFoundError):
+        BufferMapeado(str(tmp_path / "inexistente.ohlcv"), 5, somente_leitura=True)
+
+
+def test_nome_arquivo_diferencia_minuto_e_mes():
+    assert nome_arquivo("BTC/USDT:USDT", "1m") != nome_arquivo("BTC/USDT:USDT", "1M")
+    assert "/" not in nome_arquivo("BTC/USDT:USDT", "1m")
+
+
+def _ler_em_outro_processo(diretorio, fila):
+    leitor = ArmazemCandlesDisco(diretorio, somente_leitura=True)
+    buffer = leitor.obter_buffer("BTCUSDT", "1m")
+    fila.put((len(buffer), float(buffer.como_array()[:, 4].sum())))
+
+
+def test_outro_processo_le_o_mesmo_historico(tmp_path):
+    armazem = ArmazemCandlesDisco(str(tmp_path), capacidade_padrao=50)
+    candles = _candles(30)
+    armazem.obter_buffer("BTCUSDT", "1m").atualizar(candles)
+
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue()
+    processo = contexto.Process(
+        target=_ler_em_outro_processo, args=(str(tmp_path), fila)
+    )
+    processo.start()
+    tamanho, soma = fila.get(timeout=30)
+    processo.join(timeout=30)
+    assert tamanho == 30
+    assert soma == pytest.approx(sum(c[4] for c in candles))
+
+    leitor = ArmazemCandlesDisco(str(tmp_path), somente_leitura=True)
+    with pytest.raises(PermissionError):
+        leitor.obter_buffer("BTCUSDT", "1m").atualizar(_candles(1))
@@ -0,0 +1,175 @@
+import asyncio
+
+from plugins.backfill_candles import BackfillCandles, lacunas, paginar_intervalo
+
+PASSO = 15 * 60 * 1000
+INICIO = 1704067200000  # 2024-01-01 00:00 UTC
+
+
+class ClienteAsyncFalso:
+    """Exchange assíncrona com histórico sintético de 15m (sem rede)."""
+
+    def __init__(self, total, falhar_em=None):
+        self.candles = [
+            [INICIO + i * PASSO, 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i, 10.0]
+            for i in range(total)
+        ]
+        self.falhar_em = falhar_em
+        self.chamadas = 0
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.chamadas += 1
+        await asyncio.sleep(0)
+        if self.falhar_em is not None and since == self.falhar_em:
+            raise RuntimeError("falha simulada")
+        return [list(c) for c in self.candles if c[0] >= since][:limit]
+
+
+class ConexaoFalsa:
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def obter_cliente_async(self):
+        return self.cliente
+
+    def executar_async(self, corrotina, timeout=None):
+        return asyncio.run(corrotina)
+
+    def obter_info_par(self, symbol):
+        return {"id": symbol, "symbol": f"{symbol[:-4]}/USDT:USDT"}
+
+
+class GerenciadorBancoFalso:
+    """Simula executar_sql e a carga em lote guardando os candles em memória."""
+
+    def __init__(self, gravados=(), falhar_carga=False):
+        self.gravados = list(gravados)
+        self.falhar_carga = falhar_carga
+        self.cargas = []
+        self.persistidos = []
+        self.conn = object()
+
+    def executar_sql(self, query, params=None, fetchone=False, fetchall=False):
+        if fetchall:
+            return [(float(a), float(b)) for a, b in self.gravados]
+        return None
+
+    def inserir_klines_em_lote(self, plugin, symbol, timeframe, klines):
+        if self.falhar_carga:
+            return False
+        self.cargas.append((symbol, timeframe, list(klines)))
+        return True
+
+    def persistir_dados(self, plugin, tabela, dados):
+        self.persistidos.append((tabela, dados))
+        return True
+
+    def linhas(self):
+        return [(s, tf, k[0]) for s, tf, klines in self.cargas for k in klines]
+
+
+def _plugin(cliente, banco):
+    plugin = BackfillCandles(conexao=ConexaoFalsa(cliente), gerenciador_banco=banco)
+    plugin.tamanho_pagina = 100
+    plugin.paginas_por_lote = 3
+    plugin.concorrencia = 4
+    return plugin
+
+
+def test_paginar_intervalo_alinhado():
+    paginas = paginar_intervalo(INICIO + 1, INICIO + 250 * PASSO, "15m", 100)
+    assert paginas[0][0] == INICIO + PASSO
+    assert all(a < b for a, b in paginas)
+    assert paginas[-1][1] == INICIO + 250 * PASSO
+    assert sum((b - a) // PASSO for a, b in paginas) == 249
+
+
+def test_backfill_grava_todo_intervalo_por_copy():
+    cliente = ClienteAsyncFalso(1000)
+    banco = GerenciadorBancoFalso()
+    plugin = _plugin(cliente, banco)
+    resumo = plugin.executar(
+        symbols=["BTCUSDT", "ETHUSDT"],
+        timeframes=["15m"],
+        inicio=INICIO,
+        fim=INICIO + 1000 * PASSO,
+    )
+    assert resumo == {"BTCUSDT-15m": 1000, "ETHUSDT-15m": 1000}
+    linhas = banco.linhas()
+    assert len(linhas) == 2000
+    assert linhas[0][2] == INICIO
+    # 10 páginas por par, gravadas em 4 cargas (lotes de 3 páginas)
+    assert cliente.chamadas == 20
+    assert len(banco.cargas) == 8
+    assert banco.persistidos[0][0] == "backfill_execucoes"
+
+
+def test_backfill_para_quando_a_carga_falha():
+    cliente = ClienteAsyncFalso(1000)
+    banco = GerenciadorBancoFalso(falhar_carga=True)
+    plugin = _plugin(cliente, banco)
+    resumo = plugin.executar(
+        symbols=["BTCUSDT"],
+        timeframes=["15m"],
+        inicio=INICIO,
+        fim=INICIO + 1000 * PASSO,
+    )
+    # Nada gravado e nenhuma página além do primeiro lote buscada
+    assert resumo == {"BTCUSDT-15m": 0}
+    assert cliente.chamadas == 3
+
+
+def test_lacunas_do_intervalo():
+    fim = INICIO + 100 * PASSO
+    assert lacunas(INICIO, fim, PASSO, []) == [(INICIO, fim)]
+    gravados = [
+        (INICIO + 10 * PASSO, INICIO + 19 * PASSO),
+        (INICIO + 50 * PASSO, INICIO + 99 * PASSO),
+    ]
+    assert lacunas(INICIO, fim, PASSO, gravados) == [
+        (INICIO, INICIO + 10 * PASSO),
+        (INICIO + 20 * PASSO, INICIO + 50 * PASSO),
+    ]
+    assert lacunas(INICIO, fim, PASSO, [(INICIO, INICIO + 99 * PASSO)]) == []
+
+
+def test_backfill_retoma_apos_o_trecho_gravado():
+    cliente = ClienteAsyncFalso(500)
+    banco = GerenciadorBancoFalso(gravados=[(INICIO, INICIO + 299 * PASSO)])
+    plugin = _plugin(cliente, banco)
+    resumo = plugin.executar(
+        symbols=["BTCUSDT"], timeframes=["15m"], inicio=INICIO, fim=INICIO + 500 * PASSO
+    )
+    assert resumo == {"BTCUSDT-15m": 200}
+    assert banco.linhas()[0] == ("BTCUSDT", "15m", INICIO + 300 * PASSO)
+
+
+def test_backfill_para_na_pagina_com_falha_sem_lacunas():
+    cliente = ClienteAsyncFalso(1000, falhar_em=INICIO + 400 * PASSO)
+    banco = GerenciadorBancoFalso()
+    plugin = _plugin(cliente, banco)
+    resumo = plugin.executar(
+        symbols=["BTCUSDT"],
+        timeframes=["15m"],
+        inicio=INICIO,
+        fim=INICIO + 1000 * PASSO,
+    )
+    # Páginas 0-2 gravadas; no lote 3-5 só a página 3 antecede a falha
+    assert resumo == {"BTCUSDT-15m": 400}
+
+
+def test_backfill_preenche_antes_dos_candles_do_bot():
+    cliente = ClienteAsyncFalso(500)
+    # O bot já gravou os candles recentes; o histórico anterior ainda falta
+    banco = GerenciadorBancoFalso(
+        gravados=[
+            (INICIO + 100 * PASSO, INICIO + 149 * PASSO),
+            (INICIO + 450 * PASSO, INICIO + 499 * PASSO),
+        ]
+    )
+    plugin = _plugin(cliente, banco)
+    resumo = plugin.executar(
+        symbols=["BTCUSDT"], timeframes=["15m"], inicio=INICIO, fim=INICIO + 500 * PASSO
+    )
+    assert resumo == {"BTCUSDT-15m": 400}
+    assert banco.linhas()[0] == ("BTCUSDT", "15m", INICIO)
@@ -124,6 +124,29 @@ def test_inserir_klines(plugin):
     assert plugin.inserir_klines([kline], "BTCUSDT", "1m") is True
 
 
+def test_inserir_klines_em_lote(plugin):
+    plugin._conn = MagicMock()
+    cursor_mock = plugin._conn.cursor.return_value.__enter__.return_value
+    klines = [[1704067200000, 42000.0, 42100.0, 41900.0, 42050.0, 10.0]]
+    assert plugin.inserir_klines_em_lote(klines, "BTCUSDT", "1m") is True
+    sql, buffer = cursor_mock.copy_expert.call_args[0]
+    assert sql.startswith("COPY klines")
+    assert (
+        buffer.read()
+        == "BTCUSDT,1m,2024-01-01 00:00:00,42000.0,42100.0,41900.0,42050.0,10.0\n"
+    )
+    plugin._conn.commit.assert_called()
+
+
+def test_inserir_klines_em_lote_rollback_em_erro(plugin):
+    plugin._conn = MagicMock()
+    cursor_mock = plugin._conn.cursor.return_value.__enter__.return_value
+    cursor_mock.copy_expert.side_effect = Exception("falha")
+    klines = [[1704067200000, 1.0, 1.0, 1.0, 1.0, 1.0]]
+    assert plugin.inserir_klines_em_lote(klines, "BTCUSDT", "1m") is False
+    plugin._conn.rollback.assert_called()
+
+
 @pytest.mark.parametrize(
     "cursor_value, esperado",
     [
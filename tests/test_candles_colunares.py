@@ -0,0 +1,119 @@
+import copy
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from auxiliares import ClienteFalso, ConexaoFalsa
+from auxiliares import candles_lineares as _candles
+from plugins.obter_dados import ObterDados
+from utils.candles_colunares import CLOSE, CandlesOHLCV, como_candles
+from utils.plugin_utils import extrair_ohlcv
+
+
+def test_compativel_com_lista_de_candles():
+    originais = _candles(20)
+    candles = CandlesOHLCV(originais)
+    assert isinstance(candles, list)
+    assert candles == originais
+    assert len(candles) == 20
+    assert candles[0] == originais[0]
+    assert candles[-1][4] == originais[-1][4]
+    assert [c[0] for c in candles] == [c[0] for c in originais]
+    assert json.loads(json.dumps(candles)) == originais
+
+
+def test_colunas_contiguas_e_somente_leitura():
+    candles = CandlesOHLCV(_candles(50))
+    assert candles.colunas.shape == (6, 50)
+    assert candles.close.flags["C_CONTIGUOUS"]
+    assert candles.close.dtype == np.float64
+    np.testing.assert_array_equal(candles.close, [c[4] for c in _candles(50)])
+    with pytest.raises(ValueError):
+        candles.close[0] = 1.0
+
+
+def test_fatia_compartilha_colunas():
+    candles = CandlesOHLCV(_candles(30))
+    ultimos = candles[-10:]
+    assert isinstance(ultimos, CandlesOHLCV)
+    assert ultimos == _candles(30)[-10:]
+    assert np.shares_memory(ultimos.close, candles.close)
+    np.testing.assert_array_equal(ultimos.close, candles.close[-10:])
+
+
+def test_metodos_de_alteracao_sao_bloqueados():
+    candles = CandlesOHLCV(_candles(5))
+    for operacao in (
+        lambda: candles.append([0] * 6),
+        lambda: candles.sort(),
+        lambda: candles.__setitem__(0, [0] * 6),
+        lambda: candles.pop(),
+        lambda: candles[-1].__setitem__(4, 99.0),
+        lambda: candles[0].append(1.0),
+    ):
+        with pytest.raises(TypeError):
+            operacao()
+    copia = candles.como_lista()
+    copia.append([0] * 6)
+    copia[-2][4] = 99.0
+    assert len(candles) == 5
+    assert candles[-1][4] == candles.close[-1] == _candles(5)[-1][4]
+
+
+def test_linhas_somente_leitura_compativeis_com_listas():
+    candles = CandlesOHLCV(_candles(3))
+    linha = candles[0]
+    assert isinstance(linha, list)
+    assert linha == _candles(3)[0]
+    assert copy.deepcopy(linha) is linha
+    assert pickle.loads(pickle.dumps(linha)) == linha
+    assert CandlesOHLCV(candles)[0] is linha
+
+
+def test_copia_e_pickle():
+    candles = CandlesOHLCV(_candles(10))
+    assert copy.deepcopy(candles) is candles
+    restaurado = pickle.loads(pickle.dumps(candles))
+    assert isinstance(restaurado, CandlesOHLCV)
+    assert restaurado == candles
+    np.testing.assert_array_equal(restaurado.colunas, candles.colunas)
+
+
+def test_de_array_converte_timestamp_para_int():
+    dados = np.array(_candles(5), dtype=np.float64)
+    candles = CandlesOHLCV.de_array(dados)
+    assert candles == _candles(5)
+    assert isinstance(candles[0][0], int)
+
+
+def test_extrair_ohlcv_usa_colunas_e_mantem_fallback():
+    candles = CandlesOHLCV(_candles(10))
+    resultado = extrair_ohlcv(candles, [CLOSE])
+    assert resultado[CLOSE] is not None
+    assert np.shares_memory(resultado[CLOSE], candles.close)
+
+    # Candle com campo inválido: colunas com NaN, caminho legado preservado
+    irregulares = _candles(10)
+    irregulares[3][4] = None
+    candles = CandlesOHLCV(irregulares)
+    assert not candles.completo([CLOSE])
+    assert candles == irregulares
+    legado = extrair_ohlcv(irregulares, [CLOSE])
+    assert extrair_ohlcv(candles, [CLOSE]).keys() == legado.keys()
+
+
+def test_como_candles_nao_reconverte():
+    candles = CandlesOHLCV(_candles(3))
+    assert como_candles(candles) is candles
+    assert como_candles(None) == []
+
+
+def test_obter_dados_publica_candles_colunares():
+    plugin = ObterDados(conexao=ConexaoFalsa(ClienteFalso(_candles(30))))
+    dados = {}
+    plugin.executar(dados, "BTCUSDT", "1m", limit=10)
+    assert isinstance(dados["crus"], CandlesOHLCV)
+    assert dados["candles"] is dados["crus"]
+    assert dados["crus"] == _candles(30)[-10:]
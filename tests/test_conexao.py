@@ -1,18 +1,131 @@
-import pytest
-from plugins.conexao import Conexao
-
-
-def test_inicializacao_real():
-    conexao = Conexao()
-    assert conexao.inicializar() is True
-    assert conexao.obter_cliente() is not None
-    conexao.finalizar()
-
-
-def test_listar_pares_real():
-    conexao = Conexao()
-    assert conexao.inicializar() is True
-    pares = conexao.listar_pares()
-    assert isinstance(pares, list)
-    assert len(pares) > 0
-    conexao.finalizar()
+import time
+
+import pytest
+from plugins.conexao import Conexao
+
+
+def test_inicializacao_real():
+    conexao = Conexao()
+    assert conexao.inicializar() is True
+    assert conexao.obter_cliente() is not None
+    conexao.finalizar()
+
+
+def test_listar_pares_real():
+    conexao = Conexao()
+    assert conexao.inicializar() is True
+    pares = conexao.listar_pares()
+    assert isinstance(pares, list)
+    assert len(pares) > 0
+    conexao.finalizar()
+
+
+class ExchangeFalsa:
+    """Exchange mínima que conta chamadas a fetch_markets (sem rede)."""
+
+    def __init__(self, markets):
+        self.markets = markets
+        self.options = {"defaultType": "swap"}
+        self.chamadas = 0
+
+    def fetch_markets(self):
+        self.chamadas += 1
+        return self.markets
+
+
+def _mercados_sinteticos():
+    return [
+        {"id": "BTCUSDT", "symbol": "BTC/USDT", "type": "spot"},
+        {"id": "BTCUSDT", "symbol": "BTC/USDT:USDT", "type": "swap"},
+        {"id": "ETHUSDT", "symbol": "ETH/USDT:USDT", "type": "swap"},
+    ]
+
+
+@pytest.fixture
+def conexao_cache(tmp_path):
+    conexao = Conexao()
+    conexao.exchange = ExchangeFalsa(_mercados_sinteticos())
+    conexao._caminho_snapshot = str(tmp_path / "pares.json")
+    yield conexao
+    conexao.finalizar()
+
+
+def test_cache_mercados_evita_fetch_repetido(conexao_cache):
+    for _ in range(10):
+        assert set(conexao_cache.listar_pares()) == {"BTCUSDT", "ETHUSDT"}
+        conexao_cache.obter_info_par("ETHUSDT")
+    assert conexao_cache.exchange.chamadas == 1
+
+
+def test_obter_info_par_por_id_e_symbol(conexao_cache):
+    assert conexao_cache.obter_info_par("BTCUSDT")["symbol"] == "BTC/USDT:USDT"
+    assert conexao_cache.obter_info_par("BTC/USDT")["type"] == "spot"
+    assert conexao_cache.obter_info_par("XYZUSDT") == {}
+    assert "ETH/USDT:USDT" in conexao_cache.obter_mercados()
+
+
+def test_cache_expira_e_snapshot_so_muda_com_dados(conexao_cache):
+    import os
+
+    conexao_cache.listar_pares()
+    caminho = conexao_cache._caminho_snapshot
+    assert os.path.exists(caminho)
+    mtime = os.stat(caminho).st_mtime_ns
+
+    conexao_cache._mercados_ttl = 0
+    conexao_cache.listar_pares()
+    assert conexao_cache.exchange.chamadas == 2
+    assert os.stat(caminho).st_mtime_ns == mtime
+
+    conexao_cache.exchange.markets = _mercados_sinteticos()[:2]
+    assert conexao_cache.listar_pares() == ["BTCUSDT"]
+    with open(caminho) as f:
+        assert "ETHUSDT" not in f.read()
+
+
+def test_falha_de_fetch_markets_serve_cache_ate_nova_tentativa(conexao_cache):
+    conexao_cache.listar_pares()
+    conexao_cache._mercados_ttl = 0.5
+    conexao_cache._mercados_retry = 60
+
+    def falhar():
+        conexao_cache.exchange.chamadas += 1
+        raise TimeoutError("exchange fora do ar")
+
+    conexao_cache.exchange.fetch_markets = falhar
+    time.sleep(0.6)
+    for _ in range(5):
+        assert conexao_cache.obter_info_par("ETHUSDT")["type"] == "swap"
+    assert conexao_cache.exchange.chamadas == 2
+
+
+def test_snapshot_carregado_na_falha_nao_repete_a_consulta(conexao_cache):
+    conexao_cache.listar_pares()
+    recarregada = Conexao()
+    recarregada.exchange = ExchangeFalsa([])
+    recarregada._caminho_snapshot = conexao_cache._caminho_snapshot
+
+    def falhar():
+        recarregada.exchange.chamadas += 1
+        raise TimeoutError("exchange fora do ar")
+
+    recarregada.exchange.fetch_markets = falhar
+    for _ in range(5):
+        assert recarregada.obter_info_par("BTCUSDT")["type"] == "swap"
+    assert recarregada.exchange.chamadas == 1
+    recarregada.finalizar()
+
+
+def test_executar_async_em_loop_dedicado():
+    import asyncio
+
+    conexao = Conexao()
+
+    async def soma(a, b):
+        await asyncio.sleep(0)
+        return a + b
+
+    assert conexao.executar_async(soma(2, 3), timeout=5) == 5
+    assert conexao.executar_async(soma(1, 1), timeout=5) == 2
+    conexao.finalizar()
+    assert conexao._loop_async is None
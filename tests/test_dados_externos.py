@@ -0,0 +1,127 @@
+import time
+
+import pytest
+
+from utils.dados_externos import (
+    ColetorDadosExternos,
+    FonteExterna,
+    criar_sessao_http,
+    fontes_da_config,
+    interpretar_fgi,
+)
+from utils.servidor_dados_externos import ServidorDadosExternos
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorDadosExternos()
+    servidor.iniciar()
+    yield servidor
+    servidor.parar()
+
+
+def _config(url):
+    return {
+        "FGI_URL": f"{url}/fng/",
+        "LSR_URL": url + "/lsr/{symbol}",
+        "BTC_DOMINANCE_URL": f"{url}/btcd",
+    }
+
+
+def _esperar(condicao, limite=5.0):
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        if condicao():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_sessao_reaproveita_conexao(servidor):
+    config = _config(servidor.url)
+    coletor = ColetorDadosExternos(fontes_da_config(config), config=config)
+    try:
+        for _ in range(3):
+            assert coletor.atualizar("fgi")
+            assert coletor.atualizar("lsr", "BTCUSDT")
+            assert coletor.atualizar("btc_dominance")
+    finally:
+        coletor.parar()
+    assert sum(servidor.requisicoes.values()) == 9
+    assert servidor.conexoes == 1
+    assert coletor.obter("lsr", "BTCUSDT")["direcao"] == "Long Pesado"
+    assert coletor.obter("btc_dominance")["categoria"] == "Alta"
+
+
+def test_obter_nao_bloqueia_e_atualiza_em_segundo_plano(servidor):
+    config = _config(servidor.url)
+    coletor = ColetorDadosExternos(fontes_da_config(config), config=config)
+    try:
+        inicio = time.monotonic()
+        primeiro = coletor.obter("fgi")
+        assert time.monotonic() - inicio < 0.05
+        assert primeiro["obsoleto"] is True and primeiro["atualizado_em"] is None
+        assert _esperar(lambda: coletor.obter("fgi")["atualizado_em"] is not None)
+        dados = coletor.obter("fgi")
+        assert dados["value"] == 62 and dados["obsoleto"] is False
+        assert dados["idade_segundos"] >= 0
+    finally:
+        coletor.parar()
+
+
+def test_renova_antes_de_expirar(servidor):
+    fontes = {"fgi": FonteExterna("fgi", f"{servidor.url}/fng/", 0.4, interpretar_fgi)}
+    coletor = ColetorDadosExternos(fontes, antecedencia=0.5)
+    try:
+        coletor.obter("fgi")
+        assert _esperar(lambda: coletor.obter("fgi")["atualizado_em"] is not None)
+        obsoletos = 0
+        for _ in range(30):
+            obsoletos += coletor.obter("fgi")["obsoleto"]
+            time.sleep(0.04)
+        assert obsoletos == 0
+        assert servidor.requisicoes["/fng/"] >= 4
+    finally:
+        coletor.parar()
+
+
+def test_falha_mantem_ultimo_valor_com_erro(servidor):
+    config = _config(servidor.url)
+    # Sem retentativas para o 503 falhar de imediato
+    coletor = ColetorDadosExternos(
+        fontes_da_config(config),
+        config=config,
+        sessao=criar_sessao_http(tentativas=0),
+        espera_erro=60,
+    )
+    try:
+        assert coletor.atualizar("fgi")
+        servidor.definir("/fng/", 503, {})
+        assert not coletor.atualizar("fgi")
+        dados = coletor.obter("fgi")
+        assert dados["value"] == 62
+        assert "503" in dados["erro"]
+        assert not coletor.atualizar("lsr")  # URL sem symbol → 404
+    finally:
+        coletor.parar()
+
+
+def test_obter_dados_le_instantaneo_com_metadados(servidor):
+    from plugins.obter_dados import ObterDados
+
+    plugin = ObterDados(conexao=None)
+    config = _config(servidor.url)
+    plugin._dados_externos = ColetorDadosExternos(
+        fontes_da_config(config), config=config
+    )
+    try:
+        plugin._dados_externos.atualizar("fgi")
+        fgi = plugin.obter_fear_greed_index()
+        assert fgi["value"] == 62
+        assert fgi["classification"] == "Greed"
+        assert fgi["fonte"] == f"{servidor.url}/fng/"
+        assert fgi["obsoleto"] is False
+        lsr = plugin.obter_long_short_ratio("ETHUSDT")
+        assert lsr["lsr"] is None and lsr["obsoleto"] is True
+    finally:
+        plugin.finalizar()
@@ -0,0 +1,160 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from auxiliares import candles_sinteticos
+from utils import execucao_processos
+from utils.execucao_processos import (
+    ArenaCandles,
+    ExecutorAnaliseProcessos,
+    analisar,
+    inicializar_worker,
+    ler_colunas,
+)
+
+PLUGINS = ["medias_moveis", "indicadores_volatilidade"]
+
+
+_candles = partial(candles_sinteticos, passo=3600000)
+
+
+def test_arena_devolve_as_colunas_de_cada_serie():
+    series = {
+        ("AUSDT", "1h"): _candles(150, 1),
+        ("BUSDT", "1h"): _candles(80, 2),
+        ("CUSDT", "1h"): [],
+    }
+    with ArenaCandles(series) as arena:
+        assert len(arena) == 2 and ("CUSDT", "1h") not in arena
+        for chave in (("AUSDT", "1h"), ("BUSDT", "1h")):
+            colunas = ler_colunas(arena.nome, *arena.descritores[chave])
+            np.testing.assert_array_equal(
+                colunas, np.array(series[chave], dtype=np.float64).T
+            )
+    with pytest.raises(FileNotFoundError):
+        ler_colunas(arena.nome, 0, 1)
+
+
+def test_worker_igual_a_execucao_no_processo(monkeypatch):
+    monkeypatch.setattr(execucao_processos, "_estado", {})
+    inicializar_worker(PLUGINS, None)
+    plano = execucao_processos._estado["plano"]
+    assert plano.plugins == PLUGINS
+
+    from utils.plano_execucao import executar_plano
+
+    candles = _candles(200, 3)
+    with ArenaCandles({("AUSDT", "1h"): candles}) as arena:
+        registro = analisar(
+            arena.nome,
+            *arena.descritores[("AUSDT", "1h")],
+            "AUSDT",
+            "1h",
+            {"extra": 1},
+        )
+    assert "erro" not in registro
+    dados = registro["dados"]
+    assert "crus" not in dados and "candles" not in dados
+    assert dados["extra"] == 1
+
+    esperado = {"symbol": "AUSDT", "timeframe": "1h", "crus": candles}
+    executar_plano(plano, esperado, "AUSDT", "1h")
+    assert dados["medias_moveis"] == esperado["medias_moveis"]
+    assert dados["volatilidade"] == esperado["volatilidade"]
+
+
+def test_erro_no_worker_vira_registro(monkeypatch):
+    monkeypatch.setattr(execucao_processos, "_estado", {})
+    registro = analisar("bloco_inexistente", 0, 10, "AUSDT", "1h")
+    assert registro["symbol"] == "AUSDT" and "erro" in registro
+
+
+def test_pool_de_processos():
+    executor = ExecutorAnaliseProcessos(PLUGINS, sinais=None, workers=1)
+    try:
+        assert executor.compativel(PLUGINS, None)
+        assert not executor.compativel(PLUGINS, "sinais_plugin")
+        with ArenaCandles({("AUSDT", "1h"): _candles(120, 4)}) as arena:
+            registro = executor.submeter(arena, "AUSDT", "1h").result(timeout=120)
+    finally:
+        executor.encerrar()
+    assert "erro" not in registro
+    assert "medias_moveis" in registro["dados"]
+
+
+def test_gravacoes_do_worker_voltam_no_registro(monkeypatch):
+    class PluginQueGrava:
+        def executar(self, symbol, timeframe, dados_completos):
+            self._gerenciador_banco.persistir_dados(
+                plugin="falso", tabela="tabela", dados={"symbol": symbol}
+            )
+            return {"gravou": True}
+
+    sinais = PluginQueGrava()
+    assert execucao_processos._usa_banco(PluginQueGrava, sinais) is False
+    sinais._gerenciador_banco = execucao_processos.BancoAdiado()
+    monkeypatch.setattr(execucao_processos, "_estado", {})
+    inicializar_worker(PLUGINS, None)
+    execucao_processos._estado["sinais"] = sinais
+
+    with ArenaCandles({("AUSDT", "1h"): _candles(60, 5)}) as arena:
+        registro = analisar(
+            arena.nome, *arena.descritores[("AUSDT", "1h")], "AUSDT", "1h"
+        )
+    assert registro["dados"]["gravou"]
+    assert registro["persistencias"] == [("falso", "tabela", {"symbol": "AUSDT"})]
+    # Fora de uma análise a gravação não acontece no worker
+    assert not sinais._gerenciador_banco.persistir_dados("falso", "tabela", {})
+
+
+def test_plugins_com_banco_recebem_o_substituto(monkeypatch):
+    from plugins.plugin import PluginRegistry
+    import plugins  # noqa: F401
+
+    monkeypatch.setattr(execucao_processos, "_estado", {})
+    instancias = {}
+    plugin = execucao_processos._instanciar("indicadores_volume", instancias, {})
+    assert isinstance(plugin._gerenciador_banco, execucao_processos.BancoAdiado)
+    assert PluginRegistry.obter_plugin("indicadores_volume") is type(plugin)
+
+
+def test_leitura_nao_registra_o_bloco_no_resource_tracker(monkeypatch):
+    with ArenaCandles({("AUSDT", "1h"): _candles(30, 6)}) as arena:
+        registrados = []
+        monkeypatch.setattr(
+            execucao_processos.resource_tracker,
+            "register",
+            lambda nome, tipo: registrados.append((nome, tipo)),
+        )
+        ler_colunas(arena.nome, *arena.descritores[("AUSDT", "1h")])
+        monkeypatch.undo()
+    assert registrados == []
+
+
+def test_series_do_universo_entram_no_cache_do_worker(monkeypatch):
+    from utils import servico_indicadores
+    from utils.candles_colunares import como_candles
+
+    servico = servico_indicadores.ServicoIndicadores(capacidade=8)
+    monkeypatch.setattr(
+        servico_indicadores, "obter_servico_indicadores", lambda: servico
+    )
+    monkeypatch.setattr(execucao_processos, "_estado", {})
+    inicializar_worker([], None)
+    candles = _candles(40, 7)
+    serie = np.arange(40, dtype=np.float64)
+    with ArenaCandles({("AUSDT", "1h"): candles}) as arena:
+        registro = analisar(
+            arena.nome,
+            *arena.descritores[("AUSDT", "1h")],
+            "AUSDT",
+            "1h",
+            universo=[("SMA", {"timeperiod": 5}, serie)],
+        )
+    assert "erro" not in registro
+    resultado = servico.calcular(
+        "SMA", como_candles(candles), "AUSDT", "1h", timeperiod=5
+    )
+    np.testing.assert_array_equal(resultado, serie)
+    assert servico.acertos == 1
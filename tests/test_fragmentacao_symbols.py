@@ -0,0 +1,129 @@
+from utils.fragmentacao_symbols import (
+    AnelConsistente,
+    FragmentoSymbols,
+    RepositorioFragmentos,
+)
+
+SYMBOLS = [f"PAR{i}USDT" for i in range(300)]
+
+
+class RepositorioMemoria:
+    """Mesma interface do RepositorioFragmentos, com relógio manual."""
+
+    def __init__(self):
+        self.agora = 0.0
+        self.batimentos = {}
+        self.arrendamentos = {}
+        self.publicados = {}
+
+    def bater(self, worker):
+        self.batimentos[worker] = self.agora
+
+    def workers_vivos(self, ttl):
+        return sorted(w for w, t in self.batimentos.items() if t > self.agora - ttl)
+
+    def arrendar(self, worker, symbols, ttl):
+        obtidos = []
+        for symbol in symbols:
+            dono, expira = self.arrendamentos.get(symbol, (None, 0.0))
+            if dono in (None, worker) or expira < self.agora:
+                self.arrendamentos[symbol] = (worker, self.agora + ttl)
+                obtidos.append(symbol)
+        return obtidos
+
+    def liberar(self, worker, symbols=None):
+        for symbol, (dono, _) in list(self.arrendamentos.items()):
+            if dono == worker and (symbols is None or symbol in symbols):
+                del self.arrendamentos[symbol]
+        if symbols is None:
+            self.batimentos.pop(worker, None)
+
+    def publicar_sinal(self, worker, symbol, sinal):
+        self.publicados[symbol] = {"worker": worker, "sinal": sinal}
+
+    def sinais(self, janela):
+        return dict(self.publicados)
+
+
+def test_anel_equilibrado_e_estavel():
+    anel = AnelConsistente(["w1", "w2", "w3"])
+    particoes = anel.particionar(SYMBOLS)
+    assert sorted(s for p in particoes.values() for s in p) == sorted(SYMBOLS)
+    assert all(len(p) > len(SYMBOLS) / 3 * 0.6 for p in particoes.values())
+    # Mesmo resultado em outro processo (hash estável) e sem dono fixo à ordem
+    assert AnelConsistente(["w3", "w1", "w2"]).particionar(SYMBOLS) == particoes
+
+    # Saída de um worker: só os symbols dele mudam de dono
+    depois = AnelConsistente(["w1", "w3"])
+    for symbol in SYMBOLS:
+        if anel.no_de(symbol) != "w2":
+            assert depois.no_de(symbol) == anel.no_de(symbol)
+    assert AnelConsistente([]).no_de("BTCUSDT") is None
+
+
+def test_workers_dividem_o_universo_sem_sobreposicao():
+    repositorio = RepositorioMemoria()
+    workers = [FragmentoSymbols(repositorio, f"w{i}", ttl=30) for i in range(3)]
+    for worker in workers:
+        worker.symbols_do_ciclo(SYMBOLS)
+    # Ciclos seguintes: todos já se enxergam no anel e liberam o que não é seu
+    for _ in range(2):
+        partes = [set(worker.symbols_do_ciclo(SYMBOLS)) for worker in workers]
+    assert set.union(*partes) == set(SYMBOLS)
+    assert sum(len(p) for p in partes) == len(SYMBOLS)
+    assert [worker.coordenador for worker in workers] == [True, False, False]
+
+
+def test_failover_apos_expirar_o_arrendamento():
+    repositorio = RepositorioMemoria()
+    w1 = FragmentoSymbols(repositorio, "w1", ttl=30)
+    w2 = FragmentoSymbols(repositorio, "w2", ttl=30)
+    for _ in range(2):
+        w1.symbols_do_ciclo(SYMBOLS)
+        parte_w2 = w2.symbols_do_ciclo(SYMBOLS)
+
+    # w2 para de bater; antes de expirar, w1 ainda não assume os symbols dele
+    repositorio.agora = 20.0
+    assert not set(w1.symbols_do_ciclo(SYMBOLS)) & set(parte_w2)
+    repositorio.agora = 31.0
+    assert w1.symbols_do_ciclo(SYMBOLS) == SYMBOLS
+    assert w1.workers == ["w1"]
+
+    w1.publicar_sinal(SYMBOLS[0], {"direcao": "LONG"})
+    assert w1.coletar_sinais()[SYMBOLS[0]]["worker"] == "w1"
+    w1.encerrar()
+    assert not repositorio.arrendamentos and "w1" not in repositorio.batimentos
+
+
+class BancoFalso:
+    def __init__(self, resultado=None):
+        self.consultas = []
+        self.resultado = resultado
+
+    def executar_sql(self, query, params=None, fetchone=False, fetchall=False):
+        self.consultas.append((" ".join(query.split()), params))
+        return self.resultado if fetchall else None
+
+
+def test_repositorio_arrenda_em_uma_consulta():
+    banco = BancoFalso([("AUSDT",)])
+    repositorio = RepositorioFragmentos(banco)
+    assert repositorio.arrendar("w1", ["AUSDT", "BUSDT"], 30) == ["AUSDT"]
+    assert repositorio.arrendar("w1", [], 30) == []
+    ((consulta, params),) = banco.consultas
+    assert consulta.startswith("INSERT INTO fragmentos_arrendamentos")
+    assert "expira_em < now()" in consulta
+    assert params == ("w1", 30, ["AUSDT", "BUSDT"])
+
+
+def test_tabelas_declaradas_no_gerenciador_bot():
+    from plugins.gerenciadores.gerenciador_bot import GerenciadorBot
+
+    tabelas = GerenciadorBot(gerente=None).plugin_tabelas
+    for nome in ("fragmentos_workers", "fragmentos_arrendamentos", "fragmentos_sinais"):
+        assert tabelas[nome]["modo_acesso"] == "own"
+    assert "expira_em" in tabelas["fragmentos_arrendamentos"]["schema"]
+    # O repositório não cria tabelas: só DML
+    banco = BancoFalso([])
+    FragmentoSymbols(RepositorioFragmentos(banco), worker="w1")
+    assert not any(c.startswith("CREATE") for c, _ in banco.consultas)
@@ -0,0 +1,232 @@
+import threading
+import time
+
+from plugins.gerenciadores.gerenciador_bot import GerenciadorBot
+
+
+class ConsolidadorFalso:
+    def __init__(self):
+        self.chamadas = []
+
+    def executar(self, dados_completos):
+        self.chamadas.append((dados_completos["symbol"], time.monotonic()))
+        return {"sinal": "NEUTRO"}
+
+
+class GerenteFalso:
+    def __init__(self, plugins):
+        self.plugins = plugins
+
+    def obter_plugin(self, nome):
+        return self.plugins.get(nome)
+
+    def planejar(self, *args, **kwargs):
+        return None
+
+
+def _bot(pares, timeframes, atrasos):
+    consolidador = ConsolidadorFalso()
+    gerente = GerenteFalso(
+        {
+            "analisador_mercado": object(),
+            "sinais_plugin": object(),
+            "consolidador_sinais": consolidador,
+        }
+    )
+    bot = GerenciadorBot(gerente=gerente)
+    bot._config = {"pares": pares, "timeframes": timeframes}
+    bot._status = "rodando"
+    bot._seletor = None
+    concluidas = {}
+    lock = threading.Lock()
+
+    def processar(symbol, tf, plano, sinais_plugin, buffer_sinais):
+        time.sleep(atrasos[symbol])
+        buffer_sinais[symbol][tf] = {"symbol": symbol, "timeframe": tf}
+        with lock:
+            concluidas[(symbol, tf)] = time.monotonic()
+        return True
+
+    bot._processar_par = processar
+    return bot, consolidador, concluidas
+
+
+def test_symbol_consolidado_sem_esperar_o_mais_lento():
+    pares = ["LENTOUSDT", "RAPIDOUSDT", "MEDIOUSDT"]
+    atrasos = {"LENTOUSDT": 0.4, "RAPIDOUSDT": 0.01, "MEDIOUSDT": 0.05}
+    bot, consolidador, concluidas = _bot(pares, ["1m", "5m"], atrasos)
+    try:
+        assert bot.executar() is True
+    finally:
+        bot._executor.shutdown(wait=True)
+
+    ordem = [symbol for symbol, _ in consolidador.chamadas]
+    assert sorted(ordem) == sorted(pares)
+    assert ordem[-1] == "LENTOUSDT"
+    fim_lento = max(t for (s, _), t in concluidas.items() if s == "LENTOUSDT")
+    momento = dict(consolidador.chamadas)
+    assert momento["RAPIDOUSDT"] < fim_lento
+    assert momento["MEDIOUSDT"] < fim_lento
+
+
+def test_falha_de_timeframe_nao_consolida_o_symbol():
+    bot, consolidador, _ = _bot(
+        ["AUSDT", "BUSDT"], ["1m"], {"AUSDT": 0.0, "BUSDT": 0.0}
+    )
+    processar = bot._processar_par
+
+    def falhar_b(symbol, tf, *args):
+        if symbol == "BUSDT":
+            return False
+        return processar(symbol, tf, *args)
+
+    bot._processar_par = falhar_b
+    try:
+        assert bot.executar() is False
+    finally:
+        bot._executor.shutdown(wait=True)
+    assert [symbol for symbol, _ in consolidador.chamadas] == ["AUSDT"]
+
+
+def test_prazo_do_ciclo_adia_o_trabalho_nao_iniciado():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from utils.agendador_ciclos import PrioridadeSymbols
+
+    pares = ["AUSDT", "BUSDT", "CUSDT", "DUSDT"]
+    bot, consolidador, concluidas = _bot(pares, ["1m"], dict.fromkeys(pares, 0.15))
+    bot._executor.shutdown(wait=True)
+    bot._executor = ThreadPoolExecutor(max_workers=1)
+    bot._prioridades = PrioridadeSymbols(prazo_ciclo=0.2)
+    bot._gerente.plugins["execucao_ordens"] = type(
+        "Ordens", (), {"_ordens_ativas": {"DUSDT": "1"}}
+    )()
+    try:
+        assert bot.executar() is True
+        # DUSDT (posição aberta) primeiro; o que não começou no prazo é adiado
+        primeiro = [symbol for symbol, _ in consolidador.chamadas]
+        assert primeiro[0] == "DUSDT" and len(primeiro) < len(pares)
+        adiados = [p for p in pares if p not in primeiro]
+
+        consolidador.chamadas.clear()
+        bot._prioridades.prazo_ciclo = None
+        assert bot.executar() is True
+        ordem = [symbol for symbol, _ in consolidador.chamadas]
+        assert ordem[0] == "DUSDT"
+        assert ordem[1 : 1 + len(adiados)] == adiados
+    finally:
+        bot._executor.shutdown(wait=True)
+
+
+def test_prazo_so_cancela_unidades_adiaveis():
+    from concurrent.futures import ThreadPoolExecutor
+
+    liberar = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        tarefas = {executor.submit(liberar.wait, 5): ("AUSDT", "1m")}
+        for symbol in ("BUSDT", "CUSDT"):
+            tarefas[executor.submit(lambda: True)] = (symbol, "1m")
+        adiadas = []
+        entregues = GerenciadorBot._ate_o_prazo(
+            tarefas, time.time() + 0.05, adiadas, cancelaveis={"CUSDT"}
+        )
+        threading.Timer(0.2, liberar.set).start()
+        concluidas = [tarefas[t][0] for t in entregues]
+    finally:
+        executor.shutdown(wait=True)
+    assert adiadas == [("CUSDT", "1m")]
+    assert sorted(concluidas) == ["AUSDT", "BUSDT"]
+
+
+def test_pipeline_em_estagios_persiste_fora_da_analise():
+    pares = ["AUSDT", "BUSDT", "CUSDT"]
+    bot, consolidador, _ = _bot(pares, ["1m", "5m"], dict.fromkeys(pares, 0.0))
+    del bot._processar_par  # usa as etapas reais
+    gravacoes = []
+
+    class Banco:
+        def persistir_dados(self, plugin, tabela, dados):
+            from utils.pipeline_estagios import adiar_persistencia
+
+            if adiar_persistencia(self, plugin, tabela, dados):
+                return True
+            gravacoes.append((dados, threading.current_thread().name))
+            return True
+
+    banco = Banco()
+
+    class ObterDados:
+        def executar(self, dados_completos, symbol, timeframe):
+            dados_completos["crus"] = [[0, 1.0, 1.0, 1.0, 1.0, 1.0]]
+
+    def executar_plano(plano, dados_completos, symbol, timeframe, executor=None):
+        dados_completos["analise"] = threading.current_thread().name
+        banco.persistir_dados("teste", "tabela", f"{symbol}-{timeframe}")
+
+    bot._gerente.plugins["obter_dados"] = ObterDados()
+    bot._gerente.executar_plano = executar_plano
+    bot._config["pipeline_estagios"] = {"ativo": True, "buscar": {"capacidade": 1}}
+    try:
+        assert bot.executar() is True
+        metricas = bot._pipeline.metricas()
+    finally:
+        bot._executor.shutdown(wait=True)
+        bot._pipeline.encerrar()
+
+    assert sorted(symbol for symbol, _ in consolidador.chamadas) == pares
+    assert sorted(dados for dados, _ in gravacoes) == sorted(
+        f"{s}-{tf}" for s in pares for tf in ("1m", "5m")
+    )
+    assert {nome for _, nome in gravacoes} <= {
+        "pipeline-persistir-0",
+        "pipeline-persistir-1",
+    }
+    assert metricas["persistir"]["processados"] == 6
+
+
+def test_agendador_no_modo_rest_so_reanalisa_unidade_com_candle_novo():
+    from utils.agendador_ciclos import SeletorUnidades
+
+    pares = ["AUSDT", "BUSDT"]
+    bot, consolidador, _ = _bot(pares, ["1m"], dict.fromkeys(pares, 0.0))
+    del bot._processar_par  # usa as etapas reais
+    bot._seletor = SeletorUnidades(limiar_variacao=0.01)
+    candles = {symbol: [[60000, 1.0, 1.0, 1.0, 100.0, 1.0]] for symbol in pares}
+    analisadas = []
+
+    class ObterDados:
+        def executar(self, dados_completos, symbol, timeframe):
+            dados_completos["crus"] = [list(c) for c in candles[symbol]]
+
+    def executar_plano(plano, dados_completos, symbol, timeframe, executor=None):
+        analisadas.append(symbol)
+
+    bot._gerente.plugins["obter_dados"] = ObterDados()
+    bot._gerente.executar_plano = executar_plano
+    try:
+        assert bot.executar() is True
+        assert sorted(analisadas) == pares
+
+        analisadas.clear()
+        consolidador.chamadas.clear()
+        candles["BUSDT"].append([120000, 1.0, 1.0, 1.0, 100.1, 1.0])
+        assert bot.executar() is True
+        assert analisadas == ["BUSDT"]
+        assert [symbol for symbol, _ in consolidador.chamadas] == ["BUSDT"]
+
+        # Symbol fora do universo perde o resultado guardado
+        bot._config["pares"] = ["BUSDT"]
+        assert bot.executar() is True
+        assert set(bot._ultimos_resultados) == {"BUSDT"}
+    finally:
+        bot._executor.shutdown(wait=True)
+
+
+def test_sem_agendador_nao_guarda_resultados_entre_ciclos():
+    bot, _, _ = _bot(["AUSDT"], ["1m"], {"AUSDT": 0.0})
+    try:
+        assert bot.executar() is True
+    finally:
+        bot._executor.shutdown(wait=True)
+    assert not bot._ultimos_resultados
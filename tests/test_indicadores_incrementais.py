@@ -0,0 +1,167 @@
+from functools import partial
+
+import numpy as np
+import pytest
+import talib
+
+from auxiliares import candles_sinteticos
+from plugins.obter_dados import ObterDados
+from utils.indicadores_incrementais import (
+    ESPECIFICACAO_PADRAO,
+    MotorIndicadoresIncrementais,
+    criar_indicadores,
+)
+from utils.servico_indicadores import ServicoIndicadores
+from utils.servidor_replay_ws import montar_mensagem_kline
+from utils.stream_klines import StreamKlines
+
+MINUTO = 60000
+
+
+_candles = partial(candles_sinteticos, semente=1, repetidos=(50, 53))
+
+
+def _talib(candles):
+    o, h, l, c, v = np.array(candles, dtype=np.float64)[:, 1:].T
+    macd, sinal, hist = talib.MACD(c, fastperiod=12, slowperiod=26, signalperiod=9)
+    return {
+        "ema": talib.EMA(c, timeperiod=21),
+        "rsi": talib.RSI(c, timeperiod=14),
+        "atr": talib.ATR(h, l, c, timeperiod=14),
+        "obv": talib.OBV(c, v),
+        "adx": talib.ADX(h, l, c, timeperiod=14),
+        "macd": np.column_stack([macd, sinal, hist]),
+    }
+
+
+def _assert_valores(valores, referencia, i=-1):
+    for nome, serie in referencia.items():
+        esperado = serie[i]
+        atual = valores[nome]
+        if np.isnan(esperado).all():
+            assert atual is None, nome
+        else:
+            np.testing.assert_allclose(atual, esperado, rtol=1e-9, err_msg=nome)
+
+
+@pytest.mark.parametrize("nome", sorted(ESPECIFICACAO_PADRAO))
+def test_serie_completa_igual_ao_talib(nome):
+    candles = _candles(300)
+    indicador = criar_indicadores({nome: ESPECIFICACAO_PADRAO[nome]})[nome]
+    esperado = _talib(candles)[nome]
+    estado = indicador.estado_inicial()
+    for i, candle in enumerate(candles):
+        estado, valor = indicador.passo(estado, candle)
+        if np.isnan(esperado[i]).all():
+            assert valor is None
+        else:
+            np.testing.assert_allclose(valor, esperado[i], rtol=1e-9)
+
+
+def test_revisoes_do_candle_aberto_nao_alteram_o_estado():
+    candles = _candles(120)
+    motor = MotorIndicadoresIncrementais()
+    motor.carregar("BTCUSDT", "1m", candles[:100], aberto=False)
+
+    aberto = list(candles[100])
+    for close in (aberto[4] + 3, aberto[4] - 2):
+        revisado = aberto[:4] + [close, aberto[5]]
+        valores = motor.processar("BTCUSDT", "1m", revisado)
+        _assert_valores(valores, _talib(candles[:100] + [revisado]))
+
+    # Fechamento com os valores finais: estado igual ao cálculo completo
+    motor.processar("BTCUSDT", "1m", candles[100], fechado=True)
+    for candle in candles[101:]:
+        motor.processar("BTCUSDT", "1m", candle, fechado=True)
+    _assert_valores(motor.valores("BTCUSDT", "1m"), _talib(candles))
+
+
+def test_fechamento_perdido_confirma_o_candle_aberto():
+    candles = _candles(80)
+    motor = MotorIndicadoresIncrementais()
+    motor.carregar("BTCUSDT", "1m", candles[:60])  # último ainda aberto
+    for candle in candles[60:]:
+        # Só revisões: cada candle novo confirma o anterior
+        motor.processar("BTCUSDT", "1m", candle)
+    _assert_valores(motor.valores("BTCUSDT", "1m"), _talib(candles))
+    # Mensagem repetida de candle já confirmado é ignorada
+    motor.processar("BTCUSDT", "1m", candles[10], fechado=True)
+    _assert_valores(motor.valores("BTCUSDT", "1m"), _talib(candles))
+
+
+def test_verificacao_detecta_divergencia_e_recarrega():
+    candles = _candles(100)
+    motor = MotorIndicadoresIncrementais(intervalo_verificacao=5)
+    motor.carregar("BTCUSDT", "1m", candles[:90], aberto=False)
+    for candle in candles[90:95]:
+        motor.processar("BTCUSDT", "1m", candle, fechado=True)
+    assert motor.precisa_verificar("BTCUSDT", "1m")
+    assert motor.verificar("BTCUSDT", "1m", candles[:95], aberto=False)
+    assert motor.divergencias == 0
+
+    serie = motor._series[("BTCUSDT", "1m")]
+    n, soma, ema = serie.estados["ema"]
+    serie.estados["ema"] = (n, soma, ema * 1.01)
+    motor.processar("BTCUSDT", "1m", candles[95], fechado=True)
+    assert not motor.verificar("BTCUSDT", "1m", candles[:96], aberto=False)
+    assert motor.divergencias == 1
+    _assert_valores(motor.valores("BTCUSDT", "1m"), _talib(candles[:96]))
+
+
+def test_stream_alimenta_o_ultimo_do_servico():
+    candles = _candles(60)
+    plugin = ObterDados(conexao=None)
+    plugin._motor_incremental = MotorIndicadoresIncrementais()
+    servico = ServicoIndicadores()
+    servico.usar_motor_incremental(plugin._motor_incremental)
+    plugin._armazem.obter_buffer("BTCUSDT", "1m").atualizar(candles[:50])
+    stream = StreamKlines(
+        "ws://nao-usado",
+        plugin._armazem,
+        ["BTCUSDT"],
+        ["1m"],
+        ao_atualizar=plugin._ao_atualizar_candle,
+    )
+    for candle in candles[49:]:
+        stream.processar_mensagem(montar_mensagem_kline("BTCUSDT", "1m", candle, False))
+        stream.processar_mensagem(montar_mensagem_kline("BTCUSDT", "1m", candle, True))
+    janela = plugin._armazem.obter_buffer("BTCUSDT", "1m").como_lista()
+    referencia = _talib(candles)
+
+    ema = servico.ultimo("EMA", janela, "BTCUSDT", "1m", timeperiod=21)
+    macd = servico.ultimo(
+        "MACD", janela, "BTCUSDT", "1m", fastperiod=12, slowperiod=26, signalperiod=9
+    )
+    obv = servico.ultimo("OBV", janela, "BTCUSDT", "1m")
+    assert servico.incrementais == 3
+    np.testing.assert_allclose(ema, referencia["ema"][-1], rtol=1e-9)
+    np.testing.assert_allclose(macd, referencia["macd"][-1], rtol=1e-9)
+    np.testing.assert_allclose(obv, referencia["obv"][-1], rtol=1e-9)
+
+    # Parâmetros sem equivalente e outro par continuam no TA-Lib
+    servico.ultimo("EMA", janela, "BTCUSDT", "1m", timeperiod=9)
+    servico.ultimo("EMA", janela, "ETHUSDT", "1m", timeperiod=21)
+    assert servico.incrementais == 3
+
+
+def test_servico_so_usa_o_motor_no_mesmo_candle_e_janela_estavel():
+    candles = _candles(300)
+    motor = MotorIndicadoresIncrementais()
+    motor.carregar("BTCUSDT", "1m", candles)
+    servico = ServicoIndicadores()
+    servico.usar_motor_incremental(motor)
+
+    # Janela mais curta que a série do motor, mas maior que a janela estável
+    janela = candles[-200:]
+    ema = servico.ultimo("EMA", janela, "BTCUSDT", "1m", timeperiod=21)
+    assert servico.incrementais == 1
+    c = np.array(janela, dtype=np.float64)[:, 4]
+    np.testing.assert_allclose(ema, talib.EMA(c, timeperiod=21)[-1], rtol=1e-6)
+    # OBV é acumulado: só com a mesma origem da janela
+    servico.ultimo("OBV", janela, "BTCUSDT", "1m")
+    assert servico.incrementais == 1
+
+    # Candle aberto revisado depois do snapshot: o motor não corresponde
+    revisado = candles[:-1] + [candles[-1][:4] + [candles[-1][4] + 1, candles[-1][5]]]
+    servico.ultimo("RSI", revisado, "BTCUSDT", "1m", timeperiod=14)
+    assert servico.incrementais == 1
@@ -0,0 +1,120 @@
+from functools import partial
+
+import numpy as np
+import pytest
+import talib
+
+from auxiliares import candles_sinteticos
+from utils.candles_colunares import como_candles
+from utils.indicadores_matriciais import (
+    ESPECIFICACAO_UNIVERSO,
+    armazenar_lote,
+    calcular_universo,
+    empilhar,
+    especificacao_universo,
+    lote_universo,
+    ultimos_valores,
+)
+from utils.plano_execucao import NoPlano, chave_indicador
+from utils.servico_indicadores import ServicoIndicadores
+
+MINUTO = 60000
+
+
+_candles = partial(candles_sinteticos, repetidos=(40, 44))
+
+
+def _talib(candles, nome, params):
+    _, o, h, l, c, v = np.array(candles, dtype=np.float64).T
+    if nome == "ATR":
+        return talib.ATR(h, l, c, **params)
+    return getattr(talib, nome)(c, **params)
+
+
+@pytest.mark.parametrize("nome,params", ESPECIFICACAO_UNIVERSO)
+def test_matriz_igual_ao_talib_por_par(nome, params):
+    universo = {f"PAR{i}USDT": _candles(200, semente=i) for i in range(5)}
+    series = calcular_universo(universo, [(nome, params)])
+    chave = chave_indicador(nome, params)
+    assert set(series) == set(universo)
+    for symbol, candles in universo.items():
+        atual, esperado = series[symbol][chave], _talib(candles, nome, params)
+        if isinstance(esperado, tuple):
+            for a, e in zip(atual, esperado):
+                np.testing.assert_allclose(a, e, rtol=1e-9, equal_nan=True)
+        else:
+            np.testing.assert_allclose(atual, esperado, rtol=1e-9, equal_nan=True)
+
+
+def test_agrupa_apenas_series_alinhadas():
+    universo = {
+        "AUSDT": _candles(150, 1),
+        "BUSDT": _candles(150, 2),
+        "CUSDT": _candles(120, 3),  # tamanho diferente
+        "DUSDT": _candles(150, 4, inicio=1710000000000 + MINUTO),  # defasado
+        "EUSDT": [],
+    }
+    grupos = sorted(empilhar(universo), key=len, reverse=True)
+    assert [m.symbols for m in grupos] == [["AUSDT", "BUSDT"], ["CUSDT"], ["DUSDT"]]
+    assert grupos[0].colunas.shape == (6, 2, 150)
+
+    series = calcular_universo(universo, min_pares=2)
+    assert set(series) == {"AUSDT", "BUSDT"}
+    valores = ultimos_valores(series["AUSDT"])
+    assert valores[chave_indicador("RSI", {"timeperiod": 14})] is not None
+    assert len(valores[chave_indicador(*ESPECIFICACAO_UNIVERSO[4])]) == 3
+
+
+def test_series_gravadas_no_cache_do_servico():
+    servico = ServicoIndicadores(capacidade=64)
+    universo = {
+        s: como_candles(_candles(100, i)) for i, s in enumerate(("AUSDT", "BUSDT"))
+    }
+    especificacao = especificacao_universo()
+    calcular_universo(universo, especificacao, timeframe="1m", servico=servico)
+
+    candles = universo["AUSDT"]
+    atr = servico.calcular("ATR", candles, "AUSDT", "1m", timeperiod=14)
+    upper, _, _ = servico.calcular(
+        "BBANDS",
+        candles,
+        "AUSDT",
+        "1m",
+        timeperiod=20,
+        nbdevup=2.0,
+        nbdevdn=2.0,
+        matype=0,
+    )
+    assert servico.acertos == 2 and servico.falhas == 0
+    assert not atr.flags.writeable
+    np.testing.assert_allclose(
+        atr, _talib(candles, "ATR", {"timeperiod": 14}), rtol=1e-9, equal_nan=True
+    )
+
+
+def test_especificacao_inclui_indicadores_do_plano_sem_repetir():
+    plano = [
+        NoPlano("indicador:ATR", "indicador", "ATR", params={"timeperiod": 14}),
+        NoPlano("indicador:SMA", "indicador", "SMA", params={"timeperiod": 50}),
+        NoPlano("indicador:ADX", "indicador", "ADX", params={"timeperiod": 14}),
+    ]
+    especificacao = especificacao_universo(indicadores_plano=plano)
+    chaves = [chave_indicador(n, p) for n, p in especificacao]
+    assert len(chaves) == len(set(chaves)) == len(ESPECIFICACAO_UNIVERSO) + 1
+    assert chave_indicador("SMA", {"timeperiod": 50}) in chaves
+    assert not any(c.startswith("ADX") for c in chaves)  # sem kernel matricial
+
+
+def test_lote_de_um_par_gravado_so_antes_da_analise():
+    universo = {f"P{i}USDT": _candles(100, i) for i in range(40)}
+    especificacao = especificacao_universo()
+    series = calcular_universo(universo, especificacao)
+    # Capacidade menor que o universo inteiro: cada par entra só na sua vez
+    servico = ServicoIndicadores(capacidade=len(especificacao))
+    for symbol, candles in universo.items():
+        lote = lote_universo(series[symbol], especificacao)
+        assert [(n, p) for n, p, _ in lote] == especificacao
+        gravadas = armazenar_lote(servico, lote, candles, symbol, "1m")
+        assert gravadas == sum(servico.conhece(n) for n, _ in especificacao)
+        servico.calcular("RSI", candles, symbol, "1m", timeperiod=14)
+    assert servico.falhas == 0 and servico.acertos == len(universo)
@@ -0,0 +1,99 @@
+from functools import partial
+
+import numpy as np
+import pytest
+import talib
+
+from auxiliares import candles_sinteticos
+from plugins.indicadores.outros_indicadores import OutrosIndicadores
+from utils import kernels_outros
+from utils.kernels_outros import maximos_minimos_moveis, pivot_points
+
+_candles = partial(candles_sinteticos, semente=3, passo=3600000, repetidos=(30, 35))
+
+
+@pytest.mark.parametrize(
+    "kernel",
+    [kernels_outros._maximos_minimos_filas, kernels_outros._maximos_minimos_numpy],
+)
+def test_maximos_minimos_iguais_ao_talib(kernel):
+    dados = np.array(_candles(200), dtype=np.float64)
+    high, low = dados[:, 2].copy(), dados[:, 3].copy()
+    janelas = np.array([2, 9, 26, 52, 250], dtype=np.int64)
+    maximos, minimos = kernel(high, low, janelas)
+    for j, janela in enumerate(janelas):
+        np.testing.assert_array_equal(maximos[j], talib.MAX(high, timeperiod=janela))
+        np.testing.assert_array_equal(minimos[j], talib.MIN(low, timeperiod=janela))
+
+
+def test_janela_invalida():
+    with pytest.raises(ValueError):
+        maximos_minimos_moveis(np.ones(5), np.ones(5), (0, 3))
+
+
+def _ichimoku_anterior(high, low, close, periodos, shift):
+    """Cálculo do Ichimoku antes dos kernels (6x talib.MAX/MIN)."""
+    linhas = {
+        nome: (
+            talib.MAX(high, timeperiod=periodos[f"ichimoku_{nome}"])
+            + talib.MIN(low, timeperiod=periodos[f"ichimoku_{nome}"])
+        )
+        / 2
+        for nome in ("tenkan", "kijun", "senkou_b")
+    }
+    senkou_span_a = np.roll((linhas["tenkan"] + linhas["kijun"]) / 2, shift)
+    senkou_span_a[:shift] = np.nan
+    chikou_span = np.roll(close.copy(), -shift)
+    chikou_span[-shift:] = np.nan
+    return {
+        "tenkan_sen": linhas["tenkan"],
+        "kijun_sen": linhas["kijun"],
+        "senkou_span_a": senkou_span_a,
+        "senkou_span_b": linhas["senkou_b"],
+        "chikou_span": chikou_span,
+    }
+
+
+@pytest.mark.parametrize("shift", [None, 26])
+def test_plugin_mantem_o_resultado_anterior(shift):
+    candles = _candles(200)
+    plugin = OutrosIndicadores()
+    if shift is None:
+        plugin.config.pop("ichimoku_shift", None)
+    else:
+        plugin.config["ichimoku_shift"] = shift
+    dados = {"symbol": "BTCUSDT", "timeframe": "1h", "crus": candles}
+    resultado = plugin.executar(dados_completos=dados, symbol="BTCUSDT", timeframe="1h")
+
+    _, _, high, low, close, _ = np.array(candles, dtype=np.float64).T
+    periodos = plugin.config["periodos"]
+    janela = periodos["fibonacci_janela"]
+    maximo, minimo = np.max(high[-janela:]), np.min(low[-janela:])
+    pp = (high[-1] + low[-1] + close[-1]) / 3
+
+    outros = resultado["outros"]
+    # Sem ichimoku_shift na configuração vale o deslocamento padrão (26)
+    anterior = _ichimoku_anterior(high, low, close, periodos, shift or 26)
+    atual = plugin._calcular_ichimoku(high, low, close)
+    for nome, serie in anterior.items():
+        np.testing.assert_array_equal(atual[nome], serie)
+    assert outros["ichimoku"] == {
+        nome: None if np.isnan(serie[-1]) else float(serie[-1])
+        for nome, serie in anterior.items()
+    }
+    assert outros["fibonacci"] == {
+        nivel: round(maximo - (maximo - minimo) * fator, 2)
+        for nivel, fator in (
+            ("23.6%", 0.236),
+            ("38.2%", 0.382),
+            ("50%", 0.5),
+            ("61.8%", 0.618),
+        )
+    }
+    assert outros["pivot_points"] == {
+        "PP": round(pp, 2),
+        "R1": round(2 * pp - low[-1], 2),
+        "S1": round(2 * pp - high[-1], 2),
+    }
+    assert dados["outros"] == outros
+    assert pivot_points(3.0, 1.0, 2.0) == (2.0, 3.0, 1.0)
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+import ccxt
+from utils.limitador_taxa import (
+    LimitadorTaxa,
+    PRIORIDADE_MERCADO,
+    PRIORIDADE_ORDEM,
+    classificar_requisicao,
+)
+
+
+def test_classificar_requisicao():
+    assert classificar_requisicao("public", "v5/market/kline") == (
+        "publico",
+        PRIORIDADE_MERCADO,
+    )
+    assert classificar_requisicao("private", "v5/order/create") == (
+        "privado",
+        PRIORIDADE_ORDEM,
+    )
+    assert (
+        classificar_requisicao(["private"], "v5/account/wallet-balance")[0] == "privado"
+    )
+
+
+def test_token_bucket_respeita_taxa():
+    limitador = LimitadorTaxa({"publico": {"taxa": 100.0, "capacidade": 1.0}})
+    inicio = time.monotonic()
+    for _ in range(21):
+        limitador.adquirir("publico", 1.0)
+    decorrido = time.monotonic() - inicio
+    assert decorrido >= 0.18
+    assert limitador.metricas()["publico"]["adquiridos"] == 21
+
+
+def test_orcamentos_publico_e_privado_separados():
+    limitador = LimitadorTaxa(
+        {
+            "publico": {"taxa": 1.0, "capacidade": 1.0},
+            "privado": {"taxa": 1.0, "capacidade": 1.0},
+        }
+    )
+    limitador.adquirir("publico", 1.0)
+    # O orçamento privado não é afetado pelo público esgotado
+    assert limitador.adquirir("privado", 1.0, PRIORIDADE_ORDEM) < 0.05
+
+
+def test_ordens_tem_prioridade_sobre_mercado():
+    limitador = LimitadorTaxa({"privado": {"taxa": 20.0, "capacidade": 1.0}})
+    limitador.adquirir("privado", 1.0)
+    ordem_chegada = []
+
+    def pedir(prioridade, rotulo):
+        limitador.adquirir("privado", 1.0, prioridade)
+        ordem_chegada.append(rotulo)
+
+    baixas = [
+        threading.Thread(target=pedir, args=(PRIORIDADE_MERCADO, f"mercado{i}"))
+        for i in range(3)
+    ]
+    for t in baixas:
+        t.start()
+    time.sleep(0.01)
+    alta = threading.Thread(target=pedir, args=(PRIORIDADE_ORDEM, "ordem"))
+    alta.start()
+    time.sleep(0.01)
+    assert limitador.metricas()["privado"]["fila"] == 4
+    for t in baixas + [alta]:
+        t.join()
+    assert ordem_chegada.index("ordem") <= 1
+    assert limitador.metricas()["privado"]["fila_maxima"] >= 4
+
+
+def test_adquirir_interrompido_libera_a_fila(monkeypatch):
+    limitador = LimitadorTaxa({"privado": {"taxa": 1.0, "capacidade": 1.0}})
+    limitador.adquirir("privado", 1.0)
+    interrupcoes = []
+
+    class Interrompida(Exception):
+        pass
+
+    def interromper(segundos):
+        interrupcoes.append(segundos)
+        raise Interrompida
+
+    monkeypatch.setattr("utils.limitador_taxa.time.sleep", interromper)
+    try:
+        limitador.adquirir("privado", 1.0, PRIORIDADE_ORDEM)
+    except Interrompida:
+        pass
+    assert interrupcoes
+    # A ordem abandonada não bloqueia as requisições de mercado seguintes
+    assert limitador.metricas()["privado"]["fila"] == 0
+
+
+def test_adquirir_async_compartilha_orcamento():
+    limitador = LimitadorTaxa({"publico": {"taxa": 200.0, "capacidade": 1.0}})
+
+    async def varias():
+        await asyncio.gather(
+            *(limitador.adquirir_async("publico", 1.0) for _ in range(11))
+        )
+
+    inicio = time.monotonic()
+    asyncio.run(varias())
+    assert time.monotonic() - inicio >= 0.045
+    assert limitador.metricas()["publico"]["fila"] == 0
+
+
+def test_instalar_em_cliente_ccxt_usa_custo_do_endpoint():
+    limitador = LimitadorTaxa()
+    cliente = ccxt.bybit()
+    cliente.fetch = lambda *args, **kwargs: {}
+    limitador.instalar(cliente)
+    cliente.publicGetV5MarketKline({"symbol": "BTCUSDT", "interval": "1"})
+    metricas = limitador.metricas()
+    assert metricas["publico"]["adquiridos"] == 1
+    assert metricas["privado"]["adquiridos"] == 0
+    # Custo do kline no CCXT (5 unidades) debitado do orçamento público
+    assert metricas["publico"]["tokens"] < 50.0
@@ -1,4 +1,6 @@
 import pytest
+from auxiliares import ClienteFalso, ConexaoFalsa
+from auxiliares import candles_lineares as _candles
 from plugins.obter_dados import ObterDados
 from plugins.conexao import Conexao
 
@@ -29,3 +31,205 @@ def test_obter_candles_reais(plugin_obter_dados):
         assert isinstance(candle, list)
         assert len(candle) >= 5
         assert all(isinstance(x, (int, float)) for x in candle[:5])
+
+
+def test_busca_incremental_com_since():
+    cliente = ClienteFalso(_candles(30))
+    plugin = ObterDados(conexao=ConexaoFalsa(cliente))
+    dados = {}
+    plugin.executar(dados, "BTCUSDT", "1m", limit=10)
+    assert dados["crus"] == cliente.candles[-10:]
+    assert cliente.chamadas[-1]["since"] is None
+
+    # Candle aberto atualizado e um novo candle fechado
+    cliente.candles[-1][4] = 555.0
+    cliente.candles.append([cliente.candles[-1][0] + 60000, 1.0, 2.0, 0.5, 1.5, 3.0])
+    plugin.executar(dados, "BTCUSDT", "1m", limit=10)
+    assert cliente.chamadas[-1]["since"] == cliente.candles[-2][0]
+    assert len(dados["crus"]) == 10
+    assert dados["crus"] == cliente.candles[-10:]
+    assert dados["crus"][-2][4] == 555.0
+
+
+def test_lacuna_recarrega_historico():
+    cliente = ClienteFalso(_candles(10))
+    plugin = ObterDados(conexao=ConexaoFalsa(cliente))
+    dados = {}
+    plugin.executar(dados, "BTCUSDT", "1m", limit=5)
+    cliente.candles.extend(_candles(20, inicio=cliente.candles[-1][0] + 60000))
+    plugin.executar(dados, "BTCUSDT", "1m", limit=5)
+    assert cliente.chamadas[-1]["since"] is None
+    assert dados["crus"] == cliente.candles[-5:]
+
+
+class ClienteAsyncFalso:
+    """Cliente assíncrono que mede a concorrência máxima das requisições."""
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.em_voo = 0
+        self.max_em_voo = 0
+        self.chamadas = 0
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        import asyncio
+
+        self.chamadas += 1
+        self.em_voo += 1
+        self.max_em_voo = max(self.max_em_voo, self.em_voo)
+        await asyncio.sleep(0.01)
+        self.em_voo -= 1
+        return [list(c) for c in self.candles[-limit:]]
+
+
+class ConexaoAsyncFalsa(ConexaoFalsa):
+    def __init__(self, cliente, cliente_async):
+        super().__init__(cliente)
+        self.cliente_async = cliente_async
+
+    def obter_cliente_async(self):
+        return self.cliente_async
+
+    def executar_async(self, corrotina, timeout=None):
+        import asyncio
+
+        return asyncio.run(corrotina)
+
+
+def test_buscar_em_lote_concorrente_alimenta_executar():
+    cliente = ClienteFalso(_candles(30))
+    cliente_async = ClienteAsyncFalso(_candles(30))
+    plugin = ObterDados(conexao=ConexaoAsyncFalsa(cliente, cliente_async))
+    pares = [f"PAR{i}USDT" for i in range(10)]
+    timeframes = ["1m", "5m"]
+
+    obtidos = plugin.buscar_em_lote(pares, timeframes, limit=10, concorrencia=4)
+    assert obtidos == 20
+    assert cliente_async.chamadas == 20
+    assert 1 < cliente_async.max_em_voo <= 4
+
+    dados = {}
+    plugin.executar(dados, "PAR3USDT", "5m", limit=10)
+    assert dados["crus"] == cliente_async.candles[-10:]
+    # Nenhuma requisição síncrona: o resultado já estava pronto
+    assert cliente.chamadas == []
+
+
+class ConexaoSemInfoNoLoop(ConexaoAsyncFalsa):
+    """Falha se obter_info_par (síncrono) rodar dentro do event loop."""
+
+    def obter_info_par(self, symbol):
+        import asyncio
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return super().obter_info_par(symbol)
+        raise AssertionError("obter_info_par chamado dentro do event loop")
+
+
+def test_symbol_da_exchange_resolvido_fora_do_event_loop():
+    import asyncio
+
+    cliente_async = ClienteAsyncFalso(_candles(30))
+    conexao = ConexaoSemInfoNoLoop(ClienteFalso(_candles(30)), cliente_async)
+    plugin = ObterDados(conexao=conexao)
+    assert plugin.buscar_em_lote(["AUSDT", "BUSDT"], ["1m", "5m"], limit=10) == 4
+
+    # Sem o symbol já resolvido, a corrotina consulta em outra thread
+    assert asyncio.run(plugin._buscar_candles_async(cliente_async, "CUSDT", "1m", 10))
+
+
+class ClienteAsyncMultiTimeframe:
+    """Exchange assíncrona que agrega um histórico de 15m nos demais timeframes."""
+
+    def __init__(self, base):
+        self.base = base
+        self.chamadas = []
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        from utils.reamostragem_candles import reamostrar
+
+        self.chamadas.append(timeframe)
+        if timeframe == "15m":
+            candles = self.base
+        else:
+            candles = reamostrar(self.base, timeframe, descartar_incompleto=False)
+            candles = [[int(c[0])] + c[1:] for c in candles.tolist()]
+        if since is not None:
+            return [list(c) for c in candles if c[0] >= since][:limit]
+        return [list(c) for c in candles[-limit:]]
+
+
+def test_buscar_em_lote_deriva_timeframes_maiores_do_base():
+    import asyncio
+
+    from utils.reamostragem_candles import ReamostradorCandles
+
+    base = _candles(800, inicio=1704067200000, passo=15 * 60000)
+    cliente_async = ClienteAsyncMultiTimeframe(base)
+    plugin = ObterDados(conexao=ConexaoAsyncFalsa(None, cliente_async))
+    plugin._reamostrador = ReamostradorCandles(
+        plugin._armazem, "15m", ["15m", "1h", "4h"]
+    )
+    timeframes = ["15m", "1h", "4h"]
+
+    # Primeira carga: todos os timeframes vêm da exchange
+    assert plugin.buscar_em_lote(["BTCUSDT"], timeframes, limit=20) == 3
+    assert sorted(cliente_async.chamadas) == ["15m", "1h", "4h"]
+
+    # Ciclos seguintes: só o timeframe base é consultado
+    for _ in range(9):
+        ultimo = base[-1]
+        base.append([ultimo[0] + 15 * 60000, 1.0, 3.0, 0.5, 2.0, 7.0])
+    cliente_async.chamadas.clear()
+    assert plugin.buscar_em_lote(["BTCUSDT"], timeframes, limit=20) == 3
+    assert cliente_async.chamadas == ["15m"]
+
+    for tf in ("1h", "4h"):
+        dados = {}
+        plugin.executar(dados, "BTCUSDT", tf, limit=20)
+        esperado = asyncio.run(cliente_async.fetch_ohlcv("BTCUSDT", tf, limit=20))
+        assert dados["crus"] == esperado
+
+
+def test_streaming_sinaliza_fechamento_dos_timeframes_derivados():
+    from utils.reamostragem_candles import ReamostradorCandles
+
+    class StreamFalso:
+        def consumir_fechamentos(self):
+            return {"BTCUSDT": {"15m"}}
+
+    plugin = ObterDados(conexao=ConexaoFalsa(None))
+    plugin._reamostrador = ReamostradorCandles(
+        plugin._armazem, "15m", ["15m", "1h", "4h"]
+    )
+    plugin._stream = StreamFalso()
+    buffer = plugin._armazem.obter_buffer("BTCUSDT", "15m")
+    # Candle das 02:45 fecha o candle de 1h, mas não o de 4h
+    buffer.atualizar(_candles(1, inicio=1704067200000 + 11 * 15 * 60000))
+    plugin._ao_fechar_candle("BTCUSDT", "15m")
+    assert plugin.consumir_fechamentos() == {"BTCUSDT": {"15m", "1h"}}
+    # Candle das 07:45 fecha 1h e 4h
+    buffer.atualizar(_candles(1, inicio=1704067200000 + 31 * 15 * 60000))
+    plugin._ao_fechar_candle("BTCUSDT", "15m")
+    assert plugin.consumir_fechamentos() == {"BTCUSDT": {"15m", "1h", "4h"}}
+
+
+def test_reinicio_com_armazem_persistente_busca_so_candles_novos(tmp_path):
+    from utils.armazem_candles_disco import ArmazemCandlesDisco
+
+    cliente = ClienteFalso(_candles(30))
+    plugin = ObterDados(conexao=ConexaoFalsa(cliente))
+    plugin._armazem = ArmazemCandlesDisco(str(tmp_path))
+    plugin.executar({}, "BTCUSDT", "1m", limit=10)
+    plugin.finalizar()
+
+    # Novo processo do bot: o histórico vem do disco e só o delta da exchange
+    cliente.candles.append([cliente.candles[-1][0] + 60000, 1.0, 2.0, 0.5, 1.5, 3.0])
+    reiniciado = ObterDados(conexao=ConexaoFalsa(cliente))
+    reiniciado._armazem = ArmazemCandlesDisco(str(tmp_path))
+    dados = {}
+    reiniciado.executar(dados, "BTCUSDT", "1m", limit=10)
+    assert cliente.chamadas[-1]["since"] == cliente.candles[-2][0]
+    assert dados["crus"] == cliente.candles[-10:]
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+from plugins.gerenciadores.gerenciador_banco import GerenciadorBanco
+from utils.pipeline_estagios import (
+    Estagio,
+    PipelineEstagios,
+    adiando_persistencia,
+    persistir_adiadas,
+)
+
+
+def _pipeline(buscar, analisar, persistir, capacidade=8):
+    return PipelineEstagios(
+        [
+            Estagio("buscar", buscar, workers=2, capacidade=capacidade),
+            Estagio("analisar", analisar, workers=2, capacidade=capacidade),
+            Estagio("persistir", persistir, workers=1, capacidade=capacidade),
+        ]
+    )
+
+
+def test_itens_percorrem_os_estagios():
+    def analisar(item):
+        if item == 3:
+            return None  # descartado
+        if item == 4:
+            raise RuntimeError("falhou")
+        return item * 10
+
+    pipeline = _pipeline(lambda i: i + 1, analisar, lambda i: f"ok-{i}")
+    try:
+        futuros = [pipeline.submeter(i) for i in range(6)]
+        resultados = [f.result(timeout=5) for f in futuros]
+    finally:
+        pipeline.encerrar()
+    assert resultados == ["ok-10", "ok-20", False, False, "ok-50", "ok-60"]
+
+    metricas = pipeline.metricas()
+    assert metricas["buscar"]["processados"] == 6
+    assert metricas["analisar"]["erros"] == 1
+    assert metricas["persistir"]["processados"] == 4
+    assert set(metricas["buscar"]) >= {
+        "profundidade",
+        "profundidade_maxima",
+        "capacidade",
+        "workers",
+        "espera_media",
+        "espera_p95",
+        "servico_medio",
+        "servico_p95",
+        "bloqueio_total",
+    }
+
+
+def test_contrapressao_e_gargalo():
+    liberar = threading.Event()
+
+    def persistir(item):
+        liberar.wait(timeout=5)
+        time.sleep(0.01)
+        return item
+
+    pipeline = _pipeline(lambda i: i, lambda i: i, persistir, capacidade=1)
+    try:
+        entregues = []
+
+        def entregar():
+            for i in range(10):
+                entregues.append(pipeline.submeter(i))
+
+        alimentador = threading.Thread(target=entregar)
+        alimentador.start()
+        time.sleep(0.3)
+        # Persistência parada: filas cheias seguram a entrega
+        assert len(entregues) < 10
+        liberar.set()
+        alimentador.join(timeout=5)
+        assert [f.result(timeout=5) for f in entregues] == list(range(10))
+    finally:
+        pipeline.encerrar()
+    metricas = pipeline.metricas()
+    assert metricas["buscar"]["bloqueio_total"] > 0
+    assert metricas["gargalo"] == "persistir"
+
+
+def test_item_cancelado_na_fila_nao_executa():
+    executados = []
+    inicio = threading.Event()
+    liberar = threading.Event()
+
+    def buscar(item):
+        executados.append(item)
+        inicio.set()
+        liberar.wait(timeout=5)
+        return item
+
+    pipeline = PipelineEstagios([Estagio("buscar", buscar, workers=1)])
+    try:
+        primeiro = pipeline.submeter("a")
+        inicio.wait(timeout=5)
+        segundo = pipeline.submeter("b")
+        assert segundo.cancel() and not primeiro.cancel()
+        liberar.set()
+        assert primeiro.result(timeout=5) == "a"
+    finally:
+        pipeline.encerrar()
+    assert executados == ["a"]
+
+
+def test_persistencia_adiada_do_gerenciador_banco():
+    class BancoDadosFalso:
+        def __init__(self):
+            self.inseridos = []
+
+        def inserir(self, tabela, dados):
+            self.inseridos.append((tabela, dados))
+            return True
+
+    banco = GerenciadorBanco()
+    banco._banco_dados = BancoDadosFalso()
+    with adiando_persistencia() as pendentes:
+        assert banco.persistir_dados("plugin", "tabela", {"valor": 1})
+    assert banco._banco_dados.inseridos == [] and len(pendentes) == 1
+
+    assert persistir_adiadas(pendentes) == 1
+    assert banco._banco_dados.inseridos == [("tabela", {"valor": 1})]
+    # Fora do bloco a gravação é imediata
+    banco.persistir_dados("plugin", "tabela", {"valor": 2})
+    assert len(banco._banco_dados.inseridos) == 2
+
+
+def test_estagio_invalido():
+    with pytest.raises(ValueError):
+        Estagio("buscar", lambda i: i, workers=0)
+    with pytest.raises(ValueError):
+        PipelineEstagios([])
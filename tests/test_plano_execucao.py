@@ -0,0 +1,248 @@
+import numpy as np
+import pytest
+
+from plugins.calculo_alavancagem import CalculoAlavancagem
+from plugins.gerenciadores.gerenciador_plugins import GerenciadorPlugins
+from plugins.indicadores.indicadores_tendencia import IndicadoresTendencia
+from plugins.indicadores.indicadores_volatilidade import IndicadoresVolatilidade
+from plugins.indicadores.indicadores_volume import IndicadoresVolume
+from plugins.medias_moveis import MediasMoveis
+from plugins.sinais_plugin import SinaisPlugin
+from utils.plano_execucao import compilar_plano, declaracao_plugin, executar_plano
+from utils.servico_indicadores import obter_servico_indicadores
+
+
+class Falso:
+    """Plugin mínimo: registra a execução e escreve as chaves produzidas."""
+
+    PLUGIN_TAGS = ["analise"]
+
+    def __init__(self, nome, consome=None, produz=(), indicadores=(), log=None):
+        self.nome = nome
+        self.PLUGIN_CONSOME = consome
+        self.PLUGIN_PRODUZ = list(produz)
+        self._indicadores = list(indicadores)
+        self._log = log if log is not None else []
+
+    def indicadores_requeridos(self):
+        return self._indicadores
+
+    def executar(self, dados_completos, symbol, timeframe):
+        self._log.append(self.nome)
+        return {chave: self.nome for chave in self.PLUGIN_PRODUZ}
+
+
+def _plano(*plugins):
+    return compilar_plano([declaracao_plugin(p) for p in plugins])
+
+
+def test_independentes_no_mesmo_estagio_e_leitor_apos_escritor():
+    plano = _plano(
+        Falso("a", ["crus"], ["x"]),
+        Falso("b", ["crus"], ["y"]),
+        Falso("c", ["x", "y"], ["z"]),
+        Falso("d", ["crus"], ["w"]),
+    )
+    assert plano.estagios == [
+        ["plugin:a", "plugin:b", "plugin:d"],
+        ["plugin:c"],
+    ]
+    assert plano.nos["plugin:c"].dependencias == ("plugin:a", "plugin:b")
+    assert plano.plugins == ["a", "b", "d", "c"]
+
+
+def test_leitor_espera_escritor_posterior_e_escritas_mantem_a_ordem():
+    plano = _plano(
+        Falso("leitor", ["x"], ["y"]),
+        Falso("escritor1", ["crus"], ["x"]),
+        Falso("escritor2", ["x"], ["x"]),
+    )
+    # O leitor espera todos os escritores de x; escritor2 lê e reescreve x
+    assert plano.plugins == ["escritor1", "escritor2", "leitor"]
+    assert plano.nos["plugin:escritor2"].dependencias == ("plugin:escritor1",)
+    assert plano.nos["plugin:leitor"].dependencias == (
+        "plugin:escritor1",
+        "plugin:escritor2",
+    )
+    assert plano.nao_produzidas == []
+
+
+def test_ciclo_nas_declaracoes():
+    with pytest.raises(ValueError):
+        _plano(Falso("a", ["x"], ["y"]), Falso("b", ["y"], ["x"]))
+
+
+def test_plugin_sem_declaracao_e_barreira():
+    plano = _plano(
+        Falso("a", ["crus"], ["x"]),
+        Falso("legado"),
+        Falso("b", ["crus"], ["y"]),
+        Falso("c", ["fora_do_plano"], []),
+    )
+    assert [len(e) for e in plano.estagios] == [1, 1, 2]
+    assert plano.nos["plugin:b"].dependencias == ("plugin:legado",)
+    assert plano.nao_produzidas == ["fora_do_plano"]
+
+    # Leitura antes da barreira não espera escrita depois dela
+    plano = _plano(Falso("a", ["x"], []), Falso("legado"), Falso("b", [], ["x"]))
+    assert plano.plugins == ["a", "legado", "b"]
+
+
+def test_indicadores_iguais_viram_um_no():
+    atr = ("ATR", {"timeperiod": 14})
+    plano = _plano(
+        Falso("a", ["crus"], ["x"], [atr, ("SMA", {"timeperiod": 20})]),
+        Falso("b", ["crus"], ["y"], [("ATR", {"timeperiod": 14})]),
+    )
+    indicadores = {no.id: no for no in plano.indicadores}
+    assert set(indicadores) == {
+        "indicador:ATR(timeperiod=14)",
+        "indicador:SMA(timeperiod=20)",
+    }
+    assert indicadores["indicador:ATR(timeperiod=14)"].consumidores == ["a", "b"]
+    assert plano.estagios[0][:2] == list(indicadores)
+    descricao = plano.descrever()
+    assert descricao["paralelismo_maximo"] == 2
+    assert descricao["nos"]["plugin:b"]["dependencias"] == [
+        "indicador:ATR(timeperiod=14)"
+    ]
+
+
+def test_plano_dos_plugins_reais():
+    plugins = [
+        CalculoAlavancagem(),
+        MediasMoveis(),
+        IndicadoresVolatilidade(),
+        IndicadoresVolume(),
+        IndicadoresTendencia(gerente=None),
+        SinaisPlugin(),
+    ]
+    plano = _plano(*plugins)
+    sinais = plano.nos["plugin:sinais_plugin"]
+    assert {"plugin:indicadores_volume", "plugin:indicadores_tendencia"} <= set(
+        sinais.dependencias
+    )
+    assert sinais.estagio == 2
+    atr = plano.nos["indicador:ATR(timeperiod=14)"]
+    assert atr.consumidores == [
+        "calculo_alavancagem",
+        "medias_moveis",
+        "indicadores_volatilidade",
+    ]
+    # Analisadores independentes entre si: só esperam os próprios indicadores
+    estagios = {p.nome: plano.nos[f"plugin:{p.nome}"].estagio for p in plugins}
+    assert estagios == {
+        "calculo_alavancagem": 1,
+        "medias_moveis": 1,
+        "indicadores_volatilidade": 1,
+        "indicadores_volume": 0,
+        "indicadores_tendencia": 0,
+        "sinais_plugin": 2,
+    }
+
+
+def test_gerente_reaproveita_o_plano_e_executa_em_ordem():
+    log = []
+    gerente = GerenciadorPlugins()
+    gerente.plugins = {
+        "c": Falso("c", ["x"], ["z"], log=log),
+        "a": Falso("a", ["crus"], ["x"], [("SMA", {"timeperiod": 3})], log=log),
+        "mercado": Falso("mercado", log=log),
+    }
+    # c lê o que a escreve: roda depois, mesmo registrado antes
+    plano = gerente.planejar("analise", excluir=["mercado"])
+    assert gerente.planejar("analise", excluir=["mercado"]) is plano
+    assert gerente.plano_execucao is plano
+    assert plano.plugins == ["a", "c"]
+
+    servico = obter_servico_indicadores()
+    servico.limpar()
+    crus = [[1710000000000 + i * 60000, 1.0, 2.0, 0.5, 1.0 + i, 3.0] for i in range(10)]
+    dados = {"symbol": "BTCUSDT", "timeframe": "1m", "crus": crus}
+    gerente.executar_plano(plano, dados, "BTCUSDT", "1m")
+    assert log == ["a", "c"]
+    assert dados["x"] == "a" and dados["z"] == "c"
+    # SMA já está no cache para o plugin consumidor
+    acertos = servico.acertos
+    sma = servico.calcular("SMA", crus, "BTCUSDT", "1m", timeperiod=3)
+    assert servico.acertos == acertos + 1
+    np.testing.assert_allclose(sma[-1], np.mean([8.0, 9.0, 10.0]))
+
+    # Declaração alterada: novo plano
+    gerente.plugins["c"].PLUGIN_CONSOME = ["crus"]
+    assert gerente.planejar("analise", excluir=["mercado"]) is not plano
+
+    # Ciclo: volta à ordem sequencial original
+    gerente.plugins["c"].PLUGIN_CONSOME = ["x"]
+    gerente.plugins["a"].PLUGIN_CONSOME = ["z"]
+    assert gerente.planejar("analise", excluir=["mercado"]).plugins == ["c", "a"]
+
+
+class EscreveNoDicionario(Falso):
+    """Escreve direto em dados_completos, inclusive uma chave não declarada."""
+
+    def __init__(self, *args, barreira=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._barreira = barreira
+
+    def executar(self, dados_completos, symbol, timeframe):
+        if self._barreira is not None:
+            self._barreira.wait(timeout=5)
+        for chave in self.PLUGIN_PRODUZ:
+            dados_completos[chave] = f"{self.nome}:{dados_completos.get('base')}"
+        dados_completos["rascunho"] = self.nome
+        return None
+
+
+def test_estagio_em_paralelo_com_namespace_por_plugin():
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Barrier
+
+    # a e b só terminam se rodarem ao mesmo tempo
+    barreira = Barrier(2)
+    plugins = [
+        EscreveNoDicionario("a", ["crus"], ["x"], barreira=barreira),
+        EscreveNoDicionario("b", ["crus"], ["y"], barreira=barreira),
+        Falso("c", ["x", "y"], ["z"]),
+    ]
+    plano = _plano(*plugins)
+    dados = {"symbol": "BTCUSDT", "timeframe": "1m", "crus": [], "base": 1}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        executar_plano(plano, dados, "BTCUSDT", "1m", executor)
+    assert dados["x"] == "a:1" and dados["y"] == "b:1" and dados["z"] == "c"
+    # Escrita fora de PLUGIN_PRODUZ fica no namespace do plugin
+    assert "rascunho" not in dados
+
+    plugins[0]._barreira = plugins[1]._barreira = None
+    sequencial = {"symbol": "BTCUSDT", "timeframe": "1m", "crus": [], "base": 1}
+    executar_plano(plano, sequencial, "BTCUSDT", "1m")
+    sequencial.pop("rascunho")
+    assert sequencial == dados
+
+
+def test_retorno_em_paralelo_so_incorpora_chaves_declaradas(caplog):
+    from concurrent.futures import ThreadPoolExecutor
+
+    class RetornaDemais(Falso):
+        def executar(self, dados_completos, symbol, timeframe):
+            return {"x": self.nome, "crus": "sobrescrito", "extra": 1}
+
+    plano = _plano(RetornaDemais("a", ["crus"], ["x"]), Falso("b", ["crus"], ["y"]))
+    dados = {"crus": [1]}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        executar_plano(plano, dados, "BTCUSDT", "1m", executor)
+    assert dados == {"crus": [1], "x": "a", "y": "b"}
+    assert "['crus', 'extra']" in caplog.text
+
+
+def test_erro_de_plugin_em_paralelo_propaga():
+    from concurrent.futures import ThreadPoolExecutor
+
+    class Quebrado(Falso):
+        def executar(self, dados_completos, symbol, timeframe):
+            raise RuntimeError("falhou")
+
+    plano = _plano(Falso("a", ["crus"], ["x"]), Quebrado("b", ["crus"], ["y"]))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(RuntimeError):
+            executar_plano(plano, {"crus": []}, "BTCUSDT", "1m", executor)
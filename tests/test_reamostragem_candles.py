@@ -0,0 +1,129 @@
+from functools import partial
+
+import numpy as np
+
+from auxiliares import candles_sinteticos
+from utils.armazem_candles import ArmazemCandles
+from utils.reamostragem_candles import (
+    ReamostradorCandles,
+    fecha_bucket,
+    inicio_bucket,
+    pode_reamostrar,
+    reamostrar,
+)
+
+M15 = 15 * 60 * 1000
+H1 = 4 * M15
+DIA = 24 * H1
+INICIO = 1704067200000  # 2024-01-01 00:00 UTC (segunda-feira)
+
+
+_candles = partial(candles_sinteticos, semente=7, inicio=INICIO, passo=M15)
+
+
+def _reamostrar_ingenuo(candles, duracao):
+    grupos = {}
+    for c in candles:
+        grupos.setdefault(c[0] // duracao * duracao, []).append(c)
+    return [
+        [
+            ts,
+            g[0][1],
+            max(x[2] for x in g),
+            min(x[3] for x in g),
+            g[-1][4],
+            sum(x[5] for x in g),
+        ]
+        for ts, g in sorted(grupos.items())
+    ]
+
+
+def test_reamostrar_equivale_a_agregacao_ingenua():
+    candles = _candles(500)
+    esperado = _reamostrar_ingenuo(candles, 4 * H1)
+    obtido = reamostrar(candles, "4h")
+    np.testing.assert_allclose(obtido, np.array(esperado))
+    assert obtido[0, 0] == INICIO
+
+
+def test_reamostrar_descarta_bucket_inicial_parcial():
+    candles = _candles(10, inicio=INICIO + 2 * M15)
+    obtido = reamostrar(candles, "1h")
+    assert obtido[0, 0] == INICIO + H1
+    assert len(reamostrar(candles, "1h", descartar_incompleto=False)) == 3
+
+
+def test_buckets_alinhados_a_exchange():
+    ts = INICIO + 3 * DIA + 5 * H1 + 7
+    assert inicio_bucket(ts, "4h") == INICIO + 3 * DIA + 4 * H1
+    assert inicio_bucket(ts, "1d") == INICIO + 3 * DIA
+    # Semana da Bybit começa na segunda-feira
+    assert inicio_bucket(ts, "1w") == INICIO
+    assert pode_reamostrar("15m", "1w")
+    assert not pode_reamostrar("15m", "1M")
+    assert not pode_reamostrar("1h", "15m")
+    assert fecha_bucket(INICIO + 3 * M15, "15m", "1h")
+    assert not fecha_bucket(INICIO + 2 * M15, "15m", "1h")
+
+
+def test_reamostrador_incremental_acompanha_candle_aberto():
+    historico = _candles(1000)
+    armazem = ArmazemCandles(capacidade_padrao=200)
+    reamostrador = ReamostradorCandles(armazem, "15m", ["15m", "1h", "4h"])
+    assert reamostrador.derivados == ["1h", "4h"]
+
+    # Carga inicial: base e derivado vindos da "exchange"
+    armazem.obter_buffer("BTCUSDT", "15m", reamostrador.capacidade_base(30)).substituir(
+        historico[:600]
+    )
+    armazem.obter_buffer("BTCUSDT", "4h", 30).substituir(
+        reamostrar(historico[:600], "4h").tolist()
+    )
+
+    for i in range(600, 1000):
+        candle = list(historico[i])
+        aberto = candle[:4] + [candle[1], 0.0]
+        base = armazem.obter_buffer("BTCUSDT", "15m")
+        base.atualizar([aberto])
+        base.atualizar([candle])
+        obtidos = reamostrador.atualizar("BTCUSDT", "4h", 30)
+
+    esperado = reamostrar(historico, "4h")[-30:]
+    np.testing.assert_allclose(np.array(obtidos), esperado)
+
+
+def test_reamostrador_sem_cobertura_do_base_pede_exchange():
+    historico = _candles(300)
+    armazem = ArmazemCandles(capacidade_padrao=100)
+    reamostrador = ReamostradorCandles(armazem, "15m", ["1d"])
+    assert reamostrador.atualizar("BTCUSDT", "1d", 2) is None
+    armazem.obter_buffer("BTCUSDT", "1d", 2).substituir(
+        reamostrar(historico, "1d").tolist()
+    )
+    # Base começa depois do início do candle diário aberto
+    armazem.obter_buffer("BTCUSDT", "15m").substituir(historico[-10:])
+    assert reamostrador.atualizar("BTCUSDT", "1d", 2) is None
+
+
+def test_reamostrador_le_copia_do_base(monkeypatch):
+    import utils.reamostragem_candles as modulo
+
+    historico = _candles(200)
+    armazem = ArmazemCandles(capacidade_padrao=100)
+    reamostrador = ReamostradorCandles(armazem, "15m", ["1h"])
+    base = armazem.obter_buffer("BTCUSDT", "15m", reamostrador.capacidade_base(5))
+    base.substituir(historico[: base.capacidade])
+    armazem.obter_buffer("BTCUSDT", "1h", 5).substituir(
+        reamostrar(historico[: base.capacidade], "1h").tolist()
+    )
+    original = modulo.reamostrar
+
+    def reamostrar_com_escrita(candles, *args, **kwargs):
+        # O stream grava no base (buffer cheio: gira) durante a redução
+        base.atualizar(historico[base.capacidade :])
+        return original(candles, *args, **kwargs)
+
+    monkeypatch.setattr(modulo, "reamostrar", reamostrar_com_escrita)
+    obtidos = reamostrador.atualizar("BTCUSDT", "1h", 5)
+    esperado = reamostrar(historico[: base.capacidade], "1h")[-5:]
+    np.testing.assert_allclose(np.array(obtidos), esperado)
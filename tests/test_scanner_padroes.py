@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+import talib
+
+from auxiliares import candles_sinteticos
+from plugins.analise_candles import AnaliseCandles
+from utils.candles_colunares import CandlesOHLCV
+from utils.scanner_padroes import DTYPE_OCORRENCIAS, ScannerPadroes
+
+PADROES = ["doji", "engulfing", "hammer", "harami", "hikkake", "morningstar"]
+
+
+def _candles(qtd, semente=0):
+    """Passeio aleatório com dojis (close = open) em 1/8 dos candles."""
+    candles = candles_sinteticos(qtd, semente)
+    for i in np.random.default_rng(semente).choice(qtd, qtd // 8):
+        candles[i][4] = candles[i][1]
+    return candles
+
+
+def _esperado(candles, padroes, ultimos):
+    _, o, h, l, c, _ = np.array(candles, dtype=np.float64).T
+    ocorrencias = []
+    for i in range(len(candles) - ultimos, len(candles)):
+        for padrao in sorted(padroes):
+            valor = getattr(talib, f"CDL{padrao.upper()}")(o, h, l, c)[i]
+            if valor:
+                ocorrencias.append((int(candles[i][0]), padrao, int(valor)))
+    return ocorrencias
+
+
+def test_janela_minima_igual_ao_historico_completo():
+    candles = _candles(400)
+    scanner = ScannerPadroes(PADROES)
+    for fim in range(20, 401, 7):
+        ocorrencias = scanner.escanear(candles[:fim])
+        assert ocorrencias.dtype == DTYPE_OCORRENCIAS
+        assert ocorrencias.tolist() == _esperado(candles[:fim], PADROES, 1)
+
+
+def test_varios_candles_em_um_array():
+    candles = CandlesOHLCV(_candles(300))
+    scanner = ScannerPadroes(PADROES)
+    ocorrencias = scanner.escanear(candles, ultimos=50)
+    assert ocorrencias.tolist() == _esperado(candles, PADROES, 50)
+    assert len(ocorrencias) > 0
+    assert np.all(np.diff(ocorrencias["timestamp"]) >= 0)
+
+
+def test_candle_fechado_nao_e_reescaneado():
+    candles = _candles(200)
+    scanner = ScannerPadroes(PADROES)
+    scanner.escanear(candles[:150], "BTCUSDT", "1m", ultimos=10)
+    assert scanner.falhas == 10
+
+    # Janela avançou um candle: só o novo é calculado
+    ocorrencias = scanner.escanear(candles[:151], "BTCUSDT", "1m", ultimos=10)
+    assert scanner.acertos == 9 and scanner.falhas == 11
+    assert ocorrencias.tolist() == _esperado(candles[:151], PADROES, 10)
+
+    # Candle aberto revisado (close diferente) é outro resultado
+    revisado = [list(c) for c in candles[:151]]
+    revisado[-1][4] += 0.5
+    scanner.escanear(revisado, "BTCUSDT", "1m")
+    assert scanner.falhas == 12
+    # Sem symbol/timeframe não há cache
+    scanner.escanear(candles[:151])
+    assert scanner.estatisticas()["entradas"] == 12
+
+
+def test_resultados_somente_leitura_e_padrao_desconhecido():
+    scanner = ScannerPadroes(["doji", "inexistente"])
+    assert scanner.padroes == ["doji"]
+    ocorrencias = scanner.escanear(_candles(30), "BTCUSDT", "1m")
+    with pytest.raises(ValueError):
+        ocorrencias["valor"] = 0
+    assert scanner.escanear([], "BTCUSDT", "1m").size == 0
+
+
+def test_plugin_usa_o_scanner():
+    plugin = AnaliseCandles()
+    candles = _candles(120)
+    padroes = plugin._detectar_padroes(candles, "BTCUSDT", "1m")
+    esperado = _esperado(candles, plugin._scanner.padroes, 1)
+    assert [(p["padrao"], p["forca"]) for p in padroes] == [
+        (nome, abs(valor)) for _, nome, valor in esperado
+    ]
+    assert plugin._scanner.falhas == 1
+    plugin._detectar_padroes(candles, "BTCUSDT", "1m")
+    assert plugin._scanner.acertos == 1
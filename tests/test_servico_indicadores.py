@@ -0,0 +1,165 @@
+from functools import partial
+
+import numpy as np
+import pytest
+import talib
+
+from auxiliares import candles_sinteticos
+from plugins.calculo_alavancagem import CalculoAlavancagem
+from plugins.calculo_risco import CalculoRisco
+from utils.candles_colunares import CandlesOHLCV
+from utils.servico_indicadores import ServicoIndicadores, obter_servico_indicadores
+
+_candles = partial(candles_sinteticos, semente=3)
+
+
+def test_calcula_uma_vez_por_chave():
+    servico = ServicoIndicadores(capacidade=10)
+    candles = CandlesOHLCV(_candles(60))
+    atr = servico.calcular("ATR", candles, "BTCUSDT", "1m", timeperiod=14)
+    esperado = talib.ATR(candles.high, candles.low, candles.close, timeperiod=14)
+    np.testing.assert_allclose(atr, esperado, equal_nan=True)
+
+    assert servico.calcular("ATR", candles, "BTCUSDT", "1m", timeperiod=14) is atr
+    assert servico.acertos == 1 and servico.falhas == 1
+    # Parâmetros, par ou timeframe diferentes são outra série
+    servico.calcular("ATR", candles, "BTCUSDT", "1m", timeperiod=7)
+    servico.calcular("ATR", candles, "ETHUSDT", "1m", timeperiod=14)
+    assert servico.falhas == 3
+
+
+def test_novo_candle_invalida_a_serie():
+    servico = ServicoIndicadores()
+    candles = _candles(60)
+    rsi = servico.calcular("RSI", candles, "BTCUSDT", "1m", timeperiod=14)
+    # Candle aberto atualizado: mesma janela, close diferente
+    candles[-1][4] += 5.0
+    novo = servico.calcular("RSI", candles, "BTCUSDT", "1m", timeperiod=14)
+    assert novo is not rsi
+    assert servico.falhas == 2
+
+
+def test_resultados_somente_leitura_e_tuplas():
+    servico = ServicoIndicadores()
+    macd, signal, hist = servico.calcular(
+        "MACD", _candles(60), fastperiod=12, slowperiod=26, signalperiod=9
+    )
+    with pytest.raises(ValueError):
+        macd[-1] = 0.0
+    assert signal.shape == hist.shape == (60,)
+
+
+def test_despejo_lru():
+    servico = ServicoIndicadores(capacidade=2)
+    candles = _candles(40)
+    for periodo in (5, 10, 5, 20):
+        servico.calcular("SMA", candles, timeperiod=periodo)
+    estatisticas = servico.estatisticas()
+    assert estatisticas["entradas"] == 2
+    assert estatisticas["despejos"] == 1
+    # SMA(5) foi usada recentemente e permaneceu; SMA(10) saiu
+    servico.calcular("SMA", candles, timeperiod=5)
+    assert servico.acertos == 2
+    servico.calcular("SMA", candles, timeperiod=10)
+    assert servico.falhas == 4
+
+
+def test_indicador_registrado():
+    servico = ServicoIndicadores()
+    servico.registrar("AMPLITUDE", lambda h, l: h - l, colunas=(2, 3))
+    candles = CandlesOHLCV(_candles(10))
+    amplitude = servico.calcular("AMPLITUDE", candles)
+    np.testing.assert_allclose(amplitude, candles.high - candles.low)
+    with pytest.raises(KeyError):
+        servico.calcular("INEXISTENTE", _candles(10))
+
+
+def test_plugins_compartilham_o_atr():
+    servico = obter_servico_indicadores()
+    servico.limpar()
+    candles = CandlesOHLCV(_candles(60))
+    risco = CalculoRisco()
+    risco._atr_period = 14
+    alavancagem = CalculoAlavancagem()
+    falhas = servico.falhas
+
+    risco._verificar_volatilidade(candles, "BTCUSDT", "1m")
+    acertos = servico.acertos
+    alavancagem.calcular_alavancagem(
+        candles, direcao="ALTA", confianca=0.8, symbol="BTCUSDT", timeframe="1m"
+    )
+    assert servico.falhas == falhas + 1
+    assert servico.acertos == acertos + 1
+
+
+@pytest.mark.parametrize(
+    "nome,params",
+    [
+        ("SMA", {"timeperiod": 20}),
+        ("BBANDS", {"timeperiod": 20, "nbdevup": 2.0, "nbdevdn": 2.0, "matype": 0}),
+        ("STOCH", {"fastk_period": 5, "slowk_period": 3, "slowd_period": 3}),
+        ("MFI", {"timeperiod": 14}),
+        ("EMA", {"timeperiod": 9}),
+        ("RSI", {"timeperiod": 14}),
+        ("ATR", {"timeperiod": 14}),
+        ("MACD", {"fastperiod": 12, "slowperiod": 26, "signalperiod": 9}),
+        ("ADX", {"timeperiod": 14}),
+        ("OBV", {}),
+    ],
+)
+def test_ultimo_valor_na_cauda_igual_a_serie_completa(nome, params):
+    candles = CandlesOHLCV(_candles(600))
+    servico = ServicoIndicadores(tolerancia=1e-6)
+    janela = servico.janela_estavel(nome, **params)
+    completa = ServicoIndicadores().calcular(nome, candles, **params)
+    ultimo = servico.ultimo(nome, candles, "BTCUSDT", "1m", **params)
+    if nome == "OBV":
+        assert janela is None  # acumulado: precisa de todo o histórico
+    else:
+        assert janela < len(candles)
+    esperado = (
+        tuple(s[-1] for s in completa) if isinstance(completa, tuple) else completa[-1]
+    )
+    np.testing.assert_allclose(ultimo, esperado, rtol=1e-5)
+
+
+@pytest.mark.parametrize(
+    "nome,params",
+    [
+        ("RSI", {"timeperiod": 14}),
+        ("PLUS_DI", {"timeperiod": 14}),
+        ("MACD", {"fastperiod": 12, "slowperiod": 26, "signalperiod": 9}),
+        ("ADX", {"timeperiod": 14}),
+    ],
+)
+def test_janela_estavel_padrao_cabe_nos_200_candles(nome, params):
+    candles = _candles(200)
+    servico = ServicoIndicadores()
+    assert servico.janela_estavel(nome, **params) < len(candles)
+    completa = ServicoIndicadores().calcular(nome, candles, **params)
+    ultimo = servico.ultimo(nome, candles, "BTCUSDT", "1m", **params)
+    if isinstance(completa, tuple):
+        escala = max(abs(s[-1]) for s in completa[:2])
+        for valor, serie in zip(ultimo, completa):
+            assert abs(valor - serie[-1]) <= 5e-3 * escala
+    else:
+        np.testing.assert_allclose(ultimo, completa[-1], rtol=5e-3)
+
+
+def test_ultimo_reaproveita_cache_e_serie_completa():
+    servico = ServicoIndicadores()
+    candles = _candles(300)
+    assert servico.janela_estavel("SMA", timeperiod=20) == 20
+    # EMA exige mais aquecimento com tolerância menor
+    assert servico.janela_estavel("EMA", timeperiod=21) < ServicoIndicadores(
+        tolerancia=1e-9
+    ).janela_estavel("EMA", timeperiod=21)
+    assert servico.janela_estavel("BBANDS", timeperiod=20, matype=1) is None
+
+    primeiro = servico.ultimo("RSI", candles, "BTCUSDT", "1m", timeperiod=14)
+    assert servico.ultimo("RSI", candles, "BTCUSDT", "1m", timeperiod=14) == primeiro
+    assert (servico.acertos, servico.falhas) == (1, 1)
+
+    serie = servico.calcular("SMA", candles, "BTCUSDT", "1m", timeperiod=10)
+    assert servico.ultimo("SMA", candles, "BTCUSDT", "1m", timeperiod=10) == serie[-1]
+    assert servico.ultimo("SMA", [], timeperiod=10) is None
@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+from auxiliares import ClienteFalso, ConexaoFalsa
+from auxiliares import candles_lineares as _candles
+from plugins.conexao import Conexao
+from plugins.obter_dados import ObterDados
+from utils.armazem_candles import ArmazemCandles
+from utils.servidor_replay_ws import ServidorReplayKlines, montar_mensagem_kline
+from utils.stream_klines import StreamKlines, converter_mensagem_kline
+
+
+def test_converter_mensagem_kline():
+    candle = _candles(1)[0]
+    mensagem = montar_mensagem_kline("BTCUSDT", "15m", candle, True)
+    assert mensagem["topic"] == "kline.15.BTCUSDT"
+    assert converter_mensagem_kline(mensagem) == [("BTCUSDT", "15m", candle, True)]
+    assert converter_mensagem_kline({"op": "pong"}) == []
+
+
+def test_replay_carga_milhares_de_symbols():
+    pares = [f"PAR{i}USDT" for i in range(2000)]
+    candles = _candles(3)
+    servidor = ServidorReplayKlines({(p, "1m"): candles for p in pares})
+    armazem = ArmazemCandles(capacidade_padrao=10)
+
+    async def cenario():
+        url = await servidor.iniciar()
+        stream = StreamKlines(url, armazem, pares, ["1m"], lote_inscricao=100)
+        tarefa = asyncio.ensure_future(stream.executar())
+        limite = time.monotonic() + 30
+        fechados = {}
+        while time.monotonic() < limite:
+            for symbol, tfs in stream.consumir_fechamentos().items():
+                fechados.setdefault(symbol, set()).update(tfs)
+            if stream.mensagens_recebidas >= len(pares) * len(candles) * 2:
+                break
+            await asyncio.sleep(0.05)
+        stream.parar()
+        tarefa.cancel()
+        await servidor.parar()
+        return fechados
+
+    fechados = asyncio.run(cenario())
+    assert set(fechados) == set(pares)
+    for par in (pares[0], pares[-1]):
+        assert armazem.obter_buffer(par, "1m").como_lista() == candles
+
+
+def test_obter_dados_em_streaming_dispensa_rest():
+    conexao = Conexao()
+    candles = _candles(20)
+    servidor = ServidorReplayKlines({("BTCUSDT", "1m"): candles})
+    url = conexao.executar_async(servidor.iniciar(), timeout=10)
+    plugin = ObterDados(conexao=conexao)
+    try:
+        assert plugin.iniciar_streaming(["BTCUSDT"], ["1m"], url=url)
+        limite = time.monotonic() + 10
+        while time.monotonic() < limite:
+            if plugin._armazem.tamanho("BTCUSDT", "1m") == len(candles):
+                break
+            time.sleep(0.05)
+        dados = {}
+        plugin.executar(dados, "BTCUSDT", "1m", limit=10)
+        assert dados["crus"] == candles[-10:]
+        assert "BTCUSDT" in plugin.consumir_fechamentos()
+    finally:
+        plugin.finalizar()
+        conexao.executar_async(servidor.parar(), timeout=10)
+        conexao.finalizar()
+
+
+def test_queda_da_conexao_marca_recarga_e_reinscricao_de_pares():
+    candles = _candles(3)
+    servidor = ServidorReplayKlines(
+        {(p, "1m"): candles for p in ("AUSDT", "BUSDT", "CUSDT")}, intervalo=0.01
+    )
+    armazem = ArmazemCandles(capacidade_padrao=10)
+
+    async def esperar(condicao):
+        limite = time.monotonic() + 10
+        while not condicao() and time.monotonic() < limite:
+            await asyncio.sleep(0.02)
+        return condicao()
+
+    async def cenario():
+        url = await servidor.iniciar()
+        stream = StreamKlines(
+            url, armazem, ["AUSDT", "BUSDT"], ["1m"], espera_reconexao=0.05
+        )
+        tarefa = asyncio.ensure_future(stream.executar())
+        try:
+            assert await esperar(
+                lambda: servidor.topicos_inscritos == {"kline.1.AUSDT", "kline.1.BUSDT"}
+            )
+            assert stream.atualizar_pares(["BUSDT", "CUSDT"]) == {"CUSDT"}
+            assert stream.atualizar_pares(["CUSDT", "BUSDT"]) == set()
+            assert await esperar(
+                lambda: servidor.topicos_inscritos == {"kline.1.BUSDT", "kline.1.CUSDT"}
+            )
+            assert not stream.pendente_recarga("BUSDT", "1m")
+            await servidor.derrubar_conexoes()
+            assert await esperar(lambda: stream.pendente_recarga("BUSDT", "1m"))
+            assert stream.pendente_recarga("CUSDT", "1m")
+            assert not stream.pendente_recarga("AUSDT", "1m")
+            stream.marcar_recarregado("BUSDT", "1m")
+            assert not stream.pendente_recarga("BUSDT", "1m")
+            # A reconexão inscreve a lista atual de pares
+            assert await esperar(
+                lambda: servidor.topicos_inscritos == {"kline.1.BUSDT", "kline.1.CUSDT"}
+            )
+        finally:
+            stream.parar()
+            tarefa.cancel()
+            await servidor.parar()
+
+    asyncio.run(cenario())
+
+
+def test_buffer_pendente_de_recarga_completa_pelo_rest():
+    candles = _candles(30)
+    cliente = ClienteFalso(candles)
+    plugin = ObterDados(conexao=ConexaoFalsa(cliente))
+    plugin._armazem.obter_buffer("BTCUSDT", "1m", capacidade=10).atualizar(candles[:25])
+    plugin._stream = StreamKlines("ws://nada", plugin._armazem, ["BTCUSDT"], ["1m"])
+    plugin._stream_futuro = asyncio.Future(loop=asyncio.new_event_loop())
+    plugin._stream._marcar_pendentes()
+    # O par entra no próximo ciclo do bot mesmo sem fechamento pelo stream
+    assert plugin.consumir_fechamentos() == {"BTCUSDT": {"1m"}}
+
+    dados = {}
+    plugin.executar(dados, "BTCUSDT", "1m", limit=10)
+    # Incremental a partir do último candle do buffer: a lacuna é preenchida
+    assert [c["since"] for c in cliente.chamadas] == [candles[24][0]]
+    assert dados["crus"] == candles[-10:]
+    assert not plugin._stream.pendente_recarga("BTCUSDT", "1m")
+
+    plugin.executar(dados, "BTCUSDT", "1m", limit=10)
+    assert len(cliente.chamadas) == 1  # buffer em dia: sem REST
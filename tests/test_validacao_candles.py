@@ -0,0 +1,110 @@
+import numpy as np
+
+from auxiliares import candles_lineares as _candles
+from plugins.validador_dados import ValidadorDados
+from utils.candles_colunares import CandlesOHLCV
+from utils.plugin_utils import validacao_klines, validar_klines
+from utils.validacao_candles import validar_colunas
+
+MINUTO = 60000
+
+
+def test_bloco_valido_e_consistente():
+    relatorio = CandlesOHLCV(_candles(50)).validar("1m")
+    assert relatorio.total == 50
+    assert relatorio.consistente
+    assert relatorio.valido(min_len=50)
+    assert not relatorio.valido(min_len=51)
+    assert relatorio.problemas() == []
+
+
+def test_detecta_valores_nao_numericos_e_nan():
+    candles = _candles(10)
+    candles[2][2] = "erro"
+    candles[5][4] = float("nan")
+    candles[7] = candles[7][:5]  # sem volume
+    relatorio = CandlesOHLCV(candles).validacao
+    assert relatorio.nao_finitos.tolist() == [0, 0, 1, 0, 1, 1]
+    assert not relatorio.valido((2, 3, 4))
+    assert relatorio.valido((0, 1, 3))
+    assert not relatorio.consistente
+
+
+def test_detecta_precos_incoerentes_e_volume_negativo():
+    candles = _candles(10)
+    candles[1][2], candles[1][3] = 90.0, 110.0  # high < low
+    candles[4][4] = 500.0  # close acima do high
+    candles[6][5] = -1.0
+    relatorio = validar_colunas(CandlesOHLCV(candles).colunas)
+    assert relatorio.high_menor_low == 1
+    assert relatorio.fora_da_faixa == 2
+    assert relatorio.volume_negativo == 1
+    # Formato continua válido: só a consistência falha
+    assert relatorio.valido()
+    assert not relatorio.consistente
+
+
+def test_detecta_ordem_duplicados_e_lacunas():
+    candles = _candles(20)
+    del candles[10:13]  # lacuna de 3 candles
+    candles.append(list(candles[-1]))  # duplicado
+    candles[3], candles[4] = candles[4], candles[3]  # fora de ordem
+    relatorio = CandlesOHLCV(candles).validar("1m")
+    assert relatorio.duplicados == 1
+    assert relatorio.fora_de_ordem == 1
+    assert relatorio.lacunas == 1
+    assert relatorio.candles_faltantes == 3
+    # Sem timeframe não há detecção de lacunas
+    assert CandlesOHLCV(candles).validacao.lacunas == 0
+
+
+def test_relatorio_fica_no_objeto_e_e_reutilizado():
+    candles = CandlesOHLCV(_candles(30))
+    relatorio = candles.validar("1m")
+    assert candles.validacao is relatorio
+    assert validacao_klines(candles) is relatorio
+    assert validar_klines(candles, min_len=20)
+    assert not validar_klines(candles, min_len=31)
+
+
+def test_validar_klines_aceita_lista_comum():
+    candles = _candles(25)
+    assert validar_klines(candles)
+    candles[0][3] = None
+    assert not validar_klines(candles)
+    assert not validar_klines("nao e lista")
+    assert not validar_klines([1, 2, 3] * 10)
+
+
+def test_bloco_vazio():
+    relatorio = validar_colunas(np.empty((6, 0)))
+    assert relatorio.total == 0
+    assert relatorio.consistente
+    assert not relatorio.valido(min_len=1)
+
+
+def test_validador_dados_rejeita_timestamps_duplicados():
+    plugin = ValidadorDados()
+    plugin.inicializar({})
+    candles = _candles(25)
+    dados = {"crus": CandlesOHLCV(candles)}
+    plugin.executar(dados_completos=dados, symbol="BTCUSDT", timeframe="1m")
+    assert dados["validador_dados"]["status"] == "VALIDO"
+
+    candles[10][0] = candles[9][0]
+    dados = {"crus": CandlesOHLCV(candles)}
+    plugin.executar(dados_completos=dados, symbol="BTCUSDT", timeframe="1m")
+    assert dados["validador_dados"]["status"] == "INVALIDO"
+
+
+def test_plugins_sem_volume_ignoram_volume_ausente():
+    from plugins.calculo_alavancagem import CalculoAlavancagem
+    from plugins.indicadores.outros_indicadores import OutrosIndicadores
+
+    candles = _candles(60)
+    candles[-1][5] = None
+    for plugin in (CalculoAlavancagem(), OutrosIndicadores()):
+        assert plugin._validar_klines(CandlesOHLCV(candles), "BTCUSDT", "1m")
+    candles[-1][4] = None
+    for plugin in (CalculoAlavancagem(), OutrosIndicadores()):
+        assert not plugin._validar_klines(CandlesOHLCV(candles), "BTCUSDT", "1m")
@@ -0,0 +1,335 @@
+"""
+Agendamento dos ciclos do bot orientado ao fechamento de candles.
+- AgendadorCiclos: cadência sem deriva (grade fixa de instantâneos), acordando
+  logo após o fechamento de candle de qualquer timeframe e pulando os ciclos
+  perdidos quando uma execução ultrapassa o intervalo.
+- SeletorUnidades: decide quais (symbol, timeframe) precisam de nova análise —
+  candle fechado ou candle aberto que variou além do limiar.
+- PrioridadeSymbols: ordena os symbols por interesse (posição aberta, sinal
+  recente, volatilidade realizada), amostra os de baixo interesse a cada N
+  ciclos e guarda os adiados pelo prazo do ciclo para o ciclo seguinte.
+"""
+
+import math
+import statistics
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.armazem_candles import timeframe_para_ms
+from utils.logging_config import get_logger
+from utils.reamostragem_candles import inicio_bucket
+
+logger = get_logger(__name__)
+
+
+class AgendadorCiclos:
+    """
+    Relógio dos ciclos do loop principal.
+
+    Os ciclos caem numa grade fixa (múltiplos de `intervalo` desde a época),
+    então o tempo de execução não se acumula. Além da grade, o agendador acorda
+    `atraso_fechamento` segundos após o fechamento de candle de cada timeframe
+    (tempo para a exchange publicar o candle novo).
+
+    Args:
+        intervalo (float): Intervalo entre ciclos em segundos.
+        timeframes (list): Timeframes cujos fechamentos antecipam o ciclo.
+        atraso_fechamento (float): Espera após o fechamento de um candle.
+        relogio (callable): Fonte de tempo (segundos desde a época).
+        dormir (callable): Função de espera (ex: time.sleep, Event.wait).
+    """
+
+    def __init__(
+        self,
+        intervalo: float,
+        timeframes: Optional[Iterable[str]] = None,
+        atraso_fechamento: float = 2.0,
+        relogio: Callable[[], float] = time.time,
+        dormir: Optional[Callable[[float], object]] = None,
+    ):
+        if intervalo <= 0:
+            raise ValueError("O intervalo do ciclo deve ser maior que 0.")
+        self.intervalo = float(intervalo)
+        self.timeframes = [tf for tf in (timeframes or []) if self._valido(tf)]
+        self.atraso_fechamento = float(atraso_fechamento)
+        self._relogio = relogio
+        self._parar = threading.Event()
+        self._dormir = dormir or self._parar.wait
+        self._previsto: Optional[float] = None
+        self.ciclos_executados = 0
+        self.ciclos_pulados = 0
+
+    @staticmethod
+    def _valido(timeframe: str) -> bool:
+        try:
+            timeframe_para_ms(timeframe)
+            return True
+        except ValueError:
+            return False
+
+    def _proximo_fechamento(self, agora: float) -> Optional[float]:
+        """Próximo instante (s) de fechamento de candle + atraso, entre os timeframes."""
+        proximos = []
+        agora_ms = int(agora * 1000)
+        for tf in self.timeframes:
+            inicio = int(inicio_bucket(agora_ms, tf))
+            fim = inicio + timeframe_para_ms(tf)
+            alvo = fim / 1000 + self.atraso_fechamento
+            # Ainda dentro da janela de atraso do fechamento anterior
+            if inicio / 1000 + self.atraso_fechamento > agora:
+                alvo = inicio / 1000 + self.atraso_fechamento
+            proximos.append(alvo)
+        return min(proximos, default=None)
+
+    def proximo_instante(self, agora: Optional[float] = None) -> float:
+        """Próximo instante de ciclo: ponto da grade ou fechamento de candle."""
+        agora = self._relogio() if agora is None else agora
+        grade = (math.floor(agora / self.intervalo) + 1) * self.intervalo
+        fechamento = self._proximo_fechamento(agora)
+        return grade if fechamento is None else min(grade, fechamento)
+
+    def aguardar(self) -> int:
+        """
+        Espera até o próximo ciclo.
+
+        Returns:
+            int: Quantidade de ciclos da grade pulados porque o ciclo anterior
+            ultrapassou o instante previsto.
+        """
+        agora = self._relogio()
+        pulados = 0
+        if self._previsto is not None and agora > self._previsto + self.intervalo:
+            pulados = int((agora - self._previsto) // self.intervalo)
+            self.ciclos_pulados += pulados
+            logger.warning(
+                f"[agendador] Ciclo excedeu o intervalo; {pulados} ciclo(s) pulado(s)"
+            )
+        alvo = self.proximo_instante(agora)
+        self._previsto = alvo
+        espera = alvo - agora
+        if espera > 0:
+            self._dormir(espera)
+        self.ciclos_executados += 1
+        return pulados
+
+    def parar(self) -> None:
+        """Interrompe uma espera em andamento (quando usa o Event interno)."""
+        self._parar.set()
+
+
+class SeletorUnidades:
+    """
+    Filtra as unidades (symbol, timeframe) que precisam ser reanalisadas.
+
+    Uma unidade é executada quando ainda não foi analisada, quando surgiu um
+    candle novo (o anterior fechou) ou quando o close do candle aberto variou
+    pelo menos `limiar_variacao` (fração) desde a última análise.
+    """
+
+    def __init__(self, limiar_variacao: float = 0.002):
+        self.limiar_variacao = float(limiar_variacao)
+        self._estado: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def motivo(self, symbol: str, timeframe: str, candle) -> Optional[str]:
+        """
+        Returns:
+            str | None: "inicial", "fechamento", "variacao" ou None (pular).
+        """
+        if not candle:
+            return "inicial"
+        with self._lock:
+            anterior = self._estado.get((symbol, timeframe))
+        if anterior is None:
+            return "inicial"
+        ts, close = anterior
+        if int(candle[0]) > ts:
+            return "fechamento"
+        if close and abs(float(candle[4]) - close) / abs(close) >= self.limiar_variacao:
+            return "variacao"
+        return None
+
+    def selecionar(
+        self, unidades: Iterable[Tuple[str, str]], ultimo_candle: Callable
+    ) -> List[Tuple[str, str]]:
+        """Retorna as unidades que precisam de análise neste ciclo."""
+        return [
+            (symbol, tf)
+            for symbol, tf in unidades
+            if self.motivo(symbol, tf, ultimo_candle(symbol, tf)) is not None
+        ]
+
+    def registrar(self, symbol: str, timeframe: str, candle) -> None:
+        """Marca a unidade como analisada com o candle informado."""
+        if not candle:
+            return
+        with self._lock:
+            self._estado[(symbol, timeframe)] = (int(candle[0]), float(candle[4]))
+
+    def esquecer(self, symbol: str, timeframe: str) -> None:
+        with self._lock:
+            self._estado.pop((symbol, timeframe), None)
+
+
+class PrioridadeSymbols:
+    """
+    Prioridade dos symbols no ciclo do bot.
+
+    Classes (menor = antes):
+        ALTA: symbol com posição/ordem aberta.
+        MEDIA: sinal (não lateral) nos últimos `janela_sinal` segundos ou
+            volatilidade realizada no quantil `quantil_volatilidade` do
+            timeframe entre os symbols acompanhados.
+        BAIXA: demais; analisados um ciclo a cada `intervalo_baixa`
+            (escalonados por um hash estável do symbol para distribuir a
+            carga); só eles são adiados quando o prazo do ciclo esgota.
+
+    Symbols ainda não analisados e os adiados pelo prazo do ciclo anterior
+    entram sempre e, dentro da classe, vão na frente.
+
+    Args:
+        intervalo_baixa (int): Ciclos entre análises de um symbol BAIXA.
+        janela_sinal (float): Segundos em que um sinal conta como recente.
+        quantil_volatilidade (float): Quantil (0-1) de volatilidade a partir
+            do qual o symbol é MEDIA.
+        janela_volatilidade (int): Retornos usados na volatilidade realizada.
+        prazo_ciclo (float, optional): Segundos do ciclo após os quais o
+            trabalho ainda não iniciado é adiado (None = sem prazo).
+        relogio (callable): Fonte de tempo (segundos).
+    """
+
+    ALTA, MEDIA, BAIXA = 0, 1, 2
+    _SEM_SINAL = {None, "", "LATERAL", "NEUTRO"}
+
+    def __init__(
+        self,
+        intervalo_baixa: int = 4,
+        janela_sinal: float = 900.0,
+        quantil_volatilidade: float = 0.8,
+        janela_volatilidade: int = 20,
+        prazo_ciclo: Optional[float] = None,
+        relogio: Callable[[], float] = time.time,
+    ):
+        if intervalo_baixa < 1:
+            raise ValueError("intervalo_baixa deve ser pelo menos 1.")
+        self.intervalo_baixa = int(intervalo_baixa)
+        self.janela_sinal = float(janela_sinal)
+        self.quantil_volatilidade = float(quantil_volatilidade)
+        self.janela_volatilidade = int(janela_volatilidade)
+        self.prazo_ciclo = float(prazo_ciclo) if prazo_ciclo else None
+        self._relogio = relogio
+        self._ciclo = 0
+        self._sinais: Dict[str, float] = {}
+        self._volatilidade: Dict[Tuple[str, str], float] = {}
+        self._analisados: set = set()
+        self._adiados: set = set()
+        # Classes calculadas no último selecionar()
+        self.classes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def registrar_sinal(self, symbol: str, direcao: Optional[str]) -> None:
+        """Guarda o instante do último sinal direcional do symbol."""
+        if str(direcao or "").upper() in self._SEM_SINAL:
+            return
+        with self._lock:
+            self._sinais[symbol] = self._relogio()
+
+    def registrar_candles(self, symbol: str, timeframe: str, candles) -> None:
+        """Atualiza a volatilidade realizada (desvio dos log-retornos)."""
+        if not candles or len(candles) < 3:
+            return
+        closes = [float(c[4]) for c in candles[-(self.janela_volatilidade + 1) :]]
+        retornos = [
+            math.log(atual / anterior)
+            for anterior, atual in zip(closes, closes[1:])
+            if anterior > 0 and atual > 0
+        ]
+        if len(retornos) < 2:
+            return
+        with self._lock:
+            self._volatilidade[(symbol, timeframe)] = statistics.pstdev(retornos)
+
+    def _volateis(self) -> set:
+        """Symbols no quantil superior de volatilidade de algum timeframe."""
+        por_timeframe: Dict[str, List[Tuple[float, str]]] = {}
+        for (symbol, tf), valor in self._volatilidade.items():
+            por_timeframe.setdefault(tf, []).append((valor, symbol))
+        volateis = set()
+        for valores in por_timeframe.values():
+            if len(valores) < 2:
+                continue
+            valores.sort()
+            corte = valores[
+                min(int(self.quantil_volatilidade * len(valores)), len(valores) - 1)
+            ][0]
+            volateis.update(symbol for valor, symbol in valores if valor >= corte)
+        return volateis
+
+    def prioridades(
+        self, pares: Iterable[str], posicoes: Iterable[str] = ()
+    ) -> Dict[str, int]:
+        """Classe de prioridade de cada symbol."""
+        posicoes = set(posicoes)
+        agora = self._relogio()
+        with self._lock:
+            volateis = self._volateis()
+            recentes = {
+                s
+                for s, instante in self._sinais.items()
+                if agora - instante <= self.janela_sinal
+            }
+        return {
+            symbol: (
+                self.ALTA
+                if symbol in posicoes
+                else (
+                    self.MEDIA
+                    if symbol in recentes or symbol in volateis
+                    else self.BAIXA
+                )
+            )
+            for symbol in pares
+        }
+
+    def selecionar(
+        self, pares: Sequence[str], posicoes: Iterable[str] = ()
+    ) -> List[str]:
+        """
+        Avança um ciclo e retorna os symbols a analisar, em ordem de prioridade.
+        """
+        self._ciclo += 1
+        classes = self.prioridades(pares, posicoes)
+        self.classes = classes
+        with self._lock:
+            novos = {s for s in pares if s not in self._analisados}
+            urgentes = novos | (self._adiados & set(pares))
+        selecionados = [
+            (classes[symbol], symbol not in urgentes, indice, symbol)
+            for indice, symbol in enumerate(pares)
+            if classes[symbol] != self.BAIXA
+            or symbol in urgentes
+            or (self._ciclo + self._fase(symbol)) % self.intervalo_baixa == 0
+        ]
+        return [symbol for *_, symbol in sorted(selecionados)]
+
+    def adiaveis(self, pares: Iterable[str]) -> set:
+        """Symbols do último ciclo que podem ser adiados pelo prazo (BAIXA)."""
+        return {s for s in pares if self.classes.get(s, self.BAIXA) == self.BAIXA}
+
+    @staticmethod
+    def _fase(symbol: str) -> int:
+        """Deslocamento estável do symbol (independe da ordem da lista)."""
+        return zlib.crc32(symbol.encode("utf-8"))
+
+    def concluir(self, symbol: str) -> None:
+        """Marca o symbol como analisado no ciclo."""
+        with self._lock:
+            self._analisados.add(symbol)
+            self._adiados.discard(symbol)
+
+    def adiar(self, symbol: str) -> None:
+        """Marca o symbol para entrar na frente no próximo ciclo."""
+        with self._lock:
+            self._adiados.add(symbol)
@@ -0,0 +1,203 @@
+"""
+Armazém de candles em memória.
+Mantém os últimos N candles por (symbol, timeframe) em buffers circulares de
+tamanho fixo, permitindo que o ObterDados busque na exchange apenas os candles
+novos (since=) e sobrescreva o candle ainda aberto.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# [timestamp, open, high, low, close, volume]
+CAMPOS_OHLCV = 6
+
+_UNIDADES_TIMEFRAME_MS = {
+    "s": 1000,
+    "m": 60 * 1000,
+    "h": 60 * 60 * 1000,
+    "d": 24 * 60 * 60 * 1000,
+    "w": 7 * 24 * 60 * 60 * 1000,
+    "M": 30 * 24 * 60 * 60 * 1000,
+    "y": 365 * 24 * 60 * 60 * 1000,
+}
+
+
+def timeframe_para_ms(timeframe: str) -> int:
+    """
+    Converte um timeframe no formato CCXT (ex: "15m", "4h", "1d") em milissegundos.
+
+    Args:
+        timeframe (str): Timeframe no formato CCXT.
+
+    Returns:
+        int: Duração do timeframe em milissegundos.
+
+    Raises:
+        ValueError: Se o timeframe for inválido.
+    """
+    try:
+        quantidade = int(timeframe[:-1])
+        unidade = _UNIDADES_TIMEFRAME_MS[timeframe[-1]]
+    except (KeyError, ValueError, IndexError, TypeError):
+        raise ValueError(f"Timeframe inválido: {timeframe}")
+    if quantidade <= 0:
+        raise ValueError(f"Timeframe inválido: {timeframe}")
+    return quantidade * unidade
+
+
+class BufferCircular:
+    """
+    Buffer circular de candles OHLCV com capacidade fixa.
+
+    Cada candle é gravado duas vezes (posições i e i + capacidade), de modo que
+    a janela ordenada [inicio, inicio + tamanho) é sempre contígua e pode ser
+    exposta como visão NumPy sem cópia.
+    """
+
+    def __init__(self, capacidade: int):
+        if capacidade <= 0:
+            raise ValueError("A capacidade do buffer deve ser maior que 0.")
+        self.capacidade = int(capacidade)
+        self._dados = np.zeros((2 * self.capacidade, CAMPOS_OHLCV), dtype=np.float64)
+        self._inicio = 0
+        self._tamanho = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    @property
+    def ultimo_timestamp(self) -> Optional[int]:
+        """Timestamp (ms) do candle mais recente, ou None se vazio."""
+        if not self._tamanho:
+            return None
+        return int(self._dados[self._inicio + self._tamanho - 1, 0])
+
+    def _gravar(self, posicao: int, candle) -> None:
+        linha = candle[:CAMPOS_OHLCV]
+        self._dados[posicao, : len(linha)] = linha
+        self._dados[posicao + self.capacidade, : len(linha)] = linha
+
+    def _anexar(self, candle) -> None:
+        if self._tamanho < self.capacidade:
+            self._gravar((self._inicio + self._tamanho) % self.capacidade, candle)
+            self._tamanho += 1
+        else:
+            # Buffer cheio: o candle mais antigo é sobrescrito
+            self._gravar(self._inicio, candle)
+            self._inicio = (self._inicio + 1) % self.capacidade
+
+    def atualizar(self, candles: List[list]) -> int:
+        """
+        Incorpora candles ao buffer, em ordem de timestamp.
+
+        Candles com o mesmo timestamp do último armazenado sobrescrevem o candle
+        aberto; candles mais antigos são ignorados.
+
+        Args:
+            candles (List[list]): Candles no formato [ts, o, h, l, c, v].
+
+        Returns:
+            int: Quantidade de candles novos anexados.
+        """
+        novos = 0
+        with self._lock:
+            for candle in sorted(candles, key=lambda c: c[0]):
+                ultimo = self.ultimo_timestamp
+                if ultimo is None or candle[0] > ultimo:
+                    self._anexar(candle)
+                    novos += 1
+                elif candle[0] == ultimo:
+                    self._gravar(
+                        (self._inicio + self._tamanho - 1) % self.capacidade, candle
+                    )
+        return novos
+
+    def substituir(self, candles: List[list]) -> int:
+        """Descarta o conteúdo atual e armazena os candles informados."""
+        with self._lock:
+            self._inicio = 0
+            self._tamanho = 0
+        return self.atualizar(candles)
+
+    def como_array(self, n: Optional[int] = None, copiar: bool = True) -> np.ndarray:
+        """
+        Retorna os últimos n candles.
+
+        Args:
+            n (int, optional): Quantidade de candles. Padrão: todos.
+            copiar (bool): Se True (padrão), retorna uma cópia feita sob o lock.
+                Com False, a visão sem cópia aponta para o próprio buffer: uma
+                gravação posterior (ex: o stream de klines) pode sobrescrever
+                as linhas dela, então só serve para leituras imediatas de quem
+                controla as escritas.
+
+        Returns:
+            np.ndarray: Array (n, 6) float64 somente leitura, ordenado por timestamp.
+        """
+        with self._lock:
+            visao = self._dados[self._inicio : self._inicio + self._tamanho]
+            if n is not None:
+                visao = visao[-n:] if n > 0 else visao[:0]
+            visao = np.array(visao) if copiar else visao.view()
+        visao.flags.writeable = False
+        return visao
+
+    def como_lista(self, n: Optional[int] = None) -> List[list]:
+        """Retorna os últimos n candles no formato de lista do CCXT."""
+        linhas = self.como_array(n, copiar=True).tolist()
+        for linha in linhas:
+            linha[0] = int(linha[0])
+        return linhas
+
+
+class ArmazemCandles:
+    """
+    Conjunto de buffers circulares indexados por (symbol, timeframe).
+    Seguro para uso concorrente pelas threads do GerenciadorBot.
+    """
+
+    def __init__(self, capacidade_padrao: int = 500):
+        self.capacidade_padrao = int(capacidade_padrao)
+        self._buffers: Dict[Tuple[str, str], BufferCircular] = {}
+        self._lock = threading.Lock()
+
+    def obter_buffer(
+        self, symbol: str, timeframe: str, capacidade: Optional[int] = None
+    ) -> BufferCircular:
+        """
+        Retorna o buffer do par/timeframe, criando-o se necessário.
+
+        Se a capacidade pedida for maior que a do buffer existente, o buffer é
+        recriado vazio (o chamador deve recarregar o histórico completo).
+        """
+        capacidade = max(capacidade or 0, self.capacidade_padrao)
+        chave = (symbol, timeframe)
+        with self._lock:
+            buffer = self._buffers.get(chave)
+            if buffer is None or buffer.capacidade < capacidade:
+                buffer = BufferCircular(capacidade)
+                self._buffers[chave] = buffer
+            return buffer
+
+    def ultimo_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        buffer = self._buffers.get((symbol, timeframe))
+        return buffer.ultimo_timestamp if buffer else None
+
+    def tamanho(self, symbol: str, timeframe: str) -> int:
+        buffer = self._buffers.get((symbol, timeframe))
+        return len(buffer) if buffer else 0
+
+    def remover(self, symbol: str, timeframe: str) -> None:
+        with self._lock:
+            self._buffers.pop((symbol, timeframe), None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._buffers.clear()
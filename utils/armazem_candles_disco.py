@@ -0,0 +1,353 @@
+"""
+Armazém de candles persistente em arquivos mapeados em memória (np.memmap).
+Um arquivo de layout fixo por (symbol, timeframe), com o mesmo buffer circular
+do ArmazemCandles: o reinício do bot reaproveita o histórico do disco e outros
+processos podem ler os mesmos candles sem cópia e sem duplicá-los na RAM.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from utils.armazem_candles import ArmazemCandles, BufferCircular, CAMPOS_OHLCV
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Layout do arquivo: cabeçalho de 8 int64 seguido de (2 * capacidade, 6) float64
+ASSINATURA = 0x56434C484F  # "OHLCV"
+VERSAO_LAYOUT = 1
+TAMANHO_CABECALHO = 8
+BYTES_CABECALHO = TAMANHO_CABECALHO * 8
+# Posições no cabeçalho; a geração muda quando o arquivo é recriado (ampliação)
+(
+    _ASSINATURA,
+    _VERSAO,
+    _CAPACIDADE,
+    _CAMPOS,
+    _INICIO,
+    _TAMANHO,
+    _SEQUENCIA,
+    _GERACAO,
+) = range(8)
+
+EXTENSAO_ARQUIVO = ".ohlcv"
+
+
+def nome_arquivo(symbol: str, timeframe: str) -> str:
+    """
+    Nome do arquivo de um par/timeframe.
+
+    "1M" (mês) vira "1mes" para não colidir com "1m" em sistemas de arquivos
+    que não diferenciam maiúsculas.
+    """
+    symbol = re.sub(r"[^A-Za-z0-9_-]", "-", symbol)
+    timeframe = timeframe.replace("M", "mes")
+    return f"{symbol}__{timeframe}{EXTENSAO_ARQUIVO}"
+
+
+class BufferMapeado(BufferCircular):
+    """
+    BufferCircular cujo armazenamento é um arquivo mapeado em memória.
+
+    Início, tamanho e um contador de sequência ficam no cabeçalho do arquivo.
+    O escritor (um único processo) deixa a sequência ímpar durante cada
+    alteração; leitores em outros processos repetem a leitura se a sequência
+    mudou, obtendo sempre uma janela consistente. Quando o escritor recria o
+    arquivo (ampliação), marca o cabeçalho do arquivo antigo e os leitores
+    remapeiam o caminho até encontrar a nova geração.
+    """
+
+    def __init__(self, caminho: str, capacidade: int, somente_leitura: bool = False):
+        if capacidade <= 0:
+            raise ValueError("A capacidade do buffer deve ser maior que 0.")
+        self.caminho = caminho
+        self.somente_leitura = somente_leitura
+        if not os.path.exists(caminho) or not self._layout_valido(caminho):
+            if somente_leitura:
+                raise FileNotFoundError(f"Arquivo de candles inválido: {caminho}")
+            self._criar_arquivo(caminho, capacidade)
+        self._mapear()
+        # Reentrante: atualizar/substituir envolvem os métodos da classe base
+        self._lock = threading.RLock()
+
+    def _mapear(self) -> None:
+        modo = "r" if self.somente_leitura else "r+"
+        self._cabecalho = np.memmap(
+            self.caminho, dtype=np.int64, mode=modo, shape=(TAMANHO_CABECALHO,)
+        )
+        self.capacidade = int(self._cabecalho[_CAPACIDADE])
+        self.geracao = int(self._cabecalho[_GERACAO])
+        self._dados = np.memmap(
+            self.caminho,
+            dtype=np.float64,
+            mode=modo,
+            offset=BYTES_CABECALHO,
+            shape=(2 * self.capacidade, CAMPOS_OHLCV),
+        )
+
+    def fechar(self) -> None:
+        """
+        Solta os mapeamentos do arquivo (o Windows não permite substituí-lo
+        com o mapeamento aberto). O mmap é liberado quando a última visão sem
+        cópia entregue a um chamador deixa de existir; fechá-lo à força
+        invalidaria essas visões.
+        """
+        if not self.somente_leitura and self._cabecalho is not None:
+            self._cabecalho.flush()
+            self._dados.flush()
+        self._cabecalho = self._dados = None
+
+    def _substituido(self) -> bool:
+        # Geração negativa: arquivo marcado para troca, a nova ainda não está
+        # no caminho
+        geracao = int(self._cabecalho[_GERACAO])
+        return geracao != self.geracao or geracao < 0
+
+    def _remapear_se_substituido(self) -> None:
+        """Leitor: reabre o caminho se o escritor recriou o arquivo."""
+        if self._substituido():
+            with self._lock:
+                if self._substituido():
+                    self.fechar()
+                    self._mapear()
+
+    @staticmethod
+    def _layout_valido(caminho: str) -> bool:
+        try:
+            cabecalho = np.fromfile(caminho, dtype=np.int64, count=TAMANHO_CABECALHO)
+        except (OSError, ValueError):
+            return False
+        if len(cabecalho) < TAMANHO_CABECALHO:
+            return False
+        esperado = BYTES_CABECALHO + 2 * int(cabecalho[_CAPACIDADE]) * CAMPOS_OHLCV * 8
+        return (
+            cabecalho[_ASSINATURA] == ASSINATURA
+            and cabecalho[_VERSAO] == VERSAO_LAYOUT
+            and cabecalho[_CAMPOS] == CAMPOS_OHLCV
+            and cabecalho[_CAPACIDADE] > 0
+            and os.path.getsize(caminho) == esperado
+        )
+
+    @staticmethod
+    def _criar_arquivo(caminho: str, capacidade: int, geracao: int = 0) -> None:
+        """Cria o arquivo vazio de forma atômica (escreve em .tmp e renomeia)."""
+        temporario = f"{caminho}.tmp"
+        cabecalho = np.zeros(TAMANHO_CABECALHO, dtype=np.int64)
+        cabecalho[_ASSINATURA] = ASSINATURA
+        cabecalho[_VERSAO] = VERSAO_LAYOUT
+        cabecalho[_CAPACIDADE] = capacidade
+        cabecalho[_CAMPOS] = CAMPOS_OHLCV
+        cabecalho[_GERACAO] = geracao
+        with open(temporario, "wb") as f:
+            f.write(cabecalho.tobytes())
+            f.truncate(BYTES_CABECALHO + 2 * capacidade * CAMPOS_OHLCV * 8)
+        os.replace(temporario, caminho)
+
+    @property
+    def _inicio(self) -> int:
+        return int(self._cabecalho[_INICIO])
+
+    @_inicio.setter
+    def _inicio(self, valor: int) -> None:
+        self._cabecalho[_INICIO] = valor
+
+    @property
+    def _tamanho(self) -> int:
+        return int(self._cabecalho[_TAMANHO])
+
+    @_tamanho.setter
+    def _tamanho(self, valor: int) -> None:
+        self._cabecalho[_TAMANHO] = valor
+
+    def _escrever(self, alteracao):
+        """Executa a alteração com a sequência ímpar (leitores aguardam)."""
+        if self.somente_leitura:
+            raise PermissionError(f"Buffer somente leitura: {self.caminho}")
+        with self._lock:
+            self._cabecalho[_SEQUENCIA] += 1
+            try:
+                return alteracao()
+            finally:
+                self._cabecalho[_SEQUENCIA] += 1
+
+    def atualizar(self, candles) -> int:
+        return self._escrever(lambda: BufferCircular.atualizar(self, candles))
+
+    def substituir(self, candles) -> int:
+        def alteracao():
+            self._inicio = 0
+            self._tamanho = 0
+            return BufferCircular.atualizar(self, candles)
+
+        return self._escrever(alteracao)
+
+    def como_array(self, n: Optional[int] = None, copiar: bool = True) -> np.ndarray:
+        """
+        Retorna os últimos n candles do arquivo mapeado.
+
+        Args:
+            n (int, optional): Quantidade de candles. Padrão: todos.
+            copiar (bool): Se True (padrão), retorna uma cópia feita dentro do
+                seqlock (instantâneo consistente). Com False, a visão sem cópia
+                só é consistente no instante da leitura: o escritor continua
+                gravando nela, então quem a guardar ou converter deve copiá-la
+                (np.array) antes de qualquer outra operação.
+
+        Returns:
+            np.ndarray: Array (n, 6) float64 somente leitura.
+        """
+        if self.somente_leitura:
+            self._remapear_se_substituido()
+        while True:
+            sequencia = int(self._cabecalho[_SEQUENCIA])
+            if sequencia % 2:
+                time.sleep(0)
+                continue
+            inicio, tamanho = self._inicio, self._tamanho
+            visao = self._dados[inicio : inicio + tamanho]
+            if n is not None:
+                visao = visao[-n:] if n > 0 else visao[:0]
+            visao = np.array(visao) if copiar else visao.view(np.ndarray)
+            if int(self._cabecalho[_SEQUENCIA]) == sequencia:
+                break
+        visao.flags.writeable = False
+        return visao
+
+    def como_lista(self, n: Optional[int] = None) -> list:
+        linhas = self.como_array(n, copiar=True).tolist()
+        for linha in linhas:
+            linha[0] = int(linha[0])
+        return linhas
+
+    def sincronizar(self) -> None:
+        """Força a gravação das páginas alteradas no disco."""
+        if not self.somente_leitura:
+            self._cabecalho.flush()
+            self._dados.flush()
+
+
+class ArmazemCandlesDisco(ArmazemCandles):
+    """
+    ArmazemCandles persistente: cada (symbol, timeframe) é um BufferMapeado
+    em `diretorio`. Com somente_leitura=True serve para processos que apenas
+    consomem o histórico gravado pelo bot.
+    """
+
+    def __init__(
+        self,
+        diretorio: str,
+        capacidade_padrao: int = 500,
+        somente_leitura: bool = False,
+    ):
+        super().__init__(capacidade_padrao=capacidade_padrao)
+        self.diretorio = diretorio
+        self.somente_leitura = somente_leitura
+        if not somente_leitura:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def caminho(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.diretorio, nome_arquivo(symbol, timeframe))
+
+    def obter_buffer(
+        self, symbol: str, timeframe: str, capacidade: Optional[int] = None
+    ) -> BufferMapeado:
+        """
+        Abre (ou cria) o arquivo do par/timeframe.
+
+        Se a capacidade pedida for maior que a do arquivo, ele é recriado
+        preservando os candles já gravados.
+        """
+        capacidade = max(capacidade or 0, self.capacidade_padrao)
+        chave = (symbol, timeframe)
+        with self._lock:
+            buffer = self._buffers.get(chave)
+            if buffer is None:
+                buffer = BufferMapeado(
+                    self.caminho(symbol, timeframe),
+                    capacidade,
+                    somente_leitura=self.somente_leitura,
+                )
+                self._buffers[chave] = buffer
+            if buffer.capacidade < capacidade and not self.somente_leitura:
+                buffer = self._ampliar(buffer, capacidade)
+                self._buffers[chave] = buffer
+            return buffer
+
+    def _ampliar(self, buffer: BufferMapeado, capacidade: int) -> BufferMapeado:
+        """
+        Recria o arquivo com a nova capacidade e a próxima geração. O arquivo
+        antigo é marcado com a geração negativa (leitores de outros processos
+        remapeiam) e fechado antes da troca, que o Windows não permite com o
+        mapeamento aberto.
+        """
+        candles = buffer.como_lista()
+        geracao = buffer.geracao + 1
+        caminho = buffer.caminho
+        temporario = f"{caminho}.novo"
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        BufferMapeado._criar_arquivo(temporario, capacidade, geracao)
+        novo = BufferMapeado(temporario, capacidade)
+        novo.atualizar(candles)
+        novo.fechar()
+        with buffer._lock:
+            buffer._cabecalho[_GERACAO] = -geracao
+            buffer.fechar()
+        del buffer, novo
+        try:
+            os.replace(temporario, caminho)
+        except PermissionError as e:
+            # Windows: alguma visão sem cópia ainda mantém o arquivo mapeado
+            logger.warning(
+                f"[armazem_candles_disco] Não foi possível ampliar {caminho}: {e}"
+            )
+            os.remove(temporario)
+            antigo = BufferMapeado(caminho, capacidade)
+            antigo._cabecalho[_GERACAO] = antigo.geracao = geracao - 1
+            return antigo
+        return BufferMapeado(caminho, capacidade)
+
+    def _buffer_existente(self, symbol: str, timeframe: str):
+        buffer = self._buffers.get((symbol, timeframe))
+        if buffer is None and os.path.exists(self.caminho(symbol, timeframe)):
+            try:
+                buffer = self.obter_buffer(symbol, timeframe)
+            except (OSError, ValueError):
+                return None
+        return buffer
+
+    def ultimo_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        buffer = self._buffer_existente(symbol, timeframe)
+        return buffer.ultimo_timestamp if buffer else None
+
+    def tamanho(self, symbol: str, timeframe: str) -> int:
+        buffer = self._buffer_existente(symbol, timeframe)
+        return len(buffer) if buffer else 0
+
+    def remover(self, symbol: str, timeframe: str) -> None:
+        """Fecha o buffer e apaga o arquivo do par/timeframe."""
+        with self._lock:
+            buffer = self._buffers.pop((symbol, timeframe), None)
+        if buffer is not None:
+            buffer.fechar()
+        if not self.somente_leitura:
+            caminho = self.caminho(symbol, timeframe)
+            if os.path.exists(caminho):
+                os.remove(caminho)
+
+    def sincronizar(self) -> None:
+        """Grava no disco as páginas alteradas de todos os buffers abertos."""
+        with self._lock:
+            buffers = list(self._buffers.values())
+        for buffer in buffers:
+            buffer.sincronizar()
+
+    def limpar(self) -> None:
+        """Sincroniza e fecha os buffers; os arquivos permanecem no disco."""
+        self.sincronizar()
+        super().limpar()
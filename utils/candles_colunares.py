@@ -0,0 +1,217 @@
+"""
+Contêiner colunar de candles OHLCV.
+Construído uma única vez pela camada de dados (ObterDados) e repassado,
+somente leitura, a todos os plugins em dados_completos["crus"]. As colunas são
+arrays float64 contíguos prontos para NumPy/TA-Lib; a lista de candles
+[ts, o, h, l, c, v] continua disponível para o código legado, com linhas
+também somente leitura para não divergirem das colunas.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.armazem_candles import CAMPOS_OHLCV
+from utils.logging_config import get_logger
+from utils.validacao_candles import RelatorioValidacao, validar_colunas
+
+logger = get_logger(__name__)
+
+# Índices das colunas, iguais às posições na lista do CCXT
+TIMESTAMP, OPEN, HIGH, LOW, CLOSE, VOLUME = range(CAMPOS_OHLCV)
+
+
+def _somente_leitura(*args, **kwargs):
+    raise TypeError("CandlesOHLCV é somente leitura")
+
+
+class LinhaCandle(list):
+    """
+    Candle [ts, o, h, l, c, v] somente leitura de um CandlesOHLCV.
+
+    Continua sendo uma list (comparação, serialização e isinstance), mas os
+    métodos que a alterariam levantam TypeError: as colunas do contêiner
+    são a fonte dos indicadores e do cache, e uma linha alterada passaria a
+    divergir delas. Para alterar, use list(linha) ou CandlesOHLCV.como_lista().
+    """
+
+    __slots__ = ()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _somente_leitura
+    append = extend = insert = pop = remove = clear = _somente_leitura
+    sort = reverse = _somente_leitura
+
+
+class CandlesOHLCV(list):
+    """
+    Candles OHLCV em colunas contíguas (matriz 6 x n, float64, somente leitura).
+
+    É uma subclasse de list para compatibilidade: indexação, iteração,
+    len(), comparação e serialização continuam funcionando como a lista de
+    candles do CCXT. Fatias devolvem novos CandlesOHLCV que compartilham as
+    colunas e as linhas (sem cópia). Os métodos que alterariam a lista ou
+    uma de suas linhas (LinhaCandle) levantam TypeError.
+    O relatório de validação é calculado uma vez e fica em `validacao`.
+    """
+
+    __slots__ = ("_colunas", "_validacao")
+
+    def __init__(self, candles: Iterable = ()):
+        self._validacao = None
+        if isinstance(candles, np.ndarray):
+            self._inicializar_de_array(candles)
+            return
+        linhas = [self._linha(c) for c in candles]
+        list.extend(self, linhas)
+        self._colunas = self._montar_colunas(linhas)
+
+    @classmethod
+    def de_array(cls, dados: np.ndarray) -> "CandlesOHLCV":
+        """Cria a partir de um array (n, 6) (ex: BufferCircular.como_array())."""
+        return cls(np.asarray(dados, dtype=np.float64))
+
+    def _inicializar_de_array(self, dados: np.ndarray) -> None:
+        dados = np.asarray(dados, dtype=np.float64).reshape(-1, CAMPOS_OHLCV)
+        colunas = np.ascontiguousarray(dados.T)
+        colunas.flags.writeable = False
+        self._colunas = colunas
+        linhas = dados.tolist()
+        for linha in linhas:
+            if linha[TIMESTAMP] == linha[TIMESTAMP]:  # NaN permanece float
+                linha[TIMESTAMP] = int(linha[TIMESTAMP])
+        list.extend(self, map(LinhaCandle, linhas))
+
+    @staticmethod
+    def _linha(candle) -> LinhaCandle:
+        # Itens que não são sequências viram linhas vazias (colunas NaN)
+        if isinstance(candle, LinhaCandle):
+            return candle
+        if isinstance(candle, (str, bytes)):
+            return LinhaCandle()
+        try:
+            return LinhaCandle(candle)
+        except TypeError:
+            return LinhaCandle()
+
+    @staticmethod
+    def _montar_colunas(linhas: List[list]) -> np.ndarray:
+        colunas = np.full((CAMPOS_OHLCV, len(linhas)), np.nan, dtype=np.float64)
+        try:
+            dados = np.array(linhas, dtype=np.float64)
+            if dados.ndim == 2 and dados.shape[1] >= CAMPOS_OHLCV:
+                colunas[:] = dados[:, :CAMPOS_OHLCV].T
+            else:
+                raise ValueError("formato irregular")
+        except (ValueError, TypeError):
+            # Candles com campos faltantes ou inválidos viram NaN
+            for j, linha in enumerate(linhas):
+                for i in range(min(len(linha), CAMPOS_OHLCV)):
+                    try:
+                        colunas[i, j] = float(linha[i])
+                    except (TypeError, ValueError):
+                        pass
+        colunas.flags.writeable = False
+        return colunas
+
+    @classmethod
+    def _de_fatia(cls, linhas: list, colunas: np.ndarray) -> "CandlesOHLCV":
+        novo = cls.__new__(cls)
+        list.extend(novo, linhas)
+        novo._colunas = colunas
+        novo._validacao = None
+        return novo
+
+    # --- Colunas ---
+    @property
+    def colunas(self) -> np.ndarray:
+        """Matriz (6, n) float64 somente leitura; cada linha é contígua."""
+        return self._colunas
+
+    def coluna(self, indice: int) -> np.ndarray:
+        return self._colunas[indice]
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._colunas[TIMESTAMP]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._colunas[OPEN]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._colunas[HIGH]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._colunas[LOW]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._colunas[CLOSE]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._colunas[VOLUME]
+
+    def ohlcv(self, indices: Iterable[int]) -> Dict[int, np.ndarray]:
+        """Colunas pedidas no formato de extrair_ohlcv() ({índice: array})."""
+        return {i: self._colunas[i] for i in indices}
+
+    def completo(self, indices: Iterable[int]) -> bool:
+        """Indica se as colunas pedidas não têm valores ausentes (NaN)."""
+        return not np.isnan(self._colunas[list(indices)]).any()
+
+    # --- Validação ---
+    def validar(self, timeframe: Optional[str] = None) -> RelatorioValidacao:
+        """Valida os candles (com detecção de lacunas se houver timeframe)."""
+        self._validacao = validar_colunas(self._colunas, timeframe)
+        return self._validacao
+
+    @property
+    def validacao(self) -> RelatorioValidacao:
+        """Relatório de validação, calculado na primeira consulta."""
+        if self._validacao is None:
+            self._validacao = validar_colunas(self._colunas)
+        return self._validacao
+
+    def como_lista(self) -> List[list]:
+        """Cópia em lista de listas (para código que precisa alterar os dados)."""
+        return [list(c) for c in self]
+
+    # --- Compatibilidade com list ---
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return self._de_fatia(
+                list.__getitem__(self, indice), self._colunas[:, indice]
+            )
+        return list.__getitem__(self, indice)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (self.__class__.de_array, (self._colunas.T.copy(),))
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _somente_leitura
+    append = extend = insert = pop = remove = clear = _somente_leitura
+    sort = reverse = _somente_leitura
+
+
+def como_candles(candles) -> CandlesOHLCV:
+    """Retorna `candles` como CandlesOHLCV, convertendo só se necessário."""
+    if isinstance(candles, CandlesOHLCV):
+        return candles
+    return CandlesOHLCV(candles or [])
@@ -18,6 +18,8 @@ except UnicodeDecodeError:
 # Caminho padrão para schema.json e pares.json sempre em utils/
 SCHEMA_JSON_PATH = os.getenv("SCHEMA_JSON_PATH", os.path.join("utils", "schema.json"))
 PAIRS_JSON_PATH = os.getenv("PAIRS_JSON_PATH", os.path.join("utils", "pares.json"))
+# Diretório dos arquivos de candles mapeados em memória (armazem_persistente)
+CANDLES_DIR = os.getenv("CANDLES_DIR", os.path.join("dados", "candles"))
 
 _config_cache = None
 
@@ -98,11 +100,13 @@ class ConfigManager:
             api_key = os.getenv("TESTNET_BYBIT_API_KEY")
             api_secret = os.getenv("TESTNET_BYBIT_API_SECRET")
             base_url = "https://api-testnet.bybit.com"
+            ws_url = "wss://stream-testnet.bybit.com/v5/public/linear"
             logger.debug("Credenciais da testnet carregadas.")
         else:
             api_key = os.getenv("BYBIT_API_KEY")
             api_secret = os.getenv("BYBIT_API_SECRET")
             base_url = "https://api.bybit.com"
+            ws_url = "wss://stream.bybit.com/v5/public/linear"
             logger.debug("Credenciais da mainnet carregadas.")
 
         # Estilos de risco SLTP
@@ -126,7 +130,31 @@ class ConfigManager:
         PESOS_PLUGIN = {"analise_mercado": 0.5, "calculo_risco": 0.3, "outros": 0.2}
 
         config = {
-            "bot": {"cycle_interval": bot_cycle_interval},
+            "bot": {
+                "cycle_interval": bot_cycle_interval,
+                # Ciclos alinhados ao fechamento dos candles: só reanalisa um
+                # par/timeframe com candle novo ou se o candle aberto variou
+                # ao menos limiar_variacao (fração do preço). Com fetch_async ou
+                # websocket a seleção é feita antes das análises; no modo REST
+                # cada par/timeframe ainda é buscado e só a análise é pulada
+                "agendador": {
+                    "ativo": False,
+                    "limiar_variacao": 0.002,
+                    "atraso_fechamento": 2.0,
+                },
+                # Prioridade dos symbols: posição aberta > sinal recente (janela_sinal
+                # em segundos) ou volatilidade no quantil superior > demais, estes
+                # analisados a cada intervalo_baixa ciclos. Passados prazo_ciclo
+                # segundos, o trabalho não iniciado é adiado para o próximo ciclo
+                "prioridades": {
+                    "ativo": False,
+                    "intervalo_baixa": 4,
+                    "janela_sinal": 900,
+                    "quantil_volatilidade": 0.8,
+                    "janela_volatilidade": 20,
+                    "prazo_ciclo": None,
+                },
+            },
             "ativos": ativos,
             # Configuração operacional
             "pares": ativos,
@@ -136,10 +164,68 @@ class ConfigManager:
             "swap": True,  # True para analisar swaps perpétuos
             "option": False,  # True para analisar opções
             "timeframes": ["15m", "1h", "4h", "1d"],
-            # Quantidade de symbols processados em lote (ajuste conforme desejado)
-            "batch_size": 3,
             # Número máximo de workers para o ThreadPoolExecutor (ajuste conforme desejado)
             "executor_max_workers": 4,
+            # Busca assíncrona (ccxt.async_support) de todos os candles antes das análises
+            "fetch_async": False,
+            # Máximo de requisições OHLCV simultâneas na busca assíncrona
+            "fetch_concorrencia": 20,
+            # Ingestão de candles: "rest" (polling) ou "websocket" (stream de klines;
+            # a análise de um par só roda quando algum candle dele fecha)
+            "modo_ingestao": "rest",
+            # Deriva localmente os timeframes maiores a partir do timeframe base
+            # (padrão: o menor de "timeframes"), buscando só o base na exchange
+            "reamostragem_local": False,
+            "timeframe_base": None,
+            # Mantém os buffers de candles em arquivos mapeados em memória
+            # (CANDLES_DIR): reinício sem novo download e leitura por outros processos
+            "armazem_persistente": False,
+            # Cache LRU compartilhado dos indicadores (ATR, SMA, MACD, RSI...)
+            # calculados pelos plugins: uma série por atualização de candle.
+            # tolerancia_cauda: erro relativo aceito ao avaliar só o último valor
+            # das médias recursivas (EMA, RSI, ATR...) sobre os candles finais;
+            # 1e-3 mantém MACD/ADX/RSI padrão dentro dos 200 candles da busca
+            # (1e-6 exige ~400 candles e o cálculo volta a usar a série toda)
+            "cache_indicadores": {"capacidade": 2048, "tolerancia_cauda": 1e-3},
+            # Cache LRU dos padrões de candlestick por candle (analise_candles):
+            # cada candle é escaneado uma vez, só na janela final de cada padrão
+            "cache_padroes_candles": {"capacidade": 4096},
+            # Indicadores EMA/RSI/ATR/OBV/MACD/ADX em O(1) por mensagem do stream
+            # (modo_ingestao="websocket"), conferidos com o TA-Lib periodicamente;
+            # ServicoIndicadores.ultimo() lê deles em vez de rodar o TA-Lib
+            "indicadores_incrementais": {"ativo": False, "intervalo_verificacao": 100},
+            # Com fetch_async, calcula SMA/EMA/ATR/RSI/Bollinger de
+            # todos os pares alinhados de um timeframe em uma única matriz NumPy
+            # (só com pelo menos "min_pares" pares alinhados)
+            "indicadores_universo": {"ativo": False, "min_pares": 8},
+            # Divide os pares entre vários processos/hosts (hash consistente por
+            # symbol e arrendamentos no Postgres); worker identifica o processo
+            # (padrão: host-pid) e ttl (s) deve ser maior que o ciclo
+            "fragmentacao": {
+                "ativo": os.getenv("FRAGMENTACAO_ATIVA", "false").lower() == "true",
+                "worker": os.getenv("FRAGMENTO_WORKER"),
+                "ttl": 60.0,
+                "replicas": 64,
+            },
+            # Busca, análise e persistência em estágios com filas limitadas
+            # (contrapressão) e threads próprias; métricas por estágio no log
+            "pipeline_estagios": {
+                "ativo": False,
+                "buscar": {"workers": 8, "capacidade": 64},
+                "analisar": {"workers": 4, "capacidade": 32},
+                "persistir": {"workers": 2, "capacidade": 64},
+            },
+            # Plugins de análise independentes de um mesmo par/timeframe em
+            # paralelo (estágios do plano); symbols vazio = todos os pares
+            "plugins_paralelos": {"ativo": False, "max_workers": 4, "symbols": []},
+            # Com fetch_async, executa as análises em um pool de processos; os
+            # candles vão por memória compartilhada e os workers não gravam no
+            # banco (workers=None usa todos os núcleos)
+            "execucao_processos": {
+                "ativo": False,
+                "workers": None,
+                "contexto": "spawn",
+            },
             "trading": {
                 "auto_trade": False,
                 "risco_por_operacao": 0.05,
@@ -153,6 +239,13 @@ class ConfigManager:
                 "market": os.getenv("BYBIT_MARKET", "linear"),
                 "testnet": testnet,
                 "base_url": base_url,  # usado direto no conexao.py
+                "ws_url": ws_url,  # stream público de klines (modo_ingestao="websocket")
+                # Orçamentos do limitador de taxa (unidades de custo do CCXT por segundo)
+                "limites_taxa": {
+                    "publico": {"taxa": 50.0, "capacidade": 50.0},
+                    "privado": {"taxa": 50.0, "capacidade": 50.0},
+                    "global": {"taxa": 100.0, "capacidade": 100.0},
+                },
             },
             "db": {
                 "host": os.getenv("DB_HOST"),
@@ -0,0 +1,293 @@
+"""
+Coleta de dados externos de sentimento (Fear & Greed, Long/Short Ratio, BTC.d).
+Uma sessão HTTP com pool de conexões keep-alive é compartilhada por todas as
+fontes, que são atualizadas em segundo plano antes de o TTL expirar. O
+caminho de análise só lê o último instantâneo em memória, com metadados de
+idade/obsolescência, e nunca espera pela rede.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+URL_FGI_PADRAO = "https://api.alternative.me/fng/"
+
+
+def criar_sessao_http(
+    tamanho_pool: int = 4, tentativas: int = 2, backoff: float = 0.5
+) -> requests.Session:
+    """
+    Cria uma requests.Session com pool de conexões keep-alive e retentativas
+    para erros transitórios (429/5xx).
+    """
+    sessao = requests.Session()
+    retry = Retry(
+        total=tentativas,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+    )
+    adaptador = HTTPAdapter(
+        pool_connections=tamanho_pool, pool_maxsize=tamanho_pool, max_retries=retry
+    )
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+    return sessao
+
+
+def interpretar_fgi(data: dict, config: dict) -> Optional[dict]:
+    """Converte a resposta da API Fear & Greed (alternative.me)."""
+    if not data.get("data"):
+        return None
+    info = data["data"][0]
+    return {
+        "value": int(info["value"]),
+        "classification": info["value_classification"],
+        "timestamp": int(info["timestamp"]),
+    }
+
+
+def interpretar_lsr(data: dict, config: dict) -> Optional[dict]:
+    """Converte a resposta de Long/Short Ratio e classifica a direção."""
+    lsr = float(data.get("longShortRatio", 1.0))
+    if lsr > float(config.get("LSR_LIMITE_LONG", 1.5)):
+        direcao = "Long Pesado"
+    elif lsr < float(config.get("LSR_LIMITE_SHORT", 0.7)):
+        direcao = "Short Pesado"
+    else:
+        direcao = "Equilibrado"
+    return {
+        "lsr": lsr,
+        "long": float(data.get("longAccount", 0.0)),
+        "short": float(data.get("shortAccount", 0.0)),
+        "direcao": direcao,
+    }
+
+
+def interpretar_btc_dominance(data: dict, config: dict) -> Optional[dict]:
+    """Converte a resposta de BTC Dominance e classifica a categoria."""
+    dominance = float(data.get("btc_dominance", 0.0))
+    if dominance >= float(config.get("BTC_DOMINANCE_LIMITE_ALTA", 50)):
+        categoria = "Alta"
+    elif dominance <= float(config.get("BTC_DOMINANCE_LIMITE_BAIXA", 45)):
+        categoria = "Baixa"
+    else:
+        categoria = "Média"
+    return {
+        "dominance": dominance,
+        "direcao": data.get("direction", "Estável"),
+        "categoria": categoria,
+    }
+
+
+class FonteExterna:
+    """
+    Descrição de uma fonte de dados externa.
+
+    Args:
+        nome (str): Identificador da fonte (ex: "fgi").
+        url (str): URL; pode conter {symbol} para fontes por par.
+        ttl (float): Validade do dado em segundos.
+        interpretar (callable): (json, config) -> dict com os campos da fonte.
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        url: str,
+        ttl: float,
+        interpretar: Callable[[dict, dict], Optional[dict]],
+    ):
+        self.nome = nome
+        self.url = url
+        self.ttl = float(ttl)
+        self.interpretar = interpretar
+
+
+def fontes_da_config(config: dict) -> Dict[str, FonteExterna]:
+    """Monta as fontes FGI/LSR/BTC.d a partir das chaves já usadas na config."""
+    return {
+        "fgi": FonteExterna(
+            "fgi",
+            config.get("FGI_URL", URL_FGI_PADRAO),
+            config.get("FGI_CACHE_TTL", 300),
+            interpretar_fgi,
+        ),
+        "lsr": FonteExterna(
+            "lsr",
+            config.get("LSR_URL", ""),
+            config.get("LSR_CACHE_TTL", 300),
+            interpretar_lsr,
+        ),
+        "btc_dominance": FonteExterna(
+            "btc_dominance",
+            config.get("BTC_DOMINANCE_URL", ""),
+            config.get("BTC_DOMINANCE_CACHE_TTL", 300),
+            interpretar_btc_dominance,
+        ),
+    }
+
+
+class ColetorDadosExternos:
+    """
+    Mantém instantâneos em memória das fontes externas, atualizados por uma
+    thread em segundo plano.
+
+    - obter() nunca faz I/O: devolve o último dado com "idade_segundos",
+      "obsoleto" e "erro"; uma chave nova é registrada e buscada em seguida.
+    - Cada chave é atualizada ao atingir `antecedencia` x TTL de idade, de modo
+      que o dado é renovado antes de expirar.
+    - Falhas mantêm o último dado válido e são repetidas após `espera_erro`.
+    """
+
+    def __init__(
+        self,
+        fontes: Dict[str, FonteExterna],
+        config: Optional[dict] = None,
+        sessao: Optional[requests.Session] = None,
+        timeout: float = 5.0,
+        antecedencia: float = 0.8,
+        espera_erro: float = 30.0,
+    ):
+        self.fontes = fontes
+        self.config = config or {}
+        self.sessao = sessao or criar_sessao_http()
+        self.timeout = timeout
+        self.antecedencia = antecedencia
+        self.espera_erro = espera_erro
+        self.requisicoes = 0
+        self._instantaneos: Dict[Tuple[str, Optional[str]], dict] = {}
+        self._proxima: Dict[Tuple[str, Optional[str]], float] = {}
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ativo(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def iniciar(self) -> None:
+        """Inicia a thread de atualização (idempotente)."""
+        if self.ativo:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="dados-externos", daemon=True
+        )
+        self._thread.start()
+
+    def parar(self, timeout: float = 5.0) -> None:
+        """Encerra a thread de atualização e fecha a sessão HTTP."""
+        self._parar.set()
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.sessao.close()
+
+    def registrar(self, nome: str, symbol: Optional[str] = None) -> None:
+        """Inclui a chave (fonte, symbol) na atualização em segundo plano."""
+        chave = (nome, symbol)
+        with self._lock:
+            if chave in self._proxima:
+                return
+            self._proxima[chave] = 0.0
+        self._acordar.set()
+
+    def obter(self, nome: str, symbol: Optional[str] = None) -> dict:
+        """
+        Retorna o último instantâneo da fonte, sem acessar a rede.
+
+        Returns:
+            dict: Campos da fonte + "fonte", "atualizado_em", "idade_segundos",
+            "obsoleto" e "erro".
+        """
+        fonte = self.fontes[nome]
+        chave = (nome, symbol)
+        with self._lock:
+            instantaneo = self._instantaneos.get(chave)
+            registrada = chave in self._proxima
+        if not registrada:
+            self.registrar(nome, symbol)
+            self.iniciar()
+        if instantaneo is None:
+            return {
+                "fonte": self._url(fonte, symbol),
+                "atualizado_em": None,
+                "idade_segundos": None,
+                "obsoleto": True,
+                "erro": None,
+            }
+        idade = time.time() - instantaneo["atualizado_em"]
+        return {
+            **instantaneo,
+            "idade_segundos": round(idade, 3),
+            "obsoleto": idade > fonte.ttl,
+        }
+
+    def atualizar(self, nome: str, symbol: Optional[str] = None) -> bool:
+        """Busca a fonte agora (usado pela thread e em testes)."""
+        fonte = self.fontes[nome]
+        chave = (nome, symbol)
+        url = self._url(fonte, symbol)
+        if not url:
+            self._registrar_erro(chave, url, "URL não configurada", fonte.ttl)
+            return False
+        try:
+            self.requisicoes += 1
+            resposta = self.sessao.get(url, timeout=self.timeout)
+            resposta.raise_for_status()
+            dados = fonte.interpretar(resposta.json(), self.config)
+            if dados is None:
+                raise ValueError("resposta sem dados")
+        except Exception as e:
+            logger.warning(f"[dados_externos] Falha ao atualizar {nome}: {e}")
+            self._registrar_erro(chave, url, str(e), self.espera_erro)
+            return False
+        agora = time.time()
+        with self._lock:
+            self._instantaneos[chave] = {
+                **dados,
+                "fonte": url,
+                "atualizado_em": agora,
+                "erro": None,
+            }
+            self._proxima[chave] = time.monotonic() + fonte.ttl * self.antecedencia
+        logger.debug(f"[dados_externos] {nome} atualizado: {dados}")
+        return True
+
+    def _registrar_erro(self, chave, url, erro: str, espera: float) -> None:
+        with self._lock:
+            anterior = self._instantaneos.get(chave)
+            if anterior is not None:
+                anterior["erro"] = erro
+            self._proxima[chave] = time.monotonic() + espera
+
+    @staticmethod
+    def _url(fonte: FonteExterna, symbol: Optional[str]) -> str:
+        return fonte.url.format(symbol=symbol or "") if fonte.url else ""
+
+    def _loop(self) -> None:
+        while not self._parar.is_set():
+            agora = time.monotonic()
+            with self._lock:
+                vencidas = [c for c, t in self._proxima.items() if t <= agora]
+                proxima = min(self._proxima.values(), default=None)
+            for nome, symbol in vencidas:
+                if self._parar.is_set():
+                    return
+                self.atualizar(nome, symbol)
+            if vencidas:
+                continue
+            espera = None if proxima is None else max(0.0, proxima - agora)
+            self._acordar.wait(espera)
+            self._acordar.clear()
@@ -0,0 +1,317 @@
+"""
+Execução das análises de cada par/timeframe em um pool de processos.
+Os candles de todas as unidades do ciclo são copiados uma única vez para um
+bloco de memória compartilhada (multiprocessing.shared_memory), no formato
+colunar (6, n) de CandlesOHLCV; cada tarefa leva só o nome do bloco, o
+deslocamento e o tamanho. Os workers mantêm suas próprias instâncias dos
+plugins do plano (sem banco de dados nem conexão com a exchange), executam o
+plano e o plugin de sinais e devolvem um registro compacto com os
+resultados, sem os candles. As gravações no banco feitas pelos plugins no
+worker voltam no registro e são executadas pelo processo principal.
+"""
+
+import inspect
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from time import perf_counter
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.armazem_candles import CAMPOS_OHLCV
+from utils.candles_colunares import CandlesOHLCV, como_candles
+from utils.logging_config import get_logger
+from utils.pipeline_estagios import adiando_persistencia, adiar_persistencia
+
+logger = get_logger(__name__)
+
+# Dependências que envolvem E/S e ficam só no processo principal
+_EXTERNOS = {"gerenciador_banco", "obter_dados", "conexao"}
+
+# Chaves de dados_completos que não voltam no registro (o principal já as tem)
+_NAO_DEVOLVER = ("crus", "candles")
+
+
+class ArenaCandles:
+    """
+    Bloco de memória compartilhada com as colunas de várias séries.
+
+    Args:
+        series (dict): (symbol, timeframe) -> k-lines ou CandlesOHLCV.
+    """
+
+    def __init__(self, series: Dict[Tuple[str, str], object]):
+        self.series = {
+            chave: como_candles(candles) for chave, candles in series.items() if candles
+        }
+        total = sum(len(c) for c in self.series.values()) * CAMPOS_OHLCV
+        self._shm = shared_memory.SharedMemory(create=True, size=max(total, 1) * 8)
+        dados = np.ndarray((max(total, 1),), dtype=np.float64, buffer=self._shm.buf)
+        self.descritores: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        deslocamento = 0
+        for chave, candles in self.series.items():
+            tamanho = len(candles) * CAMPOS_OHLCV
+            dados[deslocamento : deslocamento + tamanho] = candles.colunas.ravel()
+            self.descritores[chave] = (deslocamento, len(candles))
+            deslocamento += tamanho
+        del dados
+
+    @property
+    def nome(self) -> str:
+        return self._shm.name
+
+    def __contains__(self, chave) -> bool:
+        return chave in self.descritores
+
+    def __len__(self) -> int:
+        return len(self.descritores)
+
+    def fechar(self) -> None:
+        """Libera o bloco (depois que todas as tarefas terminaram)."""
+        try:
+            self._shm.close()
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+# Python 3.13+ permite abrir um bloco sem registrá-lo no resource_tracker
+_ANEXAR_SEM_RASTREIO = (
+    "track" in inspect.signature(shared_memory.SharedMemory).parameters
+)
+
+
+def _anexar(nome: str) -> shared_memory.SharedMemory:
+    """
+    Abre um bloco existente sem registrá-lo no resource_tracker (compartilhado
+    com o processo principal): quem cria o bloco (ArenaCandles) é o único
+    responsável pelo unlink, e um registro feito pelo worker geraria avisos
+    de vazamento ou um segundo unlink.
+    """
+    if _ANEXAR_SEM_RASTREIO:
+        return shared_memory.SharedMemory(name=nome, track=False)
+    registrar = resource_tracker.register
+
+    def _registrar(nome_recurso, tipo):
+        if tipo != "shared_memory":
+            registrar(nome_recurso, tipo)
+
+    resource_tracker.register = _registrar
+    try:
+        return shared_memory.SharedMemory(name=nome)
+    finally:
+        resource_tracker.register = registrar
+
+
+def ler_colunas(nome: str, deslocamento: int, tamanho: int) -> np.ndarray:
+    """Copia as colunas (6, tamanho) de uma série do bloco compartilhado."""
+    shm = _anexar(nome)
+    try:
+        visao = np.ndarray(
+            (CAMPOS_OHLCV, tamanho),
+            dtype=np.float64,
+            buffer=shm.buf,
+            offset=deslocamento * 8,
+        )
+        colunas = visao.copy()
+        del visao
+    finally:
+        shm.close()
+    return colunas
+
+
+# --- Lado do worker ---
+_estado: dict = {}
+
+
+class BancoAdiado:
+    """
+    Substitui o GerenciadorBanco nos plugins do worker: persistir_dados só
+    guarda a gravação, devolvida no registro da análise.
+    """
+
+    def persistir_dados(self, plugin: str, tabela: str, dados) -> bool:
+        if adiar_persistencia(self, plugin, tabela, dados):
+            return True
+        logger.warning(
+            f"[execucao_processos] Gravação de {plugin} em {tabela} fora de uma análise descartada"
+        )
+        return False
+
+
+def _usa_banco(classe, plugin) -> bool:
+    """Indica se o plugin grava pelo gerenciador_banco no processo principal."""
+    try:
+        dependencias = classe.dependencias() if hasattr(classe, "dependencias") else []
+    except TypeError:
+        dependencias = []
+    return (
+        "gerenciador_banco" in (dependencias or [])
+        or "gerenciador_banco" in inspect.signature(classe.__init__).parameters
+        or hasattr(plugin, "_gerenciador_banco")
+    )
+
+
+def _instanciar(nome: str, instancias: dict, config: dict):
+    if nome in instancias:
+        return instancias[nome]
+    from plugins.plugin import PluginRegistry
+
+    classe = PluginRegistry.obter_plugin(nome)
+    if classe is None:
+        raise RuntimeError(f"Plugin '{nome}' não registrado")
+    kwargs = {"gerente": None}
+    for parametro in inspect.signature(classe.__init__).parameters:
+        if parametro in _EXTERNOS or parametro in kwargs:
+            continue
+        if PluginRegistry.obter_plugin(parametro):
+            kwargs[parametro] = _instanciar(parametro, instancias, config)
+    plugin = classe(**kwargs)
+    if _usa_banco(classe, plugin):
+        plugin._gerenciador_banco = _estado.setdefault("banco", BancoAdiado())
+    if not plugin.inicializar(config):
+        raise RuntimeError(f"Falha ao inicializar plugin '{nome}'")
+    instancias[nome] = plugin
+    return plugin
+
+
+def inicializar_worker(plugins_plano: Sequence[str], sinais: Optional[str]) -> None:
+    """Instancia os plugins do plano no worker e compila o plano local."""
+    import plugins  # noqa: F401 - registra as classes dos plugins
+    from utils.config import carregar_config
+    from utils.plano_execucao import compilar_plano, declaracao_plugin
+
+    config = carregar_config()
+    instancias: dict = {}
+    for nome in list(plugins_plano) + ([sinais] if sinais else []):
+        _instanciar(nome, instancias, config)
+    _estado["plano"] = compilar_plano(
+        [declaracao_plugin(instancias[nome]) for nome in plugins_plano]
+    )
+    _estado["sinais"] = instancias.get(sinais) if sinais else None
+
+
+def analisar(
+    nome: str,
+    deslocamento: int,
+    tamanho: int,
+    symbol: str,
+    timeframe: str,
+    extras: Optional[dict] = None,
+    universo: Optional[list] = None,
+) -> dict:
+    """
+    Executa o plano e o plugin de sinais para uma série do bloco compartilhado.
+    universo: séries (nome, parâmetros, série) já calculadas no modo universo,
+    gravadas no cache de indicadores do worker antes do plano.
+
+    Returns:
+        dict: {"symbol", "timeframe", "dados", "persistencias", "segundos",
+        "pid"} ou, em caso de falha, {"symbol", "timeframe", "erro", "pid"}.
+        persistencias: gravações (plugin, tabela, dados) a executar no
+        processo principal.
+    """
+    from utils.indicadores_matriciais import armazenar_lote
+    from utils.plano_execucao import executar_plano
+    from utils.servico_indicadores import obter_servico_indicadores
+
+    inicio = perf_counter()
+    registro = {"symbol": symbol, "timeframe": timeframe, "pid": os.getpid()}
+    try:
+        candles = CandlesOHLCV.de_array(ler_colunas(nome, deslocamento, tamanho).T)
+        dados = {"symbol": symbol, "timeframe": timeframe, "crus": candles}
+        dados["candles"] = candles
+        dados.update(extras or {})
+        if universo:
+            armazenar_lote(
+                obter_servico_indicadores(), universo, candles, symbol, timeframe
+            )
+        with adiando_persistencia() as pendentes:
+            executar_plano(_estado["plano"], dados, symbol, timeframe)
+            sinais = _estado.get("sinais")
+            if sinais is not None:
+                resultado = sinais.executar(
+                    symbol=symbol, timeframe=timeframe, dados_completos=dados
+                )
+                if isinstance(resultado, dict):
+                    dados.update(resultado)
+        for chave in _NAO_DEVOLVER:
+            dados.pop(chave, None)
+        registro["dados"] = dados
+        registro["persistencias"] = [
+            (plugin, tabela, gravacao) for _, plugin, tabela, gravacao in pendentes
+        ]
+    except Exception as e:
+        logger.error(
+            f"[execucao_processos] Erro ao analisar {symbol}-{timeframe}: {e}",
+            exc_info=True,
+        )
+        registro["erro"] = str(e)
+    registro["segundos"] = round(perf_counter() - inicio, 6)
+    return registro
+
+
+# --- Lado do processo principal ---
+class ExecutorAnaliseProcessos:
+    """
+    Pool de processos que executa o plano de análise.
+
+    Args:
+        plugins_plano (Sequence[str]): Plugins do plano, na ordem original.
+        sinais (str, optional): Plugin de sinais executado após o plano.
+        workers (int, optional): Processos (padrão: os.cpu_count()).
+        contexto (str): Método de início dos processos ("spawn" evita herdar
+            conexões e threads do processo principal).
+    """
+
+    def __init__(
+        self,
+        plugins_plano: Sequence[str],
+        sinais: Optional[str] = "sinais_plugin",
+        workers: Optional[int] = None,
+        contexto: str = "spawn",
+    ):
+        self.plugins_plano = tuple(plugins_plano)
+        self.sinais = sinais
+        self.workers = int(workers or os.cpu_count() or 1)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(contexto),
+            initializer=inicializar_worker,
+            initargs=(self.plugins_plano, sinais),
+        )
+
+    def compativel(self, plugins_plano: Iterable[str], sinais: Optional[str]) -> bool:
+        """Indica se o pool foi criado para o mesmo plano."""
+        return tuple(plugins_plano) == self.plugins_plano and sinais == self.sinais
+
+    def submeter(
+        self,
+        arena: ArenaCandles,
+        symbol: str,
+        timeframe: str,
+        extras: Optional[dict] = None,
+        universo: Optional[list] = None,
+    ) -> Future:
+        deslocamento, tamanho = arena.descritores[(symbol, timeframe)]
+        return self._pool.submit(
+            analisar,
+            arena.nome,
+            deslocamento,
+            tamanho,
+            symbol,
+            timeframe,
+            extras,
+            universo,
+        )
+
+    def encerrar(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,229 @@
+"""
+Fragmentação do universo de symbols entre vários processos (ou hosts).
+Cada worker se anuncia no Postgres já usado pelo GerenciadorBanco (tabela de
+workers com batimento), monta o mesmo anel de hash consistente com os workers
+vivos e arrenda (tabela de arrendamentos com expiração) os symbols que caem no
+seu trecho do anel. Quando um worker para de bater, o anel dos demais deixa de
+incluí-lo e os symbols dele são assumidos assim que o arrendamento expira.
+Os sinais consolidados de cada symbol são publicados em uma tabela comum, lida
+pelo coordenador (o primeiro worker vivo em ordem alfabética).
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import socket
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def _hash(chave: str) -> int:
+    """Hash estável entre processos (o hash() do Python é aleatorizado)."""
+    return int.from_bytes(hashlib.md5(chave.encode("utf-8")).digest()[:8], "big")
+
+
+def identificador_worker() -> str:
+    """Identificador padrão do worker: host e pid."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class AnelConsistente:
+    """
+    Anel de hash consistente com nós virtuais.
+
+    Ao entrar ou sair um nó, só os symbols do trecho dele mudam de dono.
+
+    Args:
+        nos (Iterable[str]): Identificadores dos workers.
+        replicas (int): Nós virtuais por worker (equilíbrio da divisão).
+    """
+
+    def __init__(self, nos: Iterable[str], replicas: int = 64):
+        self.nos = sorted(set(nos))
+        pontos = sorted(
+            (_hash(f"{no}#{r}"), no) for no in self.nos for r in range(replicas)
+        )
+        self._chaves = [ponto for ponto, _ in pontos]
+        self._donos = [no for _, no in pontos]
+
+    def no_de(self, symbol: str) -> Optional[str]:
+        """Worker responsável pelo symbol (None com o anel vazio)."""
+        if not self._chaves:
+            return None
+        indice = bisect.bisect(self._chaves, _hash(symbol)) % len(self._chaves)
+        return self._donos[indice]
+
+    def particionar(self, symbols: Iterable[str]) -> Dict[str, List[str]]:
+        """Symbols de cada worker, na ordem recebida."""
+        particoes: Dict[str, List[str]] = {no: [] for no in self.nos}
+        for symbol in symbols:
+            no = self.no_de(symbol)
+            if no is not None:
+                particoes[no].append(symbol)
+        return particoes
+
+
+class RepositorioFragmentos:
+    """
+    Tabelas de workers, arrendamentos e sinais no Postgres.
+
+    As tabelas são declaradas em GerenciadorBot.plugin_tabelas e criadas pelo
+    GerenciadorBanco; aqui há só leitura e escrita. O tempo de referência é
+    o now() do banco, então hosts com relógios diferentes concordam sobre
+    expirações.
+
+    Args:
+        banco: Objeto com executar_sql(query, params, fetchone, fetchall)
+            (GerenciadorBanco).
+    """
+
+    def __init__(self, banco):
+        self._banco = banco
+
+    def bater(self, worker: str) -> None:
+        self._banco.executar_sql(
+            "INSERT INTO fragmentos_workers (worker, visto_em) VALUES (%s, now()) "
+            "ON CONFLICT (worker) DO UPDATE SET visto_em = now()",
+            (worker,),
+        )
+
+    def workers_vivos(self, ttl: float) -> List[str]:
+        linhas = self._banco.executar_sql(
+            "SELECT worker FROM fragmentos_workers "
+            "WHERE visto_em > now() - %s * interval '1 second' ORDER BY worker",
+            (ttl,),
+            fetchall=True,
+        )
+        return [linha[0] for linha in linhas or []]
+
+    def arrendar(self, worker: str, symbols: Sequence[str], ttl: float) -> List[str]:
+        """Arrenda (ou renova) os symbols livres, expirados ou já do worker."""
+        if not symbols:
+            return []
+        linhas = self._banco.executar_sql(
+            """
+            INSERT INTO fragmentos_arrendamentos (symbol, worker, expira_em)
+            SELECT s, %s, now() + %s * interval '1 second' FROM unnest(%s::text[]) AS s
+            ON CONFLICT (symbol) DO UPDATE
+                SET worker = EXCLUDED.worker, expira_em = EXCLUDED.expira_em
+                WHERE fragmentos_arrendamentos.worker = EXCLUDED.worker
+                   OR fragmentos_arrendamentos.expira_em < now()
+            RETURNING symbol
+            """,
+            (worker, ttl, list(symbols)),
+            fetchall=True,
+        )
+        return [linha[0] for linha in linhas or []]
+
+    def liberar(self, worker: str, symbols: Optional[Sequence[str]] = None) -> None:
+        """
+        Libera os symbols informados; sem symbols, libera todos os do worker e
+        o retira do anel.
+        """
+        if symbols is None:
+            self._banco.executar_sql(
+                "DELETE FROM fragmentos_arrendamentos WHERE worker = %s", (worker,)
+            )
+            self._banco.executar_sql(
+                "DELETE FROM fragmentos_workers WHERE worker = %s", (worker,)
+            )
+        elif symbols:
+            self._banco.executar_sql(
+                "DELETE FROM fragmentos_arrendamentos "
+                "WHERE worker = %s AND symbol = ANY(%s::text[])",
+                (worker, list(symbols)),
+            )
+
+    def publicar_sinal(self, worker: str, symbol: str, sinal: dict) -> None:
+        self._banco.executar_sql(
+            "INSERT INTO fragmentos_sinais (symbol, worker, sinal, atualizado_em) "
+            "VALUES (%s, %s, %s, now()) ON CONFLICT (symbol) DO UPDATE SET "
+            "worker = EXCLUDED.worker, sinal = EXCLUDED.sinal, atualizado_em = now()",
+            (symbol, worker, json.dumps(sinal, default=str)),
+        )
+
+    def sinais(self, janela: float) -> Dict[str, dict]:
+        linhas = self._banco.executar_sql(
+            "SELECT symbol, worker, sinal FROM fragmentos_sinais "
+            "WHERE atualizado_em > now() - %s * interval '1 second'",
+            (janela,),
+            fetchall=True,
+        )
+        return {
+            symbol: {"worker": worker, "sinal": sinal}
+            for symbol, worker, sinal in linhas or []
+        }
+
+
+class FragmentoSymbols:
+    """
+    Parte do universo de symbols atribuída a este worker.
+
+    Args:
+        repositorio (RepositorioFragmentos): Acesso às tabelas compartilhadas.
+        worker (str, optional): Identificador do worker (padrão: host-pid).
+        ttl (float): Segundos de validade do batimento e dos arrendamentos
+            (maior que o intervalo entre ciclos).
+        replicas (int): Nós virtuais por worker no anel.
+    """
+
+    def __init__(
+        self,
+        repositorio: RepositorioFragmentos,
+        worker: Optional[str] = None,
+        ttl: float = 60.0,
+        replicas: int = 64,
+    ):
+        self.repositorio = repositorio
+        self.worker = worker or identificador_worker()
+        self.ttl = float(ttl)
+        self.replicas = int(replicas)
+        self.workers: List[str] = []
+        self._arrendados: set = set()
+
+    @property
+    def coordenador(self) -> bool:
+        """Este worker coleta os sinais de todos (primeiro worker vivo)."""
+        return bool(self.workers) and self.workers[0] == self.worker
+
+    def symbols_do_ciclo(self, pares: Sequence[str]) -> List[str]:
+        """
+        Renova o batimento e os arrendamentos e retorna os symbols deste
+        worker, na ordem recebida. Symbols que mudaram de dono no anel são
+        liberados; os de outro worker com arrendamento válido ficam de fora
+        até expirar.
+        """
+        self.repositorio.bater(self.worker)
+        self.workers = self.repositorio.workers_vivos(self.ttl)
+        if self.worker not in self.workers:
+            self.workers = sorted(self.workers + [self.worker])
+        anel = AnelConsistente(self.workers, self.replicas)
+        meus = anel.particionar(pares)[self.worker]
+        perdidos = self._arrendados - set(meus)
+        if perdidos:
+            self.repositorio.liberar(self.worker, sorted(perdidos))
+        self._arrendados = set(self.repositorio.arrendar(self.worker, meus, self.ttl))
+        aguardando = len(meus) - len(self._arrendados)
+        logger.debug(
+            f"[fragmentacao_symbols] {self.worker}: {len(self._arrendados)}/{len(pares)} "
+            f"symbols ({len(self.workers)} workers, {aguardando} aguardando arrendamento)"
+        )
+        return [symbol for symbol in pares if symbol in self._arrendados]
+
+    def publicar_sinal(self, symbol: str, sinal: dict) -> None:
+        """Publica o sinal consolidado do symbol para o coordenador."""
+        if symbol in self._arrendados:
+            self.repositorio.publicar_sinal(self.worker, symbol, sinal)
+
+    def coletar_sinais(self, janela: Optional[float] = None) -> Dict[str, dict]:
+        """Sinais publicados por todos os workers na janela (padrão: ttl)."""
+        return self.repositorio.sinais(self.ttl if janela is None else janela)
+
+    def encerrar(self) -> None:
+        """Libera os arrendamentos para que outro worker assuma sem esperar."""
+        self.repositorio.liberar(self.worker)
+        self._arrendados = set()
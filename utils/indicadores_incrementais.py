@@ -0,0 +1,581 @@
+"""
+Indicadores incrementais (streaming) com atualização O(1) por candle.
+EMA, RSI, ATR, OBV, MACD e ADX guardam o estado recursivo de cada série e
+reproduzem os valores do TA-Lib (mesma semente e suavização). O candle
+aberto nunca altera o estado confirmado: cada revisão é calculada a partir
+do último candle fechado (rollback implícito) e só é incorporada quando o
+candle fecha. Uma verificação periódica recalcula tudo com o TA-Lib e
+recarrega a série se houver divergência.
+Com o streaming ativo o ServicoIndicadores lê estes valores em ultimo()
+(valor_talib) no lugar de rodar o TA-Lib sobre a janela de candles.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import talib
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Mesmo limiar de "zero" usado pelo TA-Lib nas divisões
+_EPSILON = 1e-14
+
+
+def _zero(valor: float) -> bool:
+    return -_EPSILON < valor < _EPSILON
+
+
+def _true_range(h: float, l: float, c_anterior: float) -> float:
+    return max(h - l, abs(h - c_anterior), abs(l - c_anterior))
+
+
+class IndicadorIncremental:
+    """
+    Base dos indicadores incrementais.
+
+    `passo(estado, candle)` é uma função pura: devolve (novo_estado, valor)
+    sem alterar o estado recebido, o que permite recalcular o candle aberto
+    a cada revisão a partir do último estado confirmado.
+    """
+
+    nome = ""
+    # Função TA-Lib equivalente e quantidade de saídas
+    talib_nome = ""
+    saidas = 1
+
+    def estado_inicial(self) -> tuple:
+        raise NotImplementedError
+
+    def parametros_talib(self) -> dict:
+        """Parâmetros da função TA-Lib equivalente."""
+        return {"timeperiod": self.periodo}
+
+    def passo(self, estado: tuple, candle) -> Tuple[tuple, object]:
+        raise NotImplementedError
+
+    def referencia(self, colunas: np.ndarray):
+        """Último valor calculado pelo TA-Lib sobre as colunas (6, n)."""
+        raise NotImplementedError
+
+
+class EMAIncremental(IndicadorIncremental):
+    nome = "ema"
+    talib_nome = "EMA"
+
+    def __init__(self, timeperiod: int = 21):
+        self.periodo = int(timeperiod)
+        self.k = 2.0 / (self.periodo + 1)
+
+    def estado_inicial(self) -> tuple:
+        return (0, 0.0, None)
+
+    def passo(self, estado, candle):
+        n, soma, ema = estado
+        c = float(candle[4])
+        n += 1
+        if n < self.periodo:
+            return (n, soma + c, None), None
+        if n == self.periodo:
+            ema = (soma + c) / self.periodo
+        else:
+            ema = (c - ema) * self.k + ema
+        return (n, 0.0, ema), ema
+
+    def referencia(self, colunas):
+        return talib.EMA(colunas[4], timeperiod=self.periodo)[-1]
+
+
+class RSIIncremental(IndicadorIncremental):
+    nome = "rsi"
+    talib_nome = "RSI"
+
+    def __init__(self, timeperiod: int = 14):
+        self.periodo = int(timeperiod)
+
+    def estado_inicial(self) -> tuple:
+        return (0, None, 0.0, 0.0)
+
+    @staticmethod
+    def _rsi(ganho: float, perda: float) -> float:
+        total = ganho + perda
+        return 0.0 if _zero(total) else 100.0 * (ganho / total)
+
+    def passo(self, estado, candle):
+        n, anterior, ganho, perda = estado
+        c = float(candle[4])
+        n += 1
+        if anterior is None:
+            return (n, c, 0.0, 0.0), None
+        variacao = c - anterior
+        alta, baixa = (variacao, 0.0) if variacao > 0 else (0.0, -variacao)
+        p = self.periodo
+        if n <= p:
+            return (n, c, ganho + alta, perda + baixa), None
+        if n == p + 1:
+            ganho, perda = (ganho + alta) / p, (perda + baixa) / p
+        else:
+            ganho = (ganho * (p - 1) + alta) / p
+            perda = (perda * (p - 1) + baixa) / p
+        return (n, c, ganho, perda), self._rsi(ganho, perda)
+
+    def referencia(self, colunas):
+        return talib.RSI(colunas[4], timeperiod=self.periodo)[-1]
+
+
+class ATRIncremental(IndicadorIncremental):
+    nome = "atr"
+    talib_nome = "ATR"
+
+    def __init__(self, timeperiod: int = 14):
+        self.periodo = int(timeperiod)
+
+    def estado_inicial(self) -> tuple:
+        return (0, None, 0.0, None)
+
+    def passo(self, estado, candle):
+        n, c_anterior, soma, atr = estado
+        h, l, c = float(candle[2]), float(candle[3]), float(candle[4])
+        n += 1
+        if c_anterior is None:
+            return (n, c, 0.0, None), None
+        tr = _true_range(h, l, c_anterior)
+        p = self.periodo
+        if n <= p:
+            return (n, c, soma + tr, None), None
+        if n == p + 1:
+            atr = (soma + tr) / p
+        else:
+            atr = (atr * (p - 1) + tr) / p
+        return (n, c, 0.0, atr), atr
+
+    def referencia(self, colunas):
+        return talib.ATR(colunas[2], colunas[3], colunas[4], timeperiod=self.periodo)[
+            -1
+        ]
+
+
+class OBVIncremental(IndicadorIncremental):
+    nome = "obv"
+    talib_nome = "OBV"
+
+    def estado_inicial(self) -> tuple:
+        return (None, 0.0)
+
+    def parametros_talib(self) -> dict:
+        return {}
+
+    def passo(self, estado, candle):
+        c_anterior, obv = estado
+        c, v = float(candle[4]), float(candle[5])
+        if c_anterior is None:
+            obv = v
+        elif c > c_anterior:
+            obv += v
+        elif c < c_anterior:
+            obv -= v
+        return (c, obv), obv
+
+    def referencia(self, colunas):
+        return talib.OBV(colunas[4], colunas[5])[-1]
+
+
+class MACDIncremental(IndicadorIncremental):
+    """
+    MACD no formato do TA-Lib: as duas EMAs começam juntas no candle
+    `slowperiod` (a rápida semeada com a média dos últimos `fastperiod`
+    closes) e a linha de sinal é uma EMA semeada com a média dos primeiros
+    `signalperiod` valores do MACD. Valor: (macd, signal, hist).
+    """
+
+    nome = "macd"
+    talib_nome = "MACD"
+    saidas = 3
+
+    def __init__(
+        self, fastperiod: int = 12, slowperiod: int = 26, signalperiod: int = 9
+    ):
+        rapida, lenta = int(fastperiod), int(slowperiod)
+        if lenta < rapida:
+            rapida, lenta = lenta, rapida
+        self.rapida, self.lenta, self.sinal = rapida, lenta, int(signalperiod)
+        self.k_rapida = 2.0 / (rapida + 1)
+        self.k_lenta = 2.0 / (lenta + 1)
+        self.k_sinal = 2.0 / (self.sinal + 1)
+
+    def parametros_talib(self) -> dict:
+        return {
+            "fastperiod": self.rapida,
+            "slowperiod": self.lenta,
+            "signalperiod": self.sinal,
+        }
+
+    def estado_inicial(self) -> tuple:
+        # (n, closes do aquecimento, ema rápida, ema lenta, n macd, soma macd, sinal)
+        return (0, (), None, None, 0, 0.0, None)
+
+    def passo(self, estado, candle):
+        n, aquecimento, rapida, lenta, n_macd, soma_macd, sinal = estado
+        c = float(candle[4])
+        n += 1
+        if n < self.lenta:
+            return (n, aquecimento + (c,), None, None, 0, 0.0, None), None
+        if n == self.lenta:
+            janela = aquecimento + (c,)
+            lenta = sum(janela) / self.lenta
+            rapida = sum(janela[-self.rapida :]) / self.rapida
+            aquecimento = ()
+        else:
+            rapida = (c - rapida) * self.k_rapida + rapida
+            lenta = (c - lenta) * self.k_lenta + lenta
+        macd = rapida - lenta
+        n_macd += 1
+        if n_macd < self.sinal:
+            novo = (n, aquecimento, rapida, lenta, n_macd, soma_macd + macd, None)
+            return novo, None
+        if n_macd == self.sinal:
+            sinal = (soma_macd + macd) / self.sinal
+        else:
+            sinal = (macd - sinal) * self.k_sinal + sinal
+        novo = (n, aquecimento, rapida, lenta, n_macd, 0.0, sinal)
+        return novo, (macd, sinal, macd - sinal)
+
+    def referencia(self, colunas):
+        macd, sinal, hist = talib.MACD(
+            colunas[4],
+            fastperiod=self.rapida,
+            slowperiod=self.lenta,
+            signalperiod=self.sinal,
+        )
+        return (macd[-1], sinal[-1], hist[-1])
+
+
+class ADXIncremental(IndicadorIncremental):
+    """ADX de Wilder no formato do TA-Lib (primeiro valor no candle 2 x período)."""
+
+    nome = "adx"
+    talib_nome = "ADX"
+
+    def __init__(self, timeperiod: int = 14):
+        self.periodo = int(timeperiod)
+
+    def estado_inicial(self) -> tuple:
+        # (n, h, l, c anteriores, +DM, -DM, TR, soma DX, adx)
+        return (0, None, None, None, 0.0, 0.0, 0.0, 0.0, None)
+
+    def _dx(self, mais_dm: float, menos_dm: float, tr: float) -> Optional[float]:
+        if _zero(tr):
+            return None
+        mais_di = 100.0 * (mais_dm / tr)
+        menos_di = 100.0 * (menos_dm / tr)
+        total = mais_di + menos_di
+        if _zero(total):
+            return None
+        return 100.0 * (abs(menos_di - mais_di) / total)
+
+    def passo(self, estado, candle):
+        n, h_ant, l_ant, c_ant, mais_dm, menos_dm, tr_suave, soma_dx, adx = estado
+        h, l, c = float(candle[2]), float(candle[3]), float(candle[4])
+        n += 1
+        if h_ant is None:
+            return (n, h, l, c, 0.0, 0.0, 0.0, 0.0, None), None
+        p = self.periodo
+        if n > p:
+            # Suavização de Wilder após o acúmulo inicial de p - 1 movimentos
+            mais_dm -= mais_dm / p
+            menos_dm -= menos_dm / p
+            tr_suave -= tr_suave / p
+        dif_mais, dif_menos = h - h_ant, l_ant - l
+        if dif_menos > 0 and dif_mais < dif_menos:
+            menos_dm += dif_menos
+        elif dif_mais > 0 and dif_mais > dif_menos:
+            mais_dm += dif_mais
+        tr_suave += _true_range(h, l, c_ant)
+        valor = None
+        if n > p:
+            dx = self._dx(mais_dm, menos_dm, tr_suave)
+            if n <= 2 * p:
+                soma_dx += dx or 0.0
+                if n == 2 * p:
+                    adx = valor = soma_dx / p
+            else:
+                if dx is not None:
+                    adx = (adx * (p - 1) + dx) / p
+                valor = adx
+        novo = (n, h, l, c, mais_dm, menos_dm, tr_suave, soma_dx, adx)
+        return novo, valor
+
+    def referencia(self, colunas):
+        return talib.ADX(colunas[2], colunas[3], colunas[4], timeperiod=self.periodo)[
+            -1
+        ]
+
+
+INDICADORES_INCREMENTAIS = {
+    "ema": EMAIncremental,
+    "rsi": RSIIncremental,
+    "atr": ATRIncremental,
+    "obv": OBVIncremental,
+    "macd": MACDIncremental,
+    "adx": ADXIncremental,
+}
+
+ESPECIFICACAO_PADRAO = {
+    "ema": {"timeperiod": 21},
+    "rsi": {"timeperiod": 14},
+    "atr": {"timeperiod": 14},
+    "obv": {},
+    "macd": {"fastperiod": 12, "slowperiod": 26, "signalperiod": 9},
+    "adx": {"timeperiod": 14},
+}
+
+
+def criar_indicadores(
+    especificacao: Dict[str, dict],
+) -> Dict[str, IndicadorIncremental]:
+    """Instancia os indicadores de {nome: parâmetros} (nome em INDICADORES_INCREMENTAIS)."""
+    indicadores = {}
+    for nome, params in especificacao.items():
+        tipo = params.get("tipo", nome)
+        if tipo not in INDICADORES_INCREMENTAIS:
+            raise KeyError(f"Indicador incremental desconhecido: {tipo}")
+        parametros = {k: v for k, v in params.items() if k != "tipo"}
+        indicadores[nome] = INDICADORES_INCREMENTAIS[tipo](**parametros)
+    return indicadores
+
+
+class SerieIncremental:
+    """Estado de todos os indicadores de um (symbol, timeframe)."""
+
+    def __init__(self, indicadores: Dict[str, IndicadorIncremental]):
+        self.indicadores = indicadores
+        self.estados = {n: i.estado_inicial() for n, i in indicadores.items()}
+        self.confirmados = {n: None for n in indicadores}
+        self.provisorios: Optional[dict] = None
+        self.inicio_ts: Optional[int] = None
+        self.ultimo_ts: Optional[int] = None
+        self.ultimo = None
+        self.aberto = None
+        self.fechados = 0
+
+    def confirmar(self, candle) -> None:
+        for nome, indicador in self.indicadores.items():
+            self.estados[nome], self.confirmados[nome] = indicador.passo(
+                self.estados[nome], candle
+            )
+        self.ultimo_ts = int(candle[0])
+        self.ultimo = list(candle)
+        self.aberto = None
+        self.provisorios = None
+        self.fechados += 1
+
+    def revisar(self, candle) -> None:
+        """Valores do candle aberto, sem alterar o estado confirmado."""
+        self.aberto = list(candle)
+        self.provisorios = {
+            nome: indicador.passo(self.estados[nome], candle)[1]
+            for nome, indicador in self.indicadores.items()
+        }
+
+    def valores(self) -> dict:
+        return dict(
+            self.provisorios if self.provisorios is not None else self.confirmados
+        )
+
+    def candle_atual(self):
+        """Candle ao qual os valores atuais correspondem (aberto ou último fechado)."""
+        return self.aberto if self.aberto is not None else self.ultimo
+
+
+class MotorIndicadoresIncrementais:
+    """
+    Mantém os indicadores incrementais de vários (symbol, timeframe).
+
+    Args:
+        especificacao (dict): {nome: parâmetros}; padrão ESPECIFICACAO_PADRAO.
+        intervalo_verificacao (int): Candles fechados entre as verificações
+            completas contra o TA-Lib (0 desativa).
+        tolerancia (float): Diferença relativa aceita na verificação.
+    """
+
+    def __init__(
+        self,
+        especificacao: Optional[Dict[str, dict]] = None,
+        intervalo_verificacao: int = 100,
+        tolerancia: float = 1e-6,
+    ):
+        self.especificacao = dict(especificacao or ESPECIFICACAO_PADRAO)
+        criar_indicadores(self.especificacao)  # valida a especificação
+        self.intervalo_verificacao = int(intervalo_verificacao)
+        self.tolerancia = float(tolerancia)
+        self.verificacoes = 0
+        self.divergencias = 0
+        self._series: Dict[Tuple[str, str], SerieIncremental] = {}
+        self._lock = threading.Lock()
+
+    def conhece(self, symbol: str, timeframe: str) -> bool:
+        return (symbol, timeframe) in self._series
+
+    def carregar(
+        self, symbol: str, timeframe: str, candles: Iterable, aberto: bool = True
+    ) -> dict:
+        """
+        (Re)cria a série a partir do histórico; com aberto=True o último
+        candle é tratado como ainda aberto (pode ser revisado).
+        """
+        candles = list(candles)
+        serie = SerieIncremental(criar_indicadores(self.especificacao))
+        fechados = candles[:-1] if aberto and candles else candles
+        for candle in fechados:
+            serie.confirmar(candle)
+        if aberto and candles:
+            serie.revisar(candles[-1])
+        serie.inicio_ts = int(candles[0][0]) if candles else None
+        serie.fechados = 0
+        with self._lock:
+            self._series[(symbol, timeframe)] = serie
+        return serie.valores()
+
+    def processar(
+        self, symbol: str, timeframe: str, candle, fechado: bool = False
+    ) -> Optional[dict]:
+        """
+        Aplica um candle novo ou revisado em O(1) por indicador.
+
+        Args:
+            candle (list): [timestamp, open, high, low, close, volume].
+            fechado (bool): True quando o candle é definitivo.
+
+        Returns:
+            dict | None: Valores atuais (None se a série não foi carregada).
+        """
+        # O lock cobre a atualização: valor_talib lê a série de outra thread
+        with self._lock:
+            serie = self._series.get((symbol, timeframe))
+            if serie is None:
+                return None
+            ts = int(candle[0])
+            if serie.ultimo_ts is not None and ts <= serie.ultimo_ts:
+                return serie.valores()  # candle já confirmado (mensagem repetida)
+            if serie.aberto is not None and ts > int(serie.aberto[0]):
+                # Fechamento perdido: o candle aberto anterior vale como fechado
+                serie.confirmar(serie.aberto)
+            if fechado:
+                serie.confirmar(candle)
+            else:
+                serie.revisar(candle)
+            return serie.valores()
+
+    def valores(self, symbol: str, timeframe: str) -> Optional[dict]:
+        with self._lock:
+            serie = self._series.get((symbol, timeframe))
+            return serie.valores() if serie else None
+
+    def valor_talib(
+        self, symbol: str, timeframe: str, nome: str, params: dict, candle
+    ) -> Optional[Tuple[object, int]]:
+        """
+        Valor atual do indicador equivalente à função TA-Lib `nome` com
+        `params`, desde que a série esteja exatamente em `candle` (o último
+        da janela analisada).
+
+        Returns:
+            tuple | None: (valor no formato do TA-Lib, com NaN enquanto
+            indefinido; timestamp do início da série), ou None se não houver
+            série no candle pedido nem indicador equivalente.
+        """
+        with self._lock:
+            serie = self._series.get((symbol, timeframe))
+            atual = serie.candle_atual() if serie else None
+            if atual is None:
+                return None
+            try:
+                if [float(x) for x in atual[:6]] != [float(x) for x in candle[:6]]:
+                    return None
+                parametros = {k: float(v) for k, v in params.items()}
+            except (TypeError, ValueError):
+                return None
+            for chave, indicador in serie.indicadores.items():
+                if indicador.talib_nome != nome:
+                    continue
+                esperados = {
+                    k: float(v) for k, v in indicador.parametros_talib().items()
+                }
+                if esperados != parametros:
+                    continue
+                valor = serie.valores()[chave]
+                if valor is None:
+                    valor = (
+                        math.nan
+                        if indicador.saidas == 1
+                        else (math.nan,) * indicador.saidas
+                    )
+                return valor, serie.inicio_ts
+        return None
+
+    def precisa_verificar(self, symbol: str, timeframe: str) -> bool:
+        with self._lock:
+            serie = self._series.get((symbol, timeframe))
+        return bool(
+            serie
+            and self.intervalo_verificacao
+            and serie.fechados >= self.intervalo_verificacao
+        )
+
+    def verificar(
+        self, symbol: str, timeframe: str, candles, aberto: bool = True
+    ) -> bool:
+        """
+        Compara os valores atuais com o TA-Lib sobre `candles` e recarrega a
+        série em caso de divergência. Candles anteriores ao início da série
+        são ignorados; se o começo da série já saiu da janela (buffer
+        circular), a série é apenas recarregada a partir de `candles`.
+
+        Returns:
+            bool: True se consistente.
+        """
+        with self._lock:
+            serie = self._series.get((symbol, timeframe))
+        if serie is None or not len(candles):
+            return True
+        dados = np.asarray(candles, dtype=np.float64)[:, :6]
+        if serie.inicio_ts is not None:
+            dados = dados[dados[:, 0] >= serie.inicio_ts]
+        if not len(dados) or int(dados[0, 0]) != serie.inicio_ts:
+            self.carregar(symbol, timeframe, candles, aberto=aberto)
+            return True
+        self.verificacoes += 1
+        colunas = np.ascontiguousarray(dados.T)
+        atuais = serie.valores()
+        divergentes = [
+            nome
+            for nome, indicador in serie.indicadores.items()
+            if not self._iguais(atuais[nome], indicador.referencia(colunas))
+        ]
+        serie.fechados = 0
+        if not divergentes:
+            return True
+        self.divergencias += 1
+        logger.warning(
+            f"[indicadores_incrementais] Divergência com o TA-Lib em {symbol}-{timeframe}: "
+            f"{divergentes}; recarregando a série"
+        )
+        self.carregar(symbol, timeframe, candles, aberto=aberto)
+        return False
+
+    def _iguais(self, atual, referencia) -> bool:
+        if isinstance(referencia, tuple):
+            atual = atual if atual is not None else (None,) * len(referencia)
+            return all(self._iguais(a, r) for a, r in zip(atual, referencia))
+        if referencia is None or math.isnan(referencia):
+            return atual is None
+        if atual is None:
+            return False
+        return math.isclose(atual, referencia, rel_tol=self.tolerancia, abs_tol=1e-9)
+
+    def remover(self, symbol: str, timeframe: str) -> None:
+        with self._lock:
+            self._series.pop((symbol, timeframe), None)
@@ -0,0 +1,332 @@
+"""
+Indicadores calculados para todo o universo de pares de uma vez.
+As séries de close/high/low/volume dos pares de um timeframe são empilhadas em
+matrizes (pares × candles) e cada indicador é uma única operação NumPy sobre a
+matriz: janelas móveis vetorizadas e recursões (EMA, RSI, ATR) com um passo por
+candle aplicado a todos os pares ao mesmo tempo. Os resultados reproduzem o
+TA-Lib e são devolvidos por par; as séries de um par são gravadas no cache do
+serviço de indicadores (armazenar_lote) logo antes da análise dele, onde os
+plugins as encontram sem recalcular.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.candles_colunares import CLOSE, HIGH, LOW, como_candles
+from utils.logging_config import get_logger
+from utils.plano_execucao import chave_indicador
+
+logger = get_logger(__name__)
+
+# Indicadores calculados por padrão no modo universo
+ESPECIFICACAO_UNIVERSO: List[Tuple[str, dict]] = [
+    ("SMA", {"timeperiod": 20}),
+    ("EMA", {"timeperiod": 21}),
+    ("ATR", {"timeperiod": 14}),
+    ("RSI", {"timeperiod": 14}),
+    ("BBANDS", {"timeperiod": 20, "nbdevup": 2.0, "nbdevdn": 2.0, "matype": 0}),
+]
+
+_EPSILON = 1e-14
+
+
+def _nan(forma) -> np.ndarray:
+    return np.full(forma, np.nan, dtype=np.float64)
+
+
+def sma(x: np.ndarray, timeperiod: int = 30) -> np.ndarray:
+    """Média móvel simples de cada linha (mesmo resultado de talib.SMA)."""
+    p = int(timeperiod)
+    saida = _nan(x.shape)
+    if x.shape[1] < p:
+        return saida
+    soma = np.cumsum(x, axis=1)
+    saida[:, p - 1] = soma[:, p - 1]
+    saida[:, p:] = soma[:, p:] - soma[:, :-p]
+    saida[:, p - 1 :] /= p
+    return saida
+
+
+def ema(x: np.ndarray, timeperiod: int = 30) -> np.ndarray:
+    """Média exponencial semeada pela SMA do primeiro período (talib.EMA)."""
+    p = int(timeperiod)
+    saida = _nan(x.shape)
+    if x.shape[1] < p:
+        return saida
+    k = 2.0 / (p + 1)
+    anterior = x[:, :p].mean(axis=1)
+    saida[:, p - 1] = anterior
+    for j in range(p, x.shape[1]):
+        anterior = (x[:, j] - anterior) * k + anterior
+        saida[:, j] = anterior
+    return saida
+
+
+def rsi(close: np.ndarray, timeperiod: int = 14) -> np.ndarray:
+    """RSI com suavização de Wilder (talib.RSI)."""
+    p = int(timeperiod)
+    saida = _nan(close.shape)
+    if close.shape[1] <= p:
+        return saida
+    variacao = np.diff(close, axis=1)
+    ganhos = np.maximum(variacao, 0.0)
+    perdas = np.maximum(-variacao, 0.0)
+
+    def valor(ganho, perda):
+        total = ganho + perda
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(np.abs(total) < _EPSILON, 0.0, 100.0 * (ganho / total))
+
+    ganho = ganhos[:, :p].sum(axis=1) / p
+    perda = perdas[:, :p].sum(axis=1) / p
+    saida[:, p] = valor(ganho, perda)
+    for j in range(p + 1, close.shape[1]):
+        ganho = (ganho * (p - 1) + ganhos[:, j - 1]) / p
+        perda = (perda * (p - 1) + perdas[:, j - 1]) / p
+        saida[:, j] = valor(ganho, perda)
+    return saida
+
+
+def atr(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, timeperiod: int = 14
+) -> np.ndarray:
+    """Average True Range com suavização de Wilder (talib.ATR)."""
+    p = int(timeperiod)
+    saida = _nan(close.shape)
+    if close.shape[1] <= p:
+        return saida
+    anterior = close[:, :-1]
+    tr = np.maximum.reduce(
+        [
+            high[:, 1:] - low[:, 1:],
+            np.abs(high[:, 1:] - anterior),
+            np.abs(low[:, 1:] - anterior),
+        ]
+    )
+    media = tr[:, :p].mean(axis=1)
+    saida[:, p] = media
+    for j in range(p + 1, close.shape[1]):
+        media = (media * (p - 1) + tr[:, j - 1]) / p
+        saida[:, j] = media
+    return saida
+
+
+def stddev(x: np.ndarray, timeperiod: int = 5, nbdev: float = 1.0) -> np.ndarray:
+    """Desvio padrão populacional móvel (talib.STDDEV)."""
+    p = int(timeperiod)
+    saida = _nan(x.shape)
+    if x.shape[1] < p:
+        return saida
+    saida[:, p - 1 :] = sliding_window_view(x, p, axis=1).std(axis=-1) * nbdev
+    return saida
+
+
+def bbands(
+    close: np.ndarray,
+    timeperiod: int = 5,
+    nbdevup: float = 2.0,
+    nbdevdn: float = 2.0,
+    matype: int = 0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger Bands sobre a SMA (talib.BBANDS com matype=0)."""
+    if matype != 0:
+        raise ValueError("BBANDS matricial suporta apenas matype=0 (SMA).")
+    meio = sma(close, timeperiod)
+    desvio = stddev(close, timeperiod)
+    return meio + nbdevup * desvio, meio, meio - nbdevdn * desvio
+
+
+# nome -> (kernel, colunas de entrada)
+KERNELS = {
+    "SMA": (sma, (CLOSE,)),
+    "EMA": (ema, (CLOSE,)),
+    "RSI": (rsi, (CLOSE,)),
+    "ATR": (atr, (HIGH, LOW, CLOSE)),
+    "STDDEV": (stddev, (CLOSE,)),
+    "BBANDS": (bbands, (CLOSE,)),
+}
+
+
+class MatrizCandles:
+    """
+    Candles de vários pares empilhados e alinhados.
+
+    Attributes:
+        symbols (List[str]): Pares, na ordem das linhas.
+        candles (List[CandlesOHLCV]): Série original de cada par.
+        colunas (np.ndarray): Matriz (6, pares, candles) float64.
+    """
+
+    __slots__ = ("symbols", "candles", "colunas")
+
+    def __init__(self, symbols: List[str], candles: list):
+        self.symbols = symbols
+        self.candles = candles
+        self.colunas = np.stack([c.colunas for c in candles], axis=1)
+
+    def coluna(self, indice: int) -> np.ndarray:
+        return self.colunas[indice]
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __repr__(self) -> str:
+        return (
+            f"MatrizCandles(pares={len(self.symbols)}, candles={self.colunas.shape[2]})"
+        )
+
+
+def empilhar(candles_por_symbol: Dict[str, object]) -> List[MatrizCandles]:
+    """
+    Agrupa os pares com a mesma quantidade de candles e o mesmo último
+    timestamp (séries alinhadas candle a candle) em matrizes.
+
+    Séries vazias ou com valores ausentes ficam de fora (seguem pelo cálculo
+    individual de cada plugin).
+    """
+    grupos: Dict[tuple, Tuple[List[str], list]] = {}
+    for symbol, candles in candles_por_symbol.items():
+        candles = como_candles(candles)
+        if not len(candles) or not candles.completo(range(6)):
+            continue
+        chave = (len(candles), float(candles.timestamp[-1]))
+        symbols, series = grupos.setdefault(chave, ([], []))
+        symbols.append(symbol)
+        series.append(candles)
+    return [MatrizCandles(symbols, series) for symbols, series in grupos.values()]
+
+
+def calcular_matriz(
+    matriz: MatrizCandles, especificacao: Sequence[Tuple[str, dict]]
+) -> Dict[str, object]:
+    """
+    Calcula cada indicador da especificação sobre a matriz inteira.
+
+    Returns:
+        dict: chave_indicador -> matriz (pares, candles) ou tupla de matrizes.
+    """
+    resultados = {}
+    for nome, params in especificacao:
+        kernel, colunas = KERNELS[nome]
+        resultados[chave_indicador(nome, params)] = kernel(
+            *(matriz.coluna(i) for i in colunas), **params
+        )
+    return resultados
+
+
+def _linha(resultado, indice: int):
+    if isinstance(resultado, tuple):
+        return tuple(r[indice] for r in resultado)
+    return resultado[indice]
+
+
+def especificacao_universo(
+    extras: Optional[Iterable] = None, indicadores_plano: Iterable = ()
+) -> List[Tuple[str, dict]]:
+    """
+    Monta a especificação do modo universo: a padrão (ou `extras`, da config)
+    mais os indicadores compartilhados do plano de execução, sem repetições e
+    só com os indicadores que têm kernel matricial.
+    """
+    pedidos = [tuple(item) for item in (extras or ESPECIFICACAO_UNIVERSO)]
+    pedidos += [(no.nome, no.params) for no in indicadores_plano]
+    especificacao, vistos = [], set()
+    for nome, params in pedidos:
+        chave = chave_indicador(nome, params)
+        if nome not in KERNELS or chave in vistos:
+            continue
+        if nome == "BBANDS" and params.get("matype", 0) != 0:
+            continue
+        vistos.add(chave)
+        especificacao.append((nome, dict(params)))
+    return especificacao
+
+
+def calcular_universo(
+    candles_por_symbol: Dict[str, object],
+    especificacao: Sequence[Tuple[str, dict]] = ESPECIFICACAO_UNIVERSO,
+    timeframe: Optional[str] = None,
+    servico=None,
+    min_pares: int = 1,
+) -> Dict[str, Dict[str, object]]:
+    """
+    Calcula a especificação para todos os pares de um timeframe.
+
+    Args:
+        candles_por_symbol (dict): symbol -> k-lines ou CandlesOHLCV.
+        especificacao (Sequence): Pares (nome, parâmetros) com kernel em KERNELS.
+        timeframe (str, optional): Timeframe (chave do cache do serviço).
+        servico (ServicoIndicadores, optional): Recebe na hora as séries
+            calculadas (só para poucos pares: com muitos, o LRU descarta as
+            primeiras antes do uso; prefira armazenar_lote por par).
+        min_pares (int): Grupos alinhados menores que isso não compensam a
+            matriz e ficam para o cálculo individual.
+
+    Returns:
+        dict: symbol -> {chave_indicador: série (ou tupla de séries)}.
+    """
+    saida: Dict[str, Dict[str, object]] = {}
+    for matriz in empilhar(candles_por_symbol):
+        if len(matriz) < max(1, int(min_pares)):
+            continue
+        resultados = calcular_matriz(matriz, especificacao)
+        for indice, symbol in enumerate(matriz.symbols):
+            series = {
+                chave: _linha(resultado, indice)
+                for chave, resultado in resultados.items()
+            }
+            saida[symbol] = series
+            if servico is not None:
+                armazenar_lote(
+                    servico,
+                    lote_universo(series, especificacao),
+                    matriz.candles[indice],
+                    symbol,
+                    timeframe,
+                )
+    return saida
+
+
+def lote_universo(
+    series: Dict[str, object], especificacao: Sequence[Tuple[str, dict]]
+) -> List[Tuple[str, dict, object]]:
+    """Séries de um par como (nome, parâmetros, série), na ordem da especificação."""
+    return [
+        (nome, dict(params), series[chave_indicador(nome, params)])
+        for nome, params in especificacao
+        if chave_indicador(nome, params) in series
+    ]
+
+
+def armazenar_lote(
+    servico,
+    lote: Iterable[Tuple[str, dict, object]],
+    candles,
+    symbol: Optional[str] = None,
+    timeframe: Optional[str] = None,
+) -> int:
+    """
+    Grava no cache do serviço as séries de um par que ele conhece, sob a
+    chave da janela de candles que os plugins vão analisar. Retorna quantas
+    foram gravadas.
+    """
+    gravadas = 0
+    for nome, params, serie in lote:
+        if servico.conhece(nome):
+            servico.armazenar(nome, candles, serie, symbol, timeframe, **params)
+            gravadas += 1
+    return gravadas
+
+
+def ultimos_valores(series: Dict[str, object]) -> Dict[str, object]:
+    """Último valor de cada série (None se ainda indefinido)."""
+
+    def ultimo(serie):
+        if isinstance(serie, tuple):
+            return tuple(ultimo(s) for s in serie)
+        valor = float(serie[-1]) if len(serie) else float("nan")
+        return None if np.isnan(valor) else valor
+
+    return {chave: ultimo(serie) for chave, serie in series.items()}
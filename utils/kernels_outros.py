@@ -0,0 +1,122 @@
+"""
+Kernels numéricos dos indicadores Ichimoku, Fibonacci e Pivot Points.
+Máximos e mínimos móveis de várias janelas são calculados em uma única
+passada sobre high/low com filas monotônicas (O(n) por janela, sem as seis
+passadas de talib.MAX/MIN). Com o numba instalado esse kernel é compilado
+(JIT, com cache em disco) e as janelas entram como argumento, então mudar os
+períodos não recompila nada; sem o numba é usado o equivalente em NumPy.
+Os pivots são três operações escalares e ficam em Python puro.
+"""
+
+from typing import Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from numba import njit
+except ImportError:  # numba é opcional: fallback em NumPy
+    njit = None
+
+NUMBA_DISPONIVEL = njit is not None
+
+
+def _maximos_minimos_filas(high, low, janelas):
+    """Passada única com uma fila monotônica de máximos e uma de mínimos por janela."""
+    n = high.shape[0]
+    k = janelas.shape[0]
+    maximos = np.full((k, n), np.nan)
+    minimos = np.full((k, n), np.nan)
+    fila_max = np.empty((k, n), dtype=np.int64)
+    fila_min = np.empty((k, n), dtype=np.int64)
+    ini_max = np.zeros(k, dtype=np.int64)
+    fim_max = np.zeros(k, dtype=np.int64)
+    ini_min = np.zeros(k, dtype=np.int64)
+    fim_min = np.zeros(k, dtype=np.int64)
+    for i in range(n):
+        for j in range(k):
+            janela = janelas[j]
+            while (
+                fim_max[j] > ini_max[j] and high[fila_max[j, fim_max[j] - 1]] <= high[i]
+            ):
+                fim_max[j] -= 1
+            fila_max[j, fim_max[j]] = i
+            fim_max[j] += 1
+            if fila_max[j, ini_max[j]] <= i - janela:
+                ini_max[j] += 1
+            while (
+                fim_min[j] > ini_min[j] and low[fila_min[j, fim_min[j] - 1]] >= low[i]
+            ):
+                fim_min[j] -= 1
+            fila_min[j, fim_min[j]] = i
+            fim_min[j] += 1
+            if fila_min[j, ini_min[j]] <= i - janela:
+                ini_min[j] += 1
+            if i >= janela - 1:
+                maximos[j, i] = high[fila_max[j, ini_max[j]]]
+                minimos[j, i] = low[fila_min[j, ini_min[j]]]
+    return maximos, minimos
+
+
+def _maximos_minimos_numpy(high, low, janelas):
+    """Equivalente vetorizado (uma janela deslizante por período)."""
+    n = high.shape[0]
+    maximos = np.full((len(janelas), n), np.nan)
+    minimos = np.full((len(janelas), n), np.nan)
+    for j, janela in enumerate(janelas):
+        janela = int(janela)
+        if n >= janela:
+            maximos[j, janela - 1 :] = sliding_window_view(high, janela).max(axis=1)
+            minimos[j, janela - 1 :] = sliding_window_view(low, janela).min(axis=1)
+    return maximos, minimos
+
+
+if NUMBA_DISPONIVEL:
+    _maximos_minimos = njit(cache=True, nogil=True)(_maximos_minimos_filas)
+else:
+    _maximos_minimos = _maximos_minimos_numpy
+
+
+def maximos_minimos_moveis(
+    high, low, janelas: Sequence[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Máximo de high e mínimo de low em cada janela móvel (como talib.MAX/MIN).
+
+    Args:
+        high, low: Arrays de preços.
+        janelas (Sequence[int]): Períodos (>= 1).
+
+    Returns:
+        tuple: (maximos, minimos), matrizes (janelas, candles) com NaN antes
+        de cada janela completa.
+    """
+    janelas = np.asarray(janelas, dtype=np.int64)
+    if janelas.size and janelas.min() < 1:
+        raise ValueError("As janelas devem ser maiores que 0.")
+    return _maximos_minimos(
+        np.ascontiguousarray(high, dtype=np.float64),
+        np.ascontiguousarray(low, dtype=np.float64),
+        janelas,
+    )
+
+
+def pivot_points(h: float, l: float, c: float) -> Tuple[float, float, float]:
+    """Pivot Point clássico: (PP, R1, S1). Aritmética escalar: sem JIT."""
+    pp = (float(h) + float(l) + float(c)) / 3
+    return pp, 2 * pp - float(l), 2 * pp - float(h)
+
+
+def aquecer() -> None:
+    """Compila o kernel de máximos/mínimos (numba) antes do primeiro ciclo."""
+    if not NUMBA_DISPONIVEL:
+        return
+    try:
+        dados = np.arange(8, dtype=np.float64)
+        maximos_minimos_moveis(dados, dados, (2, 3))
+    except Exception as e:
+        logger.warning(f"[kernels_outros] Falha ao compilar kernels: {e}")
@@ -0,0 +1,266 @@
+"""
+Limitador de taxa global (token bucket) para as chamadas à Bybit.
+Compartilhado pelos clientes síncrono e assíncrono da Conexao: separa os
+orçamentos público e privado, usa o custo por endpoint que o CCXT já conhece
+(api da Bybit) e dá prioridade às ordens sobre dados de mercado.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Prioridades (menor = mais urgente)
+PRIORIDADE_ORDEM = 0
+PRIORIDADE_PRIVADA = 1
+PRIORIDADE_MERCADO = 2
+
+# Endpoints privados tratados como tráfego de ordem
+PREFIXOS_ORDEM = ("v5/order/", "v5/position/trading-stop", "v5/position/set-leverage")
+
+# Orçamentos padrão em unidades de custo do CCXT por segundo
+# (rateLimit da Bybit no CCXT = 20 ms -> 50 unidades/s)
+ORCAMENTOS_PADRAO = {
+    "publico": {"taxa": 50.0, "capacidade": 50.0},
+    "privado": {"taxa": 50.0, "capacidade": 50.0},
+    # Teto por IP compartilhado por todos os endpoints
+    "global": {"taxa": 100.0, "capacidade": 100.0},
+}
+
+_requisicao_atual: contextvars.ContextVar = contextvars.ContextVar(
+    "limitador_requisicao", default=("publico", PRIORIDADE_MERCADO)
+)
+
+
+class _Balde:
+    """Token bucket simples com contagem de espera por prioridade."""
+
+    def __init__(self, taxa: float, capacidade: float):
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade)
+        self.tokens = float(capacidade)
+        self.atualizado = time.monotonic()
+        self.esperando = Counter()
+        self.adquiridos = 0
+        self.espera_total = 0.0
+        self.fila_maxima = 0
+
+    def reabastecer(self, agora: float) -> None:
+        self.tokens = min(
+            self.capacidade, self.tokens + (agora - self.atualizado) * self.taxa
+        )
+        self.atualizado = agora
+
+    def bloqueado_por_prioridade(self, prioridade: int) -> bool:
+        return any(p < prioridade and n > 0 for p, n in self.esperando.items())
+
+    @property
+    def fila(self) -> int:
+        return sum(self.esperando.values())
+
+
+def classificar_requisicao(api, path: str) -> Tuple[str, int]:
+    """
+    Classifica uma requisição do CCXT em (orçamento, prioridade).
+
+    Args:
+        api: Identificador da API no CCXT (ex: "public", "private").
+        path (str): Caminho do endpoint (ex: "v5/order/create").
+
+    Returns:
+        tuple: ("publico" | "privado", prioridade).
+    """
+    if isinstance(api, (list, tuple)):
+        api = api[0] if api else "public"
+    if str(api).startswith("private"):
+        if str(path).startswith(PREFIXOS_ORDEM):
+            return "privado", PRIORIDADE_ORDEM
+        return "privado", PRIORIDADE_PRIVADA
+    return "publico", PRIORIDADE_MERCADO
+
+
+class LimitadorTaxa:
+    """
+    Escalonador token bucket thread-safe e compatível com asyncio.
+
+    Cada requisição consome `custo` tokens do seu orçamento e do orçamento
+    "global". Enquanto houver requisições de prioridade maior aguardando em um
+    balde, as de prioridade menor não consomem tokens dele.
+    """
+
+    def __init__(self, orcamentos: Optional[Dict[str, dict]] = None):
+        orcamentos = {**ORCAMENTOS_PADRAO, **(orcamentos or {})}
+        self._baldes = {
+            nome: _Balde(cfg["taxa"], cfg.get("capacidade", cfg["taxa"]))
+            for nome, cfg in orcamentos.items()
+        }
+        self._lock = threading.Lock()
+
+    def _baldes_para(self, orcamento: str):
+        baldes = [self._baldes[orcamento]]
+        if orcamento != "global" and "global" in self._baldes:
+            baldes.append(self._baldes["global"])
+        return baldes
+
+    def _tentar(
+        self, orcamento: str, custo: float, prioridade: int, registrado: bool
+    ) -> float:
+        """
+        Tenta consumir os tokens. Retorna 0 se conseguiu, ou o tempo sugerido
+        de espera em segundos. Registra/desregistra a espera na fila.
+        """
+        baldes = self._baldes_para(orcamento)
+        with self._lock:
+            agora = time.monotonic()
+            espera = 0.0
+            for balde in baldes:
+                balde.reabastecer(agora)
+                necessario = min(custo, balde.capacidade)
+                if balde.bloqueado_por_prioridade(prioridade):
+                    espera = max(espera, necessario / balde.taxa)
+                elif balde.tokens < necessario:
+                    espera = max(espera, (necessario - balde.tokens) / balde.taxa)
+            if espera == 0.0:
+                for balde in baldes:
+                    balde.tokens -= min(custo, balde.capacidade)
+                    balde.adquiridos += 1
+                    if registrado:
+                        balde.esperando[prioridade] -= 1
+                return 0.0
+            if not registrado:
+                for balde in baldes:
+                    balde.esperando[prioridade] += 1
+                    balde.fila_maxima = max(balde.fila_maxima, balde.fila)
+            return espera
+
+    def _contabilizar_espera(self, orcamento: str, segundos: float) -> None:
+        if segundos <= 0:
+            return
+        with self._lock:
+            for balde in self._baldes_para(orcamento):
+                balde.espera_total += segundos
+
+    def adquirir(
+        self,
+        orcamento: str = "publico",
+        custo: float = 1.0,
+        prioridade: int = PRIORIDADE_MERCADO,
+    ) -> float:
+        """
+        Bloqueia a thread até haver tokens disponíveis.
+
+        Returns:
+            float: Tempo total de espera em segundos.
+        """
+        inicio = time.monotonic()
+        registrado = aguardou = False
+        try:
+            while True:
+                espera = self._tentar(orcamento, custo, prioridade, registrado)
+                if espera == 0.0:
+                    registrado = False
+                    break
+                registrado = aguardou = True
+                time.sleep(espera)
+        finally:
+            if registrado:
+                # Interrompida durante a espera: libera a posição na fila
+                with self._lock:
+                    for balde in self._baldes_para(orcamento):
+                        balde.esperando[prioridade] -= 1
+        total = time.monotonic() - inicio
+        self._contabilizar_espera(orcamento, total if aguardou else 0.0)
+        return total
+
+    async def adquirir_async(
+        self,
+        orcamento: str = "publico",
+        custo: float = 1.0,
+        prioridade: int = PRIORIDADE_MERCADO,
+    ) -> float:
+        """Equivalente assíncrono de adquirir()."""
+        inicio = time.monotonic()
+        registrado = False
+        try:
+            while True:
+                espera = self._tentar(orcamento, custo, prioridade, registrado)
+                if espera == 0.0:
+                    registrado = False
+                    break
+                registrado = True
+                await asyncio.sleep(espera)
+        finally:
+            if registrado:
+                # Cancelada durante a espera: libera a posição na fila
+                with self._lock:
+                    for balde in self._baldes_para(orcamento):
+                        balde.esperando[prioridade] -= 1
+        total = time.monotonic() - inicio
+        self._contabilizar_espera(orcamento, total)
+        return total
+
+    def metricas(self) -> Dict[str, dict]:
+        """
+        Retorna o estado de cada orçamento (tokens, fila por prioridade,
+        fila máxima, requisições atendidas e espera acumulada).
+        """
+        with self._lock:
+            agora = time.monotonic()
+            resultado = {}
+            for nome, balde in self._baldes.items():
+                balde.reabastecer(agora)
+                resultado[nome] = {
+                    "tokens": round(balde.tokens, 3),
+                    "fila": balde.fila,
+                    "fila_por_prioridade": {
+                        p: n for p, n in balde.esperando.items() if n > 0
+                    },
+                    "fila_maxima": balde.fila_maxima,
+                    "adquiridos": balde.adquiridos,
+                    "espera_total": round(balde.espera_total, 3),
+                }
+            return resultado
+
+    def instalar(self, cliente) -> None:
+        """
+        Faz um cliente CCXT (síncrono ou assíncrono) usar este limitador no
+        lugar do throttle interno, mantendo o custo por endpoint do CCXT.
+        """
+        fetch2_original = cliente.fetch2
+        limitador = self
+
+        if asyncio.iscoroutinefunction(fetch2_original):
+
+            async def fetch2(path, api="public", *args, **kwargs):
+                token = _requisicao_atual.set(classificar_requisicao(api, path))
+                try:
+                    return await fetch2_original(path, api, *args, **kwargs)
+                finally:
+                    _requisicao_atual.reset(token)
+
+            async def throttle(cost=None):
+                orcamento, prioridade = _requisicao_atual.get()
+                await limitador.adquirir_async(orcamento, cost or 1.0, prioridade)
+
+        else:
+
+            def fetch2(path, api="public", *args, **kwargs):
+                token = _requisicao_atual.set(classificar_requisicao(api, path))
+                try:
+                    return fetch2_original(path, api, *args, **kwargs)
+                finally:
+                    _requisicao_atual.reset(token)
+
+            def throttle(cost=None):
+                orcamento, prioridade = _requisicao_atual.get()
+                limitador.adquirir(orcamento, cost or 1.0, prioridade)
+
+        cliente.enableRateLimit = True
+        cliente.fetch2 = fetch2
+        cliente.throttle = throttle
@@ -0,0 +1,240 @@
+"""
+Pipeline em estágios (busca → análise → persistência) com filas limitadas.
+Cada estágio tem sua fila (capacidade fixa) e seu próprio grupo de threads;
+um estágio só entrega ao seguinte quando há espaço na fila dele, então um
+estágio lento segura os anteriores (contrapressão) em vez de acumular
+trabalho em memória. Cada estágio mede profundidade da fila, tempo de espera,
+tempo de serviço e tempo bloqueado pela contrapressão.
+As gravações no banco feitas durante a análise podem ser adiadas para o
+estágio de persistência (adiando_persistencia / adiar_persistencia).
+"""
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Sequence
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_persistencias: ContextVar[Optional[list]] = ContextVar(
+    "persistencias_adiadas", default=None
+)
+
+_FIM = object()
+
+
+@contextmanager
+def adiando_persistencia():
+    """
+    Dentro do bloco, GerenciadorBanco.persistir_dados só enfileira as
+    gravações na lista devolvida (executar depois com persistir_adiadas).
+    """
+    pendentes: list = []
+    token = _persistencias.set(pendentes)
+    try:
+        yield pendentes
+    finally:
+        _persistencias.reset(token)
+
+
+def adiar_persistencia(gerenciador, plugin: str, tabela: str, dados) -> bool:
+    """Enfileira a gravação se houver um bloco adiando_persistencia ativo."""
+    pendentes = _persistencias.get()
+    if pendentes is None:
+        return False
+    pendentes.append((gerenciador, plugin, tabela, dados))
+    return True
+
+
+def persistir_adiadas(pendentes: Sequence[tuple]) -> int:
+    """Executa as gravações adiadas; retorna quantas tiveram sucesso."""
+    sucesso = 0
+    for gerenciador, plugin, tabela, dados in pendentes:
+        if gerenciador.persistir_dados(plugin=plugin, tabela=tabela, dados=dados):
+            sucesso += 1
+    return sucesso
+
+
+def _percentil(valores: Sequence[float], fracao: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(int(fracao * len(ordenados)), len(ordenados) - 1)]
+
+
+class MetricasEstagio:
+    """Contadores e janelas de tempo (espera e serviço) de um estágio."""
+
+    def __init__(self, janela: int = 1000):
+        self._lock = threading.Lock()
+        self._espera = deque(maxlen=janela)
+        self._servico = deque(maxlen=janela)
+        self.processados = 0
+        self.erros = 0
+        self.profundidade_maxima = 0
+        self.bloqueio_total = 0.0
+
+    def entrada(self, profundidade: int, bloqueio: float) -> None:
+        with self._lock:
+            self.profundidade_maxima = max(self.profundidade_maxima, profundidade)
+            self.bloqueio_total += bloqueio
+
+    def saida(self, espera: float, servico: float, erro: bool) -> None:
+        with self._lock:
+            self._espera.append(espera)
+            self._servico.append(servico)
+            self.processados += 1
+            self.erros += int(erro)
+
+    def resumo(self) -> dict:
+        with self._lock:
+            espera, servico = list(self._espera), list(self._servico)
+            dados = {
+                "processados": self.processados,
+                "erros": self.erros,
+                "profundidade_maxima": self.profundidade_maxima,
+                "bloqueio_total": round(self.bloqueio_total, 6),
+            }
+        dados.update(
+            espera_media=round(sum(espera) / len(espera), 6) if espera else 0.0,
+            espera_p95=round(_percentil(espera, 0.95), 6),
+            servico_medio=round(sum(servico) / len(servico), 6) if servico else 0.0,
+            servico_p95=round(_percentil(servico, 0.95), 6),
+        )
+        return dados
+
+
+class Estagio:
+    """
+    Um estágio do pipeline.
+
+    Args:
+        nome (str): Nome do estágio (métricas e logs).
+        funcao (callable): Recebe o item e devolve o item do próximo estágio
+            (o resultado final, no último); None encerra o item com False.
+        workers (int): Threads do estágio.
+        capacidade (int): Tamanho máximo da fila (contrapressão).
+    """
+
+    def __init__(
+        self, nome: str, funcao: Callable, workers: int = 1, capacidade: int = 64
+    ):
+        if workers < 1 or capacidade < 1:
+            raise ValueError("workers e capacidade devem ser maiores que 0.")
+        self.nome = nome
+        self.funcao = funcao
+        self.workers = int(workers)
+        self.capacidade = int(capacidade)
+        self.fila: queue.Queue = queue.Queue(maxsize=self.capacidade)
+        self.metricas = MetricasEstagio()
+        self.proximo: Optional["Estagio"] = None
+        self._threads: List[threading.Thread] = []
+
+    def colocar(self, futuro: Future, item) -> None:
+        """Enfileira o item; bloqueia enquanto a fila estiver cheia."""
+        inicio = perf_counter()
+        self.fila.put((futuro, item, perf_counter()))
+        agora = perf_counter()
+        self.metricas.entrada(self.fila.qsize(), agora - inicio)
+
+    def iniciar(self, primeiro: bool) -> None:
+        for indice in range(self.workers):
+            thread = threading.Thread(
+                target=self._trabalhar,
+                args=(primeiro,),
+                name=f"pipeline-{self.nome}-{indice}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def parar(self) -> None:
+        for _ in self._threads:
+            self.fila.put((None, _FIM, 0.0))
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _trabalhar(self, primeiro: bool) -> None:
+        while True:
+            futuro, item, entrada = self.fila.get()
+            if item is _FIM:
+                return
+            inicio = perf_counter()
+            # O item pode ter sido cancelado enquanto esperava na primeira fila
+            if primeiro and not futuro.set_running_or_notify_cancel():
+                continue
+            erro = False
+            try:
+                resultado = self.funcao(item)
+            except Exception as e:
+                logger.error(
+                    f"[pipeline_estagios] Erro no estágio {self.nome}: {e}",
+                    exc_info=True,
+                )
+                resultado, erro = None, True
+            self.metricas.saida(inicio - entrada, perf_counter() - inicio, erro)
+            if resultado is None:
+                futuro.set_result(False)
+            elif self.proximo is None:
+                futuro.set_result(resultado)
+            else:
+                self.proximo.colocar(futuro, resultado)
+
+
+class PipelineEstagios:
+    """
+    Estágios encadeados; cada item submetido vira um Future resolvido com o
+    retorno do último estágio (ou False se algum estágio o descartou).
+
+    Args:
+        estagios (Sequence[Estagio]): Estágios na ordem do fluxo.
+    """
+
+    def __init__(self, estagios: Sequence[Estagio]):
+        if not estagios:
+            raise ValueError("O pipeline precisa de pelo menos um estágio.")
+        self.estagios = list(estagios)
+        for atual, proximo in zip(self.estagios, self.estagios[1:]):
+            atual.proximo = proximo
+        for indice, estagio in enumerate(self.estagios):
+            estagio.iniciar(primeiro=indice == 0)
+
+    def submeter(self, item, futuro: Optional[Future] = None) -> Future:
+        """Entrega o item ao primeiro estágio (bloqueia se a fila estiver cheia)."""
+        futuro = futuro or Future()
+        self.estagios[0].colocar(futuro, item)
+        return futuro
+
+    def metricas(self) -> Dict[str, dict]:
+        """
+        Métricas por estágio e o gargalo (maior tempo de serviço médio por
+        worker, isto é, menor vazão).
+        """
+        dados = {}
+        for estagio in self.estagios:
+            resumo = estagio.metricas.resumo()
+            resumo.update(
+                profundidade=estagio.fila.qsize(),
+                capacidade=estagio.capacidade,
+                workers=estagio.workers,
+            )
+            dados[estagio.nome] = resumo
+        processados = [e for e in self.estagios if e.metricas.processados]
+        if processados:
+            dados["gargalo"] = max(
+                processados,
+                key=lambda e: dados[e.nome]["servico_medio"] / e.workers,
+            ).nome
+        return dados
+
+    def encerrar(self) -> None:
+        """Para as threads, estágio a estágio (o trabalho já enfileirado termina)."""
+        for estagio in self.estagios:
+            estagio.parar()
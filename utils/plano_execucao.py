@@ -0,0 +1,423 @@
+"""
+Plano de execução dos plugins de análise de um par/timeframe.
+Cada plugin declara as chaves de dados_completos que lê (PLUGIN_CONSOME) e
+escreve (PLUGIN_PRODUZ) e os indicadores que consome do serviço compartilhado
+(indicadores_requeridos). O plano compila essas declarações uma única vez em
+um grafo acíclico: indicadores iguais viram um só nó pré-calculado, cada
+plugin depende apenas de quem produz o que ele lê (respeitando a ordem
+original para escritas concorrentes) e os nós sem dependência entre si ficam
+no mesmo estágio, podendo rodar em paralelo.
+"""
+
+from concurrent.futures import Executor
+from contextvars import copy_context
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.logging_config import get_logger
+from utils.servico_indicadores import obter_servico_indicadores
+
+logger = get_logger(__name__)
+
+# Chaves disponíveis antes dos plugins de análise (preenchidas pelo ObterDados)
+ENTRADAS_PADRAO = ("symbol", "timeframe", "crus", "candles")
+
+INDICADOR = "indicador"
+PLUGIN = "plugin"
+
+
+def chave_indicador(nome: str, params: Optional[dict] = None) -> str:
+    """Identificador estável de um indicador: "ATR(timeperiod=14)"."""
+    argumentos = ",".join(f"{k}={v!r}" for k, v in sorted((params or {}).items()))
+    return f"{nome}({argumentos})"
+
+
+class NoPlano:
+    """
+    Nó do plano: um indicador compartilhado ou um plugin.
+
+    Attributes:
+        id (str): "indicador:<chave>" ou "plugin:<nome>".
+        tipo (str): INDICADOR ou PLUGIN.
+        nome (str): Nome do indicador (ex: "ATR") ou do plugin.
+        params (dict): Parâmetros do indicador.
+        consome (tuple | None): Chaves lidas (None = plugin não declarado).
+        produz (tuple): Chaves escritas.
+        dependencias (tuple): Ids dos nós que precisam terminar antes.
+        estagio (int): Nível no grafo; nós do mesmo estágio são independentes.
+        plugin: Instância do plugin (nós de plugin).
+        consumidores (list): Plugins que usam o indicador (nós de indicador).
+    """
+
+    __slots__ = (
+        "id",
+        "tipo",
+        "nome",
+        "params",
+        "consome",
+        "produz",
+        "dependencias",
+        "estagio",
+        "plugin",
+        "consumidores",
+    )
+
+    def __init__(self, id: str, tipo: str, nome: str, **kwargs):
+        self.id = id
+        self.tipo = tipo
+        self.nome = nome
+        self.params = kwargs.get("params", {})
+        self.consome = kwargs.get("consome", ())
+        self.produz = kwargs.get("produz", ())
+        self.dependencias: Tuple[str, ...] = ()
+        self.estagio = 0
+        self.plugin = kwargs.get("plugin")
+        self.consumidores: List[str] = []
+
+    def como_dict(self) -> dict:
+        dados = {
+            "id": self.id,
+            "tipo": self.tipo,
+            "nome": self.nome,
+            "estagio": self.estagio,
+            "dependencias": list(self.dependencias),
+        }
+        if self.tipo == INDICADOR:
+            dados["params"] = dict(self.params)
+            dados["consumidores"] = list(self.consumidores)
+        else:
+            dados["consome"] = None if self.consome is None else list(self.consome)
+            dados["produz"] = list(self.produz)
+        return dados
+
+    def __repr__(self) -> str:
+        return f"NoPlano({self.id}, estagio={self.estagio})"
+
+
+class PlanoExecucao:
+    """
+    Grafo compilado: nós, estágios paralelizáveis e ordem estável.
+
+    Attributes:
+        nos (Dict[str, NoPlano]): Nós por id.
+        estagios (List[List[str]]): Ids por estágio, em ordem estável.
+        ordem (List[str]): Ordem de execução sequencial (estágios em sequência).
+        nao_produzidas (List[str]): Chaves lidas que nenhum plugin do plano
+            produz nem estão nas entradas.
+        assinatura (tuple): Declarações que originaram o plano (chave do cache).
+    """
+
+    def __init__(
+        self,
+        nos: Dict[str, NoPlano],
+        estagios: List[List[str]],
+        nao_produzidas: List[str],
+        assinatura: tuple = (),
+    ):
+        self.nos = nos
+        self.estagios = estagios
+        self.ordem = [id_no for estagio in estagios for id_no in estagio]
+        self.nao_produzidas = nao_produzidas
+        self.assinatura = assinatura
+
+    def __iter__(self):
+        return (self.nos[id_no] for id_no in self.ordem)
+
+    def __len__(self) -> int:
+        return len(self.nos)
+
+    @property
+    def plugins(self) -> List[str]:
+        """Nomes dos plugins na ordem de execução."""
+        return [no.nome for no in self if no.tipo == PLUGIN]
+
+    @property
+    def indicadores(self) -> List[NoPlano]:
+        return [no for no in self if no.tipo == INDICADOR]
+
+    def descrever(self) -> dict:
+        """Resumo inspecionável do plano (para logs e depuração)."""
+        return {
+            "estagios": [list(estagio) for estagio in self.estagios],
+            "nos": {id_no: no.como_dict() for id_no, no in self.nos.items()},
+            "nao_produzidas": list(self.nao_produzidas),
+            "paralelismo_maximo": max((len(e) for e in self.estagios), default=0),
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"PlanoExecucao(nos={len(self.nos)}, estagios={len(self.estagios)}, "
+            f"plugins={self.plugins})"
+        )
+
+
+def declaracao_plugin(plugin) -> dict:
+    """Lê as declarações de um plugin (atributos PLUGIN_* e indicadores)."""
+    consome = getattr(plugin, "PLUGIN_CONSOME", None)
+    indicadores = []
+    requeridos = getattr(plugin, "indicadores_requeridos", None)
+    if callable(requeridos):
+        try:
+            indicadores = [(nome, dict(params)) for nome, params in requeridos()]
+        except Exception as e:
+            logger.warning(
+                f"[plano_execucao] Indicadores de {getattr(plugin, 'nome', plugin)} "
+                f"indisponíveis: {e}"
+            )
+    return {
+        "nome": getattr(plugin, "nome", None) or getattr(plugin, "PLUGIN_NAME"),
+        "consome": None if consome is None else tuple(consome),
+        "produz": tuple(getattr(plugin, "PLUGIN_PRODUZ", ()) or ()),
+        "indicadores": indicadores,
+        "plugin": plugin,
+    }
+
+
+def assinatura_declaracoes(declaracoes: Sequence[dict]) -> tuple:
+    return tuple(
+        (
+            d["nome"],
+            d["consome"],
+            d["produz"],
+            tuple(chave_indicador(n, p) for n, p in d["indicadores"]),
+        )
+        for d in declaracoes
+    )
+
+
+def compilar_plano(
+    declaracoes: Sequence[dict], entradas: Iterable[str] = ENTRADAS_PADRAO
+) -> PlanoExecucao:
+    """
+    Compila as declarações (na ordem original de execução) em um plano.
+
+    Regras de dependência entre plugins:
+        - quem lê uma chave espera todos os plugins que a escrevem (se ele
+          mesmo também a escreve, só os anteriores);
+        - escritas na mesma chave seguem a ordem original;
+        - plugin sem declaração (PLUGIN_CONSOME = None) é uma barreira: espera
+          todos os anteriores, todos os posteriores esperam por ele e nenhuma
+          leitura anterior a ele espera escritas posteriores.
+
+    Args:
+        declaracoes (Sequence[dict]): Saída de declaracao_plugin(), em ordem.
+        entradas (Iterable[str]): Chaves já presentes antes dos plugins.
+
+    Returns:
+        PlanoExecucao: Plano compilado.
+
+    Raises:
+        ValueError: Se as declarações formarem um ciclo.
+    """
+    entradas = set(entradas)
+    nos: Dict[str, NoPlano] = {}
+    posicao: Dict[str, int] = {}
+    segmento: Dict[str, int] = {}
+    plugins: List[str] = []
+    escritores: Dict[str, List[str]] = {}
+    lidas = set()
+
+    barreiras = 0
+    for declaracao in declaracoes:
+        id_plugin = f"{PLUGIN}:{declaracao['nome']}"
+        if id_plugin in nos:
+            logger.warning(f"[plano_execucao] Plugin repetido ignorado: {id_plugin}")
+            continue
+        for nome, params in declaracao["indicadores"]:
+            id_indicador = f"{INDICADOR}:{chave_indicador(nome, params)}"
+            if id_indicador not in nos:
+                nos[id_indicador] = NoPlano(
+                    id_indicador, INDICADOR, nome, params=dict(params)
+                )
+                posicao[id_indicador] = len(posicao)
+            nos[id_indicador].consumidores.append(declaracao["nome"])
+        nos[id_plugin] = NoPlano(
+            id_plugin,
+            PLUGIN,
+            declaracao["nome"],
+            consome=declaracao["consome"],
+            produz=declaracao["produz"],
+            plugin=declaracao.get("plugin"),
+        )
+        nos[id_plugin].dependencias = tuple(
+            f"{INDICADOR}:{chave_indicador(n, p)}" for n, p in declaracao["indicadores"]
+        )
+        posicao[id_plugin] = len(posicao)
+        if declaracao["consome"] is None:
+            barreiras += 1
+        segmento[id_plugin] = barreiras
+        plugins.append(id_plugin)
+        for chave in declaracao["produz"]:
+            escritores.setdefault(chave, []).append(id_plugin)
+
+    deps: Dict[str, set] = {id_no: set(nos[id_no].dependencias) for id_no in nos}
+    barreira: Optional[str] = None
+    for indice, id_plugin in enumerate(plugins):
+        no = nos[id_plugin]
+        dependencias = deps[id_plugin]
+        if no.consome is None:
+            dependencias.update(plugins[:indice])
+            barreira = id_plugin
+            continue
+        if barreira:
+            dependencias.add(barreira)
+        for chave in no.consome:
+            lidas.add(chave)
+            for escritor in escritores.get(chave, ()):
+                if segmento[escritor] > segmento[id_plugin]:
+                    continue
+                if chave in no.produz and posicao[escritor] > posicao[id_plugin]:
+                    continue
+                dependencias.add(escritor)
+        for chave in no.produz:
+            for escritor in escritores[chave]:
+                if posicao[escritor] < posicao[id_plugin]:
+                    dependencias.add(escritor)
+        dependencias.discard(id_plugin)
+
+    # Ordenação topológica estável (Kahn, desempate pela ordem original);
+    # estágio = maior caminho até o nó
+    dependentes: Dict[str, List[str]] = {id_no: [] for id_no in nos}
+    pendentes = {id_no: len(deps[id_no]) for id_no in nos}
+    for id_no, dependencias in deps.items():
+        for dependencia in dependencias:
+            dependentes[dependencia].append(id_no)
+    prontos = sorted(
+        (id_no for id_no, qtd in pendentes.items() if not qtd), key=posicao.get
+    )
+    ordenados: List[str] = []
+    while prontos:
+        id_no = prontos.pop(0)
+        ordenados.append(id_no)
+        no = nos[id_no]
+        no.dependencias = tuple(sorted(deps[id_no], key=posicao.get))
+        no.estagio = 1 + max((nos[d].estagio for d in no.dependencias), default=-1)
+        for dependente in dependentes[id_no]:
+            pendentes[dependente] -= 1
+            if not pendentes[dependente]:
+                prontos.append(dependente)
+        prontos.sort(key=posicao.get)
+
+    if len(ordenados) != len(nos):
+        ciclo = sorted((i for i in nos if pendentes[i]), key=posicao.get)
+        raise ValueError(f"Declarações dos plugins formam um ciclo: {ciclo}")
+
+    estagios: List[List[str]] = []
+    for id_no in sorted(ordenados, key=posicao.get):
+        while len(estagios) <= nos[id_no].estagio:
+            estagios.append([])
+        estagios[nos[id_no].estagio].append(id_no)
+
+    nao_produzidas = sorted(lidas - entradas - set(escritores))
+    return PlanoExecucao(
+        nos, estagios, nao_produzidas, assinatura_declaracoes(declaracoes)
+    )
+
+
+def _executar_plugin(no: NoPlano, dados: dict, symbol: str, timeframe: str):
+    plugin = no.plugin
+    if not hasattr(plugin, "executar"):
+        return None
+    return plugin.executar(dados_completos=dados, symbol=symbol, timeframe=timeframe)
+
+
+def _incorporar(no: NoPlano, resultado, dados_completos: dict, namespace=None):
+    """
+    Incorpora o retorno do plugin. Com namespace (estágio em paralelo), só
+    entram as chaves de PLUGIN_PRODUZ, do retorno ou do namespace; as demais
+    são descartadas com aviso.
+    """
+    if namespace is None:
+        if isinstance(resultado, dict):
+            dados_completos.update(resultado)
+    else:
+        retorno = resultado if isinstance(resultado, dict) else {}
+        ignoradas = set(retorno) | (set(namespace) - set(dados_completos))
+        ignoradas.difference_update(no.produz)
+        for chave in no.produz:
+            if chave in retorno:
+                dados_completos[chave] = retorno[chave]
+            elif chave in namespace:
+                dados_completos[chave] = namespace[chave]
+        if ignoradas:
+            logger.warning(
+                f"[plano_execucao] {no.nome} escreveu chaves fora de PLUGIN_PRODUZ "
+                f"(ignoradas em paralelo): {sorted(ignoradas)}"
+            )
+    logger.debug(
+        f"[pipeline] Após {no.nome}: chaves em dados_completos = {list(dados_completos.keys())}"
+    )
+
+
+def executar_plano(
+    plano: PlanoExecucao,
+    dados_completos: dict,
+    symbol: str,
+    timeframe: str,
+    executor: Optional[Executor] = None,
+) -> dict:
+    """
+    Executa o plano para um par/timeframe, estágio por estágio.
+
+    Indicadores compartilhados são calculados uma vez (cache do serviço de
+    indicadores) antes dos plugins; o dicionário devolvido por cada plugin
+    é incorporado a dados_completos.
+
+    Com um executor, os plugins de um mesmo estágio (independentes entre si)
+    rodam em paralelo, cada um sobre uma cópia rasa de dados_completos (seu
+    namespace). Ao fim do estágio, na ordem original, entram em
+    dados_completos só as chaves que cada plugin declara em PLUGIN_PRODUZ
+    (do retorno ou do namespace); as não declaradas são descartadas com aviso.
+
+    Args:
+        plano (PlanoExecucao): Plano compilado.
+        dados_completos (dict): Dados do par/timeframe (com "crus").
+        symbol (str): Símbolo do par.
+        timeframe (str): Timeframe.
+        executor (Executor, optional): Executor dos plugins de cada estágio.
+
+    Returns:
+        dict: O próprio dados_completos atualizado.
+    """
+    crus = dados_completos.get("crus") or []
+    servico = obter_servico_indicadores()
+    for estagio in plano.estagios:
+        plugins = []
+        for id_no in estagio:
+            no = plano.nos[id_no]
+            if no.tipo == PLUGIN:
+                plugins.append(no)
+                continue
+            if not crus:
+                continue
+            try:
+                servico.calcular(no.nome, crus, symbol, timeframe, **no.params)
+            except Exception as e:
+                # O plugin consumidor calcula (e registra o erro) por conta própria
+                logger.debug(f"[plano_execucao] Pré-cálculo de {no.id} falhou: {e}")
+        if executor is None or len(plugins) < 2:
+            for no in plugins:
+                resultado = _executar_plugin(no, dados_completos, symbol, timeframe)
+                _incorporar(no, resultado, dados_completos)
+            continue
+        # copy_context: o plugin roda com as variáveis de contexto de quem chamou
+        # (ex.: persistência adiada do pipeline em estágios)
+        tarefas = []
+        for no in plugins:
+            namespace = dict(dados_completos)
+            tarefas.append(
+                (
+                    no,
+                    namespace,
+                    executor.submit(
+                        copy_context().run,
+                        _executar_plugin,
+                        no,
+                        namespace,
+                        symbol,
+                        timeframe,
+                    ),
+                )
+            )
+        for no, namespace, tarefa in tarefas:
+            _incorporar(no, tarefa.result(), dados_completos, namespace)
+    return dados_completos
@@ -19,6 +19,7 @@ Apenas fornece funções auxiliares para uso dos plugins, sempre sob controle do
 from typing import Dict, Any, List, Callable, Type
 from plugins.plugin import Plugin, PluginRegistry
 from utils.logging_config import get_logger
+from utils.candles_colunares import CandlesOHLCV, como_candles
 import numpy as np
 import talib
 import logging
@@ -122,7 +123,8 @@ def calcular_volatilidade_generico(close, periodo=14):
     try:
         if len(close) < periodo:
             return 0.0
-        std = talib.STDDEV(close, timeperiod=periodo)
+        # Só o último valor é usado: basta a janela final de `periodo` candles
+        std = talib.STDDEV(close[-periodo:], timeperiod=periodo)
         return (
             float(std[-1]) / float(close[-1])
             if std.size > 0 and close[-1] != 0
@@ -143,6 +145,9 @@ def extrair_ohlcv(klines, indices):
     Returns:
         dict: Dicionário {indice: np.ndarray}
     """
+    if isinstance(klines, CandlesOHLCV) and klines.completo(indices):
+        # Colunas já convertidas pela camada de dados: sem cópia
+        return klines.ohlcv(indices)
     try:
         return {
             i: np.array([float(d[i]) for d in klines if len(d) > i]) for i in indices
@@ -153,26 +158,32 @@ def extrair_ohlcv(klines, indices):
 
 
 # --- Validação de candles ---
-def validar_klines(klines, min_len=20):
+def validacao_klines(klines):
+    """
+    Retorna o relatório de validação vetorizada dos klines.
+    Para CandlesOHLCV (saída do ObterDados) reutiliza o relatório já
+    calculado na busca; listas comuns são convertidas e validadas uma vez.
+    Args:
+        klines (list): Lista de k-lines ou CandlesOHLCV.
+    Returns:
+        RelatorioValidacao: Relatório com as contagens de problemas.
+    """
+    return como_candles(klines).validacao
+
+
+def validar_klines(klines, min_len=20, indices=(2, 3, 4)):
     """
     Valida o formato da lista de klines (candles).
     Args:
         klines (list): Lista de k-lines.
         min_len (int): Tamanho mínimo.
+        indices (tuple): Colunas que devem ser numéricas e finitas.
     Returns:
         bool: True se válido, False caso contrário.
     """
     if not isinstance(klines, list) or len(klines) < min_len:
         return False
-    for item in klines:
-        if not isinstance(item, (list, tuple)) or len(item) < 5:
-            return False
-        for idx in [2, 3, 4]:
-            try:
-                float(item[idx])
-            except (TypeError, ValueError):
-                return False
-    return True
+    return validacao_klines(klines).valido(indices)
 
 
 # --- Wrapper para indicadores talib ---
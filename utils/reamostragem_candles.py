@@ -0,0 +1,167 @@
+"""
+Reamostragem local de candles.
+Constrói timeframes maiores (1h, 4h, 1d...) a partir do timeframe base já
+armazenado no ArmazemCandles, com buckets alinhados aos da exchange, para que
+apenas o timeframe base precise ser buscado na Bybit.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+from utils.armazem_candles import ArmazemCandles, CAMPOS_OHLCV, timeframe_para_ms
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Timeframes de duração variável (mês/ano) não são derivados localmente
+UNIDADES_NAO_REAMOSTRAVEIS = ("M", "y")
+
+# Deslocamento do início dos buckets em relação à época Unix
+# (1970-01-01 foi quinta-feira; as semanas da Bybit começam na segunda)
+DESLOCAMENTO_BUCKET_MS = {"w": 4 * 24 * 60 * 60 * 1000}
+
+
+def inicio_bucket(timestamps, timeframe: str) -> np.ndarray:
+    """
+    Calcula o início (ms) do candle do timeframe que contém cada timestamp.
+
+    Args:
+        timestamps: Timestamp ou array de timestamps em ms.
+        timeframe (str): Timeframe de destino no formato CCXT.
+
+    Returns:
+        np.ndarray: Inícios dos buckets (int64).
+    """
+    duracao = timeframe_para_ms(timeframe)
+    deslocamento = DESLOCAMENTO_BUCKET_MS.get(timeframe[-1], 0)
+    ts = np.asarray(timestamps, dtype=np.int64)
+    return (ts - deslocamento) // duracao * duracao + deslocamento
+
+
+def pode_reamostrar(timeframe_base: str, timeframe_destino: str) -> bool:
+    """Indica se o timeframe de destino pode ser derivado do timeframe base."""
+    if (
+        timeframe_base[-1:] in UNIDADES_NAO_REAMOSTRAVEIS
+        or timeframe_destino[-1:] in UNIDADES_NAO_REAMOSTRAVEIS
+    ):
+        return False
+    try:
+        base = timeframe_para_ms(timeframe_base)
+        destino = timeframe_para_ms(timeframe_destino)
+    except ValueError:
+        return False
+    deslocamento = DESLOCAMENTO_BUCKET_MS.get(timeframe_destino[-1], 0)
+    return destino > base and destino % base == 0 and deslocamento % base == 0
+
+
+def fecha_bucket(ts_base: int, timeframe_base: str, timeframe_destino: str) -> bool:
+    """Indica se o fechamento do candle base em ts_base fecha o candle de destino."""
+    fim = int(ts_base) + timeframe_para_ms(timeframe_base)
+    return int(inicio_bucket(fim, timeframe_destino)) == fim
+
+
+def reamostrar(
+    candles, timeframe_destino: str, descartar_incompleto: bool = True
+) -> np.ndarray:
+    """
+    Agrega candles OHLCV do timeframe base no timeframe de destino.
+
+    Reduções vetorizadas por bucket: open do primeiro, high máximo, low mínimo,
+    close do último e soma do volume. O último bucket pode estar em formação
+    (candle aberto), como na exchange.
+
+    Args:
+        candles: Array/lista (n, 6) [ts, o, h, l, c, v] ordenado por timestamp.
+        timeframe_destino (str): Timeframe de destino (ex: "4h").
+        descartar_incompleto (bool): Descarta o primeiro bucket se a janela
+            começar no meio dele (candle parcial).
+
+    Returns:
+        np.ndarray: Array (m, 6) float64 com os candles agregados.
+    """
+    dados = np.asarray(candles, dtype=np.float64)
+    if dados.ndim != 2 or not len(dados):
+        return np.empty((0, CAMPOS_OHLCV), dtype=np.float64)
+    buckets = inicio_bucket(dados[:, 0], timeframe_destino)
+    if descartar_incompleto and buckets[0] != int(dados[0, 0]):
+        inicio = int(np.searchsorted(buckets, buckets[0], side="right"))
+        dados, buckets = dados[inicio:], buckets[inicio:]
+        if not len(dados):
+            return np.empty((0, CAMPOS_OHLCV), dtype=np.float64)
+    inicios = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    fins = np.append(inicios[1:], len(dados)) - 1
+    resultado = np.empty((len(inicios), CAMPOS_OHLCV), dtype=np.float64)
+    resultado[:, 0] = buckets[inicios]
+    resultado[:, 1] = dados[inicios, 1]
+    resultado[:, 2] = np.maximum.reduceat(dados[:, 2], inicios)
+    resultado[:, 3] = np.minimum.reduceat(dados[:, 3], inicios)
+    resultado[:, 4] = dados[fins, 4]
+    resultado[:, 5] = np.add.reduceat(dados[:, 5], inicios)
+    return resultado
+
+
+class ReamostradorCandles:
+    """
+    Mantém os timeframes derivados de cada par atualizados a partir do buffer
+    do timeframe base no ArmazemCandles.
+
+    O histórico inicial de cada timeframe derivado vem da exchange (uma única
+    vez); depois disso, a cada atualização só os candles base a partir do
+    candle derivado aberto são reagregados e gravados no buffer derivado.
+    """
+
+    def __init__(self, armazem: ArmazemCandles, timeframe_base: str, timeframes):
+        self.armazem = armazem
+        self.timeframe_base = timeframe_base
+        self.derivados = [
+            tf for tf in timeframes if pode_reamostrar(timeframe_base, tf)
+        ]
+        base_ms = timeframe_para_ms(timeframe_base)
+        # O buffer base precisa conter ao menos um candle derivado inteiro
+        self._maior_razao = max(
+            (timeframe_para_ms(tf) // base_ms for tf in self.derivados), default=0
+        )
+
+    def eh_derivado(self, timeframe: str) -> bool:
+        return timeframe in self.derivados
+
+    def capacidade_base(self, limit: int) -> int:
+        """Capacidade necessária para o buffer do timeframe base."""
+        return max(int(limit), self._maior_razao + 1, self.armazem.capacidade_padrao)
+
+    def pronto(self, symbol: str, timeframe: str, limit: int) -> bool:
+        """Indica se o timeframe já tem histórico suficiente para ser derivado."""
+        return self.armazem.tamanho(symbol, timeframe) >= limit
+
+    def atualizar(self, symbol: str, timeframe: str, limit: int) -> Optional[List]:
+        """
+        Atualiza o candle derivado aberto (e os que fecharam) a partir do base.
+
+        Args:
+            symbol (str): ID do par.
+            timeframe (str): Timeframe derivado.
+            limit (int): Quantidade de candles a retornar.
+
+        Returns:
+            list | None: Últimos `limit` candles do timeframe, ou None se ainda
+            não houver histórico/candles base suficientes (buscar na exchange).
+        """
+        if not self.eh_derivado(timeframe) or not self.pronto(symbol, timeframe, limit):
+            return None
+        derivado = self.armazem.obter_buffer(symbol, timeframe, capacidade=limit)
+        # Cópia feita sob o lock do buffer: o stream/REST pode girá-lo durante
+        # a busca e a redução
+        base = self.armazem.obter_buffer(
+            symbol, self.timeframe_base, capacidade=self.capacidade_base(limit)
+        ).como_array(copiar=True)
+        ultimo = derivado.ultimo_timestamp
+        if ultimo is None or not len(base):
+            return None
+        inicio = int(np.searchsorted(base[:, 0], ultimo, side="left"))
+        if inicio >= len(base) or int(base[inicio, 0]) != ultimo:
+            # Buffer base não cobre o início do candle derivado aberto
+            return None
+        novos = reamostrar(base[inicio:], timeframe, descartar_incompleto=False)
+        derivado.atualizar(novos.tolist())
+        return derivado.como_lista(limit)
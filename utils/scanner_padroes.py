@@ -0,0 +1,224 @@
+"""
+Scanner em lote de padrões de candlestick (funções CDL* do TA-Lib).
+Cada padrão é avaliado só sobre a menor janela final de que precisa
+(lookback do TA-Lib + 1 candle), e não sobre todo o histórico. O resultado de
+cada candle é memorizado (LRU) por symbol, timeframe e valores do candle:
+um candle fechado nunca é reescaneado. As ocorrências são devolvidas em um
+único array estruturado (timestamp, padrao, valor).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import talib
+from talib import abstract
+
+from utils.candles_colunares import como_candles
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Uma linha por padrão detectado: valor > 0 alta, < 0 baixa (±100, ±200)
+DTYPE_OCORRENCIAS = np.dtype(
+    [("timestamp", np.int64), ("padrao", "U24"), ("valor", np.int32)]
+)
+
+
+def _vazio() -> np.ndarray:
+    return np.empty(0, dtype=DTYPE_OCORRENCIAS)
+
+
+class ScannerPadroes:
+    """
+    Detecta os padrões configurados nos últimos candles de uma série.
+
+    Args:
+        padroes (Iterable[str]): Nomes dos padrões (ex: "hammer", "engulfing"),
+            como em utils/padroes_talib.json.
+        capacidade (int): Máximo de candles com resultado em cache.
+    """
+
+    def __init__(self, padroes: Iterable[str], capacidade: int = 4096):
+        if capacidade <= 0:
+            raise ValueError("A capacidade do cache deve ser maior que 0.")
+        self.capacidade = capacidade
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self._funcoes: Dict[str, Tuple[Callable, int]] = {}
+        for padrao in sorted(set(padroes)):
+            nome_funcao = f"CDL{padrao.upper()}"
+            funcao = getattr(talib, nome_funcao, None)
+            if funcao is None:
+                logger.warning(f"[scanner_padroes] Padrão sem função TA-Lib: {padrao}")
+                continue
+            janela = abstract.Function(nome_funcao).lookback + 1
+            self._funcoes[padrao] = (funcao, janela)
+        self.janela_maxima = max((j for _, j in self._funcoes.values()), default=0)
+        self._cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def padroes(self) -> List[str]:
+        return list(self._funcoes)
+
+    def janela(self, padrao: str) -> int:
+        """Quantidade de candles finais que o padrão precisa avaliar."""
+        return self._funcoes[padrao][1]
+
+    def escanear(
+        self,
+        candles,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        ultimos: int = 1,
+    ) -> np.ndarray:
+        """
+        Retorna os padrões presentes nos `ultimos` candles.
+
+        Args:
+            candles: Lista de k-lines ou CandlesOHLCV.
+            symbol (str, optional): Par; com o timeframe, habilita o cache.
+            timeframe (str, optional): Timeframe.
+            ultimos (int): Quantidade de candles finais a avaliar.
+
+        Returns:
+            np.ndarray: Array estruturado DTYPE_OCORRENCIAS, em ordem de
+            timestamp e, no mesmo candle, de nome do padrão.
+        """
+        candles = como_candles(candles)
+        return self.escanear_colunas(
+            candles.timestamp,
+            candles.open,
+            candles.high,
+            candles.low,
+            candles.close,
+            symbol=symbol,
+            timeframe=timeframe,
+            ultimos=ultimos,
+        )
+
+    def escanear_colunas(
+        self,
+        timestamp: np.ndarray,
+        abertura: np.ndarray,
+        maxima: np.ndarray,
+        minima: np.ndarray,
+        fechamento: np.ndarray,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        ultimos: int = 1,
+    ) -> np.ndarray:
+        """Mesmo que escanear(), a partir das colunas OHLC já extraídas."""
+        total = len(fechamento)
+        ultimos = min(max(int(ultimos), 0), total)
+        if not ultimos or not self._funcoes:
+            return _vazio()
+
+        indices = range(total - ultimos, total)
+        usar_cache = bool(symbol and timeframe)
+        chaves = {}
+        resultados: Dict[int, np.ndarray] = {}
+        if usar_cache:
+            for i in indices:
+                chaves[i] = (
+                    symbol,
+                    timeframe,
+                    float(timestamp[i]),
+                    float(abertura[i]),
+                    float(maxima[i]),
+                    float(minima[i]),
+                    float(fechamento[i]),
+                )
+            with self._lock:
+                for i, chave in chaves.items():
+                    if chave in self._cache:
+                        self._cache.move_to_end(chave)
+                        resultados[i] = self._cache[chave]
+                self.acertos += len(resultados)
+                self.falhas += ultimos - len(resultados)
+
+        pendentes = [i for i in indices if i not in resultados]
+        if pendentes:
+            novos = self._calcular(
+                timestamp, abertura, maxima, minima, fechamento, pendentes[0]
+            )
+            for i in pendentes:
+                resultados[i] = novos[i]
+            if usar_cache:
+                self._guardar({chaves[i]: novos[i] for i in pendentes})
+
+        if ultimos == 1:
+            return resultados[indices[0]]
+        return np.concatenate([resultados[i] for i in indices])
+
+    def _calcular(
+        self,
+        timestamp: np.ndarray,
+        abertura: np.ndarray,
+        maxima: np.ndarray,
+        minima: np.ndarray,
+        fechamento: np.ndarray,
+        inicio: int,
+    ) -> Dict[int, np.ndarray]:
+        """Avalia todos os padrões para os candles de `inicio` até o fim."""
+        total = len(fechamento)
+        quantidade = total - inicio
+        # Uma única cópia contígua da maior janela; cada padrão usa o seu final
+        corte = max(0, total - (self.janela_maxima + quantidade - 1))
+        colunas = [
+            np.ascontiguousarray(coluna[corte:], dtype=np.float64)
+            for coluna in (abertura, maxima, minima, fechamento)
+        ]
+        tamanho = total - corte
+
+        nomes = list(self._funcoes)
+        valores = np.zeros((len(nomes), quantidade), dtype=np.int32)
+        for linha, nome in enumerate(nomes):
+            funcao, janela = self._funcoes[nome]
+            desde = max(0, tamanho - (janela + quantidade - 1))
+            try:
+                saida = funcao(*(coluna[desde:] for coluna in colunas))
+                valores[linha] = saida[-quantidade:]
+            except Exception as e:
+                logger.error(f"[scanner_padroes] Erro ao avaliar padrão {nome}: {e}")
+
+        nomes = np.array(nomes)
+        resultados = {}
+        for j in range(quantidade):
+            linhas = np.flatnonzero(valores[:, j])
+            ocorrencias = np.empty(len(linhas), dtype=DTYPE_OCORRENCIAS)
+            ocorrencias["timestamp"] = int(timestamp[inicio + j])
+            ocorrencias["padrao"] = nomes[linhas]
+            ocorrencias["valor"] = valores[linhas, j]
+            ocorrencias.flags.writeable = False
+            resultados[inicio + j] = ocorrencias
+        return resultados
+
+    def _guardar(self, novos: Dict[tuple, np.ndarray]) -> None:
+        with self._lock:
+            for chave, ocorrencias in novos.items():
+                self._cache[chave] = ocorrencias
+                self._cache.move_to_end(chave)
+            while len(self._cache) > self.capacidade:
+                self._cache.popitem(last=False)
+                self.despejos += 1
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                "padroes": len(self._funcoes),
+                "entradas": len(self._cache),
+                "capacidade": self.capacidade,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "despejos": self.despejos,
+                "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+            }
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._cache.clear()
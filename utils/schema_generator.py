@@ -216,6 +216,8 @@ def generate_schema():
                                 plugin, "plugin_schema_versao", "1.0"
                             ),
                         }
+                        if conf.get("indices"):
+                            schema["tabelas"][nome_tabela]["indices"] = conf["indices"]
             except Exception as e:
                 logging.warning(
                     f"[SchemaGenerator] Falha ao processar plugin {cls}: {e}"
@@ -0,0 +1,401 @@
+"""
+Serviço de indicadores com cache compartilhado entre os plugins.
+Cada série (ATR, SMA, MACD, RSI...) é calculada uma única vez por atualização
+de candle: a chave combina symbol, timeframe, a janela de candles (tamanho,
+primeiro timestamp e último candle), o nome do indicador e os parâmetros.
+O cache tem limite de entradas (LRU) e contadores de acertos/falhas.
+Quem só usa o valor mais recente chama ultimo(): o indicador é avaliado
+apenas sobre o menor sufixo estável de candles (lookback do TA-Lib mais o
+aquecimento das médias recursivas até a tolerância), e a série completa
+fica para quem precisa do histórico (features de ML, persistência).
+Com a tolerância padrão (1e-3) a janela estável de RSI/ATR/DI(14) é de 109
+candles, a de MACD(12,26,9) de 129 e a de ADX(14) de 153, abaixo do
+limit=200 das buscas; em troca, o último valor difere do calculado sobre a
+série toda em ~1e-3 relativo (no MACD, relativo à amplitude das linhas: um
+histograma perto de zero tem erro relativo maior). Períodos maiores (ex:
+ADX 21) voltam a exceder a janela e, nesse caso, a série toda é usada.
+Com a ingestão por WebSocket e os indicadores incrementais ativos, ultimo()
+lê EMA, RSI, ATR, OBV, MACD e ADX do motor incremental quando ele está no
+mesmo candle da janela analisada, sem rodar o TA-Lib.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import talib
+from talib import abstract
+
+from utils.candles_colunares import CLOSE, HIGH, LOW, VOLUME, como_candles
+from utils.config import carregar_config
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Colunas de entrada dos indicadores TA-Lib usados pelos plugins
+COLUNAS_INDICADORES: Dict[str, Tuple[int, ...]] = {
+    "SMA": (CLOSE,),
+    "EMA": (CLOSE,),
+    "RSI": (CLOSE,),
+    "MACD": (CLOSE,),
+    "BBANDS": (CLOSE,),
+    "STDDEV": (CLOSE,),
+    "ATR": (HIGH, LOW, CLOSE),
+    "ADX": (HIGH, LOW, CLOSE),
+    "PLUS_DI": (HIGH, LOW, CLOSE),
+    "MINUS_DI": (HIGH, LOW, CLOSE),
+    "OBV": (CLOSE, VOLUME),
+    "STOCH": (HIGH, LOW, CLOSE),
+    "MFI": (HIGH, LOW, CLOSE, VOLUME),
+}
+
+# Indicadores recursivos: estágios de suavização em cascata, cada um com
+# (parâmetros de período, suavização). Em cada estágio o efeito da semente
+# cai a (1 - alfa) por candle, somado ao erro que chega do estágio anterior.
+_RECURSIVOS: Dict[str, Tuple[Tuple[Tuple[str, ...], str], ...]] = {
+    "EMA": ((("timeperiod",), "ema"),),
+    "MACD": ((("fastperiod", "slowperiod"), "ema"), (("signalperiod",), "ema")),
+    "RSI": ((("timeperiod",), "wilder"),),
+    "ATR": ((("timeperiod",), "wilder"),),
+    "PLUS_DI": ((("timeperiod",), "wilder"),),
+    "MINUS_DI": ((("timeperiod",), "wilder"),),
+    "ADX": ((("timeperiod",), "wilder"), (("timeperiod",), "wilder")),
+}
+
+# Dependem de todo o histórico (acumulados): sem avaliação de cauda
+_INTEGRAIS = {"OBV"}
+
+
+def _aquecimento(alfas: Sequence[float], tolerancia: float) -> int:
+    """
+    Candles até a influência da semente ficar abaixo da tolerância em todos
+    os estágios da cascata (erro inicial 1 em cada estágio).
+    """
+    erros = [1.0 if alfa < 1 else 0.0 for alfa in alfas]
+    candles = 0
+    while max(erros, default=0.0) >= tolerancia:
+        entrada = 0.0
+        for i, alfa in enumerate(alfas):
+            erros[i] = (1.0 - alfa) * erros[i] + alfa * entrada
+            entrada = erros[i]
+        candles += 1
+    return candles
+
+
+def _ultimo_valor(resultado):
+    if isinstance(resultado, tuple):
+        return tuple(_ultimo_valor(r) for r in resultado)
+    if isinstance(resultado, np.ndarray):
+        return float(resultado[-1]) if resultado.size else None
+    return resultado
+
+
+def _somente_leitura(resultado):
+    if isinstance(resultado, tuple):
+        return tuple(_somente_leitura(r) for r in resultado)
+    if isinstance(resultado, np.ndarray):
+        resultado.flags.writeable = False
+    return resultado
+
+
+class ServicoIndicadores:
+    """
+    Calcula indicadores por nome e parâmetros, memorizando os resultados.
+
+    Os arrays devolvidos são compartilhados entre os plugins e, por isso,
+    somente leitura (use .copy() para alterar).
+
+    Args:
+        capacidade (int): Máximo de séries em cache (as menos usadas saem).
+        tolerancia (float): Influência relativa máxima da semente das médias
+            recursivas no valor obtido por ultimo(). Menor = mais exato, com
+            janelas maiores (1e-6 leva MACD/ADX a ~400 candles).
+    """
+
+    def __init__(self, capacidade: int = 2048, tolerancia: float = 1e-3):
+        if capacidade <= 0:
+            raise ValueError("A capacidade do cache deve ser maior que 0.")
+        if not 0 < tolerancia < 1:
+            raise ValueError("A tolerância deve estar entre 0 e 1.")
+        self.capacidade = capacidade
+        self.tolerancia = tolerancia
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self.incrementais = 0
+        self._motor = None
+        self._cache: "OrderedDict[tuple, object]" = OrderedDict()
+        self._funcoes: Dict[str, Tuple[Callable, Tuple[int, ...]]] = {}
+        self._janelas: Dict[tuple, Optional[int]] = {}
+        self._lock = threading.Lock()
+
+    def registrar(
+        self, nome: str, funcao: Callable, colunas: Sequence[int] = (CLOSE,)
+    ) -> None:
+        """Registra um indicador próprio: funcao(*colunas, **params)."""
+        self._funcoes[nome] = (funcao, tuple(colunas))
+        self._janelas = {c: j for c, j in self._janelas.items() if c[0] != nome}
+
+    def usar_motor_incremental(self, motor) -> None:
+        """
+        Liga o MotorIndicadoresIncrementais do stream a ultimo() (None desliga).
+        """
+        self._motor = motor
+
+    def _funcao(self, nome: str) -> Tuple[Callable, Tuple[int, ...]]:
+        if nome in self._funcoes:
+            return self._funcoes[nome]
+        if nome in COLUNAS_INDICADORES:
+            return getattr(talib, nome), COLUNAS_INDICADORES[nome]
+        raise KeyError(f"Indicador não registrado: {nome}")
+
+    @staticmethod
+    def _janela(candles) -> tuple:
+        """Identifica a janela de candles sem percorrê-la (O(1))."""
+        if not len(candles):
+            return (0,)
+        return (len(candles), candles[0][0], tuple(candles[-1]))
+
+    def chave(
+        self,
+        nome: str,
+        candles,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        **params,
+    ) -> tuple:
+        return (
+            symbol,
+            timeframe,
+            self._janela(candles),
+            nome,
+            tuple(sorted(params.items())),
+        )
+
+    def conhece(self, nome: str) -> bool:
+        """Indica se o indicador é do TA-Lib suportado ou foi registrado."""
+        return nome in self._funcoes or nome in COLUNAS_INDICADORES
+
+    def armazenar(
+        self,
+        nome: str,
+        candles,
+        resultado,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        **params,
+    ) -> None:
+        """
+        Grava uma série calculada fora do serviço (ex: modo universo) sob a
+        mesma chave que calcular() usaria, tornando-a somente leitura.
+        """
+        chave = self.chave(nome, candles, symbol, timeframe, **params)
+        resultado = _somente_leitura(resultado)
+        with self._lock:
+            self._guardar(chave, resultado)
+
+    def calcular(
+        self,
+        nome: str,
+        candles,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        **params,
+    ):
+        """
+        Retorna o indicador `nome` calculado sobre os candles.
+
+        Args:
+            nome (str): Nome do indicador (ex: "ATR", "SMA", "MACD").
+            candles: Lista de k-lines ou CandlesOHLCV.
+            symbol (str, optional): Par, parte da chave do cache.
+            timeframe (str, optional): Timeframe, parte da chave do cache.
+            **params: Parâmetros do indicador (ex: timeperiod=14).
+
+        Returns:
+            np.ndarray | tuple: Saída da função do indicador (somente leitura).
+        """
+        chave = self.chave(nome, candles, symbol, timeframe, **params)
+        with self._lock:
+            if chave in self._cache:
+                self._cache.move_to_end(chave)
+                self.acertos += 1
+                return self._cache[chave]
+            self.falhas += 1
+
+        funcao, colunas = self._funcao(nome)
+        candles = como_candles(candles)
+        resultado = _somente_leitura(
+            funcao(*(candles.coluna(i) for i in colunas), **params)
+        )
+
+        with self._lock:
+            self._guardar(chave, resultado)
+        return resultado
+
+    def janela_estavel(self, nome: str, **params) -> Optional[int]:
+        """
+        Menor quantidade de candles finais que reproduz o último valor da
+        série completa: exatamente (indicadores de janela fixa) ou dentro da
+        tolerância (médias recursivas). None quando o indicador precisa de
+        todo o histórico (acumulados, médias não simples ou registrados).
+        """
+        chave = (nome, tuple(sorted(params.items())))
+        if chave not in self._janelas:
+            self._janelas[chave] = self._calcular_janela(nome, params)
+        return self._janelas[chave]
+
+    def _calcular_janela(self, nome: str, params: dict) -> Optional[int]:
+        if nome in self._funcoes or nome in _INTEGRAIS:
+            return None
+        if any(int(v) != 0 for k, v in params.items() if k.endswith("matype")):
+            return None
+        try:
+            funcao = abstract.Function(nome)
+            # O lookback só depende dos períodos e dos tipos de média
+            funcao.set_parameters(
+                {k: v for k, v in params.items() if "period" in k or "matype" in k}
+            )
+            lookback = funcao.lookback
+        except Exception as e:
+            logger.warning(f"[servico_indicadores] Lookback indisponível: {nome}: {e}")
+            return None
+        aquecimento = 0
+        if nome in _RECURSIVOS:
+            padroes = funcao.parameters
+            alfas = []
+            for periodos, suavizacao in _RECURSIVOS[nome]:
+                periodo = (
+                    max(int(params.get(p, padroes.get(p, 0)) or 0) for p in periodos)
+                    or 1
+                )
+                alfas.append(
+                    2.0 / (periodo + 1) if suavizacao == "ema" else 1.0 / periodo
+                )
+            aquecimento = _aquecimento(alfas, self.tolerancia)
+        return lookback + aquecimento + 1
+
+    def ultimo(
+        self,
+        nome: str,
+        candles,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        **params,
+    ):
+        """
+        Retorna só o valor mais recente do indicador, avaliado sobre o
+        sufixo estável dos candles (janela_estavel) em vez da série toda.
+
+        Returns:
+            float | tuple | None: Último valor (NaN se ainda indefinido), uma
+            tupla para indicadores com várias saídas, ou None sem candles.
+        """
+        if not len(candles):
+            return None
+        chave = self.chave(nome, candles, symbol, timeframe, **params)
+        chave_ultimo = chave + ("ultimo",)
+        with self._lock:
+            for existente in (chave_ultimo, chave):
+                if existente in self._cache:
+                    # A série completa, se já calculada, também serve
+                    self._cache.move_to_end(existente)
+                    self.acertos += 1
+                    return _ultimo_valor(self._cache[existente])
+            self.falhas += 1
+
+        valor = self._ultimo_incremental(nome, candles, symbol, timeframe, params)
+        if valor is not None:
+            with self._lock:
+                self.incrementais += 1
+                self._guardar(chave_ultimo, valor)
+            return valor
+
+        funcao, colunas = self._funcao(nome)
+        candles = como_candles(candles)
+        janela = self.janela_estavel(nome, **params)
+        inicio = 0 if janela is None else max(0, len(candles) - janela)
+        # Fatias de linhas contíguas: nenhuma cópia das colunas
+        valor = _ultimo_valor(
+            funcao(*(candles.coluna(i)[inicio:] for i in colunas), **params)
+        )
+        with self._lock:
+            self._guardar(chave_ultimo, valor)
+        return valor
+
+    def _ultimo_incremental(
+        self,
+        nome: str,
+        candles,
+        symbol: Optional[str],
+        timeframe: Optional[str],
+        params: dict,
+    ):
+        """
+        Valor do motor incremental, se ele reproduz o TA-Lib sobre `candles`:
+        série iniciada no mesmo candle da janela (exato) ou, para as médias
+        recursivas, com pelo menos janela_estavel candles nos dois lados
+        (a diferença fica dentro da tolerância). Caso contrário, None.
+        """
+        motor = self._motor
+        if motor is None or symbol is None or timeframe is None:
+            return None
+        encontrado = motor.valor_talib(symbol, timeframe, nome, params, candles[-1])
+        if encontrado is None:
+            return None
+        valor, inicio_ts = encontrado
+        if inicio_ts is None:
+            return None
+        if inicio_ts == int(candles[0][0]):
+            return valor
+        janela = self.janela_estavel(nome, **params)
+        if janela is None or len(candles) < janela:
+            return None
+        # O motor precisa ter acompanhado a série por pelo menos a janela estável
+        return valor if inicio_ts <= int(candles[-janela][0]) else None
+
+    def _guardar(self, chave: tuple, resultado) -> None:
+        # Chamado com o lock adquirido
+        self._cache[chave] = resultado
+        self._cache.move_to_end(chave)
+        while len(self._cache) > self.capacidade:
+            self._cache.popitem(last=False)
+            self.despejos += 1
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                "entradas": len(self._cache),
+                "capacidade": self.capacidade,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "despejos": self.despejos,
+                "incrementais": self.incrementais,
+                "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+            }
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+_servico: Optional[ServicoIndicadores] = None
+_servico_lock = threading.Lock()
+
+
+def obter_servico_indicadores() -> ServicoIndicadores:
+    """Instância compartilhada por todos os plugins (capacidade da config)."""
+    global _servico
+    with _servico_lock:
+        if _servico is None:
+            try:
+                opcoes = carregar_config().get("cache_indicadores", {})
+                capacidade = int(opcoes.get("capacidade", 2048))
+                tolerancia = float(opcoes.get("tolerancia_cauda", 1e-3))
+            except Exception as e:
+                logger.warning(f"[servico_indicadores] Config indisponível: {e}")
+                capacidade, tolerancia = 2048, 1e-3
+            _servico = ServicoIndicadores(capacidade=capacidade, tolerancia=tolerancia)
+        return _servico
@@ -0,0 +1,126 @@
+"""
+Servidor HTTP local que imita as APIs de sentimento (FGI, LSR, BTC.d).
+Responde JSON configurável por caminho e conta requisições e conexões TCP,
+permitindo testar o ColetorDadosExternos (keep-alive, TTL, falhas) sem rede.
+Uso exclusivo em testes/benchmarks; não é carregado pelo bot.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def respostas_padrao() -> Dict[str, Tuple[int, dict]]:
+    """Respostas no formato das APIs reais usadas pelo ObterDados."""
+    return {
+        "/fng/": (
+            200,
+            {
+                "data": [
+                    {
+                        "value": "62",
+                        "value_classification": "Greed",
+                        "timestamp": "1710000000",
+                    }
+                ]
+            },
+        ),
+        "/lsr/BTCUSDT": (
+            200,
+            {"longShortRatio": 1.8, "longAccount": 0.64, "shortAccount": 0.36},
+        ),
+        "/btcd": (200, {"btc_dominance": 52.3, "direction": "Alta"}),
+    }
+
+
+class ServidorDadosExternos:
+    """
+    Servidor de stub das fontes externas.
+
+    Args:
+        respostas (dict): caminho -> (status HTTP, corpo JSON).
+        host (str): Endereço de escuta.
+        porta (int): Porta de escuta (0 = porta livre escolhida pelo SO).
+    """
+
+    def __init__(
+        self,
+        respostas: Optional[Dict[str, Tuple[int, dict]]] = None,
+        host: str = "127.0.0.1",
+        porta: int = 0,
+    ):
+        self.respostas = dict(
+            respostas if respostas is not None else respostas_padrao()
+        )
+        self.host = host
+        self.porta = porta
+        self.requisicoes: Dict[str, int] = {}
+        self.conexoes = 0
+        self._lock = threading.Lock()
+        self._servidor: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.porta}"
+
+    def definir(self, caminho: str, status: int, corpo: dict) -> None:
+        """Altera a resposta de um caminho em tempo de execução."""
+        with self._lock:
+            self.respostas[caminho] = (status, corpo)
+
+    def iniciar(self) -> str:
+        """Sobe o servidor em uma thread e retorna a URL base."""
+        servidor_stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # mantém a conexão (keep-alive)
+
+            def setup(self):
+                super().setup()
+                with servidor_stub._lock:
+                    servidor_stub.conexoes += 1
+
+            def do_GET(self):
+                caminho = urlsplit(self.path).path
+                with servidor_stub._lock:
+                    servidor_stub.requisicoes[caminho] = (
+                        servidor_stub.requisicoes.get(caminho, 0) + 1
+                    )
+                    status, corpo = servidor_stub.respostas.get(
+                        caminho, (404, {"erro": "não encontrado"})
+                    )
+                conteudo = json.dumps(corpo).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(conteudo)))
+                self.end_headers()
+                self.wfile.write(conteudo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer((self.host, self.porta), Handler)
+        self._servidor.daemon_threads = True
+        self.porta = self._servidor.server_address[1]
+        self._thread = threading.Thread(
+            target=self._servidor.serve_forever, name="stub-dados-externos", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"[stub_dados_externos] Servidor em {self.url}")
+        return self.url
+
+    def parar(self) -> None:
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -0,0 +1,175 @@
+"""
+Servidor WebSocket local que imita o stream público de klines da Bybit v5.
+Reproduz candles gravados (formato CCXT) para os tópicos inscritos, permitindo
+testar e fazer carga do modo de ingestão por WebSocket sem acesso à rede.
+Uso exclusivo em testes/benchmarks; não é carregado pelo bot.
+"""
+
+import asyncio
+import json
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import WSMsgType, web
+
+from utils.logging_config import get_logger
+from utils.stream_klines import INTERVALOS_BYBIT, TIMEFRAMES_BYBIT
+from utils.armazem_candles import timeframe_para_ms
+
+logger = get_logger(__name__)
+
+
+def montar_mensagem_kline(
+    symbol: str, timeframe: str, candle: list, fechado: bool
+) -> dict:
+    """Monta uma mensagem kline no mesmo formato do stream público da Bybit."""
+    ts = int(candle[0])
+    return {
+        "topic": f"kline.{INTERVALOS_BYBIT[timeframe]}.{symbol}",
+        "type": "snapshot",
+        "ts": ts,
+        "data": [
+            {
+                "start": ts,
+                "end": ts + timeframe_para_ms(timeframe) - 1,
+                "interval": INTERVALOS_BYBIT[timeframe],
+                "open": str(candle[1]),
+                "high": str(candle[2]),
+                "low": str(candle[3]),
+                "close": str(candle[4]),
+                "volume": str(candle[5]),
+                "turnover": "0",
+                "confirm": fechado,
+                "timestamp": ts,
+            }
+        ],
+    }
+
+
+class ServidorReplayKlines:
+    """
+    Servidor de replay de klines.
+
+    Para cada tópico inscrito envia, candle a candle, uma atualização do candle
+    aberto (confirm=false) seguida do fechamento (confirm=true).
+
+    Args:
+        candles (dict): (symbol, timeframe) -> lista de candles [ts, o, h, l, c, v].
+        intervalo (float): Pausa entre candles de um mesmo tópico (0 = máximo).
+        host (str): Endereço de escuta.
+        porta (int): Porta de escuta (0 = porta livre escolhida pelo SO).
+    """
+
+    def __init__(
+        self,
+        candles: Dict[Tuple[str, str], List[list]],
+        intervalo: float = 0.0,
+        host: str = "127.0.0.1",
+        porta: int = 0,
+    ):
+        self.candles = candles
+        self.intervalo = intervalo
+        self.host = host
+        self.porta = porta
+        self.mensagens_enviadas = 0
+        self.topicos_inscritos: set = set()
+        self._conexoes: set = set()
+        self._runner: Optional[web.AppRunner] = None
+
+    @classmethod
+    def de_arquivo(cls, caminho: str, **kwargs) -> "ServidorReplayKlines":
+        """
+        Cria o servidor a partir de um JSON {"SYMBOL|timeframe": [[ts, o, h, l, c, v], ...]}.
+        """
+        with open(caminho, encoding="utf-8") as f:
+            bruto = json.load(f)
+        candles = {
+            tuple(chave.split("|", 1)): valores for chave, valores in bruto.items()
+        }
+        return cls(candles, **kwargs)
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.porta}/v5/public/linear"
+
+    async def iniciar(self) -> str:
+        """Sobe o servidor e retorna a URL WebSocket."""
+        app = web.Application()
+        app.router.add_get("/v5/public/linear", self._handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.porta)
+        await site.start()
+        self.porta = site._server.sockets[0].getsockname()[1]
+        logger.info(f"[replay_ws] Servidor de replay em {self.url}")
+        return self.url
+
+    async def derrubar_conexoes(self) -> None:
+        """Fecha as conexões abertas (simula queda do stream)."""
+        for ws in list(self._conexoes):
+            await ws.close()
+
+    async def parar(self) -> None:
+        await self.derrubar_conexoes()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._conexoes.add(ws)
+        tarefas: Dict[str, asyncio.Future] = {}
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                pedido = json.loads(msg.data)
+                op = pedido.get("op")
+                if op == "ping":
+                    await ws.send_json(
+                        {"success": True, "ret_msg": "pong", "op": "ping"}
+                    )
+                elif op == "subscribe":
+                    await ws.send_json(
+                        {"success": True, "ret_msg": "", "op": "subscribe"}
+                    )
+                    for topico in pedido.get("args", []):
+                        self.topicos_inscritos.add(topico)
+                        tarefas[topico] = asyncio.ensure_future(
+                            self._reproduzir(ws, topico)
+                        )
+                elif op == "unsubscribe":
+                    await ws.send_json(
+                        {"success": True, "ret_msg": "", "op": "unsubscribe"}
+                    )
+                    for topico in pedido.get("args", []):
+                        self.topicos_inscritos.discard(topico)
+                        tarefa = tarefas.pop(topico, None)
+                        if tarefa:
+                            tarefa.cancel()
+        finally:
+            self._conexoes.discard(ws)
+            self.topicos_inscritos.difference_update(tarefas)
+            for tarefa in tarefas.values():
+                tarefa.cancel()
+        return ws
+
+    async def _reproduzir(self, ws, topico: str) -> None:
+        try:
+            _, intervalo, symbol = topico.split(".", 2)
+            timeframe = TIMEFRAMES_BYBIT[intervalo]
+        except (ValueError, KeyError):
+            await ws.send_json(
+                {"success": False, "ret_msg": f"topic {topico} inválido"}
+            )
+            return
+        for candle in self.candles.get((symbol, timeframe), []):
+            for fechado in (False, True):
+                await ws.send_json(
+                    montar_mensagem_kline(symbol, timeframe, candle, fechado)
+                )
+                self.mensagens_enviadas += 1
+            if self.intervalo:
+                await asyncio.sleep(self.intervalo)
+            else:
+                await asyncio.sleep(0)
@@ -0,0 +1,267 @@
+"""
+Ingestão de klines via WebSocket (Bybit v5, tópicos kline.{intervalo}.{symbol}).
+Atualiza o ArmazemCandles à medida que as mensagens chegam e registra os pares
+cujo candle fechou, para que a análise só rode quando há candle novo. Após uma
+queda da conexão os buffers ficam pendentes de recarga (os candles perdidos
+vêm do REST) e mudanças no conjunto de pares reinscrevem os tópicos.
+"""
+
+import asyncio
+import json
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import aiohttp
+
+from utils.armazem_candles import ArmazemCandles
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Timeframe CCXT -> intervalo do tópico kline da Bybit
+INTERVALOS_BYBIT = {
+    "1m": "1",
+    "3m": "3",
+    "5m": "5",
+    "15m": "15",
+    "30m": "30",
+    "1h": "60",
+    "2h": "120",
+    "4h": "240",
+    "6h": "360",
+    "12h": "720",
+    "1d": "D",
+    "1w": "W",
+    "1M": "M",
+}
+TIMEFRAMES_BYBIT = {v: k for k, v in INTERVALOS_BYBIT.items()}
+
+
+def topico_kline(symbol: str, timeframe: str) -> str:
+    """Monta o tópico kline da Bybit (ex: kline.15.BTCUSDT)."""
+    return f"kline.{INTERVALOS_BYBIT[timeframe]}.{symbol}"
+
+
+def converter_mensagem_kline(mensagem: dict) -> List[Tuple[str, str, list, bool]]:
+    """
+    Converte uma mensagem kline da Bybit em candles no formato do CCXT.
+
+    Args:
+        mensagem (dict): Mensagem decodificada do WebSocket.
+
+    Returns:
+        list: Tuplas (symbol, timeframe, [ts, o, h, l, c, v], fechado).
+    """
+    topico = mensagem.get("topic", "")
+    if not topico.startswith("kline."):
+        return []
+    try:
+        _, intervalo, symbol = topico.split(".", 2)
+        timeframe = TIMEFRAMES_BYBIT[intervalo]
+    except (ValueError, KeyError):
+        logger.warning(f"[stream_klines] Tópico desconhecido: {topico}")
+        return []
+    candles = []
+    for item in mensagem.get("data", []):
+        candle = [
+            int(item["start"]),
+            float(item["open"]),
+            float(item["high"]),
+            float(item["low"]),
+            float(item["close"]),
+            float(item["volume"]),
+        ]
+        candles.append((symbol, timeframe, candle, bool(item.get("confirm"))))
+    return candles
+
+
+class StreamKlines:
+    """
+    Cliente WebSocket de klines com reconexão automática.
+
+    - Inscreve os tópicos em lotes (lote_inscricao por mensagem).
+    - Sobrescreve o candle aberto e anexa candles novos no ArmazemCandles.
+    - Acumula os pares com candle fechado até consumir_fechamentos().
+    - Repassa cada candle recebido a ao_atualizar (ex: indicadores incrementais).
+    - Ao perder a conexão, marca todos os pares/timeframes como pendentes de
+      recarga até marcar_recarregado() (o consumidor completa pelo REST) e
+      os reporta como fechados em consumir_fechamentos().
+    - atualizar_pares() inscreve/desinscreve os tópicos na conexão ativa.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        armazem: ArmazemCandles,
+        pares: List[str],
+        timeframes: List[str],
+        ao_fechar: Optional[Callable[[str, str], None]] = None,
+        ao_atualizar: Optional[Callable[[str, str, list, bool], None]] = None,
+        lote_inscricao: int = 10,
+        intervalo_ping: float = 20.0,
+        espera_reconexao: float = 1.0,
+    ):
+        self.url = url
+        self.armazem = armazem
+        self.pares = list(pares)
+        self.timeframes = [tf for tf in timeframes if tf in INTERVALOS_BYBIT]
+        self.ao_fechar = ao_fechar
+        self.ao_atualizar = ao_atualizar
+        self.lote_inscricao = max(1, int(lote_inscricao))
+        self.intervalo_ping = intervalo_ping
+        self.espera_reconexao = espera_reconexao
+        self.mensagens_recebidas = 0
+        self._fechados: Dict[str, Set[str]] = {}
+        self._pendentes: Set[Tuple[str, str]] = set()
+        self._inscritos: Set[str] = set()
+        self._ws = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._parar = False
+
+    @property
+    def topicos(self) -> List[str]:
+        return [topico_kline(s, tf) for s in self.pares for tf in self.timeframes]
+
+    def pendente_recarga(self, symbol: str, timeframe: str) -> bool:
+        """Indica se o buffer pode ter lacuna desde a última queda da conexão."""
+        with self._lock:
+            return (symbol, timeframe) in self._pendentes
+
+    def marcar_recarregado(self, symbol: str, timeframe: str) -> None:
+        """Registra que o buffer foi completado pelo REST."""
+        with self._lock:
+            self._pendentes.discard((symbol, timeframe))
+
+    def _marcar_pendentes(self) -> None:
+        # Candles que fecharam durante a queda não chegam pelo stream: os pares
+        # também entram como fechados para que o próximo ciclo recarregue pelo
+        # REST e analise
+        with self._lock:
+            for symbol in self.pares:
+                self._fechados.setdefault(symbol, set()).update(self.timeframes)
+                self._pendentes.update((symbol, tf) for tf in self.timeframes)
+            total = len(self._pendentes)
+        logger.warning(
+            f"[stream_klines] Conexão interrompida: {total} buffers pendentes de recarga via REST"
+        )
+
+    def atualizar_pares(self, pares: List[str]) -> Set[str]:
+        """
+        Troca o conjunto de pares; com a conexão ativa, inscreve os tópicos
+        novos e desinscreve os removidos (na próxima conexão a inscrição já
+        usa a lista nova).
+
+        Returns:
+            set: Pares que entraram (sem histórico no stream ainda).
+        """
+        with self._lock:
+            novos = set(pares) - set(self.pares)
+            if set(pares) == set(self.pares):
+                return set()
+            self.pares = list(pares)
+        loop, ws = self._loop, self._ws
+        if loop is not None and ws is not None and not ws.closed:
+            asyncio.run_coroutine_threadsafe(self._sincronizar_inscricoes(ws), loop)
+        return novos
+
+    async def _sincronizar_inscricoes(self, ws) -> None:
+        """Envia subscribe/unsubscribe até os tópicos inscritos baterem com topicos."""
+        topicos = self.topicos
+        desejados = set(topicos)
+        for op, lista in (
+            ("unsubscribe", [t for t in self._inscritos if t not in desejados]),
+            ("subscribe", [t for t in topicos if t not in self._inscritos]),
+        ):
+            for i in range(0, len(lista), self.lote_inscricao):
+                await ws.send_json(
+                    {"op": op, "args": lista[i : i + self.lote_inscricao]}
+                )
+        self._inscritos = desejados
+
+    def consumir_fechamentos(self) -> Dict[str, Set[str]]:
+        """
+        Retorna e limpa os pares com candle fechado desde a última chamada.
+
+        Returns:
+            dict: symbol -> conjunto de timeframes com candle fechado.
+        """
+        with self._lock:
+            fechados, self._fechados = self._fechados, {}
+        return fechados
+
+    def processar_mensagem(self, mensagem: dict) -> int:
+        """
+        Aplica uma mensagem kline ao armazém.
+
+        Returns:
+            int: Quantidade de candles fechados na mensagem.
+        """
+        fechados = 0
+        for symbol, timeframe, candle, fechado in converter_mensagem_kline(mensagem):
+            self.armazem.obter_buffer(symbol, timeframe).atualizar([candle])
+            if self.ao_atualizar:
+                self.ao_atualizar(symbol, timeframe, candle, fechado)
+            if fechado:
+                fechados += 1
+                with self._lock:
+                    self._fechados.setdefault(symbol, set()).add(timeframe)
+                if self.ao_fechar:
+                    self.ao_fechar(symbol, timeframe)
+        self.mensagens_recebidas += 1
+        return fechados
+
+    def parar(self) -> None:
+        """Sinaliza o encerramento do loop de leitura."""
+        self._parar = True
+
+    async def executar(self) -> None:
+        """Mantém a conexão ativa até parar(), reconectando em caso de falha."""
+        self._parar = False
+        async with aiohttp.ClientSession() as sessao:
+            while not self._parar:
+                try:
+                    await self._sessao_ws(sessao)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"[stream_klines] Conexão perdida: {e}")
+                if not self._parar:
+                    await asyncio.sleep(self.espera_reconexao)
+
+    async def _sessao_ws(self, sessao: aiohttp.ClientSession) -> None:
+        async with sessao.ws_connect(self.url, heartbeat=None) as ws:
+            self._inscritos = set()
+            await self._sincronizar_inscricoes(ws)
+            self._ws, self._loop = ws, asyncio.get_running_loop()
+            logger.info(
+                f"[stream_klines] Conectado a {self.url} ({len(self._inscritos)} tópicos)"
+            )
+            tarefa_ping = asyncio.ensure_future(self._ping(ws))
+            try:
+                async for msg in ws:
+                    if self._parar:
+                        break
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        if msg.type in (
+                            aiohttp.WSMsgType.CLOSED,
+                            aiohttp.WSMsgType.ERROR,
+                        ):
+                            break
+                        continue
+                    mensagem = json.loads(msg.data)
+                    if "topic" in mensagem:
+                        self.processar_mensagem(mensagem)
+                    elif mensagem.get("success") is False:
+                        logger.error(f"[stream_klines] Erro do servidor: {mensagem}")
+            finally:
+                tarefa_ping.cancel()
+                self._ws = None
+                if not self._parar:
+                    # Candles enviados durante a queda não chegam pelo stream
+                    self._marcar_pendentes()
+
+    async def _ping(self, ws) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo_ping)
+            await ws.send_json({"op": "ping"})
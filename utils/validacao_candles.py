@@ -0,0 +1,180 @@
+"""
+Validação vetorizada de blocos de candles OHLCV.
+Verifica em uma única passada NumPy sobre as colunas: valores numéricos e
+finitos, high >= low, open/close dentro da faixa, volume não negativo,
+timestamps em ordem, duplicados e lacunas. O relatório é calculado uma vez
+por busca (ObterDados) e consultado pelos plugins em vez de revalidar.
+"""
+
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from utils.armazem_candles import CAMPOS_OHLCV, timeframe_para_ms
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+NOMES_COLUNAS = ("timestamp", "open", "high", "low", "close", "volume")
+# Diferença entre timestamps (em intervalos) a partir da qual há lacuna
+TOLERANCIA_LACUNA = 1.5
+
+
+class RelatorioValidacao:
+    """
+    Resultado da validação de um bloco de candles.
+
+    Attributes:
+        total (int): Quantidade de candles.
+        nao_finitos (np.ndarray): Por coluna, valores ausentes, não numéricos,
+            NaN ou infinitos.
+        high_menor_low (int): Candles com high < low.
+        fora_da_faixa (int): Candles com open/close fora de [low, high].
+        volume_negativo (int): Candles com volume < 0.
+        fora_de_ordem (int): Timestamps menores que o anterior.
+        duplicados (int): Timestamps repetidos.
+        lacunas (int): Saltos maiores que o intervalo do timeframe.
+        candles_faltantes (int): Candles ausentes somando todas as lacunas.
+        timeframe (str | None): Timeframe usado para detectar lacunas.
+    """
+
+    __slots__ = (
+        "total",
+        "nao_finitos",
+        "high_menor_low",
+        "fora_da_faixa",
+        "volume_negativo",
+        "fora_de_ordem",
+        "duplicados",
+        "lacunas",
+        "candles_faltantes",
+        "timeframe",
+    )
+
+    def __init__(self, total: int, timeframe: Optional[str] = None):
+        self.total = total
+        self.nao_finitos = np.zeros(CAMPOS_OHLCV, dtype=np.int64)
+        self.high_menor_low = 0
+        self.fora_da_faixa = 0
+        self.volume_negativo = 0
+        self.fora_de_ordem = 0
+        self.duplicados = 0
+        self.lacunas = 0
+        self.candles_faltantes = 0
+        self.timeframe = timeframe
+
+    def valido(
+        self, indices: Iterable[int] = range(CAMPOS_OHLCV), min_len: int = 0
+    ) -> bool:
+        """
+        Indica se há pelo menos `min_len` candles e se as colunas pedidas são
+        todas numéricas e finitas (critério de formato usado pelos plugins).
+        """
+        return self.total >= min_len and not self.nao_finitos[list(indices)].any()
+
+    @property
+    def consistente(self) -> bool:
+        """Formato válido, preços coerentes e timestamps ordenados e únicos."""
+        return (
+            self.valido()
+            and not self.high_menor_low
+            and not self.fora_da_faixa
+            and not self.volume_negativo
+            and not self.fora_de_ordem
+            and not self.duplicados
+        )
+
+    def problemas(self) -> List[str]:
+        """Descrição curta de cada problema encontrado (para logs)."""
+        problemas = [
+            f"{NOMES_COLUNAS[i]} não numérico/NaN: {int(q)}"
+            for i, q in enumerate(self.nao_finitos)
+            if q
+        ]
+        for campo, descricao in (
+            ("high_menor_low", "high < low"),
+            ("fora_da_faixa", "open/close fora de [low, high]"),
+            ("volume_negativo", "volume negativo"),
+            ("fora_de_ordem", "timestamps fora de ordem"),
+            ("duplicados", "timestamps duplicados"),
+            ("lacunas", "lacunas"),
+        ):
+            quantidade = getattr(self, campo)
+            if quantidade:
+                problemas.append(f"{descricao}: {quantidade}")
+        return problemas
+
+    def como_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "nao_finitos": dict(zip(NOMES_COLUNAS, self.nao_finitos.tolist())),
+            "high_menor_low": self.high_menor_low,
+            "fora_da_faixa": self.fora_da_faixa,
+            "volume_negativo": self.volume_negativo,
+            "fora_de_ordem": self.fora_de_ordem,
+            "duplicados": self.duplicados,
+            "lacunas": self.lacunas,
+            "candles_faltantes": self.candles_faltantes,
+            "timeframe": self.timeframe,
+            "consistente": self.consistente,
+        }
+
+    def __repr__(self) -> str:
+        return f"RelatorioValidacao(total={self.total}, problemas={self.problemas()})"
+
+
+def validar_colunas(
+    colunas: np.ndarray, timeframe: Optional[str] = None
+) -> RelatorioValidacao:
+    """
+    Valida uma matriz (6, n) de colunas OHLCV (ex: CandlesOHLCV.colunas).
+
+    Args:
+        colunas (np.ndarray): Colunas timestamp, open, high, low, close, volume;
+            valores ausentes ou não numéricos devem estar como NaN.
+        timeframe (str, optional): Habilita a detecção de lacunas.
+
+    Returns:
+        RelatorioValidacao: Contagens de cada problema.
+    """
+    total = colunas.shape[1]
+    relatorio = RelatorioValidacao(total, timeframe)
+    if not total:
+        return relatorio
+
+    finitos = np.isfinite(colunas)
+    relatorio.nao_finitos = total - finitos.sum(axis=1)
+    ts, o, h, l, c, v = colunas
+    with np.errstate(invalid="ignore"):
+        # Comparações com NaN resultam False: só contam valores presentes
+        relatorio.high_menor_low = int(np.count_nonzero(h < l))
+        relatorio.fora_da_faixa = int(
+            np.count_nonzero((o > h) | (o < l) | (c > h) | (c < l))
+        )
+        relatorio.volume_negativo = int(np.count_nonzero(v < 0))
+
+    ts = ts[finitos[0]]
+    if len(ts) > 1:
+        diferencas = np.diff(ts)
+        relatorio.fora_de_ordem = int(np.count_nonzero(diferencas < 0))
+        unicos = np.unique(ts)
+        relatorio.duplicados = int(len(ts) - len(unicos))
+        intervalo = _intervalo_ms(timeframe)
+        if intervalo:
+            # Lacunas sobre os timestamps ordenados: independem da ordem/duplicados
+            passos = np.diff(unicos)
+            saltos = passos[passos > intervalo * TOLERANCIA_LACUNA]
+            relatorio.lacunas = int(len(saltos))
+            relatorio.candles_faltantes = int(
+                np.rint(saltos / intervalo).sum() - len(saltos)
+            )
+    return relatorio
+
+
+def _intervalo_ms(timeframe: Optional[str]) -> Optional[int]:
+    if not timeframe:
+        return None
+    try:
+        return timeframe_para_ms(timeframe)
+    except ValueError:
+        return None